@@ -7,7 +7,7 @@ Add new route modules here as they are created.
 
 from fastapi import APIRouter
 
-from app.api.routes import combat, heroes, game, npc
+from app.api.routes import analytics, assets, combat, heroes, game, npc, maps
 
 api_router = APIRouter(prefix="/api")
 
@@ -16,3 +16,6 @@ api_router.include_router(combat.router)
 api_router.include_router(heroes.router)
 api_router.include_router(game.router)
 api_router.include_router(npc.router)
+api_router.include_router(maps.router)
+api_router.include_router(analytics.router)
+api_router.include_router(assets.router)
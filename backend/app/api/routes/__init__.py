@@ -4,6 +4,6 @@ API Routes Package
 Contains modular route files for each feature area.
 """
 
-from app.api.routes import combat, heroes, game
+from app.api.routes import analytics, assets, combat, heroes, game, maps
 
-__all__ = ["combat", "heroes", "game"]
+__all__ = ["analytics", "assets", "combat", "heroes", "game", "maps"]
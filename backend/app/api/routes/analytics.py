@@ -0,0 +1,28 @@
+"""
+Analytics API Routes
+--------------------
+Balancing dashboards built from materialized combat aggregates:
+- Win rates by player army composition
+- Average fight length
+- Damage dealt and taken per unit type
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.analytics import AnalyticsResponse
+from app.services.analytics_service import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["analytics"])
+
+
+@router.get("", response_model=AnalyticsResponse)
+async def get_analytics(db: AsyncSession = Depends(get_db)) -> AnalyticsResponse:
+    """
+    Get combat balancing statistics.
+
+    Reads only the aggregate tables, which are updated as each combat
+    ends; rebuild them with `python -m app.cli backfill-analytics`.
+    """
+    return await AnalyticsService(db).get_dashboard()
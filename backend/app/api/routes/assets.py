@@ -0,0 +1,95 @@
+"""
+Asset Routes
+------------
+Serves the content-hashed static assets built by
+`python -m app.cli build-assets`:
+- The manifest mapping logical asset names to hashed files
+- Hashed files with immutable caching, precompressed variants
+  and byte-range requests
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+
+from app.config import settings
+from app.services.asset_service import (
+    ENCODINGS,
+    AssetManifest,
+    choose_encoding,
+    etag_matches,
+    get_asset_manifest,
+)
+from app.services.exceptions import AssetNotFoundError
+
+router = APIRouter(prefix="/assets", tags=["assets"])
+
+
+@router.get("/manifest")
+async def get_manifest(
+    request: Request,
+    manifest: AssetManifest = Depends(get_asset_manifest),
+) -> Response:
+    """
+    Get the asset manifest: `{base_url, files: {logical name: hashed path}}`.
+
+    The manifest itself changes with every asset build, so it is
+    revalidated on each load (ETag, 304) while the files it points at
+    are cached for good.
+    """
+    headers = {
+        "ETag": manifest.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if etag_matches(request.headers.get("if-none-match"), manifest.etag):
+        return Response(status_code=304, headers=headers)
+
+    if choose_encoding(request.headers.get("accept-encoding", ""), ("gzip",)):
+        headers["Content-Encoding"] = "gzip"
+        return Response(manifest.gzip_body, media_type="application/json", headers=headers)
+
+    return Response(manifest.body, media_type="application/json", headers=headers)
+
+
+@router.api_route("/files/{path:path}", methods=["GET", "HEAD"])
+async def get_asset(
+    path: str,
+    request: Request,
+    manifest: AssetManifest = Depends(get_asset_manifest),
+) -> Response:
+    """
+    Get a hashed asset file.
+
+    Responses are immutable for a year since a file's name changes with
+    its content. A precompressed brotli or gzip variant is sent when the
+    client accepts it; range requests get the identity encoding so byte
+    offsets refer to the file itself.
+    """
+    try:
+        asset = manifest.resolve(path)
+    except AssetNotFoundError:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    headers = {
+        "ETag": asset.etag,
+        "Cache-Control": f"public, max-age={settings.asset_max_age_seconds}, immutable",
+    }
+    if asset.encodings:
+        headers["Vary"] = "Accept-Encoding"
+
+    if etag_matches(request.headers.get("if-none-match"), asset.etag):
+        return Response(status_code=304, headers=headers)
+
+    encoding = None
+    if "range" not in request.headers:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""), asset.encodings)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+        return FileResponse(
+            asset.path.with_name(asset.path.name + ENCODINGS[encoding]),
+            media_type=asset.media_type,
+            headers=headers,
+        )
+
+    return FileResponse(asset.path, media_type=asset.media_type, headers=headers)
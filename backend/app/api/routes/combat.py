@@ -6,20 +6,37 @@ Handles all combat-related endpoints including:
 - Processing player actions (unit placement, spell casting)
 - Running combat simulation ticks
 - Retrieving combat results
+- Streaming a combat's action log for replay
 """
 
+import json
 import uuid
-from fastapi import APIRouter, Depends, HTTPException
+from collections.abc import AsyncIterator
+from functools import partial
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import SessionFactory, get_db, get_session_factory
 from app.schemas.combat import (
     CombatStartRequest,
     CombatState,
     CombatAction,
     CombatActionResponse,
+    CombatHistoryResponse,
+    CombatStatus,
 )
+from app.services.analytics_service import AnalyticsService
 from app.services.combat_engine import CombatEngine
+from app.services.combat_record_service import (
+    DEFAULT_HISTORY_PAGE_SIZE,
+    CombatActionWriter,
+    CombatRecordService,
+    get_combat_action_writer,
+)
+from app.services.exceptions import CombatNotFoundError, InvalidCursorError
 
 router = APIRouter(prefix="/combat", tags=["combat"])
 
@@ -31,6 +48,7 @@ _combat_instances: dict[str, CombatEngine] = {}
 async def start_combat(
     request: CombatStartRequest,
     db: AsyncSession = Depends(get_db),
+    writer: CombatActionWriter = Depends(get_combat_action_writer),
 ) -> CombatState:
     """
     Initialize a new combat encounter.
@@ -39,10 +57,42 @@ async def start_combat(
     Returns the initial combat state for rendering.
     """
     combat_id = str(uuid.uuid4())
-    engine = CombatEngine(combat_id, request.player_units, request.enemy_units)
+    engine = CombatEngine(
+        combat_id,
+        request.player_units,
+        request.enemy_units,
+        on_action=partial(writer.submit, combat_id),
+    )
     _combat_instances[combat_id] = engine
 
-    return engine.get_state()
+    state = engine.get_state()
+    await CombatRecordService(db).create(
+        combat_id, state.model_dump(mode="json"), game_save_id=request.game_save_id
+    )
+    return state
+
+
+@router.get("/history", response_model=CombatHistoryResponse)
+async def get_combat_history(
+    game_save_id: str = Query(description="Game save whose combats to list"),
+    limit: int = Query(DEFAULT_HISTORY_PAGE_SIZE, ge=1, le=200, description="Combats per page"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+) -> CombatHistoryResponse:
+    """
+    List a save's finished combats, newest first.
+
+    Paginated with keyset cursors on (started_at, id); only the summary
+    columns recorded at combat end are read.
+    """
+    try:
+        combats, next_cursor = await CombatRecordService(db).list_history(
+            game_save_id, limit, cursor
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return CombatHistoryResponse(combats=combats, next_cursor=next_cursor)
 
 
 @router.get("/{combat_id}/state", response_model=CombatState)
@@ -81,7 +131,7 @@ async def submit_action(combat_id: str, action: CombatAction) -> CombatActionRes
 
 
 @router.post("/{combat_id}/tick", response_model=CombatState)
-async def run_tick(combat_id: str) -> CombatState:
+async def run_tick(combat_id: str, db: AsyncSession = Depends(get_db)) -> CombatState:
     """
     Advance the combat simulation by one tick.
 
@@ -92,17 +142,63 @@ async def run_tick(combat_id: str) -> CombatState:
     if not engine:
         raise HTTPException(status_code=404, detail="Combat not found")
 
+    was_active = engine.status == CombatStatus.ACTIVE
     engine.tick()
-    return engine.get_state()
+    state = engine.get_state()
+
+    if was_active and engine.status != CombatStatus.ACTIVE:
+        await _finish_combat(db, engine)
+    return state
+
+
+@router.get("/{combat_id}/actions")
+async def stream_actions(
+    combat_id: str,
+    after_seq: int = Query(0, ge=0, description="Only return actions after this seq"),
+    session_factory: SessionFactory = Depends(get_session_factory),
+    writer: CombatActionWriter = Depends(get_combat_action_writer),
+) -> StreamingResponse:
+    """
+    Stream a combat's action log for replay, as newline-delimited JSON.
+
+    Each line is `{"seq", "tick", "payload"}`, in seq order. Rows are
+    fetched from the database in batches while the response is sent.
+    """
+    # Make actions still waiting in the write buffer visible
+    await writer.flush()
+
+    async with session_factory() as db:
+        try:
+            await CombatRecordService(db).check_exists(combat_id)
+        except CombatNotFoundError:
+            raise HTTPException(status_code=404, detail="Combat not found")
+
+    async def lines() -> AsyncIterator[str]:
+        async with session_factory() as db:
+            async for action in CombatRecordService(db).stream_actions(combat_id, after_seq):
+                yield json.dumps(action, separators=(",", ":")) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @router.delete("/{combat_id}")
-async def end_combat(combat_id: str) -> dict[str, str]:
+async def end_combat(combat_id: str, db: AsyncSession = Depends(get_db)) -> dict[str, str]:
     """
     End a combat encounter and clean up resources.
+
+    Combats abandoned before a winner is decided are recorded as
+    finished with their current state.
     """
-    if combat_id in _combat_instances:
-        del _combat_instances[combat_id]
+    engine = _combat_instances.pop(combat_id, None)
+    if engine:
+        await _finish_combat(db, engine)
         return {"status": "deleted"}
 
     raise HTTPException(status_code=404, detail="Combat not found")
+
+
+async def _finish_combat(db: AsyncSession, engine: CombatEngine) -> None:
+    """Record a combat's end and add it to the analytics aggregates once."""
+    final_state = engine.get_state().model_dump(mode="json")
+    if await CombatRecordService(db).finish(engine.combat_id, final_state):
+        await AnalyticsService(db).record_combat(final_state, engine.damage_dealt)
@@ -3,46 +3,161 @@ Game API Routes
 ---------------
 Handles game state management including:
 - Save/load game
+- Per-section access to saves (heroes, overworld, inventory, quest flags)
 - Game settings
 - World state
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.game import (
+    GameSectionResponse,
+    GameStateResponse,
+    NewGameRequest,
+    NewGameResponse,
+    SaveGameRequest,
+    SaveGameResponse,
+    SaveSectionRequest,
+)
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    SaveConflictError,
+    UnknownSaveSectionError,
+)
+from app.services.save_service import ALL_SECTIONS, SaveResult, SaveService
 
 router = APIRouter(prefix="/game", tags=["game"])
 
 
-@router.post("/new")
-async def new_game() -> dict[str, str]:
+@router.post("/new", response_model=NewGameResponse, status_code=201)
+async def new_game(
+    request: NewGameRequest | None = None,
+    db: AsyncSession = Depends(get_db),
+) -> NewGameResponse:
     """
     Start a new game session.
     """
-    # TODO: Implement new game creation
-    return {"game_id": "new-game-id", "status": "created"}
+    service = SaveService(db)
+    game_id = await service.create(request.game_state if request else None)
+    return NewGameResponse(game_id=game_id, status="created")
 
 
-@router.get("/{game_id}")
-async def get_game(game_id: str) -> dict[str, str]:
+@router.get("/{game_id}", response_model=GameStateResponse)
+async def get_game(
+    game_id: str,
+    sections: list[str] | None = Query(None, description="Sections to include (default: all)"),
+    db: AsyncSession = Depends(get_db),
+) -> GameStateResponse:
     """
     Get the current game state.
+
+    Only the requested sections are loaded, so clients that need e.g.
+    just the heroes don't pay for deserializing the whole save.
+    """
+    service = SaveService(db)
+    try:
+        seq, state = await service.load(game_id, sections or ALL_SECTIONS)
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except UnknownSaveSectionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return GameStateResponse(game_id=game_id, seq=seq, game_state=state)
+
+
+@router.get("/{game_id}/sections/{section}", response_model=GameSectionResponse)
+async def get_section(game_id: str, section: str, db: AsyncSession = Depends(get_db)) -> GameSectionResponse:
+    """
+    Get one section of the current game state.
     """
-    # TODO: Implement game state retrieval
-    return {"game_id": game_id, "status": "active"}
+    service = SaveService(db)
+    try:
+        session = await service.open(game_id)
+        data = await session.get(section)
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except UnknownSaveSectionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return GameSectionResponse(game_id=game_id, seq=session.seq, section=section, data=data)
 
 
-@router.post("/{game_id}/save")
-async def save_game(game_id: str) -> dict[str, str]:
+@router.put("/{game_id}/sections/{section}", response_model=SaveGameResponse)
+async def save_section(
+    game_id: str,
+    section: str,
+    request: SaveSectionRequest,
+    db: AsyncSession = Depends(get_db),
+) -> SaveGameResponse:
     """
-    Save the current game state.
+    Save one section of the game state, leaving the others untouched.
     """
-    # TODO: Implement game saving
-    return {"status": "saved"}
+    service = SaveService(db)
+    try:
+        session = await service.open(game_id)
+        session.set(section, request.data)
+        result = await session.flush()
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except UnknownSaveSectionError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except SaveConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
+    return _save_response(result)
 
-@router.post("/{game_id}/load")
-async def load_game(game_id: str) -> dict[str, str]:
+
+@router.post("/{game_id}/save", response_model=SaveGameResponse)
+async def save_game(
+    game_id: str,
+    request: SaveGameRequest,
+    db: AsyncSession = Depends(get_db),
+) -> SaveGameResponse:
+    """
+    Save the current game state, replacing the saved one. Keys missing
+    from the request are removed from the save; use
+    PUT /{game_id}/sections/{section} to change one section only.
+
+    Only the difference from the previous save is written, as
+    compressed per-section deltas; deltas are periodically compacted.
+    Returns 409 if another save of the game landed concurrently.
+    """
+    service = SaveService(db)
+    try:
+        result = await service.save(game_id, request.game_state)
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except SaveConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return _save_response(result)
+
+
+@router.post("/{game_id}/load", response_model=GameStateResponse)
+async def load_game(game_id: str, db: AsyncSession = Depends(get_db)) -> GameStateResponse:
     """
     Load a saved game state.
+
+    Reconstructs the latest state from the section snapshots plus deltas.
     """
-    # TODO: Implement game loading
-    return {"status": "loaded"}
+    service = SaveService(db)
+    try:
+        seq, state = await service.load(game_id)
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    return GameStateResponse(game_id=game_id, seq=seq, game_state=state)
+
+
+def _save_response(result: SaveResult) -> SaveGameResponse:
+    """Convert a SaveResult into the API response."""
+    return SaveGameResponse(
+        status="saved",
+        seq=result.seq,
+        ops=result.ops,
+        delta_bytes=result.delta_bytes,
+        compacted=result.compacted,
+        sections=result.sections,
+    )
@@ -7,33 +7,145 @@ Handles hero management including:
 - Hero abilities and equipment
 """
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
+from app.schemas.heroes import (
+    CreateHeroRequest,
+    HeroListResponse,
+    HeroResponse,
+    LevelUpRequest,
+    UpdateHeroRequest,
+)
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    HeroConflictError,
+    HeroNotFoundError,
+    InvalidCursorError,
+)
+from app.services.hero_service import DEFAULT_PAGE_SIZE, HeroEntry, HeroService
 
 router = APIRouter(prefix="/heroes", tags=["heroes"])
 
 
-@router.get("/")
-async def list_heroes() -> dict[str, list]:
+@router.get("/", response_model=HeroListResponse)
+async def list_heroes(
+    game_save_id: str = Query(description="Game save whose roster to list"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=200, description="Heroes per page"),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_db),
+) -> HeroListResponse:
     """
     Get all heroes for the current game save.
+
+    Paginated with keyset cursors; pages are served from a per-save cache.
     """
-    # TODO: Implement hero listing
-    return {"heroes": []}
+    service = HeroService(db)
+    try:
+        heroes, next_cursor = await service.list_roster(game_save_id, limit, cursor)
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return HeroListResponse(heroes=[_hero_response(h) for h in heroes], next_cursor=next_cursor)
 
 
-@router.get("/{hero_id}")
-async def get_hero(hero_id: str) -> dict[str, str]:
+@router.post("/", response_model=HeroResponse, status_code=201)
+async def create_hero(request: CreateHeroRequest, db: AsyncSession = Depends(get_db)) -> HeroResponse:
+    """
+    Recruit a hero into a game save's roster.
+    """
+    service = HeroService(db)
+    try:
+        hero = await service.create(
+            request.game_save_id,
+            request.name,
+            request.portrait_path,
+            base_stats=request.base_stats.model_dump(),
+            equipment=[item.model_dump(mode="json") for item in request.equipment],
+            buffs=[buff.model_dump(mode="json") for buff in request.buffs],
+        )
+    except GameSaveNotFoundError:
+        raise HTTPException(status_code=404, detail="Game not found")
+
+    return _hero_response(hero)
+
+
+@router.get("/{hero_id}", response_model=HeroResponse)
+async def get_hero(hero_id: str, db: AsyncSession = Depends(get_db)) -> HeroResponse:
     """
     Get details for a specific hero.
     """
-    # TODO: Implement hero retrieval
-    return {"id": hero_id, "name": "Hero"}
+    service = HeroService(db)
+    try:
+        hero = await service.get(hero_id)
+    except HeroNotFoundError:
+        raise HTTPException(status_code=404, detail="Hero not found")
+
+    return _hero_response(hero)
 
 
-@router.post("/{hero_id}/level-up")
-async def level_up_hero(hero_id: str) -> dict[str, str]:
+@router.patch("/{hero_id}", response_model=HeroResponse)
+async def update_hero(
+    hero_id: str,
+    request: UpdateHeroRequest,
+    db: AsyncSession = Depends(get_db),
+) -> HeroResponse:
+    """
+    Change a hero's equipment and/or buffs.
+    """
+    service = HeroService(db)
+    try:
+        hero = await service.update_loadout(
+            hero_id,
+            equipment=(
+                [item.model_dump(mode="json") for item in request.equipment]
+                if request.equipment is not None else None
+            ),
+            buffs=(
+                [buff.model_dump(mode="json") for buff in request.buffs]
+                if request.buffs is not None else None
+            ),
+        )
+    except HeroNotFoundError:
+        raise HTTPException(status_code=404, detail="Hero not found")
+
+    return _hero_response(hero)
+
+
+@router.post("/{hero_id}/level-up", response_model=HeroResponse)
+async def level_up_hero(
+    hero_id: str,
+    request: LevelUpRequest,
+    db: AsyncSession = Depends(get_db),
+) -> HeroResponse:
     """
     Level up a hero and choose stat increases.
     """
-    # TODO: Implement hero leveling
-    return {"status": "leveled_up"}
+    service = HeroService(db)
+    try:
+        hero = await service.level_up(hero_id, request.stat)
+    except HeroNotFoundError:
+        raise HTTPException(status_code=404, detail="Hero not found")
+    except HeroConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+    return _hero_response(hero)
+
+
+def _hero_response(hero: HeroEntry) -> HeroResponse:
+    """Convert a cached hero into the API response."""
+    return HeroResponse(
+        id=hero.id,
+        game_save_id=hero.game_save_id,
+        name=hero.name,
+        portrait_path=hero.portrait_path,
+        level=hero.level,
+        is_alive=hero.is_alive,
+        base_stats=hero.base_stats,
+        equipment=hero.equipment,
+        buffs=hero.buffs,
+        stats=hero.stats,
+    )
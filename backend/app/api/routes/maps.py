@@ -0,0 +1,218 @@
+"""
+Map API Routes
+--------------
+Handles overworld map endpoints including:
+- Map metadata for chunk planning
+- Chunked tile streaming with ETags and gzip
+- Batched hero pathfinding
+- Per-player fog of war with incremental diffs
+"""
+
+import base64
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+
+from app.schemas.maps import (
+    FogDiffData,
+    FogSnapshot,
+    HeroVisionUpdate,
+    MapInfo,
+    PathBatchRequest,
+    PathBatchResponse,
+    PathData,
+    TilePosition,
+)
+from app.services.exceptions import (
+    ChunkOutOfBoundsError,
+    MapLayerNotFoundError,
+    MapNotFoundError,
+)
+from app.services.fog_service import (
+    FogDiff,
+    FogService,
+    get_fog_service,
+    pack_bits,
+    to_runs,
+)
+from app.services.map_service import MapService, get_map_service
+from app.services.pathfinding_service import (
+    PathfindingService,
+    get_pathfinding_service,
+)
+
+router = APIRouter(prefix="/maps", tags=["maps"])
+
+
+@router.get("/{name}", response_model=MapInfo)
+async def get_map_info(
+    name: str,
+    service: MapService = Depends(get_map_service),
+) -> MapInfo:
+    """
+    Get map dimensions, layers and chunk grid size.
+    """
+    try:
+        tile_map = service.get_map(name)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    chunks_x, chunks_y = tile_map.chunk_counts(service.chunk_size)
+    return MapInfo(
+        name=tile_map.name,
+        width=tile_map.width,
+        height=tile_map.height,
+        tile_size=tile_map.tile_size,
+        tileset=tile_map.tileset,
+        layers=list(tile_map.layers),
+        chunk_size=service.chunk_size,
+        chunks_x=chunks_x,
+        chunks_y=chunks_y,
+    )
+
+
+@router.get("/{name}/chunks/{cx}/{cy}")
+async def get_map_chunk(
+    name: str,
+    cx: int,
+    cy: int,
+    request: Request,
+    layers: str | None = Query(None, description="Comma-separated layer names"),
+    service: MapService = Depends(get_map_service),
+) -> Response:
+    """
+    Get one chunk of map tiles.
+
+    Returns `{map, cx, cy, x, y, width, height, layers: {name: [tile ids]}}`
+    where each layer is a flat row-major list. Responds 304 when the
+    client's `If-None-Match` matches, and gzip when accepted.
+    """
+    layer_names = [layer for layer in layers.split(",") if layer] if layers else None
+
+    try:
+        chunk = service.get_chunk(name, cx, cy, layer_names)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+    except (MapLayerNotFoundError, ChunkOutOfBoundsError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    headers = {
+        "ETag": chunk.etag,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding",
+    }
+
+    if request.headers.get("if-none-match") == chunk.etag:
+        return Response(status_code=304, headers=headers)
+
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(chunk.gzip_body, media_type="application/json", headers=headers)
+
+    return Response(chunk.body, media_type="application/json", headers=headers)
+
+
+@router.post("/{name}/paths", response_model=PathBatchResponse)
+async def find_paths(
+    name: str,
+    request: PathBatchRequest,
+    map_service: MapService = Depends(get_map_service),
+    service: PathfindingService = Depends(get_pathfinding_service),
+) -> PathBatchResponse:
+    """
+    Find paths for a batch of start/goal queries on one map.
+
+    Uses hierarchical pathfinding over a cached cluster graph, so many
+    long cross-map queries (e.g. for AI heroes) can share one request.
+    Unreachable or blocked goals return `found: false`. The graph build
+    and searches run on a worker thread, off the event loop.
+    """
+    try:
+        tile_map = map_service.get_map(name)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    queries = [
+        ((q.start.x, q.start.y), (q.goal.x, q.goal.y)) for q in request.queries
+    ]
+    results = await run_in_threadpool(service.find_paths, tile_map, queries)
+
+    return PathBatchResponse(
+        paths=[
+            PathData(
+                found=result.found,
+                cost=result.cost,
+                path=[TilePosition(x=x, y=y) for x, y in result.path],
+            )
+            for result in results
+        ]
+    )
+
+
+def _diff_response(diff: FogDiff) -> FogDiffData:
+    return FogDiffData(
+        revealed=to_runs(diff.revealed),
+        hidden=to_runs(diff.hidden),
+        explored=to_runs(diff.explored),
+    )
+
+
+@router.get("/{name}/fog/{player_id}", response_model=FogSnapshot)
+async def get_fog(
+    name: str,
+    player_id: str,
+    service: FogService = Depends(get_fog_service),
+) -> FogSnapshot:
+    """
+    Get a player's full fog state for a map as bit-packed bitmaps.
+    """
+    try:
+        fog = service.get_fog(player_id, name)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    return FogSnapshot(
+        width=fog.width,
+        height=fog.height,
+        explored=base64.b64encode(pack_bits(fog.explored)).decode(),
+        visible=base64.b64encode(pack_bits(fog.visible)).decode(),
+    )
+
+
+@router.put("/{name}/fog/{player_id}/heroes/{hero_id}", response_model=FogDiffData)
+async def update_hero_vision(
+    name: str,
+    player_id: str,
+    hero_id: str,
+    update: HeroVisionUpdate,
+    service: FogService = Depends(get_fog_service),
+) -> FogDiffData:
+    """
+    Place or move a hero's vision source.
+
+    Returns only the cells whose visibility or explored state changed.
+    """
+    try:
+        diff = service.move_hero(player_id, name, hero_id, update.x, update.y, update.radius)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    return _diff_response(diff)
+
+
+@router.delete("/{name}/fog/{player_id}/heroes/{hero_id}", response_model=FogDiffData)
+async def remove_hero_vision(
+    name: str,
+    player_id: str,
+    hero_id: str,
+    service: FogService = Depends(get_fog_service),
+) -> FogDiffData:
+    """
+    Remove a hero's vision source (e.g. hero left the map or died).
+    """
+    try:
+        diff = service.remove_hero(player_id, name, hero_id)
+    except MapNotFoundError:
+        raise HTTPException(status_code=404, detail="Map not found")
+
+    return _diff_response(diff)
@@ -4,58 +4,183 @@ NPC Chat Routes
 Handles AI-powered NPC conversations using Gemini.
 """
 
-from fastapi import APIRouter
-from pydantic import BaseModel
-
-from app.services.gemini_service import generate_npc_response
+import json
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
+from functools import partial
+from typing import TYPE_CHECKING, Any
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db
+from app.schemas.npc import ChatRequest, ChatResponse, NpcCacheStats, NpcUsageStats
+from app.services.gemini_service import (
+    TokenUsage,
+    generate_npc_response,
+    get_http_client,
+    get_token_usage,
+    npc_flights,
+    stream_npc_response,
+)
+from app.services.npc_cache import NpcResponseCache, get_npc_cache
+from app.services.npc_conversations import ConversationStore, get_conversation_store
+from app.services.npc_pregen_service import NpcPregenService, detect_intent, profile_prompt
+
+if TYPE_CHECKING:
+    import httpx
 
 
 router = APIRouter(prefix="/npc", tags=["npc"])
 
 
-class NpcProfile(BaseModel):
-    """NPC character definition."""
-    name: str
-    backstory: str = ""
-    personality: str = ""
-    guidelines: str = ""
-
-
-class ChatMessage(BaseModel):
-    """A single message in the conversation."""
-    role: str  # "player" or "npc"
-    content: str
-
-
-class ChatRequest(BaseModel):
-    """Request to chat with an NPC."""
-    npc: NpcProfile
-    conversation_history: list[ChatMessage] = []
-    player_message: str
-    system_prompt: str | None = None  # Pre-built prompt (overrides npc fields)
-
-
-class ChatResponse(BaseModel):
-    """NPC's response."""
-    npc_response: str
-
-
 @router.post("/chat", response_model=ChatResponse)
-async def chat_with_npc(request: ChatRequest) -> ChatResponse:
+async def chat_with_npc(
+    request: ChatRequest,
+    client: "httpx.AsyncClient" = Depends(get_http_client),
+    store: ConversationStore = Depends(get_conversation_store),
+    db: AsyncSession = Depends(get_db),
+) -> ChatResponse:
     """
     Send a message to an AI NPC and get their response.
 
     The NPC will respond based on their backstory, personality,
     and conversation guidelines while staying in character.
+    Greetings and other canned intents are answered with a
+    pre-generated line when one exists.
     """
+    conversation = _conversation_args(request, store)
+    canned = await _canned_line(request, conversation, db)
+    if canned is not None:
+        return ChatResponse(npc_response=canned)
+
     response = await generate_npc_response(
         npc_name=request.npc.name,
         backstory=request.npc.backstory,
         personality=request.npc.personality,
         guidelines=request.npc.guidelines,
-        conversation_history=[msg.model_dump() for msg in request.conversation_history],
         player_message=request.player_message,
         system_prompt=request.system_prompt,
+        client=client,
+        cache=request.npc.cache_responses,
+        **conversation,
     )
 
     return ChatResponse(npc_response=response)
+
+
+@router.post("/chat/stream")
+async def stream_chat_with_npc(
+    request: ChatRequest,
+    client: "httpx.AsyncClient" = Depends(get_http_client),
+    store: ConversationStore = Depends(get_conversation_store),
+    db: AsyncSession = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Chat with an AI NPC, streaming the reply as Server-Sent Events.
+
+    Sends a `delta` event ({"text": ...}) per chunk as the model writes
+    it, then a `done` event with the full reply ({"npc_response": ...}).
+    If the player disconnects, the upstream request is closed. A
+    pre-generated line is sent as a single delta.
+    """
+    conversation = _conversation_args(request, store)
+    canned = await _canned_line(request, conversation, db)
+    if canned is not None:
+        return _event_stream(iter([
+            _sse_event("delta", {"text": canned}),
+            _sse_event("done", {"npc_response": canned}),
+        ]))
+
+    deltas = stream_npc_response(
+        npc_name=request.npc.name,
+        backstory=request.npc.backstory,
+        personality=request.npc.personality,
+        guidelines=request.npc.guidelines,
+        player_message=request.player_message,
+        system_prompt=request.system_prompt,
+        client=client,
+        cache=request.npc.cache_responses,
+        **conversation,
+    )
+
+    async def events() -> AsyncIterator[str]:
+        parts = []
+        try:
+            async for text in deltas:
+                parts.append(text)
+                yield _sse_event("delta", {"text": text})
+            yield _sse_event("done", {"npc_response": "".join(parts).strip()})
+        finally:
+            # Runs on disconnect too, when the response task is cancelled
+            await deltas.aclose()
+
+    return _event_stream(events())
+
+
+@router.get("/cache/stats", response_model=NpcCacheStats)
+async def npc_cache_stats(
+    cache: NpcResponseCache = Depends(get_npc_cache),
+) -> NpcCacheStats:
+    """Get hit/miss counters of the NPC response cache."""
+    return NpcCacheStats(**cache.stats(), coalesced=npc_flights().coalesced)
+
+
+@router.get("/usage", response_model=NpcUsageStats)
+async def npc_usage_stats(
+    usage: TokenUsage = Depends(get_token_usage),
+) -> NpcUsageStats:
+    """Get LLM token usage, including how much input came from the prompt cache."""
+    return NpcUsageStats(**usage.stats())
+
+
+def _conversation_args(request: ChatRequest, store: ConversationStore) -> dict[str, Any]:
+    """History (and session summary and recorder) for a chat request."""
+    history = [msg.model_dump() for msg in request.conversation_history]
+    if request.player_id is None:
+        return {"conversation_history": history}
+
+    conversation = store.open(request.player_id, request.npc.name, seed_history=history)
+    return {
+        "conversation_history": list(conversation.turns),
+        "summary": conversation.summary,
+        "on_complete": partial(store.record, conversation, request.player_message),
+    }
+
+
+async def _canned_line(
+    request: ChatRequest, conversation: dict[str, Any], db: AsyncSession
+) -> str | None:
+    """
+    A pre-generated line for the request's canned intent, if there is one.
+
+    The intent is the one the client names, or a plain greeting that
+    opens a conversation. A served line is recorded in the session like
+    a live reply.
+    """
+    if not settings.npc_pregen_enabled:
+        return None
+    intent = request.intent
+    if intent is None and not conversation["conversation_history"] and not conversation.get("summary"):
+        intent = detect_intent(request.player_message)
+    if intent is None:
+        return None
+
+    system_prompt = profile_prompt(request.npc, request.system_prompt)
+    line = await NpcPregenService(db).get_line(request.npc.name, system_prompt, intent)
+    if line is not None and "on_complete" in conversation:
+        conversation["on_complete"](line)
+    return line
+
+
+def _event_stream(events: Iterable[str] | AsyncIterable[str]) -> StreamingResponse:
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _sse_event(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
@@ -0,0 +1,92 @@
+"""
+Command Line Tools
+------------------
+Maintenance commands run from the backend directory:
+
+    python -m app.cli backfill-analytics         Rebuild combat analytics aggregates
+    python -m app.cli pregen-npc-lines JOBS.json Pre-generate NPC greetings and barks
+    python -m app.cli build-assets               Content-hash static assets for serving
+
+JOBS.json is a list of PregenJob objects, e.g.
+    [{"npc": {"name": "Bram", "personality": "Gruff"}, "intents": ["greeting", "bark"]}]
+"""
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+
+import app.models  # noqa: F401  Register every table for ensure_schema
+from app.config import settings
+from app.database import async_session_maker, engine, ensure_schema
+from app.schemas.npc import PregenJob
+from app.services.analytics_service import BACKFILL_BATCH_SIZE, AnalyticsService
+from app.services.asset_service import asset_roots, build_assets
+from app.services.gemini_service import close_http_client
+from app.services.npc_pregen_service import pregenerate
+
+
+async def backfill_analytics(batch_size: int) -> None:
+    """Rebuild the analytics aggregate tables from recorded combats."""
+    await ensure_schema()
+
+    async with async_session_maker() as db:
+        counted = await AnalyticsService(db).backfill(batch_size)
+        await db.commit()
+
+    await engine.dispose()
+    print(f"Rebuilt analytics from {counted} combats")
+
+
+async def pregen_npc_lines(jobs_file: Path, variants: int | None, concurrency: int | None) -> None:
+    """Generate canned NPC lines for every job in a JSON file."""
+    jobs = [PregenJob.model_validate(job) for job in json.loads(jobs_file.read_text())]
+    await ensure_schema()
+
+    try:
+        result = await pregenerate(jobs, async_session_maker, variants, concurrency)
+    finally:
+        await close_http_client()
+        await engine.dispose()
+    print(f"Stored {result.lines} lines for {len(jobs)} NPCs ({result.failed} calls failed)")
+
+
+def build_asset_files(build_dir: Path) -> None:
+    """Hash the static asset roots into the build directory and write the manifest."""
+    result = build_assets(asset_roots(), build_dir)
+    print(
+        f"{result.files} assets ({result.written} written, {result.removed} removed) "
+        f"in {build_dir}: {result.bytes:,} bytes, {result.compressed_bytes:,} with precompression"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    backfill = commands.add_parser("backfill-analytics", help="Rebuild combat analytics aggregates")
+    backfill.add_argument(
+        "--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Combats read per query"
+    )
+
+    pregen = commands.add_parser("pregen-npc-lines", help="Pre-generate NPC greetings and barks")
+    pregen.add_argument("jobs_file", type=Path, help="JSON list of PregenJob objects")
+    pregen.add_argument("--variants", type=int, help="Lines per NPC and intent")
+    pregen.add_argument("--concurrency", type=int, help="LLM calls in flight")
+
+    assets = commands.add_parser("build-assets", help="Content-hash static assets for serving")
+    assets.add_argument(
+        "--build-dir", type=Path, default=Path(settings.asset_build_dir), help="Output directory"
+    )
+
+    args = parser.parse_args()
+    if args.command == "backfill-analytics":
+        asyncio.run(backfill_analytics(args.batch_size))
+    elif args.command == "pregen-npc-lines":
+        asyncio.run(pregen_npc_lines(args.jobs_file, args.variants, args.concurrency))
+    elif args.command == "build-assets":
+        build_asset_files(args.build_dir)
+
+
+if __name__ == "__main__":
+    main()
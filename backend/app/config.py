@@ -5,8 +5,13 @@ Settings management using Pydantic. Loads from environment variables
 with sensible defaults for development.
 """
 
+from pathlib import Path
+
 from pydantic_settings import BaseSettings
 
+# Repository root (backend/app/config.py -> repo/)
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables."""
@@ -20,11 +25,98 @@ class Settings(BaseSettings):
     # Environment
     debug: bool = True
 
+    # Database performance profile
+    db_echo: bool = False  # Log every SQL statement (slow; for debugging only)
+    db_pool_size: int = 5  # Persistent connections (file and server databases)
+    db_max_overflow: int = 10  # Extra connections allowed under burst load
+    db_pool_timeout: float = 30.0  # Seconds to wait for a free connection
+    db_schema_check: bool = True  # Skip create_all at startup when the schema is current
+    sqlite_tuning: bool = True  # Apply the PRAGMAs below on every new connection
+    sqlite_journal_mode: str = "WAL"  # Readers don't block the writer
+    sqlite_synchronous: str = "NORMAL"  # Safe with WAL; fsync only at checkpoints
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # Bytes of the DB file to memory-map
+    sqlite_cache_size_kib: int = 64 * 1024  # Page cache per connection
+    sqlite_busy_timeout_ms: int = 5000  # Wait for locks instead of failing
+
+    # LLM backend for NPC dialogue: "anthropic", "gemini" or "mock"
+    llm_backend: str = "anthropic"
+
     # Gemini API (get free key from https://aistudio.google.com/apikey)
     gemini_api_key: str = ""
+    gemini_api_url: str = "https://generativelanguage.googleapis.com/v1beta"
+    gemini_model: str = "gemini-2.5-flash"
 
     # Anthropic Claude API
     anthropic_api_key: str = ""
+    anthropic_api_url: str = "https://api.anthropic.com/v1/messages"
+    anthropic_model: str = "claude-sonnet-4-20250514"
+
+    # Local mock backend (offline benchmarks and load tests). Distributions
+    # are "fixed:V", "uniform:LOW:HIGH", "normal:MEAN:SD" or "lognormal:MEDIAN:SIGMA"
+    mock_llm_latency_ms: str = "lognormal:600:0.4"  # Time to first token
+    mock_llm_tokens_per_second: str = "normal:60:10"
+    mock_llm_output_tokens: str = "normal:30:8"
+    mock_llm_error_rate: float = 0.0  # Share of calls answered with 529
+    mock_llm_seed: int = 0
+
+    # Shared HTTP client for LLM calls
+    llm_timeout_seconds: float = 30.0  # Read/write/pool timeout per request
+    llm_connect_timeout_seconds: float = 5.0
+    llm_max_connections: int = 20
+    llm_max_keepalive_connections: int = 20  # Keep every pooled connection open between bursts
+    llm_keepalive_expiry_seconds: float = 60.0  # Idle time before a pooled connection is closed
+    llm_http2: bool = True  # Only takes effect when the h2 package is installed
+    llm_prompt_caching: bool = True  # Mark each NPC's system prompt for provider-side caching
+
+    # LLM call dispatcher
+    llm_max_concurrency: int = 8  # Upstream calls in flight
+    llm_max_queue: int = 64  # Calls waiting for a slot before new ones are shed
+    llm_queue_timeout_seconds: float = 10.0  # Max wait for a slot before shedding
+    llm_max_retries: int = 3  # Retries of 429/503/529 responses
+    llm_backoff_base_seconds: float = 0.5
+    llm_backoff_max_seconds: float = 8.0  # Also the longest retry-after honored
+
+    # NPC conversation sessions
+    npc_history_token_budget: int = 1000  # Estimated tokens of history sent per call
+    npc_session_max_sessions: int = 2000  # (player, NPC) sessions kept in memory
+    npc_session_max_turns: int = 8  # Unsummarized messages that trigger a summary
+    npc_session_summary_trigger_tokens: int = 600  # ...or their estimated tokens
+    npc_session_keep_turns: int = 2  # Newest messages kept verbatim after a summary
+    npc_summary_max_tokens: int = 200
+
+    # NPC response cache
+    npc_cache_enabled: bool = True
+    npc_cache_ttl_seconds: float = 6 * 60 * 60
+    npc_cache_max_entries: int = 5000
+    npc_cache_path: str = ""  # JSON file to persist the cache across restarts (empty = memory only)
+
+    # Pre-generated NPC lines (greetings, barks)
+    npc_pregen_enabled: bool = True  # Serve canned lines for matching intents
+    npc_pregen_variants: int = 5  # Lines generated per NPC and intent
+    npc_pregen_concurrency: int = 4  # Pre-generation calls in flight
+
+    # Overworld maps (tile JSON files exported by the map editor)
+    maps_dir: str = str(REPO_ROOT / "maps")
+    map_chunk_size: int = 16  # Tiles per chunk edge for streaming
+    pathfinding_cluster_size: int = 10  # Tiles per HPA* cluster edge
+
+    # Static assets (logical prefix -> directory), content-hashed into
+    # asset_build_dir by `python -m app.cli build-assets`
+    asset_roots: dict[str, str] = {
+        "assets": str(REPO_ROOT / "frontend" / "public" / "assets"),
+        "overworld_assets": str(REPO_ROOT / "overworld_assets"),
+        "character_assets": str(REPO_ROOT / "character_assets"),
+    }
+    asset_build_dir: str = str(REPO_ROOT / "build" / "assets")
+    asset_max_age_seconds: int = 365 * 24 * 60 * 60  # Hashed files never change
+
+    # Combat action log
+    combat_action_flush_ms: int = 250  # Max time an action waits before being written
+    combat_action_batch_size: int = 500  # Rows that trigger an immediate flush
+    combat_action_write_attempts: int = 3  # Failed writes before a batch is split and bad rows dropped
+
+    # Game saves
+    save_compaction_interval: int = 50  # Deltas before folding into the base snapshot
 
     class Config:
         env_file = ".env"
@@ -3,21 +3,95 @@ Database Connection Setup
 -------------------------
 SQLAlchemy async engine and session configuration.
 Provides the Base class for models and get_db dependency.
+
+SQLite connections are tuned with PRAGMAs on connect (WAL journal,
+synchronous=NORMAL, mmap, page cache, busy timeout) when
+`settings.sqlite_tuning` is enabled.
+
+ensure_schema runs create_all only when the models changed since the
+last run (tracked by a fingerprint in the schema_version table), so a
+warm worker starts without one existence check per table.
 """
 
-from typing import AsyncGenerator
+import hashlib
+from contextlib import AbstractAsyncContextManager
+from typing import Any, AsyncGenerator, Callable
 
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy import (
+    Column,
+    Connection,
+    MetaData,
+    String,
+    Table,
+    delete,
+    event,
+    insert,
+    select,
+)
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
+
+def sqlite_pragmas() -> dict[str, Any]:
+    """PRAGMAs applied to each new SQLite connection, from settings."""
+    return {
+        "journal_mode": settings.sqlite_journal_mode,
+        "synchronous": settings.sqlite_synchronous,
+        "mmap_size": settings.sqlite_mmap_size,
+        "cache_size": -settings.sqlite_cache_size_kib,  # Negative means KiB, not pages
+        "busy_timeout": settings.sqlite_busy_timeout_ms,
+    }
+
+
+def build_engine(database_url: str, tuned: bool | None = None) -> AsyncEngine:
+    """
+    Create an async engine with pool sizing and, for SQLite, PRAGMA tuning.
+
+    `tuned` overrides `settings.sqlite_tuning` (used by benchmarks).
+    In-memory SQLite uses a single static connection, so pool sizing
+    only applies to file and server databases.
+    """
+    url = make_url(database_url)
+    is_sqlite = url.get_backend_name() == "sqlite"
+    in_memory = is_sqlite and url.database in (None, "", ":memory:")
+
+    options: dict[str, Any] = {"echo": settings.db_echo}
+    if not in_memory:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=not is_sqlite,
+        )
+
+    async_engine = create_async_engine(url, **options)
+
+    if is_sqlite and (settings.sqlite_tuning if tuned is None else tuned):
+        pragmas = sqlite_pragmas()
+        if in_memory:
+            pragmas.pop("journal_mode")  # WAL is unsupported for in-memory databases
+
+        @event.listens_for(async_engine.sync_engine, "connect")
+        def apply_pragmas(dbapi_connection: Any, connection_record: Any) -> None:
+            cursor = dbapi_connection.cursor()
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+            cursor.close()
+
+    return async_engine
+
+
 # Create async engine
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-)
+engine = build_engine(settings.database_url)
 
 # Session factory
 async_session_maker = async_sessionmaker(
@@ -27,12 +101,79 @@ async_session_maker = async_sessionmaker(
 )
 
 
+# Anything that opens a session: `async with factory() as session: ...`
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
 class Base(DeclarativeBase):
     """Base class for all SQLAlchemy models."""
 
     pass
 
 
+# Kept out of Base.metadata so it is not part of its own fingerprint
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("fingerprint", String(64), primary_key=True),
+)
+
+
+def schema_fingerprint(metadata: MetaData) -> str:
+    """Hash of every table's columns, keys and indexes."""
+    parts = []
+    for table in metadata.sorted_tables:
+        parts.append(f"table {table.name}")
+        for column in table.columns:
+            targets = sorted(key.target_fullname for key in column.foreign_keys)
+            parts.append(
+                f"{column.name} {column.type!r} pk={column.primary_key} "
+                f"null={column.nullable} fk={targets}"
+            )
+        for index in sorted(table.indexes, key=lambda index: str(index.name)):
+            columns = [column.name for column in index.columns]
+            parts.append(f"index {index.name} {columns} unique={index.unique}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _stored_fingerprint(conn: Connection) -> str | None:
+    return conn.execute(select(schema_version_table.c.fingerprint)).scalar()
+
+
+def _store_fingerprint(conn: Connection, fingerprint: str) -> None:
+    schema_version_table.create(conn, checkfirst=True)
+    conn.execute(delete(schema_version_table))
+    conn.execute(insert(schema_version_table).values(fingerprint=fingerprint))
+
+
+async def ensure_schema(
+    target: AsyncEngine | None = None, metadata: MetaData | None = None
+) -> bool:
+    """
+    Create missing tables, unless the stored fingerprint shows the schema
+    is already current. Returns whether create_all ran.
+
+    Like create_all itself, this only adds tables; it does not migrate
+    existing ones.
+    """
+    target = target or engine
+    metadata = metadata or Base.metadata
+    fingerprint = schema_fingerprint(metadata)
+
+    if settings.db_schema_check:
+        try:
+            async with target.connect() as conn:
+                if await conn.run_sync(_stored_fingerprint) == fingerprint:
+                    return False
+        except DBAPIError:
+            pass  # No schema_version table yet
+
+    async with target.begin() as conn:
+        await conn.run_sync(metadata.create_all)
+        await conn.run_sync(_store_fingerprint, fingerprint)
+    return True
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency that provides a database session.
@@ -51,3 +192,13 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             raise
         finally:
             await session.close()
+
+
+def get_session_factory() -> SessionFactory:
+    """
+    Dependency for code that manages its own sessions.
+
+    Used by streaming responses, which outlive the request-scoped
+    session from get_db, and by background writers.
+    """
+    return async_session_maker
@@ -15,17 +15,27 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.router import api_router
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, ensure_schema
+from app.services.combat_record_service import close_combat_action_writer
+from app.services.gemini_service import close_http_client
+from app.services.npc_cache import close_npc_cache, get_npc_cache
+from app.services.npc_conversations import close_conversation_store
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Handle startup and shutdown events."""
-    # Startup: Create database tables
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    # Startup: Create database tables (skipped when the schema is current)
+    # and the NPC response cache (loaded from disk if persistence is on).
+    # The pooled LLM HTTP client is created by the first NPC call.
+    await ensure_schema()
+    get_npc_cache()
     yield
-    # Shutdown: Close database connections
+    # Shutdown: Write buffered combat actions and the NPC cache, then close connections
+    await close_combat_action_writer()
+    await close_conversation_store()
+    close_npc_cache()
+    await close_http_client()
     await engine.dispose()
 
 
@@ -5,6 +5,10 @@ Contains all database model definitions.
 Import models here to register them with SQLAlchemy.
 """
 
-from app.models.combat import GameSave, CombatInstance
+from app.models.analytics import CompositionStats, UnitTypeStats
+from app.models.combat import GameSave, CombatInstance, CombatActionRecord
+from app.models.heroes import Hero
+from app.models.npc import CannedNpcLine
+from app.models.saves import GameSaveDelta, GameSaveSection
 
-__all__ = ["GameSave", "CombatInstance"]
+__all__ = ["GameSave", "CombatInstance", "CombatActionRecord", "GameSaveSection", "GameSaveDelta", "Hero", "CompositionStats", "UnitTypeStats", "CannedNpcLine"]
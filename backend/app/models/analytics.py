@@ -0,0 +1,43 @@
+"""
+Analytics Database Models
+-------------------------
+Aggregate tables for balancing dashboards, updated incrementally as
+each combat ends:
+- CompositionStats: Outcomes and fight length per player army composition
+- UnitTypeStats: Damage and losses per unit type and side
+"""
+
+from sqlalchemy import Column, Integer, String
+
+from app.database import Base
+
+
+class CompositionStats(Base):
+    """
+    Totals for one player army composition.
+
+    `composition` is the sorted unit type counts of the player's army,
+    e.g. "archer:2,warrior:3".
+    """
+
+    __tablename__ = "analytics_composition_stats"
+
+    composition = Column(String(255), primary_key=True)
+    combats = Column(Integer, default=0, nullable=False)
+    player_wins = Column(Integer, default=0, nullable=False)
+    enemy_wins = Column(Integer, default=0, nullable=False)
+    abandoned = Column(Integer, default=0, nullable=False)
+    total_ticks = Column(Integer, default=0, nullable=False)
+
+
+class UnitTypeStats(Base):
+    """Totals for one unit type on one side (player or enemy)."""
+
+    __tablename__ = "analytics_unit_type_stats"
+
+    unit_type = Column(String(32), primary_key=True)
+    side = Column(String(8), primary_key=True)
+    units_fielded = Column(Integer, default=0, nullable=False)
+    units_lost = Column(Integer, default=0, nullable=False)
+    damage_dealt = Column(Integer, default=0, nullable=False)
+    damage_taken = Column(Integer, default=0, nullable=False)
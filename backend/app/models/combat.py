@@ -4,13 +4,14 @@ Combat Database Models
 SQLAlchemy models for combat-related persistence:
 - GameSave: Persistent game state
 - CombatInstance: Combat session for replay/persistence
+- CombatActionRecord: Append-only log of actions within a combat
 """
 
 import uuid
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any
 
-from sqlalchemy import Column, String, DateTime, ForeignKey, JSON
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, Integer, JSON
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
@@ -22,32 +23,89 @@ def generate_uuid() -> str:
     return str(uuid.uuid4())
 
 
+def utc_now() -> datetime:
+    """Naive UTC timestamp with microseconds, for Python-side defaults."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
 class GameSave(Base):
-    """Represents a saved game state."""
+    """
+    Represents a saved game state.
+
+    The state itself is stored per section in GameSaveSection rows so
+    sections can be loaded independently.
+    """
 
     __tablename__ = "game_saves"
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, onupdate=func.now())
-    game_state = Column(JSON, default=dict)
+    head_seq = Column(Integer, default=0, nullable=False)  # Incremented on every save that changes state
+    roster_seq = Column(Integer, default=0, nullable=False)  # Incremented on every hero write
 
     # Relationships
     combat_instances = relationship("CombatInstance", back_populates="game_save")
+    sections = relationship("GameSaveSection", back_populates="game_save")
+    heroes = relationship("Hero", back_populates="game_save")
+    deltas = relationship("GameSaveDelta", back_populates="game_save")
 
 
 class CombatInstance(Base):
-    """Represents a combat encounter for persistence and replay."""
+    """
+    Represents a combat encounter for persistence and replay.
+
+    The summary columns (outcome, ticks, unit counts) are denormalized
+    from the final state when the combat ends, so history listings never
+    parse the JSON state columns.
+    """
 
     __tablename__ = "combat_instances"
+    __table_args__ = (
+        # Per-save combat history, newest first, keyset paginated on (started_at, id)
+        Index("ix_combat_instances_save_started", "game_save_id", "started_at", "id"),
+        Index("ix_combat_instances_started_at", "started_at"),
+    )
 
     id = Column(String(36), primary_key=True, default=generate_uuid)
     game_save_id = Column(String(36), ForeignKey("game_saves.id"), nullable=True)
-    started_at = Column(DateTime, server_default=func.now())
+    started_at = Column(DateTime, default=utc_now, server_default=func.now())
     ended_at = Column(DateTime, nullable=True)
     initial_state = Column(JSON, default=dict)
     final_state = Column(JSON, nullable=True)
-    action_log = Column(JSON, default=list)  # Store as JSON array
+    action_log = Column(JSON, default=list)  # Legacy; actions are stored in combat_actions
+
+    # Summary, set when the combat ends
+    outcome = Column(String(16), nullable=True)  # player_won, enemy_won or abandoned
+    ticks = Column(Integer, nullable=True)
+    player_units = Column(Integer, nullable=True)
+    enemy_units = Column(Integer, nullable=True)
+    player_survivors = Column(Integer, nullable=True)
+    enemy_survivors = Column(Integer, nullable=True)
 
     # Relationships
     game_save = relationship("GameSave", back_populates="combat_instances")
+    actions = relationship("CombatActionRecord", back_populates="combat")
+
+
+class CombatActionRecord(Base):
+    """
+    One action or event in a combat (placement, move, attack, ...).
+
+    Rows are only ever appended, in batches, so a long fight costs
+    O(actions) writes rather than rewriting a growing JSON array.
+    """
+
+    __tablename__ = "combat_actions"
+    __table_args__ = (
+        Index("ix_combat_actions_combat_seq", "combat_id", "seq", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    combat_id = Column(String(36), ForeignKey("combat_instances.id"), nullable=False)
+    seq = Column(Integer, nullable=False)  # Order within the combat, from 1
+    tick = Column(Integer, nullable=False)
+    payload = Column(JSON, nullable=False)
+
+    # Relationships
+    combat = relationship("CombatInstance", back_populates="actions")
@@ -0,0 +1,52 @@
+"""
+Hero Database Models
+--------------------
+SQLAlchemy models for hero persistence:
+- Hero: A hero in a game save's roster
+"""
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+)
+from sqlalchemy.orm import relationship
+
+from app.database import Base
+from app.models.combat import generate_uuid, utc_now
+
+
+class Hero(Base):
+    """
+    A hero belonging to a game save.
+
+    Only inputs are stored (base stats, level, equipment, buffs);
+    derived stats are computed by the hero service. `created_at` is set
+    in Python with microsecond precision so (created_at, id) is a stable
+    keyset pagination order.
+    """
+
+    __tablename__ = "heroes"
+    __table_args__ = (
+        Index("ix_heroes_save_created", "game_save_id", "created_at", "id"),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    game_save_id = Column(String(36), ForeignKey("game_saves.id"), nullable=False)
+    name = Column(String(64), nullable=False)
+    portrait_path = Column(String(256), nullable=False)
+    level = Column(Integer, default=1, nullable=False)
+    is_alive = Column(Boolean, default=True, nullable=False)
+    base_stats = Column(JSON, default=dict)
+    equipment = Column(JSON, default=list)  # Artifacts: [{"id", "name", "bonuses"}]
+    buffs = Column(JSON, default=list)  # Temporary effects: [{"name", "bonuses"}]
+    created_at = Column(DateTime, default=utc_now, nullable=False)
+    version = Column(Integer, default=1, nullable=False)  # Incremented on every write
+
+    # Relationships
+    game_save = relationship("GameSave", back_populates="heroes")
@@ -0,0 +1,32 @@
+"""
+NPC Database Models
+-------------------
+SQLAlchemy models for NPC dialogue:
+- CannedNpcLine: A pre-generated line for an NPC and canned intent
+"""
+
+from sqlalchemy import Column, DateTime, Index, String, Text
+
+from app.database import Base
+from app.models.combat import generate_uuid, utc_now
+
+
+class CannedNpcLine(Base):
+    """
+    One pre-generated variant of an NPC's greeting, bark, etc.
+
+    `prompt_key` hashes the system prompt the line was written for, so
+    lines are not served once the NPC's profile changes.
+    """
+
+    __tablename__ = "npc_canned_lines"
+    __table_args__ = (
+        Index("ix_npc_canned_lines_lookup", "npc_name", "prompt_key", "intent"),
+    )
+
+    id = Column(String(36), primary_key=True, default=generate_uuid)
+    npc_name = Column(String(128), nullable=False)
+    prompt_key = Column(String(32), nullable=False)
+    intent = Column(String(32), nullable=False)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=utc_now, nullable=False)
@@ -0,0 +1,67 @@
+"""
+Save Database Models
+--------------------
+SQLAlchemy models for sectioned, incremental game saves:
+- GameSaveSection: Base snapshot of one section of a save
+- GameSaveDelta: Compressed patch appended to a section on each save
+"""
+
+from sqlalchemy import (
+    JSON,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+)
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+
+from app.database import Base
+
+
+class GameSaveSection(Base):
+    """
+    One independently loadable part of a save (heroes, overworld, ...).
+
+    `data` is the base snapshot; later changes are appended as
+    GameSaveDelta rows and folded back in on compaction.
+    """
+
+    __tablename__ = "game_save_sections"
+
+    game_save_id = Column(String(36), ForeignKey("game_saves.id"), primary_key=True)
+    name = Column(String(32), primary_key=True)
+    data = Column(JSON, nullable=True)
+    snapshot_seq = Column(Integer, default=0, nullable=False)  # Last delta folded into data
+    head_seq = Column(Integer, default=0, nullable=False)  # Last delta written
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    # Relationships
+    game_save = relationship("GameSave", back_populates="sections")
+
+
+class GameSaveDelta(Base):
+    """
+    A zlib-compressed list of patch operations for one section.
+
+    Applying a section's deltas in `seq` order on top of its base
+    snapshot reconstructs the latest section data.
+    """
+
+    __tablename__ = "game_save_deltas"
+    __table_args__ = (
+        Index("ix_game_save_deltas_save_section_seq", "game_save_id", "section", "seq", unique=True),
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    game_save_id = Column(String(36), ForeignKey("game_saves.id"), nullable=False)
+    section = Column(String(32), nullable=False)
+    seq = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime, server_default=func.now())
+
+    # Relationships
+    game_save = relationship("GameSave", back_populates="deltas")
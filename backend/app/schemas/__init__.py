@@ -4,18 +4,100 @@ Pydantic Schemas Package
 Contains request/response schemas for API validation.
 """
 
+from app.schemas.analytics import (
+    CompositionSummary,
+    UnitTypeSummary,
+    AnalyticsResponse,
+)
 from app.schemas.combat import (
     UnitData,
     CombatStartRequest,
     CombatState,
     CombatAction,
     CombatActionResponse,
+    CombatHistoryEntry,
+    CombatHistoryResponse,
+)
+from app.schemas.game import (
+    NewGameRequest,
+    NewGameResponse,
+    SaveGameRequest,
+    SaveSectionRequest,
+    SaveGameResponse,
+    GameStateResponse,
+    GameSectionResponse,
+)
+from app.schemas.heroes import (
+    HeroStat,
+    HeroStats,
+    StatBonusSource,
+    CreateHeroRequest,
+    UpdateHeroRequest,
+    LevelUpRequest,
+    HeroResponse,
+    HeroListResponse,
+)
+from app.schemas.maps import (
+    MapInfo,
+    TilePosition,
+    PathQuery,
+    PathBatchRequest,
+    PathData,
+    PathBatchResponse,
+    HeroVisionUpdate,
+    FogDiffData,
+    FogSnapshot,
+)
+from app.schemas.npc import (
+    NpcProfile,
+    ChatMessage,
+    ChatRequest,
+    ChatResponse,
+    NpcCacheStats,
+    NpcUsageStats,
+    PregenJob,
 )
 
 __all__ = [
+    "CompositionSummary",
+    "UnitTypeSummary",
+    "AnalyticsResponse",
     "UnitData",
     "CombatStartRequest",
     "CombatState",
     "CombatAction",
     "CombatActionResponse",
+    "CombatHistoryEntry",
+    "CombatHistoryResponse",
+    "NewGameRequest",
+    "NewGameResponse",
+    "SaveGameRequest",
+    "SaveSectionRequest",
+    "SaveGameResponse",
+    "GameStateResponse",
+    "GameSectionResponse",
+    "HeroStat",
+    "HeroStats",
+    "StatBonusSource",
+    "CreateHeroRequest",
+    "UpdateHeroRequest",
+    "LevelUpRequest",
+    "HeroResponse",
+    "HeroListResponse",
+    "MapInfo",
+    "TilePosition",
+    "PathQuery",
+    "PathBatchRequest",
+    "PathData",
+    "PathBatchResponse",
+    "HeroVisionUpdate",
+    "FogDiffData",
+    "FogSnapshot",
+    "NpcProfile",
+    "ChatMessage",
+    "ChatRequest",
+    "ChatResponse",
+    "NpcCacheStats",
+    "NpcUsageStats",
+    "PregenJob",
 ]
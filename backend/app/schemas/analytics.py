@@ -0,0 +1,37 @@
+"""
+Analytics Pydantic Schemas
+--------------------------
+Response schemas for the balancing analytics endpoint.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class CompositionSummary(BaseModel):
+    """Outcomes for one player army composition."""
+    composition: str = Field(description="Sorted unit type counts, e.g. 'archer:2,warrior:3'")
+    combats: int = Field(ge=0, description="Combats fought with this composition")
+    player_wins: int = Field(ge=0, description="Combats won by the player")
+    enemy_wins: int = Field(ge=0, description="Combats won by the enemy")
+    abandoned: int = Field(ge=0, description="Combats ended before a winner")
+    win_rate: float = Field(ge=0, le=1, description="Player wins / decided combats")
+    avg_ticks: float = Field(ge=0, description="Average fight length in ticks")
+
+
+class UnitTypeSummary(BaseModel):
+    """Damage and losses for one unit type on one side."""
+    unit_type: str = Field(description="Unit type")
+    side: str = Field(description="player or enemy")
+    units_fielded: int = Field(ge=0, description="Units of this type that took part")
+    units_lost: int = Field(ge=0, description="Units of this type that died")
+    damage_dealt: int = Field(ge=0, description="Total damage dealt")
+    damage_taken: int = Field(ge=0, description="Total damage taken")
+    avg_damage_dealt: float = Field(ge=0, description="Damage dealt per unit fielded")
+
+
+class AnalyticsResponse(BaseModel):
+    """Balancing dashboard data."""
+    combats: int = Field(ge=0, description="Finished combats counted")
+    avg_fight_ticks: float = Field(ge=0, description="Average fight length in ticks")
+    compositions: list[CompositionSummary] = Field(description="Per-composition outcomes")
+    unit_types: list[UnitTypeSummary] = Field(description="Per-unit-type damage")
@@ -5,6 +5,7 @@ Request and response schemas for combat API endpoints.
 Handles validation and serialization of combat data.
 """
 
+from datetime import datetime
 from enum import Enum
 from typing import Optional
 from pydantic import BaseModel, Field
@@ -65,6 +66,7 @@ class CombatStartRequest(BaseModel):
     """Request to start a new combat encounter."""
     player_units: list[UnitData] = Field(description="Player's army composition")
     enemy_units: list[UnitData] = Field(description="Enemy forces")
+    game_save_id: Optional[str] = Field(None, description="Game save the combat belongs to")
 
 
 class CombatState(BaseModel):
@@ -97,3 +99,23 @@ class CombatActionResponse(BaseModel):
     success: bool = Field(description="Whether action was accepted")
     message: str = Field(description="Result message")
     state: CombatState = Field(description="Updated combat state")
+
+
+class CombatHistoryEntry(BaseModel):
+    """Summary of a finished combat."""
+    combat_id: str = Field(description="Combat identifier")
+    started_at: datetime = Field(description="When the combat started (UTC)")
+    ended_at: datetime = Field(description="When the combat ended (UTC)")
+    duration_seconds: float = Field(ge=0, description="Wall-clock length of the combat")
+    outcome: str = Field(description="player_won, enemy_won or abandoned")
+    ticks: int = Field(ge=0, description="Simulation ticks played")
+    player_units: int = Field(ge=0, description="Player units at the start")
+    enemy_units: int = Field(ge=0, description="Enemy units at the start")
+    player_survivors: int = Field(ge=0, description="Player units alive at the end")
+    enemy_survivors: int = Field(ge=0, description="Enemy units alive at the end")
+
+
+class CombatHistoryResponse(BaseModel):
+    """One page of a save's combat history, newest first."""
+    combats: list[CombatHistoryEntry] = Field(description="Combats on this page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
@@ -0,0 +1,61 @@
+"""
+Game Pydantic Schemas
+---------------------
+Request and response schemas for game save API endpoints.
+"""
+
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class NewGameRequest(BaseModel):
+    """Request to start a new game."""
+    game_state: dict[str, Any] = Field(default_factory=dict, description="Initial game state")
+
+
+class NewGameResponse(BaseModel):
+    """A newly created game."""
+    game_id: str = Field(description="Game save identifier")
+    status: str = Field(description="Creation status")
+
+
+class SaveGameRequest(BaseModel):
+    """Full game state to save; only the changes are persisted."""
+    game_state: dict[str, Any] = Field(
+        description=(
+            "Complete game state, which replaces the saved one: sections that are omitted "
+            "are cleared. Use PUT /api/game/{game_id}/sections/{section} to change one "
+            "section only"
+        )
+    )
+
+
+class SaveSectionRequest(BaseModel):
+    """New data for one save section."""
+    data: Any = Field(description="Section data")
+
+
+class SaveGameResponse(BaseModel):
+    """Result of an incremental save."""
+    status: str = Field(description="Save status")
+    seq: int = Field(ge=0, description="Save sequence number after this save")
+    ops: int = Field(ge=0, description="Number of patch operations written")
+    delta_bytes: int = Field(ge=0, description="Compressed size of the written delta")
+    compacted: bool = Field(description="Whether deltas were folded into the base snapshot")
+    sections: list[str] = Field(default_factory=list, description="Sections that were written")
+
+
+class GameStateResponse(BaseModel):
+    """The latest saved game state."""
+    game_id: str = Field(description="Game save identifier")
+    seq: int = Field(ge=0, description="Save sequence number")
+    game_state: dict[str, Any] = Field(description="Reconstructed game state")
+
+
+class GameSectionResponse(BaseModel):
+    """One section of the latest saved game state."""
+    game_id: str = Field(description="Game save identifier")
+    seq: int = Field(ge=0, description="Save sequence number")
+    section: str = Field(description="Section name")
+    data: Any = Field(description="Section data")
@@ -0,0 +1,84 @@
+"""
+Hero Pydantic Schemas
+---------------------
+Request and response schemas for hero API endpoints.
+Stat names mirror HeroStats in frontend/src/types/hero.ts.
+"""
+
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class HeroStat(str, Enum):
+    """Hero stats that modify troop stats."""
+    ATTACK = "attack"
+    DEFENSE = "defense"
+    SPEED = "speed"
+    VAMPIRIC = "vampiric"
+    ATTACK_SPEED = "attack_speed"
+    MAGIC = "magic"
+    DEPLOYMENTS = "deployments"
+    CHARISMA = "charisma"
+    TACTICS = "tactics"
+
+
+class HeroStats(BaseModel):
+    """A full set of hero stats."""
+    attack: float = Field(0, description="Bonus to troop attack")
+    defense: float = Field(0, description="Bonus to troop defense")
+    speed: float = Field(0, description="Bonus to troop movement speed")
+    vampiric: float = Field(0, description="Lifesteal fraction (0.0 = 0%)")
+    attack_speed: float = Field(0, description="Bonus to troop attack speed")
+    magic: float = Field(0, description="Magic power")
+    deployments: float = Field(0, description="Bonus deployments in combat")
+    charisma: float = Field(0, description="Charisma bonus")
+    tactics: float = Field(2, description="Tactics bonus")
+
+
+class StatBonusSource(BaseModel):
+    """An equipped artifact or active buff granting stat bonuses."""
+    id: str | None = Field(None, description="Artifact identifier")
+    name: str = Field(description="Display name")
+    bonuses: dict[HeroStat, float] = Field(default_factory=dict, description="Stat bonuses")
+
+
+class CreateHeroRequest(BaseModel):
+    """Request to recruit a hero into a save's roster."""
+    game_save_id: str = Field(description="Game save the hero belongs to")
+    name: str = Field(min_length=1, max_length=64, description="Hero name")
+    portrait_path: str = Field("assets/units/hero/hero_south.png", description="Portrait asset path")
+    base_stats: HeroStats = Field(default_factory=HeroStats, description="Stats before bonuses")
+    equipment: list[StatBonusSource] = Field(default_factory=list, description="Equipped artifacts")
+    buffs: list[StatBonusSource] = Field(default_factory=list, description="Active buffs")
+
+
+class UpdateHeroRequest(BaseModel):
+    """Replace a hero's equipment and/or buffs."""
+    equipment: list[StatBonusSource] | None = Field(None, description="Equipped artifacts")
+    buffs: list[StatBonusSource] | None = Field(None, description="Active buffs")
+
+
+class LevelUpRequest(BaseModel):
+    """Stat chosen to increase on level up."""
+    stat: HeroStat = Field(description="Stat to increase")
+
+
+class HeroResponse(BaseModel):
+    """A hero with its derived stats."""
+    id: str = Field(description="Hero identifier")
+    game_save_id: str = Field(description="Game save the hero belongs to")
+    name: str = Field(description="Hero name")
+    portrait_path: str = Field(description="Portrait asset path")
+    level: int = Field(ge=1, description="Hero level")
+    is_alive: bool = Field(description="Whether the hero is alive")
+    base_stats: HeroStats = Field(description="Stats before bonuses")
+    equipment: list[StatBonusSource] = Field(description="Equipped artifacts")
+    buffs: list[StatBonusSource] = Field(description="Active buffs")
+    stats: HeroStats = Field(description="Derived stats: base + level growth + equipment + buffs")
+
+
+class HeroListResponse(BaseModel):
+    """One page of a hero roster."""
+    heroes: list[HeroResponse] = Field(description="Heroes on this page")
+    next_cursor: str | None = Field(None, description="Cursor for the next page, if any")
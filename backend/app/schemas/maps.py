@@ -0,0 +1,81 @@
+"""
+Map Pydantic Schemas
+--------------------
+Request and response schemas for overworld map API endpoints.
+"""
+
+from pydantic import BaseModel, Field
+
+
+class MapInfo(BaseModel):
+    """
+    Map metadata needed to plan chunk requests.
+
+    Clients fetch this once, then request only the chunks
+    covering their viewport.
+    """
+    name: str = Field(description="Map name")
+    width: int = Field(gt=0, description="Map width in tiles")
+    height: int = Field(gt=0, description="Map height in tiles")
+    tile_size: int = Field(gt=0, description="Tile size in pixels")
+    tileset: str = Field(description="Tileset key")
+    layers: list[str] = Field(description="Available layer names")
+    chunk_size: int = Field(gt=0, description="Tiles per chunk edge")
+    chunks_x: int = Field(ge=0, description="Number of chunk columns")
+    chunks_y: int = Field(ge=0, description="Number of chunk rows")
+
+
+class TilePosition(BaseModel):
+    """Tile coordinate on an overworld map."""
+    x: int = Field(ge=0, description="Tile X coordinate")
+    y: int = Field(ge=0, description="Tile Y coordinate")
+
+
+class PathQuery(BaseModel):
+    """A single start/goal path query."""
+    start: TilePosition = Field(description="Starting tile")
+    goal: TilePosition = Field(description="Destination tile")
+
+
+class PathBatchRequest(BaseModel):
+    """Request to find several paths on one map."""
+    queries: list[PathQuery] = Field(max_length=1000, description="Path queries to answer")
+
+
+class PathData(BaseModel):
+    """A found path, excluding the start tile."""
+    found: bool = Field(description="Whether the goal is reachable")
+    cost: float = Field(ge=0, description="Movement cost (diagonals cost ~1.41)")
+    path: list[TilePosition] = Field(default_factory=list, description="Tiles to walk, in order")
+
+
+class PathBatchResponse(BaseModel):
+    """Answers to a path batch, in query order."""
+    paths: list[PathData] = Field(description="One result per query")
+
+
+class HeroVisionUpdate(BaseModel):
+    """A hero's position and sight radius."""
+    x: int = Field(ge=0, description="Hero tile X")
+    y: int = Field(ge=0, description="Hero tile Y")
+    radius: int = Field(ge=0, le=32, description="Vision radius in tiles")
+
+
+class FogDiffData(BaseModel):
+    """
+    Fog changes caused by one update.
+
+    Cells are flat row-major tile indices (y * width + x), encoded as
+    sorted `[start, length]` runs.
+    """
+    revealed: list[list[int]] = Field(description="Cells that became visible")
+    hidden: list[list[int]] = Field(description="Cells that are no longer visible")
+    explored: list[list[int]] = Field(description="Cells explored for the first time")
+
+
+class FogSnapshot(BaseModel):
+    """Full fog state, used when a client (re)joins a map."""
+    width: int = Field(gt=0, description="Map width in tiles")
+    height: int = Field(gt=0, description="Map height in tiles")
+    explored: str = Field(description="Base64 bitmap, bit i = cell i explored")
+    visible: str = Field(description="Base64 bitmap, bit i = cell i visible")
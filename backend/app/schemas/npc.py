@@ -0,0 +1,74 @@
+"""
+NPC Pydantic Schemas
+--------------------
+Request/response schemas for AI NPC chat, its metrics, and dialogue
+pre-generation jobs.
+"""
+
+from pydantic import BaseModel
+
+
+class NpcProfile(BaseModel):
+    """NPC character definition."""
+    name: str
+    backstory: str = ""
+    personality: str = ""
+    guidelines: str = ""
+    cache_responses: bool = True  # Set False for NPCs whose answers must vary
+
+
+class ChatMessage(BaseModel):
+    """A single message in the conversation."""
+    role: str  # "player" or "npc"
+    content: str
+
+
+class ChatRequest(BaseModel):
+    """Request to chat with an NPC."""
+    npc: NpcProfile
+    conversation_history: list[ChatMessage] = []
+    player_message: str
+    system_prompt: str | None = None  # Pre-built prompt (overrides npc fields)
+    # Keeps the conversation server-side per (player, NPC); the history
+    # above is then only used to seed a new session
+    player_id: str | None = None
+    # Canned intent (e.g. "greeting", "bark") to answer with a pre-generated
+    # line if one exists; greetings opening a conversation are detected
+    intent: str | None = None
+
+
+class ChatResponse(BaseModel):
+    """NPC's response."""
+    npc_response: str
+
+
+class NpcCacheStats(BaseModel):
+    """Counters of the NPC response cache."""
+    entries: int
+    max_entries: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    hit_rate: float
+    evictions: int
+    expirations: int
+    coalesced: int  # Requests that shared an identical call already in flight
+
+
+class NpcUsageStats(BaseModel):
+    """Token usage reported by the LLM API since startup."""
+    calls: int
+    input_tokens: int
+    cache_creation_input_tokens: int
+    cache_read_input_tokens: int
+    output_tokens: int
+    cached_token_ratio: float  # Share of input tokens read from the prompt cache
+
+
+class PregenJob(BaseModel):
+    """Canned lines to pre-generate for one NPC."""
+    npc: NpcProfile
+    system_prompt: str | None = None  # Pre-built prompt (overrides npc fields)
+    intents: list[str] = ["greeting"]
+    prompts: dict[str, str] = {}  # Player prompt per intent (overrides the defaults)
+    variants: int | None = None  # Lines per intent (default npc_pregen_variants)
@@ -5,6 +5,20 @@ Contains business logic separated from API routes.
 Services handle the core game mechanics and rules.
 """
 
+from app.services.analytics_service import AnalyticsService
 from app.services.combat_engine import CombatEngine
+from app.services.fog_service import FogService
+from app.services.hero_service import HeroService
+from app.services.map_service import MapService
+from app.services.pathfinding_service import PathfindingService
+from app.services.save_service import SaveService
 
-__all__ = ["CombatEngine"]
+__all__ = [
+    "AnalyticsService",
+    "CombatEngine",
+    "FogService",
+    "HeroService",
+    "MapService",
+    "PathfindingService",
+    "SaveService",
+]
@@ -0,0 +1,248 @@
+"""
+Analytics Service
+-----------------
+Materialized combat aggregates for balancing. Handles:
+- Turning a finished combat into per-composition and per-unit-type counters
+- Incrementally adding those counters with upserts when a combat ends
+- Reading the dashboard from the aggregate tables (O(groups))
+- Rebuilding the aggregates in bulk from recorded combats
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import CompositionStats, UnitTypeStats
+from app.models.combat import CombatActionRecord, CombatInstance
+from app.schemas.analytics import AnalyticsResponse, CompositionSummary, UnitTypeSummary
+from app.services.combat_record_service import summarize_state
+
+# Combats read per query during a backfill
+BACKFILL_BATCH_SIZE = 500
+
+_UPSERTS = {"sqlite": sqlite_insert, "postgresql": postgresql_insert}
+
+
+def composition_key(units: list[dict[str, Any]]) -> str:
+    """Sorted unit type counts of the player's army, e.g. 'archer:2,warrior:3'."""
+    counts = Counter(unit["type"] for unit in units if unit["is_player"])
+    return ",".join(f"{unit_type}:{count}" for unit_type, count in sorted(counts.items()))
+
+
+@dataclass
+class AggregateTotals:
+    """Counters to add to the aggregate tables, keyed like their primary keys."""
+    compositions: dict[str, Counter] = field(default_factory=dict)
+    unit_types: dict[tuple[str, str], Counter] = field(default_factory=dict)
+
+    def add_combat(
+        self,
+        final_state: dict[str, Any],
+        outcome: str,
+        ticks: int,
+        damage_dealt: dict[str, int],
+    ) -> None:
+        """Add one finished combat (a CombatState dump) to the totals."""
+        units = final_state.get("units", [])
+
+        composition = self.compositions.setdefault(composition_key(units), Counter())
+        composition["combats"] += 1
+        composition["total_ticks"] += ticks
+        if outcome == "player_won":
+            composition["player_wins"] += 1
+        elif outcome == "enemy_won":
+            composition["enemy_wins"] += 1
+        else:
+            composition["abandoned"] += 1
+
+        for unit in units:
+            side = "player" if unit["is_player"] else "enemy"
+            stats = self.unit_types.setdefault((unit["type"], side), Counter())
+            stats["units_fielded"] += 1
+            stats["units_lost"] += unit["hp"] <= 0
+            stats["damage_dealt"] += damage_dealt.get(unit["id"], 0)
+            stats["damage_taken"] += unit["max_hp"] - unit["hp"]
+
+    def composition_rows(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "composition": key,
+                **{
+                    name: counts[name]
+                    for name in ("combats", "player_wins", "enemy_wins", "abandoned", "total_ticks")
+                },
+            }
+            for key, counts in self.compositions.items()
+        ]
+
+    def unit_type_rows(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "unit_type": unit_type,
+                "side": side,
+                **{
+                    name: counts[name]
+                    for name in ("units_fielded", "units_lost", "damage_dealt", "damage_taken")
+                },
+            }
+            for (unit_type, side), counts in self.unit_types.items()
+        ]
+
+
+class AnalyticsService:
+    """Maintains and reads the combat aggregate tables."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def record_combat(
+        self,
+        final_state: dict[str, Any],
+        damage_dealt: dict[str, int],
+    ) -> None:
+        """Add a just-finished combat to the aggregates."""
+        summary = summarize_state(final_state)
+        totals = AggregateTotals()
+        totals.add_combat(final_state, summary["outcome"], summary["ticks"], damage_dealt)
+
+        await self._increment(CompositionStats, ["composition"], totals.composition_rows())
+        await self._increment(UnitTypeStats, ["unit_type", "side"], totals.unit_type_rows())
+
+    async def get_dashboard(self) -> AnalyticsResponse:
+        """Read the dashboard from the aggregate tables."""
+        compositions = (
+            await self.db.execute(
+                select(CompositionStats).order_by(
+                    CompositionStats.combats.desc(), CompositionStats.composition
+                )
+            )
+        ).scalars().all()
+        unit_types = (
+            await self.db.execute(
+                select(UnitTypeStats).order_by(UnitTypeStats.side, UnitTypeStats.unit_type)
+            )
+        ).scalars().all()
+
+        combats = sum(c.combats for c in compositions)
+        total_ticks = sum(c.total_ticks for c in compositions)
+        return AnalyticsResponse(
+            combats=combats,
+            avg_fight_ticks=total_ticks / combats if combats else 0.0,
+            compositions=[
+                CompositionSummary(
+                    composition=c.composition,
+                    combats=c.combats,
+                    player_wins=c.player_wins,
+                    enemy_wins=c.enemy_wins,
+                    abandoned=c.abandoned,
+                    win_rate=(
+                        c.player_wins / (c.player_wins + c.enemy_wins)
+                        if c.player_wins + c.enemy_wins else 0.0
+                    ),
+                    avg_ticks=c.total_ticks / c.combats if c.combats else 0.0,
+                )
+                for c in compositions
+            ],
+            unit_types=[
+                UnitTypeSummary(
+                    unit_type=u.unit_type,
+                    side=u.side,
+                    units_fielded=u.units_fielded,
+                    units_lost=u.units_lost,
+                    damage_dealt=u.damage_dealt,
+                    damage_taken=u.damage_taken,
+                    avg_damage_dealt=u.damage_dealt / u.units_fielded if u.units_fielded else 0.0,
+                )
+                for u in unit_types
+            ],
+        )
+
+    async def backfill(self, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+        """
+        Rebuild the aggregates from every finished combat.
+
+        Combats are read in id-keyed batches; damage dealt is summed per
+        unit from the combat_actions log with one grouped query per
+        batch. Totals are accumulated in memory (one entry per group)
+        and written in a single insert per table. Returns the number of
+        combats counted.
+        """
+        totals = AggregateTotals()
+        counted = 0
+        last_id = ""
+
+        while True:
+            rows = (
+                await self.db.execute(
+                    select(CombatInstance.id, CombatInstance.final_state)
+                    .where(
+                        CombatInstance.ended_at.is_not(None),
+                        CombatInstance.final_state.is_not(None),
+                        CombatInstance.id > last_id,
+                    )
+                    .order_by(CombatInstance.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            damage = await self._damage_by_unit([row.id for row in rows])
+            for row in rows:
+                summary = summarize_state(row.final_state)
+                totals.add_combat(
+                    row.final_state, summary["outcome"], summary["ticks"], damage.get(row.id, {})
+                )
+                counted += 1
+
+        await self.db.execute(delete(CompositionStats))
+        await self.db.execute(delete(UnitTypeStats))
+        if totals.compositions:
+            await self.db.execute(insert(CompositionStats), totals.composition_rows())
+            await self.db.execute(insert(UnitTypeStats), totals.unit_type_rows())
+        await self.db.flush()
+        return counted
+
+    async def _damage_by_unit(self, combat_ids: list[str]) -> dict[str, dict[str, int]]:
+        """Sum attack damage per unit from the action log: combat id -> unit id -> damage."""
+        payload = CombatActionRecord.payload
+        unit_id = payload["unit_id"].as_string()
+        result = await self.db.execute(
+            select(
+                CombatActionRecord.combat_id,
+                unit_id,
+                func.sum(payload["damage"].as_integer()),
+            )
+            .where(
+                CombatActionRecord.combat_id.in_(combat_ids),
+                payload["type"].as_string() == "attack",
+            )
+            .group_by(CombatActionRecord.combat_id, unit_id)
+        )
+        damage: dict[str, dict[str, int]] = {}
+        for combat_id, attacker_id, total in result.all():
+            damage.setdefault(combat_id, {})[attacker_id] = total
+        return damage
+
+    async def _increment(
+        self,
+        model: type[CompositionStats] | type[UnitTypeStats],
+        key_columns: list[str],
+        rows: list[dict[str, Any]],
+    ) -> None:
+        """Insert rows, or add their counters to existing rows with the same key."""
+        if not rows:
+            return
+        upsert = _UPSERTS[self.db.get_bind().dialect.name](model)
+        counters = [name for name in rows[0] if name not in key_columns]
+        upsert = upsert.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={name: getattr(model, name) + upsert.excluded[name] for name in counters},
+        )
+        await self.db.execute(upsert, rows)
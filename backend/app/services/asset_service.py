@@ -0,0 +1,266 @@
+"""
+Asset Service
+-------------
+Content-hashed static assets, so browsers can cache them forever. Handles:
+- Building: copying every file under the asset roots to
+  <stem>.<hash><suffix> in the build directory, with gzip (and brotli,
+  when installed) variants of compressible files
+- Rewriting the page images named in texture atlas JSON to their hashed
+  names, so an atlas and its pages are versioned together
+- Writing manifest.json, which maps logical names (as the frontend
+  requests them, e.g. "assets/units/knight_idle.png") to hashed files
+- Serving: resolving a hashed path to its file and best encoding
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import json
+import mimetypes
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.config import settings
+from app.services.exceptions import AssetNotFoundError
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_VERSION = 1
+HASH_LENGTH = 12  # Hex digits of the sha256 in hashed file names
+MIN_COMPRESSION_SAVING = 0.1  # Keep a compressed variant only if 10% smaller
+
+# Content-Encoding -> file suffix, most preferred first
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+COMPRESSIBLE_TYPES = {
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+}
+
+
+def is_compressible(path: Path) -> bool:
+    media_type = mimetypes.guess_type(path.name)[0] or ""
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def hashed_name(relative: str, digest: str) -> str:
+    """assets/units/knight_idle.png -> assets/units/knight_idle.<hash>.png"""
+    path = Path(relative)
+    return path.with_name(f"{path.stem}.{digest[:HASH_LENGTH]}{path.suffix}").as_posix()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        import brotli  # Optional; only called when installed
+
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def available_encodings() -> list[str]:
+    return [
+        encoding for encoding in ENCODINGS
+        if encoding != "br" or importlib.util.find_spec("brotli") is not None
+    ]
+
+
+def rewrite_atlas_images(data: bytes, directory: str, hashed: dict[str, str]) -> bytes:
+    """
+    Point the "image" of every texture in a multiatlas JSON (the format of
+    sprite_build's unit atlas) at its hashed page. Other files pass through.
+    """
+    try:
+        document = json.loads(data)
+    except ValueError:
+        return data
+    textures = document.get("textures") if isinstance(document, dict) else None
+    if not isinstance(textures, list):
+        return data
+
+    changed = False
+    for texture in textures:
+        image = texture.get("image") if isinstance(texture, dict) else None
+        target = hashed.get(f"{directory}/{image}" if directory else str(image))
+        if target:
+            texture["image"] = Path(target).name
+            changed = True
+    return json.dumps(document, separators=(",", ":")).encode() if changed else data
+
+
+@dataclass
+class AssetBuildResult:
+    files: int = 0
+    written: int = 0
+    removed: int = 0
+    bytes: int = 0
+    compressed_bytes: int = 0  # Bytes of the best variant of every file
+    manifest: dict = field(default_factory=dict)
+
+
+def build_assets(roots: dict[str, Path], build_dir: Path) -> AssetBuildResult:
+    """
+    Hash every file under roots (logical prefix -> directory) into
+    build_dir and write the manifest. Files already built under the same
+    hash are left alone, and files no longer in the manifest are removed.
+    """
+    result = AssetBuildResult()
+    sources = {}
+    for prefix, root in sorted(roots.items()):
+        for path in sorted(root.rglob("*")):
+            if path.is_file() and not path.name.startswith("."):
+                sources[f"{prefix}/{path.relative_to(root).as_posix()}"] = path
+
+    # Atlas JSON names its pages, so hash the pages first
+    order = sorted(sources, key=lambda name: (name.endswith(".json"), name))
+    encodings = available_encodings()
+    hashed: dict[str, str] = {}
+    files: dict[str, dict] = {}
+    for name in order:
+        data = sources[name].read_bytes()
+        if name.endswith(".json"):
+            data = rewrite_atlas_images(data, name.rpartition("/")[0], hashed)
+        digest = hashlib.sha256(data).hexdigest()
+        hashed[name] = target = hashed_name(name, digest)
+
+        entry = {"path": target, "size": len(data), "sha256": digest, "encodings": []}
+        output = build_dir / target
+        if not output.is_file() or output.stat().st_size != len(data):
+            output.parent.mkdir(parents=True, exist_ok=True)
+            output.write_bytes(data)
+            result.written += 1
+        best = len(data)
+        if is_compressible(output):
+            for encoding in encodings:
+                variant = output.with_name(output.name + ENCODINGS[encoding])
+                if not variant.is_file():
+                    packed = compress(data, encoding)
+                    if len(packed) > len(data) * (1 - MIN_COMPRESSION_SAVING):
+                        continue
+                    variant.write_bytes(packed)
+                entry["encodings"].append(encoding)
+                best = min(best, variant.stat().st_size)
+
+        files[name] = entry
+        result.files += 1
+        result.bytes += len(data)
+        result.compressed_bytes += best
+
+    keep = {MANIFEST_NAME}
+    for entry in files.values():
+        keep.add(entry["path"])
+        keep.update(entry["path"] + ENCODINGS[encoding] for encoding in entry["encodings"])
+    if build_dir.is_dir():
+        for path in sorted(build_dir.rglob("*"), reverse=True):
+            relative = path.relative_to(build_dir).as_posix()
+            if path.is_file() and relative not in keep:
+                path.unlink()
+                result.removed += 1
+            elif path.is_dir() and not any(path.iterdir()):
+                path.rmdir()
+
+    result.manifest = {"version": MANIFEST_VERSION, "files": files}
+    build_dir.mkdir(parents=True, exist_ok=True)
+    temp = build_dir / f"{MANIFEST_NAME}.tmp"
+    temp.write_text(json.dumps(result.manifest, indent=1, sort_keys=True))
+    os.replace(temp, build_dir / MANIFEST_NAME)
+    return result
+
+
+@dataclass(frozen=True)
+class AssetFile:
+    path: Path
+    media_type: str
+    etag: str
+    encodings: tuple[str, ...]
+
+
+class AssetManifest:
+    """
+    The built manifest, reloaded when manifest.json changes so a new
+    asset build is picked up without a restart.
+    """
+
+    def __init__(self, build_dir: Path, base_url: str = "/api/assets/files/") -> None:
+        self.build_dir = build_dir
+        self.base_url = base_url
+        self._stamp: tuple[int, int] | None = None
+        self._files: dict[str, AssetFile] = {}
+        self.body = b""
+        self.gzip_body = b""
+        self.etag = ""
+        self._load()
+
+    def _load(self) -> None:
+        path = self.build_dir / MANIFEST_NAME
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            stamp = None
+        else:
+            stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self._stamp and self.body:
+            return
+
+        files = json.loads(path.read_text())["files"] if stamp else {}
+        self._files = {
+            entry["path"]: AssetFile(
+                path=self.build_dir / entry["path"],
+                media_type=mimetypes.guess_type(entry["path"])[0] or "application/octet-stream",
+                etag=f'"{entry["sha256"][:32]}"',
+                encodings=tuple(entry["encodings"]),
+            )
+            for entry in files.values()
+        }
+        public = {"base_url": self.base_url, "files": {name: entry["path"] for name, entry in files.items()}}
+        self.body = json.dumps(public, separators=(",", ":"), sort_keys=True).encode()
+        self.gzip_body = gzip.compress(self.body, mtime=0)
+        self.etag = f'"{hashlib.sha256(self.body).hexdigest()[:32]}"'
+        self._stamp = stamp
+
+    def refresh(self) -> None:
+        self._load()
+
+    def resolve(self, path: str) -> AssetFile:
+        """The hashed file at path (as listed in the manifest)."""
+        asset = self._files.get(path)
+        if asset is None:
+            raise AssetNotFoundError(path)
+        return asset
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def choose_encoding(accept_encoding: str, available: tuple[str, ...]) -> str | None:
+    """The most preferred precompressed encoding the client accepts."""
+    accepted = set()
+    for part in accept_encoding.lower().split(","):
+        token, _, params = part.strip().partition(";")
+        if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+            accepted.add(token.strip())
+    for encoding in ENCODINGS:
+        if encoding in available and (encoding in accepted or "*" in accepted):
+            return encoding
+    return None
+
+
+def asset_roots() -> dict[str, Path]:
+    return {prefix: Path(directory) for prefix, directory in settings.asset_roots.items()}
+
+
+_asset_manifest: AssetManifest | None = None
+
+
+def get_asset_manifest() -> AssetManifest:
+    """Get the asset manifest singleton, reloaded if it was rebuilt."""
+    global _asset_manifest
+    if _asset_manifest is None:
+        _asset_manifest = AssetManifest(Path(settings.asset_build_dir))
+    _asset_manifest.refresh()
+    return _asset_manifest
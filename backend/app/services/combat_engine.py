@@ -6,10 +6,11 @@ Core combat simulation logic. Handles:
 - Damage resolution
 - Unit AI for auto-combat
 - Player action validation
+- Emitting an ordered action log for persistence and replay
 """
 
 import math
-from typing import Optional
+from typing import Any, Callable, Optional
 
 from app.schemas.combat import (
     UnitData,
@@ -43,6 +44,8 @@ class CombatEngine:
     Manages a single combat encounter.
 
     Handles unit state, action processing, and tick-based simulation.
+    Every placement, move, attack and status change is numbered and
+    passed to `on_action(seq, tick, payload)` if given.
     """
 
     def __init__(
@@ -50,12 +53,16 @@ class CombatEngine:
         combat_id: str,
         player_units: list[UnitData],
         enemy_units: list[UnitData],
+        on_action: Optional[Callable[[int, int, dict[str, Any]], None]] = None,
     ):
         self.combat_id = combat_id
         self.current_tick = 0
         self.status = CombatStatus.ACTIVE
         self.units: dict[str, UnitData] = {}
         self.pending_actions: list[str] = []
+        self.on_action = on_action
+        self.action_seq = 0
+        self.damage_dealt: dict[str, int] = {}  # Unit id -> total damage dealt
 
         # Initialize units
         for unit in player_units:
@@ -119,10 +126,10 @@ class CombatEngine:
 
         # Check win conditions
         if not enemy_units:
-            self.status = CombatStatus.PLAYER_WON
+            self._set_status(CombatStatus.PLAYER_WON)
             return
         if not player_units:
-            self.status = CombatStatus.ENEMY_WON
+            self._set_status(CombatStatus.ENEMY_WON)
             return
 
         # Process unit actions (simple AI)
@@ -143,6 +150,14 @@ class CombatEngine:
                 if distance <= attack_range:
                     damage = calculate_damage(unit, target)
                     target.hp = max(0, target.hp - damage)
+                    self.damage_dealt[unit.id] = self.damage_dealt.get(unit.id, 0) + damage
+                    self._record(
+                        "attack",
+                        unit_id=unit.id,
+                        target_id=target.id,
+                        damage=damage,
+                        target_hp=target.hp,
+                    )
                 else:
                     # Move toward target
                     self._move_toward(unit, target.position)
@@ -155,9 +170,9 @@ class CombatEngine:
         enemy_alive = any(u.hp > 0 for u in self.units.values() if not u.is_player)
 
         if not enemy_alive:
-            self.status = CombatStatus.PLAYER_WON
+            self._set_status(CombatStatus.PLAYER_WON)
         elif not player_alive:
-            self.status = CombatStatus.ENEMY_WON
+            self._set_status(CombatStatus.ENEMY_WON)
 
     def _handle_place_unit(self, action: CombatAction) -> CombatActionResponse:
         """Handle unit placement action."""
@@ -203,6 +218,12 @@ class CombatEngine:
 
         unit.position = action.target_position
         self.pending_actions.append(f"Placed {unit.name}")
+        self._record(
+            "place_unit",
+            unit_id=unit.id,
+            x=action.target_position.x,
+            y=action.target_position.y,
+        )
 
         return CombatActionResponse(
             success=True,
@@ -272,3 +293,16 @@ class CombatEngine:
                     return  # Can't move, position occupied
 
         unit.position = Position(x=new_x, y=new_y)
+        self._record("move", unit_id=unit.id, x=new_x, y=new_y)
+
+    def _set_status(self, status: CombatStatus) -> None:
+        """Change the combat status and record it."""
+        self.status = status
+        self._record("status", status=status.value)
+
+    def _record(self, action_type: str, **data: Any) -> None:
+        """Number an action and hand it to the on_action callback."""
+        if self.on_action is None:
+            return
+        self.action_seq += 1
+        self.on_action(self.action_seq, self.current_tick, {"type": action_type, **data})
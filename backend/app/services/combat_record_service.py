@@ -0,0 +1,348 @@
+"""
+Combat Record Service
+---------------------
+Persistence of combats for replay and analytics. Handles:
+- Creating and finishing CombatInstance rows
+- Batched, asynchronous appends to the combat_actions log
+- Streaming a combat's actions in order without loading them all
+- Denormalized combat summaries and keyset-paginated history
+"""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import SessionFactory, async_session_maker
+from app.models.combat import CombatActionRecord, CombatInstance, utc_now
+from app.schemas.combat import CombatHistoryEntry, CombatStatus
+from app.services.exceptions import CombatNotFoundError
+from app.services.pagination import after_key, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched per round trip when streaming actions
+STREAM_BATCH_SIZE = 500
+
+DEFAULT_HISTORY_PAGE_SIZE = 50
+
+
+def summarize_state(state: dict[str, Any]) -> dict[str, Any]:
+    """
+    Compute the denormalized summary columns from a final CombatState dump.
+
+    Combats that end while still active were abandoned.
+    """
+    units = state.get("units", [])
+    status = state.get("status", CombatStatus.ACTIVE.value)
+    return {
+        "outcome": "abandoned" if status == CombatStatus.ACTIVE.value else status,
+        "ticks": state.get("tick", 0),
+        "player_units": sum(1 for u in units if u["is_player"]),
+        "enemy_units": sum(1 for u in units if not u["is_player"]),
+        "player_survivors": sum(1 for u in units if u["is_player"] and u["hp"] > 0),
+        "enemy_survivors": sum(1 for u in units if not u["is_player"] and u["hp"] > 0),
+    }
+
+
+class CombatActionWriter:
+    """
+    Buffers combat actions and writes them in batches.
+
+    submit() is synchronous and never touches the database, so the
+    combat engine can call it from its tick loop. A background task
+    writes the buffer once it holds `batch_size` rows or its oldest row
+    has waited `flush_interval_ms`, whichever comes first. Failed
+    batches are put back at the front of the buffer and retried; after
+    `max_attempts` failures the batch is split in halves until the rows
+    that cannot be written are isolated, and those are logged and dropped.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        flush_interval_ms: int | None = None,
+        batch_size: int | None = None,
+        max_attempts: int | None = None,
+    ):
+        self.session_factory = session_factory
+        self.flush_interval = (flush_interval_ms or settings.combat_action_flush_ms) / 1000
+        self.batch_size = batch_size or settings.combat_action_batch_size
+        self.max_attempts = max_attempts or settings.combat_action_write_attempts
+
+        self.rows_written = 0
+        self.rows_dropped = 0
+        self.flushes = 0
+        self._failures = 0
+
+        self._buffer: list[dict[str, Any]] = []
+        self._has_rows = asyncio.Event()
+        self._full = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted rows not yet written."""
+        return len(self._buffer)
+
+    def submit(self, combat_id: str, seq: int, tick: int, payload: dict[str, Any]) -> None:
+        """Queue one action for writing. Must be called from the event loop."""
+        self._buffer.append({"combat_id": combat_id, "seq": seq, "tick": tick, "payload": payload})
+        self._has_rows.set()
+        if len(self._buffer) >= self.batch_size:
+            self._full.set()
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> int:
+        """
+        Write everything buffered so far. Returns the number of rows written.
+
+        Raises the write error and keeps the rows buffered until the batch
+        has failed `max_attempts` times; that flush then splits the batch,
+        writes what it can and drops the rest instead of raising.
+        """
+        async with self._lock:
+            if not self._buffer:
+                return 0
+
+            rows, self._buffer = self._buffer, []
+            self._has_rows.clear()
+            self._full.clear()
+            try:
+                await self._write(rows)
+            except Exception:
+                self._failures += 1
+                if self._failures < self.max_attempts:
+                    self._buffer[:0] = rows
+                    self._has_rows.set()
+                    raise
+                logger.warning(
+                    "Writing %d combat actions failed %d times; isolating bad rows",
+                    len(rows), self._failures, exc_info=True,
+                )
+                written = await self._write_split(rows)
+            else:
+                written = len(rows)
+            self._failures = 0
+
+            self.rows_written += written
+            self.flushes += 1
+            return written
+
+    async def close(self) -> None:
+        """
+        Stop the background task and write any remaining rows.
+
+        Never raises: rows that still cannot be written once the batch has
+        used up its attempts are logged and dropped.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        while self._buffer:
+            try:
+                await self.flush()
+            except Exception:
+                logger.warning("Failed to write combat actions on close; retrying", exc_info=True)
+
+    async def _write(self, rows: list[dict[str, Any]]) -> None:
+        async with self.session_factory() as db:
+            try:
+                await db.execute(insert(CombatActionRecord), rows)
+                await db.commit()
+            except Exception:
+                await db.rollback()  # Drop the rows inserted before the failing one
+                raise
+
+    async def _write_split(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Write a batch that failed as a whole by halves, recursing into the
+        halves that fail too, and drop single rows that cannot be written.
+        Returns the number of rows written.
+        """
+        if len(rows) == 1:
+            row = rows[0]
+            logger.error(
+                "Dropping combat action %s/%s that cannot be written: %r",
+                row["combat_id"], row["seq"], row["payload"],
+            )
+            self.rows_dropped += 1
+            return 0
+
+        written = 0
+        middle = len(rows) // 2
+        for half in (rows[:middle], rows[middle:]):
+            try:
+                await self._write(half)
+            except Exception:
+                written += await self._write_split(half)
+            else:
+                written += len(half)
+        return written
+
+    async def _run(self) -> None:
+        while True:
+            await self._has_rows.wait()
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to write combat actions; retrying")
+                await asyncio.sleep(self.flush_interval)
+
+
+class CombatRecordService:
+    """Reads and writes CombatInstance rows and their action logs."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(
+        self,
+        combat_id: str,
+        initial_state: dict[str, Any],
+        game_save_id: str | None = None,
+    ) -> CombatInstance:
+        """Record the start of a combat."""
+        combat = CombatInstance(
+            id=combat_id,
+            game_save_id=game_save_id,
+            started_at=utc_now(),
+            initial_state=initial_state,
+        )
+        self.db.add(combat)
+        await self.db.flush()
+        return combat
+
+    async def finish(self, combat_id: str, final_state: dict[str, Any]) -> bool:
+        """
+        Record the end of a combat and its summary.
+
+        Returns False if the combat was already finished or does not exist.
+        """
+        result = await self.db.execute(
+            update(CombatInstance)
+            .where(CombatInstance.id == combat_id, CombatInstance.ended_at.is_(None))
+            .values(ended_at=utc_now(), final_state=final_state, **summarize_state(final_state))
+        )
+        return result.rowcount > 0
+
+    async def list_history(
+        self,
+        game_save_id: str,
+        limit: int = DEFAULT_HISTORY_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[CombatHistoryEntry], str | None]:
+        """
+        Get one page of a save's finished combats, newest first.
+
+        Reads only summary columns, walking the (game_save_id, started_at,
+        id) index. Returns (combats, next_cursor).
+        """
+        query = select(
+            CombatInstance.id,
+            CombatInstance.started_at,
+            CombatInstance.ended_at,
+            CombatInstance.outcome,
+            CombatInstance.ticks,
+            CombatInstance.player_units,
+            CombatInstance.enemy_units,
+            CombatInstance.player_survivors,
+            CombatInstance.enemy_survivors,
+        ).where(
+            CombatInstance.game_save_id == game_save_id,
+            CombatInstance.ended_at.is_not(None),
+        )
+        if cursor is not None:
+            query = query.where(
+                after_key(
+                    [CombatInstance.started_at, CombatInstance.id],
+                    decode_cursor(cursor, (datetime, str)),
+                    descending=True,
+                )
+            )
+        query = query.order_by(
+            CombatInstance.started_at.desc(), CombatInstance.id.desc()
+        ).limit(limit + 1)
+
+        rows = (await self.db.execute(query)).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].started_at, rows[-1].id)
+
+        combats = [
+            CombatHistoryEntry(
+                combat_id=row.id,
+                started_at=row.started_at,
+                ended_at=row.ended_at,
+                duration_seconds=max(0.0, (row.ended_at - row.started_at).total_seconds()),
+                outcome=row.outcome,
+                ticks=row.ticks,
+                player_units=row.player_units,
+                enemy_units=row.enemy_units,
+                player_survivors=row.player_survivors,
+                enemy_survivors=row.enemy_survivors,
+            )
+            for row in rows
+        ]
+        return combats, next_cursor
+
+    async def check_exists(self, combat_id: str) -> None:
+        """Raise CombatNotFoundError unless the combat was recorded."""
+        result = await self.db.execute(
+            select(CombatInstance.id).where(CombatInstance.id == combat_id)
+        )
+        if result.scalar_one_or_none() is None:
+            raise CombatNotFoundError(f"Combat {combat_id} not found")
+
+    async def stream_actions(
+        self,
+        combat_id: str,
+        after_seq: int = 0,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield a combat's actions in seq order, fetching them in batches."""
+        result = await self.db.stream(
+            select(CombatActionRecord.seq, CombatActionRecord.tick, CombatActionRecord.payload)
+            .where(CombatActionRecord.combat_id == combat_id, CombatActionRecord.seq > after_seq)
+            .order_by(CombatActionRecord.seq)
+            .execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for row in result:
+            yield {"seq": row.seq, "tick": row.tick, "payload": row.payload}
+
+
+_combat_action_writer: CombatActionWriter | None = None
+
+
+def get_combat_action_writer() -> CombatActionWriter:
+    """Get the process-wide combat action writer."""
+    global _combat_action_writer
+    if _combat_action_writer is None:
+        _combat_action_writer = CombatActionWriter(async_session_maker)
+    return _combat_action_writer
+
+
+async def close_combat_action_writer() -> None:
+    """Flush and stop the process-wide writer, if it was started."""
+    global _combat_action_writer
+    if _combat_action_writer is not None:
+        await _combat_action_writer.close()
+        _combat_action_writer = None
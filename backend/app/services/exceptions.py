@@ -0,0 +1,92 @@
+"""
+Service Exceptions
+------------------
+Domain-specific errors raised by the service layer.
+Routes catch these and convert them to HTTP errors.
+"""
+
+
+class MapNotFoundError(Exception):
+    """Raised when a map file does not exist."""
+
+    pass
+
+
+class MapLayerNotFoundError(Exception):
+    """Raised when a requested map layer does not exist."""
+
+    pass
+
+
+class ChunkOutOfBoundsError(Exception):
+    """Raised when a chunk coordinate lies outside the map."""
+
+    pass
+
+
+class GameSaveNotFoundError(Exception):
+    """Raised when a game save does not exist."""
+
+    pass
+
+
+class SaveConflictError(Exception):
+    """Raised when another save of the same game was written first."""
+
+    pass
+
+
+class UnknownSaveSectionError(Exception):
+    """Raised when a game save section name is not recognized."""
+
+    pass
+
+
+class InvalidCursorError(Exception):
+    """Raised when a pagination cursor cannot be decoded."""
+
+    pass
+
+
+class HeroNotFoundError(Exception):
+    """Raised when a hero does not exist."""
+
+    pass
+
+
+class HeroConflictError(Exception):
+    """Raised when a hero keeps changing concurrently while being updated."""
+
+    pass
+
+
+class CombatNotFoundError(Exception):
+    """Raised when a recorded combat does not exist."""
+
+    pass
+
+
+class AssetNotFoundError(Exception):
+    """Raised when a hashed asset path is not in the asset manifest."""
+
+    pass
+
+
+class NpcUpstreamError(Exception):
+    """Raised when the LLM API rejects an NPC request."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: int | None = None,
+        retry_after: float | None = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after  # Seconds, from the retry-after header
+
+
+class LlmOverloadedError(Exception):
+    """Raised when an LLM call is shed because the dispatcher queue is full."""
+
+    pass
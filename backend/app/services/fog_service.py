@@ -0,0 +1,215 @@
+"""
+Fog of War Service
+------------------
+Server-side overworld visibility per player and map. Handles:
+- Explored and currently-visible state for every tile
+- Incremental updates when a hero moves, touching only the cells that
+  enter or leave its sight radius
+- Compact run-length diffs and bit-packed snapshots for the client
+- Bounding memory: least recently used states are evicted, and a
+  player's state starts over when the map file changes
+
+Vision matches the frontend FogOfWar: a tile is visible when its center
+is within `radius` tiles of the hero's tile center.
+"""
+
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.services.map_service import MapService, get_map_service
+
+# (player, map) fog states kept in memory; each holds a few bytes per tile
+FOG_CACHE_SIZE = 1024
+
+# (dx, dy) offsets relative to a hero's tile
+Offsets = tuple[tuple[int, int], ...]
+
+
+@lru_cache(maxsize=64)
+def circle_offsets(radius: int) -> Offsets:
+    """Offsets of every tile within a sight radius."""
+    r2 = radius * radius
+    return tuple(
+        (dx, dy)
+        for dy in range(-radius, radius + 1)
+        for dx in range(-radius, radius + 1)
+        if dx * dx + dy * dy <= r2
+    )
+
+
+@lru_cache(maxsize=1024)
+def move_offsets(radius: int, dx: int, dy: int) -> tuple[Offsets, Offsets]:
+    """
+    Offsets that enter and leave sight when a hero moves by (dx, dy).
+
+    Both are relative to the hero's new position. For single-step moves
+    these are thin crescents, far smaller than the full circle.
+    """
+    circle = set(circle_offsets(radius))
+    previous = {(ox - dx, oy - dy) for ox, oy in circle}
+    return tuple(sorted(circle - previous)), tuple(sorted(previous - circle))
+
+
+def to_runs(cells: list[int]) -> list[list[int]]:
+    """Encode flat cell indices as sorted [start, length] runs."""
+    runs: list[list[int]] = []
+    for cell in sorted(cells):
+        if runs and runs[-1][0] + runs[-1][1] == cell:
+            runs[-1][1] += 1
+        else:
+            runs.append([cell, 1])
+    return runs
+
+
+def pack_bits(cells: bytearray | array) -> bytes:
+    """Pack a per-cell state into a bitmap (bit i set when cells[i] > 0)."""
+    packed = bytearray((len(cells) + 7) // 8)
+    for i, value in enumerate(cells):
+        if value:
+            packed[i >> 3] |= 1 << (i & 7)
+    return bytes(packed)
+
+
+@dataclass
+class FogDiff:
+    """Cells whose state changed, as flat row-major indices."""
+    revealed: list[int] = field(default_factory=list)
+    hidden: list[int] = field(default_factory=list)
+    explored: list[int] = field(default_factory=list)
+
+
+@dataclass
+class HeroVision:
+    """A hero's current vision source."""
+    x: int
+    y: int
+    radius: int
+
+
+class PlayerFog:
+    """
+    Visibility state for one player on one map.
+
+    `visible` counts how many heroes currently see each cell, so
+    overlapping sight circles are handled without rescanning.
+    """
+
+    def __init__(self, width: int, height: int, map_version: str = ""):
+        self.width = width
+        self.height = height
+        self.map_version = map_version  # Version of the map the bitmaps index
+        self.explored = bytearray(width * height)
+        self.visible = array("H", bytes(2 * width * height))
+        self.heroes: dict[str, HeroVision] = {}
+
+    def move_hero(self, hero_id: str, x: int, y: int, radius: int) -> FogDiff:
+        """
+        Place or move a hero and return the resulting change.
+
+        Small moves with an unchanged radius only visit the cells entering
+        or leaving sight; anything else swaps the full circle.
+        """
+        diff = FogDiff()
+        old = self.heroes.get(hero_id)
+        self.heroes[hero_id] = HeroVision(x, y, radius)
+
+        if old is None:
+            self._apply(x, y, circle_offsets(radius), 1, diff)
+        elif old.radius == radius and abs(x - old.x) <= radius and abs(y - old.y) <= radius:
+            entering, leaving = move_offsets(radius, x - old.x, y - old.y)
+            self._apply(x, y, leaving, -1, diff)
+            self._apply(x, y, entering, 1, diff)
+        else:
+            self._apply(old.x, old.y, circle_offsets(old.radius), -1, diff)
+            self._apply(x, y, circle_offsets(radius), 1, diff)
+
+        self._cancel_flicker(diff)
+        return diff
+
+    def remove_hero(self, hero_id: str) -> FogDiff:
+        """Remove a hero's vision; explored cells stay explored."""
+        diff = FogDiff()
+        old = self.heroes.pop(hero_id, None)
+        if old is not None:
+            self._apply(old.x, old.y, circle_offsets(old.radius), -1, diff)
+        return diff
+
+    def _apply(self, x: int, y: int, offsets: Offsets, delta: int, diff: FogDiff) -> None:
+        """Add or remove one hero's sight over a set of offsets."""
+        width = self.width
+        height = self.height
+        visible = self.visible
+        explored = self.explored
+
+        for ox, oy in offsets:
+            cx = x + ox
+            cy = y + oy
+            if cx < 0 or cx >= width or cy < 0 or cy >= height:
+                continue
+            cell = cy * width + cx
+            count = visible[cell] + delta
+            visible[cell] = count
+            if delta > 0 and count == 1:
+                diff.revealed.append(cell)
+                if not explored[cell]:
+                    explored[cell] = 1
+                    diff.explored.append(cell)
+            elif delta < 0 and count == 0:
+                diff.hidden.append(cell)
+
+    def _cancel_flicker(self, diff: FogDiff) -> None:
+        """Drop cells that were hidden and revealed within the same update."""
+        both = set(diff.hidden) & set(diff.revealed)
+        if both:
+            diff.hidden = [cell for cell in diff.hidden if cell not in both]
+            diff.revealed = [cell for cell in diff.revealed if cell not in both]
+
+
+class FogService:
+    """
+    Keeps fog state per (player, map) pair.
+
+    States are evicted least recently used first, and are recreated
+    fully unexplored when the map they were built for has changed.
+    """
+
+    def __init__(self, map_service: MapService, max_states: int = FOG_CACHE_SIZE):
+        self.map_service = map_service
+        self.max_states = max_states
+        self._fog: OrderedDict[tuple[str, str], PlayerFog] = OrderedDict()
+
+    def get_fog(self, player_id: str, map_name: str) -> PlayerFog:
+        """Get a player's fog for a map, creating it fully unexplored."""
+        key = (player_id, map_name)
+        tile_map = self.map_service.get_map(map_name)
+        fog = self._fog.get(key)
+        if fog is not None and fog.map_version == tile_map.version:
+            self._fog.move_to_end(key)
+            return fog
+
+        fog = PlayerFog(tile_map.width, tile_map.height, tile_map.version)
+        self._fog[key] = fog
+        self._fog.move_to_end(key)
+        if len(self._fog) > self.max_states:
+            self._fog.popitem(last=False)
+        return fog
+
+    def move_hero(
+        self, player_id: str, map_name: str, hero_id: str, x: int, y: int, radius: int
+    ) -> FogDiff:
+        """Place or move a hero's vision source."""
+        return self.get_fog(player_id, map_name).move_hero(hero_id, x, y, radius)
+
+    def remove_hero(self, player_id: str, map_name: str, hero_id: str) -> FogDiff:
+        """Remove a hero's vision source."""
+        return self.get_fog(player_id, map_name).remove_hero(hero_id)
+
+
+_fog_service = FogService(get_map_service())
+
+
+def get_fog_service() -> FogService:
+    """Dependency that provides the shared fog service."""
+    return _fog_service
@@ -1,14 +1,207 @@
 """
-Claude AI Service
-------------------
-Handles NPC conversation generation using Anthropic's Claude API.
+NPC Dialogue Service
+--------------------
+Handles NPC conversation generation through the configured LLM backend
+(Anthropic Claude by default; see llm_backends for Gemini and the
+local mock).
+
+All calls share one pooled httpx client, created by the first call
+(httpx is only imported then, keeping it off the startup path) and
+closed on shutdown, so connections (and their TLS sessions) are
+reused across NPC lines. Successful lines are cached (see npc_cache)
+so repeated openers skip the API entirely, and identical requests
+already in flight share one call (see single_flight).
+stream_npc_response yields the reply as it is generated, for the SSE
+chat endpoint.
+
+The system prompt is sent as content blocks: the stable per-NPC prefix
+carries a cache_control breakpoint so the provider can reuse it across
+turns, and the per-session summary follows it. Token usage, including
+cached input, is totalled in `token_usage`. The module keeps its old
+name so existing imports keep working.
 """
 
-import httpx
+import importlib.util
+from collections.abc import AsyncIterator, Callable
+from dataclasses import asdict, dataclass
+from functools import lru_cache, partial
+from typing import TYPE_CHECKING, Any
+
 from app.config import settings
+from app.services.exceptions import LlmOverloadedError, NpcUpstreamError
+from app.services.llm_backends import LlmBackend, System, get_llm_backend
+from app.services.llm_dispatcher import Priority, get_llm_dispatcher
+from app.services.npc_cache import NpcResponseCache, get_npc_cache, make_cache_key
+from app.services.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    import httpx
+
+# Most recent conversation messages sent for context
+HISTORY_LIMIT = 10
+
+# Output token limit of an NPC line
+NPC_MAX_TOKENS = 500
+
+# Rough characters per token, for budgeting prompts without a tokenizer
+CHARS_PER_TOKEN = 4
+
+SUMMARY_PROMPT = """You keep notes for {npc_name}, an NPC in a fantasy RPG, about an ongoing conversation with the player.
+Update the summary with the new lines. Keep names, promises, quests, facts the player revealed and {npc_name}'s attitude toward them; drop greetings and small talk.
+Reply with the updated summary only, in under {words} words."""
+
+# NPC profiles whose system prompts are memoized
+PROMPT_CACHE_SIZE = 256
+
+
+@dataclass
+class TokenUsage:
+    """Running totals of the usage reported by the LLM backend."""
+    calls: int = 0
+    input_tokens: int = 0  # Input after the last cache breakpoint (never cached)
+    cache_creation_input_tokens: int = 0  # Prefix written to the provider cache
+    cache_read_input_tokens: int = 0  # Prefix served from the provider cache
+    output_tokens: int = 0
+
+    def add(self, usage: dict[str, Any]) -> None:
+        """Add one response's usage (or a streamed usage update)."""
+        self.input_tokens += usage.get("input_tokens") or 0
+        self.cache_creation_input_tokens += usage.get("cache_creation_input_tokens") or 0
+        self.cache_read_input_tokens += usage.get("cache_read_input_tokens") or 0
+        self.output_tokens += usage.get("output_tokens") or 0
+
+    @property
+    def cached_token_ratio(self) -> float:
+        """Share of all input tokens that were read from the provider cache."""
+        total = self.input_tokens + self.cache_creation_input_tokens + self.cache_read_input_tokens
+        return self.cache_read_input_tokens / total if total else 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return {**asdict(self), "cached_token_ratio": self.cached_token_ratio}
+
 
+token_usage = TokenUsage()
 
-CLAUDE_API_URL = "https://api.anthropic.com/v1/messages"
+_http_client: "httpx.AsyncClient | None" = None
+
+# Upstream calls in flight, keyed like the response cache
+_npc_flights = SingleFlight()
+
+
+def create_http_client() -> "httpx.AsyncClient":
+    """Create a pooled client configured from settings."""
+    import httpx
+
+    return httpx.AsyncClient(
+        http2=settings.llm_http2 and importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=settings.llm_max_connections,
+            max_keepalive_connections=settings.llm_max_keepalive_connections,
+            keepalive_expiry=settings.llm_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.llm_timeout_seconds,
+            connect=settings.llm_connect_timeout_seconds,
+        ),
+    )
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """Get the shared client, creating it on first use."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+def get_token_usage() -> TokenUsage:
+    """Get the process-wide LLM token usage totals."""
+    return token_usage
+
+
+def npc_flights() -> SingleFlight:
+    """Get the coalescer of in-flight NPC calls (for its counters)."""
+    return _npc_flights
+
+
+async def close_http_client() -> None:
+    """Close the shared client and its pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def build_system_prompt(npc_name: str, backstory: str, personality: str, guidelines: str) -> str:
+    """Build the roleplay system prompt from an NPC profile (memoized per profile)."""
+    return f"""You are roleplaying as an NPC named {npc_name} in a fantasy RPG game.
+
+BACKSTORY:
+{backstory}
+
+PERSONALITY:
+{personality}
+
+GUIDELINES:
+{guidelines}
+
+RULES:
+- Stay in character at all times
+- Keep responses concise (1-3 sentences typically)
+- Use fantasy-appropriate language
+- Never break the fourth wall or mention you're an AI
+- React naturally to what the player says
+- If asked something your character wouldn't know, respond in character"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count of a piece of text."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def build_system(system_prompt: str, summary: str = "") -> list[dict[str, Any]]:
+    """
+    Build the system content blocks: the NPC's stable prompt, then the summary.
+
+    The prompt block ends with a cache breakpoint (when
+    llm_prompt_caching is on), so everything up to it is cacheable; the
+    summary changes as the conversation goes on and comes after it.
+    """
+    blocks: list[dict[str, Any]] = [_prefix_block(system_prompt, settings.llm_prompt_caching)]
+    if summary:
+        blocks.append({"type": "text", "text": f"EARLIER IN THIS CONVERSATION:\n{summary}"})
+    return blocks
+
+
+def system_text(system: list[dict[str, Any]]) -> str:
+    """The plain text of system content blocks (used for cache keys)."""
+    return "\n\n".join(block["text"] for block in system)
+
+
+def build_messages(conversation_history: list[dict], player_message: str) -> list[dict]:
+    """
+    Build the Messages API list: recent history, then the player's message.
+
+    History is the last HISTORY_LIMIT messages, minus the oldest of those
+    while they exceed npc_history_token_budget.
+    """
+    history = conversation_history[-HISTORY_LIMIT:]
+    budget = settings.npc_history_token_budget
+    used = 0
+    start = len(history)
+    while start > 0:
+        used += estimate_tokens(history[start - 1]["content"])
+        if used > budget:
+            break
+        start -= 1
+
+    messages = []
+    for msg in history[start:]:
+        role = "user" if msg["role"] == "player" else "assistant"
+        messages.append({"role": role, "content": msg["content"]})
+    messages.append({"role": "user", "content": player_message})
+    return messages
 
 
 async def generate_npc_response(
@@ -19,9 +212,14 @@ async def generate_npc_response(
     conversation_history: list[dict],
     player_message: str,
     system_prompt: str | None = None,
+    client: "httpx.AsyncClient | None" = None,
+    cache: bool = True,
+    priority: Priority = Priority.INTERACTIVE,
+    summary: str = "",
+    on_complete: Callable[[str], None] | None = None,
 ) -> str:
     """
-    Generate an NPC response using Claude.
+    Generate an NPC response with the configured LLM backend.
 
     Args:
         npc_name: The NPC's name
@@ -31,77 +229,227 @@ async def generate_npc_response(
         conversation_history: Previous messages [{role: "player"|"npc", content: str}]
         player_message: The player's current message
         system_prompt: Optional pre-built system prompt (overrides backstory/personality/guidelines)
+        client: HTTP client to use (defaults to the shared pooled client)
+        cache: Whether this NPC's lines may be served from and stored in the cache
+        priority: Dispatcher queue priority (background work yields to players)
+        summary: Summary of turns older than conversation_history, if any
+        on_complete: Called with the reply when it is a real line (not a fallback)
 
     Returns:
         The NPC's response text
     """
-    if not settings.anthropic_api_key:
-        return f"*{npc_name} stares at you blankly* (Claude API key not configured)"
+    backend = get_llm_backend()
+    if not backend.configured():
+        return f"*{npc_name} stares at you blankly* ({backend.label} API key not configured)"
 
-    # Use provided system prompt or build a simple one
-    if system_prompt:
-        final_prompt = system_prompt
-    else:
-        final_prompt = f"""You are roleplaying as an NPC named {npc_name} in a fantasy RPG game.
+    system = build_system(
+        system_prompt or build_system_prompt(npc_name, backstory, personality, guidelines),
+        summary,
+    )
+    messages = build_messages(conversation_history, player_message)
 
-BACKSTORY:
-{backstory}
+    response_cache = get_npc_cache() if cache and settings.npc_cache_enabled else None
+    cache_key = make_cache_key(system_text(system), messages) if cache else None
+    if response_cache is not None:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            if on_complete is not None:
+                on_complete(cached)
+            return cached
 
-PERSONALITY:
-{personality}
+    # Call the LLM through the dispatcher, sharing the call with
+    # identical requests in flight
+    fetch = partial(
+        get_llm_dispatcher().submit,
+        partial(
+            _fetch_npc_line,
+            backend,
+            client or get_http_client(),
+            system,
+            messages,
+            response_cache,
+            cache_key,
+        ),
+        priority,
+    )
+    try:
+        text = await (_npc_flights.do(cache_key, fetch) if cache_key else fetch())
+    except LlmOverloadedError:
+        return f"*{npc_name} is too busy to talk right now*"
+    except NpcUpstreamError:
+        return f"*{npc_name} seems distracted* (API error)"
+    except Exception as e:
+        print(f"{backend.label} service error: {e}")
+        return f"*{npc_name} seems lost in thought* (Connection error)"
 
-GUIDELINES:
-{guidelines}
+    if not text:
+        return f"*{npc_name} mumbles something incoherent*"
+    if on_complete is not None:
+        on_complete(text)
+    return text
 
-RULES:
-- Stay in character at all times
-- Keep responses concise (1-3 sentences typically)
-- Use fantasy-appropriate language
-- Never break the fourth wall or mention you're an AI
-- React naturally to what the player says
-- If asked something your character wouldn't know, respond in character"""
 
-    # Build messages array for Claude
-    messages = []
-    for msg in conversation_history[-10:]:  # Last 10 messages for context
-        role = "user" if msg["role"] == "player" else "assistant"
-        messages.append({"role": role, "content": msg["content"]})
+async def stream_npc_response(
+    npc_name: str,
+    backstory: str,
+    personality: str,
+    guidelines: str,
+    conversation_history: list[dict],
+    player_message: str,
+    system_prompt: str | None = None,
+    client: "httpx.AsyncClient | None" = None,
+    cache: bool = True,
+    summary: str = "",
+    on_complete: Callable[[str], None] | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream an NPC response from the configured LLM backend as text deltas.
 
-    # Add current player message
-    messages.append({"role": "user", "content": player_message})
+    Takes the same arguments as generate_npc_response. Cached lines are
+    yielded whole; on_complete runs only once the whole reply has
+    arrived. Closing the generator (e.g. when the player disconnects)
+    closes the upstream request, which stops generation. A reply cut
+    off by an error is not cached.
+    """
+    backend = get_llm_backend()
+    if not backend.configured():
+        yield f"*{npc_name} stares at you blankly* ({backend.label} API key not configured)"
+        return
+
+    system = build_system(
+        system_prompt or build_system_prompt(npc_name, backstory, personality, guidelines),
+        summary,
+    )
+    messages = build_messages(conversation_history, player_message)
+
+    response_cache = get_npc_cache() if cache and settings.npc_cache_enabled else None
+    if response_cache is not None:
+        cache_key = make_cache_key(system_text(system), messages)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            if on_complete is not None:
+                on_complete(cached)
+            return
 
-    # Call Claude API
+    client = client or get_http_client()
+    parts: list[str] = []
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                CLAUDE_API_URL,
-                headers={
-                    "x-api-key": settings.anthropic_api_key,
-                    "anthropic-version": "2023-06-01",
-                    "content-type": "application/json",
-                },
-                json={
-                    "model": "claude-sonnet-4-20250514",
-                    "max_tokens": 500,
-                    "system": final_prompt,
-                    "messages": messages,
-                },
-                timeout=30.0
-            )
-
-            if response.status_code != 200:
-                print(f"Claude API error: {response.status_code} - {response.text}")
-                return f"*{npc_name} seems distracted* (API error)"
-
-            data = response.json()
-
-            # Extract the response text
-            content = data.get("content", [])
-            if content and content[0].get("text"):
-                return content[0]["text"].strip()
-
-            return f"*{npc_name} mumbles something incoherent*"
+        async with get_llm_dispatcher().slot(Priority.INTERACTIVE):
+            chunks = backend.stream(client, system, messages, NPC_MAX_TOKENS)
+            started = False
+            try:
+                async for chunk in chunks:
+                    if not started:
+                        started = True
+                        token_usage.calls += 1
+                    if chunk.usage is not None:
+                        token_usage.add(chunk.usage)
+                    text = chunk.text if parts else chunk.text.lstrip()
+                    if text:
+                        parts.append(text)
+                        yield text
+            finally:
+                # Ends the upstream request, e.g. when the player disconnects
+                await chunks.aclose()
 
+    except LlmOverloadedError:
+        yield f"*{npc_name} is too busy to talk right now*"
+        return
+    except NpcUpstreamError:
+        if not parts:
+            yield f"*{npc_name} seems distracted* (API error)"
+        return
     except Exception as e:
-        print(f"Claude service error: {e}")
-        return f"*{npc_name} seems lost in thought* (Connection error)"
+        print(f"{backend.label} service error: {e}")
+        if not parts:
+            yield f"*{npc_name} seems lost in thought* (Connection error)"
+        return
+
+    if not parts:
+        yield f"*{npc_name} mumbles something incoherent*"
+        return
+    text = "".join(parts).strip()
+    if response_cache is not None:
+        response_cache.set(cache_key, text)
+    if on_complete is not None:
+        on_complete(text)
+
+
+async def _fetch_npc_line(
+    backend: LlmBackend,
+    client: "httpx.AsyncClient",
+    system: list[dict[str, Any]],
+    messages: list[dict],
+    response_cache: NpcResponseCache | None,
+    cache_key: str | None,
+) -> str:
+    """
+    Make one LLM call and cache the line it returns.
+
+    Returns "" if the reply has no text; raises NpcUpstreamError on a
+    non-200 response (the dispatcher decides whether to retry).
+    """
+    text = await _complete(backend, client, system, messages, NPC_MAX_TOKENS)
+    if text and response_cache is not None:
+        response_cache.set(cache_key, text)
+    return text
+
+
+async def summarize_conversation(
+    npc_name: str,
+    summary: str,
+    turns: list[dict],
+    client: "httpx.AsyncClient | None" = None,
+) -> str:
+    """
+    Fold conversation turns into an NPC's running summary.
+
+    Runs at background priority. Raises like _fetch_npc_line, and
+    NpcUpstreamError if the reply is empty.
+    """
+    transcript = "\n".join(
+        f"{'Player' if turn['role'] == 'player' else npc_name}: {turn['content']}"
+        for turn in turns
+    )
+    text = await get_llm_dispatcher().submit(
+        partial(
+            _complete,
+            get_llm_backend(),
+            client or get_http_client(),
+            SUMMARY_PROMPT.format(npc_name=npc_name, words=settings.npc_summary_max_tokens // 2),
+            [{
+                "role": "user",
+                "content": f"CURRENT SUMMARY:\n{summary or '(none)'}\n\nNEW LINES:\n{transcript}",
+            }],
+            settings.npc_summary_max_tokens,
+        ),
+        Priority.BACKGROUND,
+    )
+    if not text:
+        raise NpcUpstreamError("Empty conversation summary")
+    return text
+
+
+async def _complete(
+    backend: LlmBackend,
+    client: "httpx.AsyncClient",
+    system: System,
+    messages: list[dict],
+    max_tokens: int,
+) -> str:
+    """Make one LLM call and record its usage; returns its text, or "" if there is none."""
+    reply = await backend.complete(client, system, messages, max_tokens)
+    token_usage.calls += 1
+    token_usage.add(reply.usage)
+    return reply.text
+
+
+@lru_cache(maxsize=PROMPT_CACHE_SIZE)
+def _prefix_block(system_prompt: str, cached: bool) -> dict[str, Any]:
+    """The system prompt block, memoized per prompt. Treat as read-only."""
+    block: dict[str, Any] = {"type": "text", "text": system_prompt}
+    if cached:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
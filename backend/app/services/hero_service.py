@@ -0,0 +1,395 @@
+"""
+Hero Service
+------------
+Hero roster management. Handles:
+- Recruiting heroes into a game save's roster
+- Derived stats from base stats, level, equipment and buffs
+- Memoizing derived stats, recomputed only when a hero is marked dirty
+- Per-save roster cache of heroes and pages, validated against the
+  save's roster_seq on every read and changed only after a commit
+- Keyset pagination over (created_at, id)
+"""
+
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.combat import GameSave
+from app.models.heroes import Hero
+from app.schemas.heroes import HeroStat, HeroStats
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    HeroConflictError,
+    HeroNotFoundError,
+)
+from app.services.pagination import after_key, decode_cursor, encode_cursor
+
+STAT_NAMES = tuple(stat.value for stat in HeroStat)
+DEFAULT_BASE_STATS = HeroStats().model_dump()
+
+# Stats gained automatically for every level above 1
+LEVEL_GROWTH = {"attack": 1, "defense": 1}
+
+# Amount added to the stat chosen on level up (default 1)
+LEVEL_UP_INCREMENTS = {"vampiric": 0.02, "attack_speed": 0.1}
+
+# Rosters kept in memory, keyed by game save id
+ROSTER_CACHE_SIZE = 32
+
+DEFAULT_PAGE_SIZE = 50
+
+# Pages kept per cached roster; only first pages and cursors we issued are cached
+ROSTER_PAGE_CACHE_SIZE = 64
+
+# Level-up attempts when the hero changes between reading and writing it
+LEVEL_UP_ATTEMPTS = 5
+
+# Session.info keys for cache changes waiting for the commit
+PENDING_KEY = "hero_roster_pending"
+LISTENING_KEY = "hero_roster_listening"
+
+
+def derive_stats(
+    level: int,
+    base_stats: dict[str, float],
+    equipment: list[dict],
+    buffs: list[dict],
+) -> dict[str, float]:
+    """Compute a hero's effective stats."""
+    stats = {name: base_stats.get(name, DEFAULT_BASE_STATS[name]) for name in STAT_NAMES}
+    for name, amount in LEVEL_GROWTH.items():
+        stats[name] += amount * (level - 1)
+    for source in (*equipment, *buffs):
+        for name, amount in source.get("bonuses", {}).items():
+            if name in stats:
+                stats[name] += amount
+    return stats
+
+
+@dataclass
+class HeroEntry:
+    """
+    Cached copy of a hero row with memoized derived stats.
+
+    Anything that changes an input to derive_stats must set `dirty`.
+    """
+    id: str
+    game_save_id: str
+    name: str
+    portrait_path: str
+    level: int
+    is_alive: bool
+    base_stats: dict[str, float]
+    equipment: list[dict]
+    buffs: list[dict]
+    dirty: bool = True
+    _stats: dict[str, float] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_row(cls, hero: Hero) -> "HeroEntry":
+        return cls(
+            id=hero.id,
+            game_save_id=hero.game_save_id,
+            name=hero.name,
+            portrait_path=hero.portrait_path,
+            level=hero.level,
+            is_alive=hero.is_alive,
+            base_stats=hero.base_stats or {},
+            equipment=hero.equipment or [],
+            buffs=hero.buffs or [],
+        )
+
+    @property
+    def stats(self) -> dict[str, float]:
+        """Derived stats, recomputed only when dirty."""
+        if self.dirty:
+            self._stats = derive_stats(self.level, self.base_stats, self.equipment, self.buffs)
+            self.dirty = False
+        return self._stats
+
+
+@dataclass
+class Roster:
+    """Cached heroes and pages of one game save, as of GameSave.roster_seq `seq`."""
+    seq: int = 0
+    heroes: dict[str, HeroEntry] = field(default_factory=dict)
+    # (cursor, limit) -> (hero ids, next cursor)
+    pages: dict[tuple[str | None, int], tuple[list[str], str | None]] = field(default_factory=dict)
+
+
+_rosters: OrderedDict[str, Roster] = OrderedDict()
+_hero_saves: dict[str, str] = {}  # hero id -> game save id, for cached heroes
+
+# (game save id, roster_seq written, change to apply to the cached roster)
+PendingChange = tuple[str, int, Callable[[Roster], None]]
+
+
+class HeroService:
+    """
+    Handles hero persistence and derived stats.
+
+    Every hero write increments the save's roster_seq, and every read
+    checks it, so rosters changed by another worker, or directly in the
+    database, are reloaded. Writes change the cache only once the
+    session commits: level-ups and loadout changes then only dirty the
+    affected hero, and recruiting only drops the last page. A rolled
+    back write leaves the cache as it was.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(
+        self,
+        game_save_id: str,
+        name: str,
+        portrait_path: str,
+        base_stats: dict[str, float] | None = None,
+        equipment: list[dict] | None = None,
+        buffs: list[dict] | None = None,
+    ) -> HeroEntry:
+        """Recruit a hero into a save's roster."""
+        await self._check_save(game_save_id)
+
+        hero = Hero(
+            game_save_id=game_save_id,
+            name=name,
+            portrait_path=portrait_path,
+            level=1,
+            is_alive=True,
+            base_stats=base_stats or dict(DEFAULT_BASE_STATS),
+            equipment=equipment or [],
+            buffs=buffs or [],
+        )
+        self.db.add(hero)
+        await self.db.flush()
+
+        entry = HeroEntry.from_row(hero)
+
+        def recruit(roster: Roster) -> None:
+            _cache_hero(roster, replace(entry))
+            # New heroes sort last, so only the final page changes
+            roster.pages = {key: page for key, page in roster.pages.items() if page[1] is not None}
+
+        await self._written(game_save_id, recruit)
+        return entry
+
+    async def list_roster(
+        self,
+        game_save_id: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        cursor: str | None = None,
+    ) -> tuple[list[HeroEntry], str | None]:
+        """
+        Get one page of a save's roster, oldest recruit first.
+
+        Returns (heroes, next_cursor); next_cursor is None on the last page.
+        """
+        roster = await self._roster(game_save_id)
+        page = roster.pages.get((cursor, limit))
+        if page is not None:
+            ids, next_cursor = page
+            return [roster.heroes[hero_id] for hero_id in ids], next_cursor
+
+        query = select(Hero).where(Hero.game_save_id == game_save_id)
+        if cursor is not None:
+            query = query.where(after_key([Hero.created_at, Hero.id], decode_cursor(cursor, (datetime, str))))
+        query = query.order_by(Hero.created_at, Hero.id).limit(limit + 1)
+
+        rows = list((await self.db.execute(query.execution_options(populate_existing=True))).scalars())
+
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+
+        entries = []
+        for row in rows:
+            entry = roster.heroes.get(row.id)
+            if entry is None:
+                entry = HeroEntry.from_row(row)
+                _cache_hero(roster, entry)
+            entries.append(entry)
+
+        if cursor is None or any(page[1] == cursor for page in roster.pages.values()):
+            roster.pages[(cursor, limit)] = ([entry.id for entry in entries], next_cursor)
+            while len(roster.pages) > ROSTER_PAGE_CACHE_SIZE:
+                del roster.pages[next(iter(roster.pages))]
+        return entries, next_cursor
+
+    async def get(self, hero_id: str) -> HeroEntry:
+        """Get a hero, from the roster cache when it is current."""
+        game_save_id = _hero_saves.get(hero_id)
+        if game_save_id is not None:
+            roster = await self._roster(game_save_id)
+            entry = roster.heroes.get(hero_id)
+            if entry is not None:
+                return entry
+
+        hero = await self._fetch(hero_id)
+        roster = await self._roster(hero.game_save_id)
+        entry = HeroEntry.from_row(hero)
+        _cache_hero(roster, entry)
+        return entry
+
+    async def level_up(self, hero_id: str, stat: HeroStat) -> HeroEntry:
+        """
+        Raise a hero's level and increase the chosen base stat.
+
+        The level is incremented in SQL. The base stats are JSON, so the
+        write only applies if the hero's version is still the one read;
+        otherwise it is retried on the newer row.
+        """
+        stat_name = HeroStat(stat).value
+        for _ in range(LEVEL_UP_ATTEMPTS):
+            hero = await self._fetch(hero_id, for_update=True)
+            base_stats = dict(hero.base_stats or {})
+            base_stats[stat_name] = (
+                base_stats.get(stat_name, DEFAULT_BASE_STATS[stat_name])
+                + LEVEL_UP_INCREMENTS.get(stat_name, 1)
+            )
+            result = await self.db.execute(
+                update(Hero)
+                .where(Hero.id == hero_id, Hero.version == hero.version)
+                .values(level=Hero.level + 1, base_stats=base_stats, version=Hero.version + 1)
+            )
+            if result.rowcount == 1:
+                return await self._written_hero(hero_id)
+        raise HeroConflictError(f"Hero {hero_id} kept changing during level up")
+
+    async def update_loadout(
+        self,
+        hero_id: str,
+        equipment: list[dict] | None = None,
+        buffs: list[dict] | None = None,
+    ) -> HeroEntry:
+        """Replace a hero's equipment and/or buffs."""
+        values: dict[str, Any] = {}
+        if equipment is not None:
+            values["equipment"] = equipment
+        if buffs is not None:
+            values["buffs"] = buffs
+        if not values:
+            return await self.get(hero_id)
+
+        result = await self.db.execute(
+            update(Hero).where(Hero.id == hero_id).values(version=Hero.version + 1, **values)
+        )
+        if result.rowcount != 1:
+            raise HeroNotFoundError(f"Hero {hero_id} not found")
+        return await self._written_hero(hero_id)
+
+    async def _fetch(self, hero_id: str, for_update: bool = False) -> Hero:
+        """Read a hero row fresh from the database (locked, if asked)."""
+        query = select(Hero).where(Hero.id == hero_id).execution_options(populate_existing=True)
+        if for_update:
+            query = query.with_for_update()
+        hero = (await self.db.execute(query)).scalar_one_or_none()
+        if hero is None:
+            raise HeroNotFoundError(f"Hero {hero_id} not found")
+        return hero
+
+    async def _written_hero(self, hero_id: str) -> HeroEntry:
+        """Reread an updated hero and refresh its cached entry on commit."""
+        entry = HeroEntry.from_row(await self._fetch(hero_id))
+
+        def refresh(roster: Roster) -> None:
+            cached = roster.heroes.get(hero_id)
+            if cached is not None:
+                cached.level = entry.level
+                cached.base_stats = entry.base_stats
+                cached.equipment = entry.equipment
+                cached.buffs = entry.buffs
+                cached.dirty = True
+
+        await self._written(entry.game_save_id, refresh)
+        return entry
+
+    async def _written(self, game_save_id: str, change: Callable[[Roster], None]) -> None:
+        """
+        Record a hero write: increment the save's roster_seq and queue
+        the matching cache change until the session commits.
+        """
+        result = await self.db.execute(
+            update(GameSave)
+            .where(GameSave.id == game_save_id)
+            .values(roster_seq=GameSave.roster_seq + 1)
+            .returning(GameSave.roster_seq)
+        )
+        seq = result.scalar_one()
+
+        info = self.db.info
+        if not info.get(LISTENING_KEY):
+            info[LISTENING_KEY] = True
+            event.listen(self.db.sync_session, "after_commit", _apply_pending)
+            event.listen(self.db.sync_session, "after_rollback", _discard_pending)
+        info.setdefault(PENDING_KEY, []).append((game_save_id, seq, change))
+
+    async def _roster(self, game_save_id: str) -> Roster:
+        """
+        Get the cached roster of a save if it matches the save's roster_seq,
+        or a fresh empty one (raises GameSaveNotFoundError if the save is
+        missing).
+
+        While this session has uncommitted hero writes, what it reads is
+        not cached, since it may never be committed.
+        """
+        result = await self.db.execute(
+            select(GameSave.roster_seq).where(GameSave.id == game_save_id)
+        )
+        seq = result.scalar_one_or_none()
+        if seq is None:
+            raise GameSaveNotFoundError(f"Game save {game_save_id} not found")
+
+        if self.db.info.get(PENDING_KEY):
+            return Roster(seq=seq)
+
+        roster = _rosters.get(game_save_id)
+        if roster is None or roster.seq != seq:
+            _drop_roster(game_save_id)
+            roster = _rosters[game_save_id] = Roster(seq=seq)
+            if len(_rosters) > ROSTER_CACHE_SIZE:
+                _drop_roster(next(iter(_rosters)))
+        _rosters.move_to_end(game_save_id)
+        return roster
+
+    async def _check_save(self, game_save_id: str) -> None:
+        result = await self.db.execute(select(GameSave.id).where(GameSave.id == game_save_id))
+        if result.scalar_one_or_none() is None:
+            raise GameSaveNotFoundError(f"Game save {game_save_id} not found")
+
+
+def _apply_pending(session: Session) -> None:
+    """After a commit: apply the session's cache changes to rosters that were current."""
+    for game_save_id, seq, change in session.info.pop(PENDING_KEY, []):
+        roster = _rosters.get(game_save_id)
+        if roster is None:
+            continue
+        if roster.seq == seq - 1:
+            change(roster)
+            roster.seq = seq
+        else:
+            _drop_roster(game_save_id)
+
+
+def _discard_pending(session: Session) -> None:
+    """After a rollback: the writes never happened, so the cache stays as it was."""
+    session.info.pop(PENDING_KEY, None)
+
+
+def _drop_roster(game_save_id: str) -> None:
+    roster = _rosters.pop(game_save_id, None)
+    if roster is not None:
+        for hero_id in roster.heroes:
+            _hero_saves.pop(hero_id, None)
+
+
+def _cache_hero(roster: Roster, entry: HeroEntry) -> None:
+    roster.heroes[entry.id] = entry
+    _hero_saves[entry.id] = entry.game_save_id
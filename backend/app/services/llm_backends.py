@@ -0,0 +1,430 @@
+"""
+LLM Backends
+------------
+Provider adapters behind the NPC pipeline. Handles:
+- Anthropic Messages API and Google Gemini API calls, plain and streamed
+- A local mock with configurable latency and token-rate distributions,
+  for benchmarking and load-testing the pipeline offline
+- Selecting the backend named by settings.llm_backend
+
+Every backend takes Messages-API-shaped input (system content blocks,
+messages with "user"/"assistant" roles) and reports usage with the
+Messages API field names, so the pipeline and its metrics do not depend
+on the provider.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from app.config import settings
+from app.services.exceptions import NpcUpstreamError
+
+if TYPE_CHECKING:
+    import httpx  # Imported with the shared client (see gemini_service)
+
+System = str | list[dict[str, Any]]
+
+
+@dataclass
+class LlmReply:
+    """A complete reply and the usage it was billed for."""
+    text: str
+    usage: dict[str, int]
+
+
+@dataclass
+class LlmChunk:
+    """Part of a streamed reply: a text delta and/or a usage increment."""
+    text: str = ""
+    usage: dict[str, int] | None = None
+
+
+class LlmBackend(ABC):
+    """
+    One LLM provider.
+
+    `complete` and `stream` raise NpcUpstreamError (with the status code
+    and retry-after, if any) when the provider rejects a call, and let
+    transport errors propagate.
+    """
+
+    name: str
+    label: str  # Shown in fallback lines, e.g. "(Claude API key not configured)"
+
+    def configured(self) -> bool:
+        """Whether the backend has the credentials it needs."""
+        return True
+
+    @abstractmethod
+    async def complete(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> LlmReply:
+        """Generate a whole reply."""
+
+    @abstractmethod
+    def stream(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> AsyncIterator[LlmChunk]:
+        """Generate a reply as chunks; closing the iterator ends the upstream request."""
+
+
+class AnthropicBackend(LlmBackend):
+    """Anthropic Messages API, with prompt caching breakpoints passed through."""
+
+    name = "anthropic"
+    label = "Claude"
+
+    def configured(self) -> bool:
+        return bool(settings.anthropic_api_key)
+
+    async def complete(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> LlmReply:
+        response = await client.post(
+            settings.anthropic_api_url,
+            headers=self._headers(),
+            json=self._body(system, messages, max_tokens),
+        )
+        _raise_for_status(self.label, response)
+
+        data = response.json()
+        content = data.get("content", [])
+        text = (content[0].get("text") or "") if content else ""
+        return LlmReply(text.strip(), data.get("usage", {}))
+
+    async def stream(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> AsyncIterator[LlmChunk]:
+        async with client.stream(
+            "POST",
+            settings.anthropic_api_url,
+            headers=self._headers(),
+            json={**self._body(system, messages, max_tokens), "stream": True},
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                _raise_for_status(self.label, response)
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                event = json.loads(line[5:])
+                if event["type"] == "error":
+                    raise RuntimeError(event.get("error", {}).get("message", "stream error"))
+                if event["type"] == "message_start":
+                    # Output tokens are reported (cumulatively) by message_delta
+                    yield LlmChunk(usage={**event["message"].get("usage", {}), "output_tokens": 0})
+                elif event["type"] == "message_delta":
+                    yield LlmChunk(usage={"output_tokens": event.get("usage", {}).get("output_tokens") or 0})
+                elif event["type"] == "content_block_delta":
+                    yield LlmChunk(text=event["delta"].get("text", ""))
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "x-api-key": settings.anthropic_api_key,
+            "anthropic-version": "2023-06-01",
+            "content-type": "application/json",
+        }
+
+    def _body(self, system: System, messages: list[dict], max_tokens: int) -> dict:
+        return {
+            "model": settings.anthropic_model,
+            "max_tokens": max_tokens,
+            "system": system,
+            "messages": messages,
+        }
+
+
+class GeminiBackend(LlmBackend):
+    """
+    Google Gemini generateContent API.
+
+    Cache breakpoints are dropped; Gemini caches repeated prompt
+    prefixes implicitly and reports them as cachedContentTokenCount.
+    """
+
+    name = "gemini"
+    label = "Gemini"
+
+    def configured(self) -> bool:
+        return bool(settings.gemini_api_key)
+
+    async def complete(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> LlmReply:
+        response = await client.post(
+            self._url("generateContent"),
+            headers=self._headers(),
+            json=self._body(system, messages, max_tokens),
+        )
+        _raise_for_status(self.label, response)
+
+        data = response.json()
+        return LlmReply(self._text(data).strip(), self._usage(data.get("usageMetadata", {})))
+
+    async def stream(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> AsyncIterator[LlmChunk]:
+        usage: dict[str, Any] = {}
+        async with client.stream(
+            "POST",
+            self._url("streamGenerateContent"),
+            params={"alt": "sse"},
+            headers=self._headers(),
+            json=self._body(system, messages, max_tokens),
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                _raise_for_status(self.label, response)
+
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = json.loads(line[5:])
+                # Usage metadata is cumulative; only the last one counts
+                usage = data.get("usageMetadata", usage)
+                text = self._text(data)
+                if text:
+                    yield LlmChunk(text=text)
+        yield LlmChunk(usage=self._usage(usage))
+
+    def _url(self, method: str) -> str:
+        return f"{settings.gemini_api_url}/models/{settings.gemini_model}:{method}"
+
+    def _headers(self) -> dict[str, str]:
+        return {"x-goog-api-key": settings.gemini_api_key, "content-type": "application/json"}
+
+    def _body(self, system: System, messages: list[dict], max_tokens: int) -> dict:
+        return {
+            "systemInstruction": {"parts": [{"text": text} for text in _system_texts(system)]},
+            "contents": [
+                {
+                    "role": "user" if message["role"] == "user" else "model",
+                    "parts": [{"text": message["content"]}],
+                }
+                for message in messages
+            ],
+            "generationConfig": {"maxOutputTokens": max_tokens},
+        }
+
+    @staticmethod
+    def _text(data: dict) -> str:
+        candidates = data.get("candidates") or [{}]
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def _usage(metadata: dict[str, Any]) -> dict[str, int]:
+        cached = metadata.get("cachedContentTokenCount") or 0
+        return {
+            "input_tokens": (metadata.get("promptTokenCount") or 0) - cached,
+            "cache_read_input_tokens": cached,
+            "output_tokens": metadata.get("candidatesTokenCount") or 0,
+        }
+
+
+@dataclass(frozen=True)
+class Distribution:
+    """
+    A random quantity, written as "kind:a[:b]".
+
+    fixed:V, uniform:LOW:HIGH, normal:MEAN:STDDEV, or
+    lognormal:MEDIAN:SIGMA (a long right tail, like real API latency).
+    Samples are clamped at zero.
+    """
+    kind: str
+    a: float
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "Distribution":
+        kind, *params = spec.split(":")
+        if kind not in ("fixed", "uniform", "normal", "lognormal") or not 1 <= len(params) <= 2:
+            raise ValueError(f"Invalid distribution {spec!r}")
+        return cls(kind, *map(float, params))
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            value = rng.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = rng.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(math.log(self.a), self.b)
+        else:
+            value = self.a
+        return max(value, 0.0)
+
+
+# Request digests and prompt prefixes the mock remembers, least recently used evicted
+MOCK_MEMORY_SIZE = 4096
+
+# Words the mock builds replies from
+_MOCK_WORDS = (
+    "well met traveler the road north is long and the old keep holds "
+    "more than dust ask the smith about the blade if you have coin"
+).split()
+
+
+class MockBackend(LlmBackend):
+    """
+    Local deterministic stand-in for a provider; makes no network calls.
+
+    Each call waits a sampled time to first token, then streams a
+    sampled number of words at a sampled token rate. Samples are seeded
+    from the request and how often it has been seen, so a run replays
+    exactly regardless of scheduling order. Usage is reported like the
+    Messages API (4 characters per token), including prompt cache reads
+    of system blocks up to the last cache breakpoint. A share of calls
+    can fail with 529 to exercise retries. Repeat counts and cached
+    prefixes are kept for the `memory_size` most recent requests and
+    prefixes, so long load tests don't grow the process.
+    """
+
+    name = "mock"
+    label = "Mock"
+
+    def __init__(
+        self,
+        latency_ms: str | None = None,
+        tokens_per_second: str | None = None,
+        output_tokens: str | None = None,
+        error_rate: float | None = None,
+        seed: int | None = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        memory_size: int = MOCK_MEMORY_SIZE,
+    ):
+        self.latency_ms = Distribution.parse(latency_ms or settings.mock_llm_latency_ms)
+        self.tokens_per_second = Distribution.parse(
+            tokens_per_second or settings.mock_llm_tokens_per_second
+        )
+        self.output_tokens = Distribution.parse(output_tokens or settings.mock_llm_output_tokens)
+        self.error_rate = settings.mock_llm_error_rate if error_rate is None else error_rate
+        self.seed = settings.mock_llm_seed if seed is None else seed
+        self._sleep = sleep
+        self.memory_size = memory_size
+        self._seen: OrderedDict[str, int] = OrderedDict()  # request digest -> times seen
+        self._prompt_cache: OrderedDict[str, None] = OrderedDict()  # prefix digests
+
+    async def complete(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> LlmReply:
+        latency, interval, words = self._plan(system, messages, max_tokens)
+        await self._sleep(latency + interval * len(words))
+        return LlmReply(" ".join(words), self._usage(system, messages, len(words)))
+
+    async def stream(
+        self, client: "httpx.AsyncClient", system: System, messages: list[dict], max_tokens: int
+    ) -> AsyncIterator[LlmChunk]:
+        latency, interval, words = self._plan(system, messages, max_tokens)
+        await self._sleep(latency)
+        yield LlmChunk(usage={**self._usage(system, messages, 0), "output_tokens": 0})
+        for index, word in enumerate(words):
+            await self._sleep(interval)
+            yield LlmChunk(text=word if index == 0 else f" {word}")
+        yield LlmChunk(usage={"output_tokens": len(words)})
+
+    def _plan(
+        self, system: System, messages: list[dict], max_tokens: int
+    ) -> tuple[float, float, list[str]]:
+        """Seconds to first token, seconds per token, and the reply words."""
+        digest = hashlib.blake2b(
+            json.dumps([system, messages], sort_keys=True).encode(), digest_size=16
+        ).hexdigest()
+        seen = self._seen.pop(digest, 0) + 1
+        self._remember(self._seen, digest, seen)
+        rng = random.Random(f"{self.seed}:{digest}:{seen}")
+
+        latency = self.latency_ms.sample(rng) / 1000
+        if rng.random() < self.error_rate:
+            raise NpcUpstreamError("Mock API returned 529", status_code=529)
+        rate = max(self.tokens_per_second.sample(rng), 1.0)
+        count = min(max(round(self.output_tokens.sample(rng)), 1), max_tokens)
+        words = [rng.choice(_MOCK_WORDS) for _ in range(count)]
+        words[0] = words[0].capitalize()
+        words[-1] += "."
+        return latency, 1 / rate, words
+
+    def _usage(self, system: System, messages: list[dict], output_tokens: int) -> dict[str, int]:
+        blocks = [{"text": system}] if isinstance(system, str) else system
+        cached_blocks = max(
+            (i + 1 for i, block in enumerate(blocks) if "cache_control" in block), default=0
+        )
+        prefix = "".join(block["text"] for block in blocks[:cached_blocks])
+        rest = "".join(block["text"] for block in blocks[cached_blocks:]) + "".join(
+            message["content"] for message in messages
+        )
+
+        usage = {
+            "input_tokens": len(rest) // 4,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": output_tokens,
+        }
+        key = hashlib.blake2b(prefix.encode(), digest_size=16).hexdigest()
+        if key in self._prompt_cache:
+            self._prompt_cache.move_to_end(key)
+            usage["cache_read_input_tokens"] = len(prefix) // 4
+        elif prefix:
+            usage["cache_creation_input_tokens"] = len(prefix) // 4
+            self._remember(self._prompt_cache, key, None)
+        return usage
+
+    def _remember(self, entries: OrderedDict, key: str, value: Any) -> None:
+        entries[key] = value
+        if len(entries) > self.memory_size:
+            entries.popitem(last=False)
+
+
+BACKENDS: dict[str, type[LlmBackend]] = {
+    backend.name: backend for backend in (AnthropicBackend, GeminiBackend, MockBackend)
+}
+
+_backend: LlmBackend | None = None
+
+
+def create_llm_backend(name: str) -> LlmBackend:
+    """Create a backend by name ("anthropic", "gemini" or "mock")."""
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown LLM backend {name!r}; expected one of {sorted(BACKENDS)}") from None
+
+
+def get_llm_backend() -> LlmBackend:
+    """Get the backend named by settings.llm_backend (recreated if the setting changes)."""
+    global _backend
+    if _backend is None or _backend.name != settings.llm_backend:
+        _backend = create_llm_backend(settings.llm_backend)
+    return _backend
+
+
+def _system_texts(system: System) -> list[str]:
+    return [system] if isinstance(system, str) else [block["text"] for block in system]
+
+
+def _raise_for_status(label: str, response: "httpx.Response") -> None:
+    """Raise NpcUpstreamError for a non-200 response."""
+    if response.status_code == 200:
+        return
+    print(f"{label} API error: {response.status_code} - {response.text}")
+    raise NpcUpstreamError(
+        f"{label} API returned {response.status_code}",
+        status_code=response.status_code,
+        retry_after=_retry_after(response),
+    )
+
+
+def _retry_after(response: "httpx.Response") -> float | None:
+    """Parse a retry-after header given in seconds; None if absent or a date."""
+    try:
+        return float(response.headers["retry-after"])
+    except (KeyError, ValueError):
+        return None
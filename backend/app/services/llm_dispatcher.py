@@ -0,0 +1,187 @@
+"""
+LLM Dispatcher
+--------------
+Admission control for upstream LLM calls. Handles:
+- Bounding the number of calls in flight
+- A priority queue for the rest, so interactive chat beats background work
+- Shedding load when the queue is full or a call waits too long, displacing
+  background waiters before turning away interactive calls
+- Retrying 429/503/529 responses after retry-after or jittered exponential backoff
+"""
+
+import asyncio
+import heapq
+import itertools
+import random
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, TypeVar
+
+from app.config import settings
+from app.services.exceptions import LlmOverloadedError, NpcUpstreamError
+
+T = TypeVar("T")
+
+# Rate limited / unavailable / overloaded: worth retrying after a pause
+RETRY_STATUSES = frozenset({429, 503, 529})
+
+
+class Priority(IntEnum):
+    """Queue priority; lower values are dispatched first."""
+    INTERACTIVE = 0  # A player is waiting on the line
+    BACKGROUND = 1  # Pre-generation and other batch work
+
+
+class LlmDispatcher:
+    """
+    Bounded-concurrency dispatcher for LLM calls.
+
+    A call takes a slot if one is free and nobody is queued; otherwise
+    it waits in a (priority, arrival) heap. Released slots are handed
+    straight to the next waiter. Calls that find the queue full, or
+    wait longer than `queue_timeout_seconds`, raise LlmOverloadedError
+    so the caller can answer with a fallback line at once. A full queue
+    first makes room by failing its newest lower-priority waiter, so a
+    backlog of background work never sheds interactive calls.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout_seconds: float | None = None,
+        max_retries: int | None = None,
+        backoff_base_seconds: float | None = None,
+        backoff_max_seconds: float | None = None,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+    ):
+        self.max_concurrency = max_concurrency or settings.llm_max_concurrency
+        self.max_queue = settings.llm_max_queue if max_queue is None else max_queue
+        self.queue_timeout = queue_timeout_seconds or settings.llm_queue_timeout_seconds
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self.backoff_base = backoff_base_seconds or settings.llm_backoff_base_seconds
+        self.backoff_max = backoff_max_seconds or settings.llm_backoff_max_seconds
+        self._sleep = sleep
+
+        self.active = 0
+        self.queued = 0
+        self.dispatched = 0
+        self.retries = 0
+        self.shed = 0
+
+        self._waiting: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._arrivals = itertools.count()
+
+    async def acquire(self, priority: Priority = Priority.INTERACTIVE) -> None:
+        """Wait for a slot. Raises LlmOverloadedError instead of waiting too long."""
+        if self.active < self.max_concurrency and not self.queued:
+            self.active += 1
+            self.dispatched += 1
+            return
+        if self.queued >= self.max_queue:
+            self.shed += 1
+            victim = self._lowest_waiter()
+            if victim is None or victim[0] <= priority:
+                raise LlmOverloadedError("LLM queue is full")
+            victim[2].set_exception(LlmOverloadedError("Displaced by a higher-priority LLM call"))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiting, (priority, next(self._arrivals), future))
+        self.queued += 1
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await future
+        except BaseException as exc:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            if isinstance(exc, TimeoutError):
+                self.shed += 1
+                raise LlmOverloadedError("Timed out waiting for an LLM slot") from None
+            raise
+        finally:
+            self.queued -= 1
+        self.dispatched += 1
+
+    def release(self) -> None:
+        """Give the slot to the next waiter, or free it."""
+        while self._waiting:
+            _, _, future = heapq.heappop(self._waiting)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def _lowest_waiter(self) -> tuple[int, int, asyncio.Future[None]] | None:
+        """The waiter that would be dispatched last, if any is still waiting."""
+        return max((waiter for waiter in self._waiting if not waiter[2].done()), default=None)
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block (e.g. a streamed reply)."""
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    async def submit(
+        self,
+        fn: Callable[[], Awaitable[T]],
+        priority: Priority = Priority.INTERACTIVE,
+    ) -> T:
+        """
+        Run fn() in a slot, retrying rate-limited and overloaded responses.
+
+        The slot is kept while backing off, so a struggling upstream sees
+        fewer concurrent calls rather than more.
+        """
+        attempt = 0
+        async with self.slot(priority):
+            while True:
+                try:
+                    return await fn()
+                except NpcUpstreamError as error:
+                    delay = self.retry_delay(error, attempt)
+                    if delay is None:
+                        raise
+                attempt += 1
+                self.retries += 1
+                await self._sleep(delay)
+
+    def retry_delay(self, error: NpcUpstreamError, attempt: int) -> float | None:
+        """
+        Seconds to wait before retrying, or None to give up.
+
+        Honors retry-after (plus a little jitter, so waiters don't all
+        return at once) unless it is longer than the backoff cap; without
+        it, uses full-jitter exponential backoff.
+        """
+        if error.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+            return None
+        if error.retry_after is not None:
+            if error.retry_after > self.backoff_max:
+                return None
+            return error.retry_after + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "dispatched": self.dispatched,
+            "retries": self.retries,
+            "shed": self.shed,
+        }
+
+
+_dispatcher: LlmDispatcher | None = None
+
+
+def get_llm_dispatcher() -> LlmDispatcher:
+    """Get the process-wide LLM dispatcher."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = LlmDispatcher()
+    return _dispatcher
@@ -0,0 +1,268 @@
+"""
+Map Service
+-----------
+Overworld map loading and chunked tile streaming. Handles:
+- Loading map editor JSON into compact integer arrays
+- Slicing fixed-size chunks so clients fetch only their viewport
+- Precompressing chunk payloads and tagging them with ETags
+- Deriving tile passability from the terrain and decoration layers
+"""
+
+import gzip
+import hashlib
+import json
+import re
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+
+from app.config import settings
+from app.services.exceptions import (
+    ChunkOutOfBoundsError,
+    MapLayerNotFoundError,
+    MapNotFoundError,
+)
+
+# Map names double as file names, so keep them to a safe character set
+MAP_NAME_PATTERN = re.compile(r"^[A-Za-z0-9_-]+$")
+
+# Maximum number of precompressed chunks kept in memory
+CHUNK_CACHE_SIZE = 4096
+
+# Walkability rules, kept in sync with frontend/src/types/tiles.ts
+BLOCKED_TERRAIN = frozenset([
+    # Water
+    58, 59, 60, 61, 62, 63, 70, 71, 72, 73, 74, 75, 82, 83, 84,
+    # Black tower (183 = entrance)
+    157, 158, 159, 160, 169, 170, 171, 172, 181, 182, 184,
+    # Sanctuary (186 = entrance)
+    149, 150, 151, 161, 162, 163, 173, 174, 175, 185, 187,
+])
+WALKABLE_DECORATIONS = frozenset([
+    7, 20, 29, 42, 44,  # Road overlays
+    51, 75,  # Grass overlays
+    166, 167, 168,  # Bridge platforms
+    131, 143, 189, 242,  # Entrances
+])
+BRIDGE_OVERRIDE_TILES = frozenset([109, 110])
+
+
+def is_tile_walkable(terrain_tile_id: int, decoration_tile_id: int) -> bool:
+    """
+    Check if a map position is walkable given both layers.
+
+    Terrain is walkable unless blocked; decorations block unless
+    explicitly walkable; bridges override blocked terrain.
+    """
+    if decoration_tile_id in BRIDGE_OVERRIDE_TILES:
+        return True
+    if terrain_tile_id in BLOCKED_TERRAIN:
+        return False
+    return decoration_tile_id == 0 or decoration_tile_id in WALKABLE_DECORATIONS
+
+
+@dataclass
+class TileMap:
+    """
+    A loaded overworld map.
+
+    Each layer is stored row-major as a flat uint16 array of tile ids,
+    so tile (x, y) lives at index y * width + x.
+    """
+    name: str
+    width: int
+    height: int
+    tile_size: int
+    tileset: str
+    layers: dict[str, array]
+    version: str  # Content hash of the source file
+
+    def tile(self, layer: str, x: int, y: int) -> int:
+        """Get the tile id at a position on a layer."""
+        return self.layers[layer][y * self.width + x]
+
+    @cached_property
+    def passable(self) -> bytearray:
+        """Flat row-major walkability grid (1 = walkable)."""
+        size = self.width * self.height
+        empty = array("H", bytes(2 * size))
+        terrain = self.layers.get("terrain", empty)
+        decoration = self.layers.get("decoration", empty)
+        return bytearray(
+            is_tile_walkable(t, d) for t, d in zip(terrain, decoration)
+        )
+
+    def chunk_counts(self, chunk_size: int) -> tuple[int, int]:
+        """Number of chunks along each axis for a given chunk size."""
+        return (
+            -(-self.width // chunk_size),
+            -(-self.height // chunk_size),
+        )
+
+
+@dataclass(frozen=True)
+class MapChunk:
+    """A chunk payload, encoded once and served many times."""
+    body: bytes
+    gzip_body: bytes
+    etag: str
+
+
+def parse_map(name: str, raw: bytes) -> TileMap:
+    """
+    Parse map editor JSON into a TileMap.
+
+    Rows shorter than the map width are padded with empty tiles (0).
+    """
+    data = json.loads(raw)
+    width = int(data["width"])
+    height = int(data["height"])
+
+    layers: dict[str, array] = {}
+    for layer in data.get("layers", []):
+        flat = array("H", bytes(2 * width * height))
+        rows = layer.get("data", [])
+        for y, row in enumerate(rows[:height]):
+            row = row[:width]
+            flat[y * width:y * width + len(row)] = array("H", row)
+        layers[layer["name"]] = flat
+
+    return TileMap(
+        name=name,
+        width=width,
+        height=height,
+        tile_size=int(data.get("tileSize", 16)),
+        tileset=data.get("tileset", ""),
+        layers=layers,
+        version=hashlib.blake2b(raw, digest_size=8).hexdigest(),
+    )
+
+
+def slice_chunk(
+    tile_map: TileMap, layer: str, cx: int, cy: int, chunk_size: int
+) -> list[int]:
+    """
+    Extract one chunk of a layer as a flat row-major list.
+
+    Chunks on the right/bottom edges are clipped to the map bounds.
+    """
+    source = tile_map.layers[layer]
+    x0 = cx * chunk_size
+    x1 = min(x0 + chunk_size, tile_map.width)
+    y0 = cy * chunk_size
+    y1 = min(y0 + chunk_size, tile_map.height)
+
+    tiles = array("H")
+    for y in range(y0, y1):
+        row_start = y * tile_map.width
+        tiles.extend(source[row_start + x0:row_start + x1])
+    return tiles.tolist()
+
+
+class MapService:
+    """
+    Loads maps from disk and serves precompressed chunks.
+
+    Maps are reloaded when their file changes on disk; chunks for a stale
+    map are discarded at the same time.
+    """
+
+    def __init__(self, maps_dir: Path, chunk_size: int):
+        self.maps_dir = maps_dir
+        self.chunk_size = chunk_size
+        self._maps: dict[str, tuple[int, TileMap]] = {}  # name -> (mtime, map)
+        self._chunks: OrderedDict[tuple, MapChunk] = OrderedDict()
+
+    def get_map(self, name: str) -> TileMap:
+        """Get a loaded map, reading it from disk if new or modified."""
+        if not MAP_NAME_PATTERN.match(name):
+            raise MapNotFoundError(f"Map {name} not found")
+
+        path = self.maps_dir / f"{name}.json"
+        try:
+            mtime = path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise MapNotFoundError(f"Map {name} not found")
+
+        cached = self._maps.get(name)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        tile_map = parse_map(name, path.read_bytes())
+        self._maps[name] = (mtime, tile_map)
+        for key in [k for k in self._chunks if k[0] == name]:
+            del self._chunks[key]
+        return tile_map
+
+    def get_chunk(
+        self, name: str, cx: int, cy: int, layers: list[str] | None = None
+    ) -> MapChunk:
+        """
+        Get a chunk of one or more layers.
+
+        Args:
+            name: Map name (file name without .json)
+            cx: Chunk column
+            cy: Chunk row
+            layers: Layer names to include (all layers if None)
+        """
+        tile_map = self.get_map(name)
+        layer_names = tuple(layers) if layers else tuple(tile_map.layers)
+
+        for layer in layer_names:
+            if layer not in tile_map.layers:
+                raise MapLayerNotFoundError(f"Layer {layer} not found in map {name}")
+
+        chunks_x, chunks_y = tile_map.chunk_counts(self.chunk_size)
+        if not (0 <= cx < chunks_x and 0 <= cy < chunks_y):
+            raise ChunkOutOfBoundsError(f"Chunk ({cx}, {cy}) is outside map {name}")
+
+        key = (name, cx, cy, layer_names)
+        chunk = self._chunks.get(key)
+        if chunk:
+            self._chunks.move_to_end(key)
+            return chunk
+
+        chunk = self._encode_chunk(tile_map, cx, cy, layer_names)
+        self._chunks[key] = chunk
+        if len(self._chunks) > CHUNK_CACHE_SIZE:
+            self._chunks.popitem(last=False)
+        return chunk
+
+    def _encode_chunk(
+        self, tile_map: TileMap, cx: int, cy: int, layer_names: tuple[str, ...]
+    ) -> MapChunk:
+        """Serialize and compress a chunk."""
+        x = cx * self.chunk_size
+        y = cy * self.chunk_size
+        payload = {
+            "map": tile_map.name,
+            "cx": cx,
+            "cy": cy,
+            "x": x,
+            "y": y,
+            "width": min(self.chunk_size, tile_map.width - x),
+            "height": min(self.chunk_size, tile_map.height - y),
+            "layers": {
+                layer: slice_chunk(tile_map, layer, cx, cy, self.chunk_size)
+                for layer in layer_names
+            },
+        }
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        etag = hashlib.blake2b(body, digest_size=8).hexdigest()
+
+        return MapChunk(
+            body=body,
+            gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+            etag=f'"{etag}"',
+        )
+
+
+_map_service = MapService(Path(settings.maps_dir), settings.map_chunk_size)
+
+
+def get_map_service() -> MapService:
+    """Dependency that provides the shared map service."""
+    return _map_service
@@ -0,0 +1,210 @@
+"""
+NPC Response Cache
+------------------
+In-memory cache of generated NPC lines. Handles:
+- Keys hashed from the normalized system prompt, trimmed history and message
+- Per-entry TTL and least-recently-used eviction at a max entry count
+- Optional persistence to a JSON file across restarts
+- Hit, miss, eviction and expiry counters
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Trailing punctuation ignored when matching messages ("Hello!" == "hello")
+_TRAILING_PUNCTUATION = ".!?~ "
+
+
+def normalize_text(text: str) -> str:
+    """Case-fold and collapse whitespace."""
+    return _WHITESPACE.sub(" ", text).strip().casefold()
+
+
+def make_cache_key(system_prompt: str, messages: list[dict[str, str]]) -> str:
+    """
+    Hash a request into a cache key.
+
+    `messages` is the trimmed Messages API list, ending with the player's
+    message, so two requests share a key only if the NPC would see the
+    same context.
+    """
+    *history, message = messages
+    parts = [
+        normalize_text(system_prompt),
+        [[m["role"], normalize_text(m["content"])] for m in history],
+        normalize_text(message["content"]).rstrip(_TRAILING_PUNCTUATION),
+    ]
+    encoded = json.dumps(parts, ensure_ascii=False, separators=(",", ":")).encode()
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+class NpcResponseCache:
+    """
+    LRU cache of NPC responses with a per-entry TTL.
+
+    Expiry uses wall-clock time so entries keep their deadlines when
+    persisted to disk and loaded by another process.
+    """
+
+    def __init__(
+        self,
+        max_entries: int | None = None,
+        ttl_seconds: float | None = None,
+        path: str | Path | None = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.max_entries = max_entries or settings.npc_cache_max_entries
+        self.ttl = ttl_seconds or settings.npc_cache_ttl_seconds
+        self.path = Path(path) if path else None
+        self.clock = clock
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # key -> (expires_at, response)
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> str | None:
+        """Get a cached response, or None on a miss or expired entry."""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            del self._entries[key]
+            self.expirations += 1
+            entry = None
+
+        if entry is None:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used entries if full."""
+        self._entries[key] = (self.clock() + self.ttl, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop every entry; counters are kept."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def load(self) -> int:
+        """
+        Load unexpired entries from `path`. Returns the number loaded.
+
+        A file that is not a JSON list is ignored; malformed entries in it
+        are skipped.
+        """
+        if self.path is None or not self.path.exists():
+            return 0
+        try:
+            entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            logger.warning("Ignoring unreadable NPC cache file %s", self.path, exc_info=True)
+            return 0
+        if not isinstance(entries, list):
+            logger.warning("Ignoring NPC cache file %s: expected a list of entries", self.path)
+            return 0
+
+        now = self.clock()
+        loaded = skipped = 0
+        # Stored oldest first, so the LRU order survives the round trip
+        for entry in entries:
+            if not _valid_entry(entry):
+                skipped += 1
+                continue
+            key, expires_at, response = entry
+            if expires_at > now:
+                self._entries[key] = (expires_at, response)
+                loaded += 1
+        if skipped:
+            logger.warning("Skipped %d malformed entries in NPC cache file %s", skipped, self.path)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return loaded
+
+    def save(self) -> int:
+        """Write unexpired entries to `path` atomically. Returns the number saved."""
+        if self.path is None:
+            return 0
+        now = self.clock()
+        entries = [
+            [key, expires_at, response]
+            for key, (expires_at, response) in self._entries.items()
+            if expires_at > now
+        ]
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(entries, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, self.path)
+        return len(entries)
+
+
+def _valid_entry(entry: Any) -> bool:
+    """Check a stored [key, expires_at, response] entry."""
+    return (
+        isinstance(entry, list)
+        and len(entry) == 3
+        and isinstance(entry[0], str)
+        and isinstance(entry[1], (int, float))
+        and isinstance(entry[2], str)
+    )
+
+
+_npc_cache: NpcResponseCache | None = None
+
+
+def get_npc_cache() -> NpcResponseCache:
+    """Get the process-wide NPC response cache, loading it from disk on first use."""
+    global _npc_cache
+    if _npc_cache is None:
+        _npc_cache = NpcResponseCache(path=settings.npc_cache_path or None)
+        _npc_cache.load()
+    return _npc_cache
+
+
+def close_npc_cache() -> None:
+    """Persist the process-wide cache, if one is configured and was used."""
+    global _npc_cache
+    if _npc_cache is not None:
+        try:
+            _npc_cache.save()
+        except OSError:
+            logger.exception("Failed to persist the NPC response cache")
+        _npc_cache = None
@@ -0,0 +1,153 @@
+"""
+NPC Conversations
+-----------------
+Server-side conversation sessions per (player, NPC). Handles:
+- Keeping each session's recent turns, seeded from the client's transcript
+  when the server has no session (e.g. after a restart)
+- Folding older turns into a running summary in the background
+- Bounding the number of sessions held in memory (least recently used)
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.config import settings
+from app.services.gemini_service import estimate_tokens, summarize_conversation
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Conversation:
+    """
+    One player's conversation with one NPC.
+
+    `turns` holds the messages not yet folded into `summary`, oldest
+    first ({role: "player"|"npc", content}). Only the summarizer removes
+    turns, and only from the front, so turns recorded while a summary is
+    being written are kept.
+    """
+    npc_name: str
+    summary: str = ""
+    turns: list[dict[str, str]] = field(default_factory=list)
+    summarized_turns: int = 0
+    _summarizing: asyncio.Task | None = field(default=None, repr=False)
+
+    @property
+    def history_tokens(self) -> int:
+        return sum(estimate_tokens(turn["content"]) for turn in self.turns)
+
+    def needs_summary(self) -> bool:
+        keep = settings.npc_session_keep_turns
+        if len(self.turns) <= keep:
+            return False
+        return (
+            len(self.turns) >= settings.npc_session_max_turns
+            or self.history_tokens > settings.npc_session_summary_trigger_tokens
+        )
+
+
+class ConversationStore:
+    """
+    In-memory conversation sessions keyed by (player id, NPC name).
+
+    record() is called once an NPC reply is complete; when a session's
+    unsummarized history reaches `npc_session_max_turns` messages or the
+    summary trigger budget, all but the newest `npc_session_keep_turns`
+    are summarized by a background task at background priority, off the
+    request path. Failed summaries are retried on the next turn.
+    """
+
+    def __init__(self, max_sessions: int | None = None):
+        self.max_sessions = max_sessions or settings.npc_session_max_sessions
+        self.summaries = 0
+        self.summary_failures = 0
+        self._sessions: OrderedDict[tuple[str, str], Conversation] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def open(
+        self,
+        player_id: str,
+        npc_name: str,
+        seed_history: list[dict[str, str]] | None = None,
+    ) -> Conversation:
+        """
+        Get or start a session, marking it most recently used.
+
+        A new session is seeded with `seed_history` (e.g. a client
+        resending its transcript after a server restart).
+        """
+        key = (player_id, npc_name)
+        conversation = self._sessions.get(key)
+        if conversation is None:
+            conversation = self._sessions[key] = Conversation(
+                npc_name=npc_name, turns=list(seed_history or [])
+            )
+            while len(self._sessions) > self.max_sessions:
+                _, evicted = self._sessions.popitem(last=False)
+                if evicted._summarizing is not None:
+                    evicted._summarizing.cancel()
+        self._sessions.move_to_end(key)
+        return conversation
+
+    def record(self, conversation: Conversation, player_message: str, npc_response: str) -> None:
+        """Add a completed exchange and start summarizing if the history is too long."""
+        conversation.turns.append({"role": "player", "content": player_message})
+        conversation.turns.append({"role": "npc", "content": npc_response})
+        if conversation.needs_summary() and conversation._summarizing is None:
+            conversation._summarizing = asyncio.get_running_loop().create_task(
+                self._summarize(conversation)
+            )
+
+    async def wait_idle(self) -> None:
+        """Wait for every summary in progress to finish."""
+        tasks = [c._summarizing for c in self._sessions.values() if c._summarizing is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def close(self) -> None:
+        """Cancel summaries in progress."""
+        tasks = [c._summarizing for c in self._sessions.values() if c._summarizing is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _summarize(self, conversation: Conversation) -> None:
+        try:
+            count = len(conversation.turns) - settings.npc_session_keep_turns
+            batch = conversation.turns[:count]
+            conversation.summary = await summarize_conversation(
+                conversation.npc_name, conversation.summary, batch
+            )
+            del conversation.turns[:count]
+            conversation.summarized_turns += count
+            self.summaries += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.summary_failures += 1
+            logger.warning("Failed to summarize NPC conversation; will retry", exc_info=True)
+        finally:
+            conversation._summarizing = None
+
+
+_conversation_store: ConversationStore | None = None
+
+
+def get_conversation_store() -> ConversationStore:
+    """Get the process-wide conversation store."""
+    global _conversation_store
+    if _conversation_store is None:
+        _conversation_store = ConversationStore()
+    return _conversation_store
+
+
+async def close_conversation_store() -> None:
+    """Stop background summaries of the process-wide store, if it was used."""
+    global _conversation_store
+    if _conversation_store is not None:
+        await _conversation_store.close()
+        _conversation_store = None
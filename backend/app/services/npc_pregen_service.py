@@ -0,0 +1,165 @@
+"""
+NPC Pre-generation Service
+--------------------------
+Canned NPC lines for ambient dialogue that needs no live call. Handles:
+- Detecting canned intents, such as a greeting that opens a conversation
+- Serving a random stored variant for an NPC profile and intent
+- Generating variants for a batch of NPCs with bounded concurrency
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import SessionFactory
+from app.models.npc import CannedNpcLine
+from app.schemas.npc import NpcProfile, PregenJob
+from app.services.gemini_service import build_system_prompt, generate_npc_response
+from app.services.llm_dispatcher import Priority
+from app.services.npc_cache import normalize_text
+
+if TYPE_CHECKING:
+    import httpx
+
+# Player line sent to the model to draw out each intent
+INTENT_PROMPTS = {
+    "greeting": "*A traveler walks up to you.* Hello!",
+    "bark": "*You notice someone passing by.* (Say something to yourself or to no one in particular.)",
+}
+
+_GREETING = re.compile(
+    r"(hi|hello|hey|hail|greetings|well met|good (morning|afternoon|evening|day))"
+    r"(,? (there|friend|traveler|stranger))?[\s!.,]*"
+)
+
+
+def detect_intent(player_message: str) -> str | None:
+    """The canned intent a player message asks for, if any (only plain greetings)."""
+    return "greeting" if _GREETING.fullmatch(normalize_text(player_message)) else None
+
+
+def prompt_key(system_prompt: str) -> str:
+    """Short hash identifying the system prompt a line was written for."""
+    return hashlib.blake2b(normalize_text(system_prompt).encode(), digest_size=16).hexdigest()
+
+
+def profile_prompt(npc: NpcProfile, system_prompt: str | None = None) -> str:
+    """The system prompt a chat request or job uses for its NPC."""
+    return system_prompt or build_system_prompt(npc.name, npc.backstory, npc.personality, npc.guidelines)
+
+
+@dataclass
+class PregenResult:
+    """Outcome of a pre-generation run."""
+    lines: int = 0  # Distinct lines stored
+    failed: int = 0  # Calls that returned a fallback instead of a line
+
+
+class NpcPregenService:
+    """Stores and serves pre-generated NPC lines."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_line(self, npc_name: str, system_prompt: str, intent: str) -> str | None:
+        """A random stored variant for the NPC and intent, or None if there are none."""
+        result = await self.db.execute(
+            select(CannedNpcLine.text).where(
+                CannedNpcLine.npc_name == npc_name,
+                CannedNpcLine.prompt_key == prompt_key(system_prompt),
+                CannedNpcLine.intent == intent,
+            )
+        )
+        texts = result.scalars().all()
+        return random.choice(texts) if texts else None
+
+    async def replace_lines(
+        self, npc_name: str, system_prompt: str, intent: str, texts: list[str]
+    ) -> None:
+        """Replace every stored line for the NPC and intent."""
+        await self.db.execute(
+            delete(CannedNpcLine).where(
+                CannedNpcLine.npc_name == npc_name,
+                CannedNpcLine.intent == intent,
+            )
+        )
+        key = prompt_key(system_prompt)
+        self.db.add_all(
+            CannedNpcLine(npc_name=npc_name, prompt_key=key, intent=intent, text=text)
+            for text in texts
+        )
+        await self.db.flush()
+
+
+async def pregenerate(
+    jobs: list[PregenJob],
+    session_factory: SessionFactory,
+    variants: int | None = None,
+    concurrency: int | None = None,
+    client: "httpx.AsyncClient | None" = None,
+) -> PregenResult:
+    """
+    Generate and store lines for every job and intent.
+
+    At most `concurrency` calls run at once. They go through this
+    process's dispatcher at background priority, which only orders them
+    against other calls in the same process: run from the CLI, they do
+    not yield to live chat in the server, so keep `concurrency` well
+    under the upstream rate limit the server shares. Lines bypass the
+    response cache so each variant is a fresh sample; duplicates are
+    dropped. An intent whose calls all fail keeps its existing lines.
+    """
+    for job in jobs:
+        unknown = set(job.intents) - INTENT_PROMPTS.keys() - job.prompts.keys()
+        if unknown:
+            raise ValueError(f"No prompt for intents {sorted(unknown)} of {job.npc.name}")
+
+    semaphore = asyncio.Semaphore(concurrency or settings.npc_pregen_concurrency)
+    result = PregenResult()
+
+    async def sample(job: PregenJob, system_prompt: str, prompt: str) -> str | None:
+        lines: list[str] = []
+        async with semaphore:
+            await generate_npc_response(
+                npc_name=job.npc.name,
+                backstory=job.npc.backstory,
+                personality=job.npc.personality,
+                guidelines=job.npc.guidelines,
+                conversation_history=[],
+                player_message=prompt,
+                system_prompt=system_prompt,
+                client=client,
+                cache=False,
+                priority=Priority.BACKGROUND,
+                on_complete=lines.append,
+            )
+        return lines[0] if lines else None
+
+    async def run_intent(job: PregenJob, intent: str) -> tuple[str, list[str]]:
+        system_prompt = profile_prompt(job.npc, job.system_prompt)
+        prompt = job.prompts.get(intent) or INTENT_PROMPTS[intent]
+        count = job.variants or variants or settings.npc_pregen_variants
+        samples = await asyncio.gather(
+            *(sample(job, system_prompt, prompt) for _ in range(count))
+        )
+        result.failed += samples.count(None)
+        return system_prompt, list(dict.fromkeys(text for text in samples if text))
+
+    targets = [(job, intent) for job in jobs for intent in job.intents]
+    generated = await asyncio.gather(*(run_intent(job, intent) for job, intent in targets))
+
+    async with session_factory() as db:
+        service = NpcPregenService(db)
+        for (job, intent), (system_prompt, texts) in zip(targets, generated):
+            if texts:
+                await service.replace_lines(job.npc.name, system_prompt, intent, texts)
+                result.lines += len(texts)
+        await db.commit()
+    return result
@@ -0,0 +1,74 @@
+"""
+Pagination Helpers
+------------------
+Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row on a page; the next page
+is fetched with `WHERE (a, b) > (cursor_a, cursor_b)`, which stays fast
+however deep the client pages, unlike OFFSET.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import ColumnElement, and_, or_
+
+from app.services.exceptions import InvalidCursorError
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode sort key values (str, int, float or datetime) as a cursor."""
+    payload = [
+        {"dt": value.isoformat()} if isinstance(value, datetime) else value for value in values
+    ]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, types: tuple[type, ...]) -> list[Any]:
+    """
+    Decode a cursor into sort key values of the given types, one per value.
+
+    Raises InvalidCursorError unless every value has its type; str values
+    must also be non-empty.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list) or len(payload) != len(types):
+            raise ValueError("wrong cursor size")
+        return [_decode_value(value, kind) for value, kind in zip(payload, types)]
+    except (ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor!r}") from e
+
+
+def _decode_value(value: Any, kind: type) -> Any:
+    if kind is datetime:
+        if not isinstance(value, dict) or not isinstance(value.get("dt"), str):
+            raise ValueError("expected a datetime")
+        return datetime.fromisoformat(value["dt"])
+    if kind is str:
+        if not isinstance(value, str) or not value:
+            raise ValueError("expected a non-empty string")
+        return value
+    if kind is float and isinstance(value, int) and not isinstance(value, bool):
+        return float(value)
+    if not isinstance(value, kind) or isinstance(value, bool):
+        raise ValueError(f"expected {kind.__name__}")
+    return value
+
+
+def after_key(columns: list[Any], values: list[Any], descending: bool = False) -> ColumnElement[bool]:
+    """
+    Build `(columns) > (values)` (or `<` when descending) for keyset paging.
+
+    Expanded into OR/AND terms rather than a row-value comparison so it
+    works on every backend.
+    """
+    terms = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        compare = column < value if descending else column > value
+        terms.append(and_(*(c == v for c, v in zip(columns[:i], values[:i])), compare))
+    return or_(*terms)
@@ -0,0 +1,540 @@
+"""
+Pathfinding Service
+-------------------
+Hierarchical pathfinding (HPA*) for overworld hero movement. Handles:
+- Splitting maps into clusters and finding entrances between them
+- Precomputing and caching the abstract graph per map
+- Answering batches of path queries against the abstract graph
+- Refining abstract paths into tile-by-tile paths and smoothing them
+
+Movement matches the frontend A* (8 directions, diagonals cost sqrt(2)).
+"""
+
+import heapq
+import math
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from app.config import settings
+from app.services.map_service import MapService, TileMap, get_map_service
+
+SQRT2 = math.sqrt(2)
+
+# Movement directions with costs
+DIRECTIONS = (
+    (0, -1, 1.0),
+    (1, -1, SQRT2),
+    (1, 0, 1.0),
+    (1, 1, SQRT2),
+    (0, 1, 1.0),
+    (-1, 1, SQRT2),
+    (-1, 0, 1.0),
+    (-1, -1, SQRT2),
+)
+
+# Border segments at least this wide get two transitions instead of one
+WIDE_ENTRANCE = 6
+
+# How far ahead (in path steps) smoothing looks for straight shortcuts
+SMOOTH_WINDOW = 24
+
+# Answered queries kept per map; AI heroes repeat the same trips every turn
+PATH_CACHE_SIZE = 10000
+
+# (x0, y0, x1, y1) with exclusive upper bounds
+Bounds = tuple[int, int, int, int]
+
+# Abstract edge: (target node, cost, cells walked after leaving the source)
+Edge = tuple[int, float, tuple[int, ...]]
+
+
+def octile_distance(a: int, b: int, width: int) -> float:
+    """Admissible heuristic for 8-directional movement."""
+    dx = abs(a % width - b % width)
+    dy = abs(a // width - b // width)
+    return max(dx, dy) + (SQRT2 - 1) * min(dx, dy)
+
+
+def search_grid(
+    passable: bytearray,
+    width: int,
+    start: int,
+    bounds: Bounds,
+    goal: int | None = None,
+) -> tuple[dict[int, float], dict[int, int]]:
+    """
+    A* (with goal) or Dijkstra (without) over cells inside bounds.
+
+    Returns (cost so far, parent) maps keyed by flat cell index.
+    """
+    x0, y0, x1, y1 = bounds
+    dist = {start: 0.0}
+    parent: dict[int, int] = {}
+    closed: set[int] = set()
+    heap = [(0.0, start)]
+
+    while heap:
+        _, current = heapq.heappop(heap)
+        if current in closed:
+            continue
+        if current == goal:
+            break
+        closed.add(current)
+
+        cx = current % width
+        cy = current // width
+        base = dist[current]
+        for dx, dy, cost in DIRECTIONS:
+            nx = cx + dx
+            ny = cy + dy
+            if nx < x0 or nx >= x1 or ny < y0 or ny >= y1:
+                continue
+            neighbor = ny * width + nx
+            if not passable[neighbor] or neighbor in closed:
+                continue
+            g = base + cost
+            if g < dist.get(neighbor, math.inf):
+                dist[neighbor] = g
+                parent[neighbor] = current
+                h = octile_distance(neighbor, goal, width) if goal is not None else 0.0
+                heapq.heappush(heap, (g + h, neighbor))
+
+    return dist, parent
+
+
+def trace_path(parent: dict[int, int], start: int, end: int) -> tuple[int, ...]:
+    """Walk parents back from end; excludes start, includes end."""
+    cells = []
+    node = end
+    while node != start:
+        cells.append(node)
+        node = parent[node]
+    cells.reverse()
+    return tuple(cells)
+
+
+@dataclass
+class PathResult:
+    """A refined path, excluding the start tile."""
+    found: bool
+    cost: float = 0.0
+    path: list[tuple[int, int]] = field(default_factory=list)
+
+
+class HpaGraph:
+    """
+    Abstract graph over one map.
+
+    Nodes are entrance cells on cluster borders. Intra-cluster edges store
+    their precomputed tile paths, so refinement is just concatenation.
+    Answered queries are memoized, so treat returned results as read-only.
+    """
+
+    def __init__(self, width: int, height: int, passable: bytearray, cluster_size: int):
+        self.width = width
+        self.height = height
+        self.passable = passable
+        self.cluster_size = cluster_size
+        self.edges: dict[int, list[Edge]] = {}
+        self.cluster_nodes: dict[tuple[int, int], list[int]] = {}
+        self._paths: OrderedDict[tuple[int, int], PathResult] = OrderedDict()
+
+        self._find_entrances()
+        self._connect_clusters()
+
+    @classmethod
+    def from_map(cls, tile_map: TileMap, cluster_size: int) -> "HpaGraph":
+        """Build the abstract graph for a loaded map."""
+        return cls(tile_map.width, tile_map.height, tile_map.passable, cluster_size)
+
+    def cluster_of(self, cell: int) -> tuple[int, int]:
+        """Cluster coordinates containing a cell."""
+        return (
+            (cell % self.width) // self.cluster_size,
+            (cell // self.width) // self.cluster_size,
+        )
+
+    def cluster_bounds(self, cluster: tuple[int, int]) -> Bounds:
+        """Cell bounds of a cluster, clipped to the map."""
+        size = self.cluster_size
+        x0 = cluster[0] * size
+        y0 = cluster[1] * size
+        return (x0, y0, min(x0 + size, self.width), min(y0 + size, self.height))
+
+    def find_path(self, start: tuple[int, int], goal: tuple[int, int]) -> PathResult:
+        """
+        Find a path between two tiles.
+
+        Returns a PathResult whose path excludes the start tile.
+        """
+        width = self.width
+        if not (self._in_bounds(*start) and self._in_bounds(*goal)):
+            return PathResult(found=False)
+
+        key = (start[1] * width + start[0], goal[1] * width + goal[0])
+        result = self._paths.get(key)
+        if result is None:
+            result = self._search(*key)
+            self._paths[key] = result
+            if len(self._paths) > PATH_CACHE_SIZE:
+                self._paths.popitem(last=False)
+        else:
+            self._paths.move_to_end(key)
+        return result
+
+    def _search(self, s: int, g: int) -> PathResult:
+        """Search between two in-bounds cells."""
+        width = self.width
+        if not self.passable[s] or not self.passable[g]:
+            return PathResult(found=False)
+        if s == g:
+            return PathResult(found=True)
+
+        # Short trips (same or neighboring clusters) are searched directly,
+        # with a one-cluster margin; forcing them through border entrances
+        # can cost several times the direct route
+        start_cluster = self.cluster_of(s)
+        goal_cluster = self.cluster_of(g)
+        if (
+            abs(start_cluster[0] - goal_cluster[0]) <= 1
+            and abs(start_cluster[1] - goal_cluster[1]) <= 1
+        ):
+            size = self.cluster_size
+            bounds = (
+                max((min(start_cluster[0], goal_cluster[0]) - 1) * size, 0),
+                max((min(start_cluster[1], goal_cluster[1]) - 1) * size, 0),
+                min((max(start_cluster[0], goal_cluster[0]) + 2) * size, width),
+                min((max(start_cluster[1], goal_cluster[1]) + 2) * size, self.height),
+            )
+            dist, parent = search_grid(self.passable, width, s, bounds, g)
+            if g in dist:
+                return self._result(dist[g], trace_path(parent, s, g))
+
+        start_edges = self._edges_from(s)
+        goal_edges = {node: (cost, path) for node, cost, path in self._edges_to(g)}
+        gx, gy = g % width, g // width
+
+        # A* over the abstract graph with temporary start/goal edges
+        best = {s: 0.0}
+        came_from: dict[int, tuple[int, tuple[int, ...]]] = {}
+        closed: set[int] = set()
+        heap = [(octile_distance(s, g, width), s)]
+        all_edges = self.edges
+
+        while heap:
+            _, node = heapq.heappop(heap)
+            if node == g:
+                return self._result(*self._smooth(s, self._refine(came_from, s, g)))
+            if node in closed:
+                continue
+            closed.add(node)
+
+            base = best[node]
+            edges = start_edges if node == s else all_edges.get(node, ())
+            if node in goal_edges:
+                cost, path = goal_edges[node]
+                edges = [*edges, (g, cost, path)]
+
+            for neighbor, cost, path in edges:
+                if neighbor in closed:
+                    continue
+                new_cost = base + cost
+                if new_cost < best.get(neighbor, math.inf):
+                    best[neighbor] = new_cost
+                    came_from[neighbor] = (node, path)
+                    dx = abs(neighbor % width - gx)
+                    dy = abs(neighbor // width - gy)
+                    h = dx + dy + (SQRT2 - 2) * (dx if dx < dy else dy)
+                    heapq.heappush(heap, (new_cost + h, neighbor))
+
+        return PathResult(found=False)
+
+    def _in_bounds(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _result(self, cost: float, cells: tuple[int, ...] | list[int]) -> PathResult:
+        width = self.width
+        return PathResult(
+            found=True,
+            cost=cost,
+            path=[(cell % width, cell // width) for cell in cells],
+        )
+
+    def _refine(
+        self, came_from: dict[int, tuple[int, tuple[int, ...]]], start: int, goal: int
+    ) -> list[int]:
+        """Concatenate the stored tile paths of each abstract edge."""
+        segments = []
+        node = goal
+        while node != start:
+            node, path = came_from[node]
+            segments.append(path)
+
+        cells: list[int] = []
+        for path in reversed(segments):
+            cells.extend(path)
+        return cells
+
+    def _smooth(self, start: int, cells: list[int]) -> tuple[float, list[int]]:
+        """
+        Replace detours with straight octile walks where the way is clear.
+
+        Abstract paths bend through border entrances; this removes most of
+        that overhead. Returns the smoothed (cost, cells).
+        """
+        width = self.width
+        points = [start] + cells
+        xs = [p % width for p in points]
+        ys = [p // width for p in points]
+        costs = [0.0]
+        for i in range(1, len(points)):
+            diagonal = xs[i] != xs[i - 1] and ys[i] != ys[i - 1]
+            costs.append(costs[-1] + (SQRT2 if diagonal else 1.0))
+
+        smoothed: list[int] = []
+        total = 0.0
+        i = 0
+        last = len(points) - 1
+        while i < last:
+            for j in range(min(last, i + SMOOTH_WINDOW), i + 1, -1):
+                dx = abs(xs[j] - xs[i])
+                dy = abs(ys[j] - ys[i])
+                direct = dx + dy + (SQRT2 - 2) * (dx if dx < dy else dy)
+                if costs[j] - costs[i] <= direct + 1e-9:
+                    continue
+                walk = self._direct_walk(points[i], points[j])
+                if walk is not None:
+                    smoothed.extend(walk)
+                    total += direct
+                    i = j
+                    break
+            else:
+                smoothed.append(points[i + 1])
+                total += costs[i + 1] - costs[i]
+                i += 1
+
+        return total, smoothed
+
+    def _direct_walk(self, a: int, b: int) -> list[int] | None:
+        """Diagonal-then-straight walk from a to b, or None if blocked."""
+        width = self.width
+        x, y = a % width, a // width
+        bx, by = b % width, b // width
+        step_x = (bx > x) - (bx < x)
+        step_y = (by > y) - (by < y)
+
+        cells = []
+        while (x, y) != (bx, by):
+            if x != bx and y != by:
+                x += step_x
+                y += step_y
+            elif x != bx:
+                x += step_x
+            else:
+                y += step_y
+            cell = y * width + x
+            if not self.passable[cell]:
+                return None
+            cells.append(cell)
+        return cells
+
+    def _edges_from(self, cell: int) -> list[Edge]:
+        """Edges from a cell to the entrances of its cluster."""
+        if cell in self.edges:
+            return self.edges[cell]
+
+        cluster = self.cluster_of(cell)
+        dist, parent = search_grid(
+            self.passable, self.width, cell, self.cluster_bounds(cluster)
+        )
+        return [
+            (node, dist[node], trace_path(parent, cell, node))
+            for node in self.cluster_nodes.get(cluster, [])
+            if node in dist and node != cell
+        ]
+
+    def _edges_to(self, cell: int) -> list[Edge]:
+        """Edges from the entrances of a cell's cluster to the cell."""
+        if cell in self.edges:
+            return []
+
+        edges = []
+        for node, cost, path in self._edges_from(cell):
+            # Movement costs are symmetric, so reverse the outbound path
+            back = (cell,) + path[:-1]
+            edges.append((node, cost, tuple(reversed(back))))
+        return edges
+
+    def _find_entrances(self) -> None:
+        """Create transition node pairs along every cluster border and corner."""
+        size = self.cluster_size
+        width = self.width
+        regions = self._label_regions()
+
+        # Vertical borders (between horizontally adjacent clusters)
+        for left_x in range(size - 1, width - 1, size):
+            for y0 in range(0, self.height, size):
+                y1 = min(y0 + size, self.height)
+                cells = [y * width + left_x for y in range(y0, y1)]
+                self._add_transitions(cells, 1, regions)
+
+        # Horizontal borders (between vertically adjacent clusters)
+        for top_y in range(size - 1, self.height - 1, size):
+            for x0 in range(0, width, size):
+                x1 = min(x0 + size, width)
+                cells = [top_y * width + x for x in range(x0, x1)]
+                self._add_transitions(cells, width, regions)
+
+        # Corners, where diagonally adjacent clusters touch at one point
+        for left_x in range(size - 1, width - 1, size):
+            for top_y in range(size - 1, self.height - 1, size):
+                top_left = top_y * width + left_x
+                for a, b in ((top_left, top_left + width + 1), (top_left + 1, top_left + width)):
+                    if self.passable[a] and self.passable[b]:
+                        self._add_inter_edge(a, b, SQRT2)
+
+    def _label_regions(self) -> list[int]:
+        """
+        Label every walkable cell with its connected region inside its
+        cluster (-1 for blocked cells).
+        """
+        width = self.width
+        passable = self.passable
+        labels = [-1] * (width * self.height)
+        label = 0
+        for cy in range(0, self.height, self.cluster_size):
+            for cx in range(0, width, self.cluster_size):
+                x0, y0, x1, y1 = self.cluster_bounds((cx // self.cluster_size, cy // self.cluster_size))
+                for y in range(y0, y1):
+                    for x in range(x0, x1):
+                        seed = y * width + x
+                        if not passable[seed] or labels[seed] >= 0:
+                            continue
+                        labels[seed] = label
+                        stack = [seed]
+                        while stack:
+                            cell = stack.pop()
+                            px, py = cell % width, cell // width
+                            for dx, dy, _ in DIRECTIONS:
+                                nx, ny = px + dx, py + dy
+                                if x0 <= nx < x1 and y0 <= ny < y1:
+                                    neighbor = ny * width + nx
+                                    if passable[neighbor] and labels[neighbor] < 0:
+                                        labels[neighbor] = label
+                                        stack.append(neighbor)
+                        label += 1
+        return labels
+
+    def _add_transitions(self, border: list[int], step: int, regions: list[int]) -> None:
+        """
+        Add transitions for one border.
+
+        Each maximal run of cells open on both sides becomes one transition
+        in its middle, or two at its ends when the run is wide. Diagonal
+        steps across the border get a transition of their own when they
+        link two cluster regions that no run links.
+        """
+        passable = self.passable
+        linked: set[tuple[int, int]] = set()
+        run: list[int] = []
+        for cell in border + [-1]:
+            if cell >= 0 and passable[cell] and passable[cell + step]:
+                run.append(cell)
+                continue
+            if run:
+                if len(run) >= WIDE_ENTRANCE:
+                    picks = [run[0], run[-1]]
+                else:
+                    picks = [run[len(run) // 2]]
+                for near in picks:
+                    self._add_inter_edge(near, near + step)
+                linked.add((regions[run[0]], regions[run[0] + step]))
+                run = []
+
+        diagonals: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        for i, near in enumerate(border):
+            if not passable[near]:
+                continue
+            for j in (i - 1, i + 1):
+                if 0 <= j < len(border) and passable[border[j] + step]:
+                    far = border[j] + step
+                    pair = (regions[near], regions[far])
+                    if pair not in linked:
+                        diagonals.setdefault(pair, []).append((near, far))
+        for crossings in diagonals.values():
+            near, far = crossings[len(crossings) // 2]
+            self._add_inter_edge(near, far, SQRT2)
+
+    def _add_inter_edge(self, a: int, b: int, cost: float = 1.0) -> None:
+        for node in (a, b):
+            if node not in self.edges:
+                self.edges[node] = []
+                self.cluster_nodes.setdefault(self.cluster_of(node), []).append(node)
+        self.edges[a].append((b, cost, (b,)))
+        self.edges[b].append((a, cost, (a,)))
+
+    def _connect_clusters(self) -> None:
+        """Precompute intra-cluster edges between every pair of entrances."""
+        for cluster, nodes in self.cluster_nodes.items():
+            bounds = self.cluster_bounds(cluster)
+            for node in nodes:
+                dist, parent = search_grid(self.passable, self.width, node, bounds)
+                for other in nodes:
+                    if other != node and other in dist:
+                        self.edges[node].append(
+                            (other, dist[other], trace_path(parent, node, other))
+                        )
+
+
+class PathfindingService:
+    """
+    Serves path queries for overworld maps.
+
+    Abstract graphs are built on first use and cached until the
+    underlying map file changes. Graph builds and searches hold a lock,
+    so batches can run on worker threads, off the event loop.
+    """
+
+    def __init__(self, map_service: MapService, cluster_size: int):
+        self.map_service = map_service
+        self.cluster_size = cluster_size
+        self._graphs: dict[str, tuple[str, HpaGraph]] = {}  # name -> (version, graph)
+        self._lock = threading.Lock()
+
+    def get_graph(self, tile_map: TileMap) -> HpaGraph:
+        """Get the cached abstract graph for a loaded map, rebuilding if stale."""
+        cached = self._graphs.get(tile_map.name)
+        if cached and cached[0] == tile_map.version:
+            return cached[1]
+
+        graph = HpaGraph.from_map(tile_map, self.cluster_size)
+        self._graphs[tile_map.name] = (tile_map.version, graph)
+        return graph
+
+    def find_paths(
+        self, tile_map: TileMap, queries: list[tuple[tuple[int, int], tuple[int, int]]]
+    ) -> list[PathResult]:
+        """
+        Answer a batch of (start, goal) queries on one map.
+
+        Thread-safe. Load the map with MapService.get_map on the event
+        loop first: the map service's caches are not locked.
+
+        Args:
+            tile_map: Map to search
+            queries: List of ((start_x, start_y), (goal_x, goal_y))
+        """
+        with self._lock:
+            graph = self.get_graph(tile_map)
+            return [graph.find_path(start, goal) for start, goal in queries]
+
+
+_pathfinding_service = PathfindingService(
+    get_map_service(), settings.pathfinding_cluster_size
+)
+
+
+def get_pathfinding_service() -> PathfindingService:
+    """Dependency that provides the shared pathfinding service."""
+    return _pathfinding_service
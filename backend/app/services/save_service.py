@@ -0,0 +1,472 @@
+"""
+Save Service
+------------
+Incremental, sectioned game saves. Handles:
+- Splitting game states into independently stored sections
+- Lazy per-section loading with dirty tracking (SaveSession)
+- Diffing sections into JSON-patch-like operations
+- Appending compressed deltas instead of rewriting the full state
+- Reconstructing each section from its base snapshot plus deltas
+- Periodic compaction of deltas back into the base snapshot
+- Optimistic concurrency: a save only applies on top of the sequence
+  numbers it read, so concurrent saves of one game conflict cleanly
+"""
+
+import json
+import zlib
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any
+
+from sqlalchemy import delete, event, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.combat import GameSave
+from app.models.saves import GameSaveDelta, GameSaveSection
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    SaveConflictError,
+    UnknownSaveSectionError,
+)
+
+# Top-level state keys stored as their own sections; other keys go to "meta"
+SECTIONS = ("heroes", "overworld", "inventory", "quest_flags")
+META_SECTION = "meta"
+ALL_SECTIONS = (*SECTIONS, META_SECTION)
+
+# Reconstructed sections kept in memory, keyed by (game id, section) -> (head_seq, data)
+SECTION_CACHE_SIZE = 64 * len(ALL_SECTIONS)
+_section_cache: OrderedDict[tuple[str, str], tuple[int, Any]] = OrderedDict()
+
+# Session.info keys for sections to cache once the session's writes commit
+PENDING_KEY = "save_sections_pending"
+LISTENING_KEY = "save_sections_listening"
+
+
+# =============================================================================
+# PATCHES
+# =============================================================================
+
+def diff_state(old: Any, new: Any, path: tuple = ()) -> list[dict]:
+    """
+    Compute the operations that turn `old` into `new`.
+
+    Operations are `{"op": "add" | "remove" | "replace", "path": [...], "value": ...}`
+    where path is a list of dict keys and list indices. Dicts are diffed
+    key by key, equal-length lists index by index; anything else that
+    differs is replaced wholesale.
+    """
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": [*path, key]})
+        for key, value in new.items():
+            if key not in old:
+                ops.append({"op": "add", "path": [*path, key], "value": value})
+            elif old[key] != value:
+                ops.extend(diff_state(old[key], value, (*path, key)))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (a, b) in enumerate(zip(old, new)):
+            if a != b:
+                ops.extend(diff_state(a, b, (*path, index)))
+        return ops
+
+    if old == new:
+        return []
+    return [{"op": "replace", "path": list(path), "value": new}]
+
+
+def apply_patch(state: Any, ops: list[dict]) -> Any:
+    """
+    Apply operations from diff_state in place.
+
+    Returns the resulting state (a new object only for a root replace).
+    """
+    for op in ops:
+        path = op["path"]
+        if not path:
+            state = op["value"]
+            continue
+
+        target = state
+        for key in path[:-1]:
+            target = target[key]
+
+        if op["op"] == "remove":
+            del target[path[-1]]
+        else:
+            target[path[-1]] = op["value"]
+    return state
+
+
+def encode_patch(ops: list[dict]) -> bytes:
+    """Serialize and compress patch operations."""
+    return zlib.compress(json.dumps(ops, separators=(",", ":")).encode())
+
+
+def decode_patch(payload: bytes) -> list[dict]:
+    """Decompress and parse patch operations."""
+    return json.loads(zlib.decompress(payload))
+
+
+# =============================================================================
+# SECTIONS
+# =============================================================================
+
+def split_state(state: dict) -> dict[str, Any]:
+    """
+    Split a game state into sections.
+
+    Known section keys map to their own section; every other top-level
+    key is grouped into the meta section. Sections absent from `state`
+    are absent from the result.
+    """
+    sections = {name: state[name] for name in SECTIONS if name in state}
+    meta = {key: value for key, value in state.items() if key not in SECTIONS}
+    if meta:
+        sections[META_SECTION] = meta
+    return sections
+
+
+def merge_sections(sections: dict[str, Any]) -> dict:
+    """Inverse of split_state. Sections that were never set are omitted."""
+    state = dict(sections.get(META_SECTION) or {})
+    for name in SECTIONS:
+        if sections.get(name) is not None:
+            state[name] = sections[name]
+    return state
+
+
+def check_section(name: str) -> None:
+    """Raise UnknownSaveSectionError unless `name` is a section."""
+    if name not in ALL_SECTIONS:
+        raise UnknownSaveSectionError(f"Unknown save section {name!r}")
+
+
+# =============================================================================
+# SERVICE
+# =============================================================================
+
+@dataclass
+class SaveResult:
+    """Outcome of a save."""
+    seq: int
+    ops: int
+    delta_bytes: int
+    compacted: bool
+    sections: list[str] = field(default_factory=list)  # Sections that were written
+
+
+@dataclass
+class SaveSection:
+    """Sequence numbers and, once accessed, data of one section in a session."""
+    name: str
+    head_seq: int
+    snapshot_seq: int
+    data: Any = None
+    loaded: bool = False
+    dirty: bool = False
+
+
+class SaveSession:
+    """
+    Unit of work over one game save.
+
+    Opening a session only reads sequence numbers. Section data is
+    loaded on first access (from the shared section cache when it is
+    current) and kept for the rest of the session. Sections replaced
+    with set() are marked dirty, and flush() writes deltas for dirty
+    sections only.
+
+    Returned data may be shared with the cache, so callers must not
+    mutate it; pass a new value to set() instead.
+    """
+
+    def __init__(self, db: AsyncSession, game_id: str, seq: int, sections: dict[str, SaveSection]):
+        self.db = db
+        self.game_id = game_id
+        self.seq = seq
+        self._sections = sections
+
+    @property
+    def dirty_sections(self) -> list[str]:
+        """Names of sections changed since the last flush."""
+        return [name for name, section in self._sections.items() if section.dirty]
+
+    async def get(self, name: str) -> Any:
+        """Get a section's data, loading it on first access."""
+        check_section(name)
+        section = self._sections[name]
+        if not section.loaded:
+            section.data = await self._load_persisted(section)
+            section.loaded = True
+        return section.data
+
+    async def state(self, names: Iterable[str] = ALL_SECTIONS) -> dict:
+        """Get the merged state of the given sections (all by default)."""
+        return merge_sections({name: await self.get(name) for name in names})
+
+    def set(self, name: str, data: Any) -> None:
+        """Replace a section's data and mark it dirty."""
+        check_section(name)
+        section = self._sections[name]
+        if section.loaded and not section.dirty and section.data == data:
+            return
+        section.data = data
+        section.loaded = True
+        section.dirty = True
+
+    def update(self, state: dict) -> None:
+        """Replace every section present in a (possibly partial) game state."""
+        for name, data in split_state(state).items():
+            self.set(name, data)
+
+    def replace(self, state: dict) -> None:
+        """Replace the whole game state; sections absent from it are cleared."""
+        sections = split_state(state)
+        for name in ALL_SECTIONS:
+            self.set(name, sections.get(name))
+
+    async def flush(self) -> SaveResult:
+        """
+        Write deltas for all dirty sections.
+
+        Each dirty section is diffed against its persisted data, so
+        sections that were set to an unchanged value write nothing.
+        Takes ownership of the data passed to set().
+
+        Raises SaveConflictError if another save of the game was written
+        since this session was opened; nothing from this session is
+        applied then, and the caller's transaction should be rolled back.
+        """
+        pending = []
+        for section in self._sections.values():
+            if not section.dirty:
+                continue
+            section.dirty = False
+            ops = diff_state(await self._load_persisted(section), section.data)
+            if ops:
+                pending.append((section, ops))
+
+        if not pending:
+            return SaveResult(seq=self.seq, ops=0, delta_bytes=0, compacted=False)
+
+        try:
+            # Claim the next save seq first: a concurrent save that already
+            # claimed it leaves nothing matching, and on server databases
+            # the row lock queues saves of the same game behind each other
+            await self._claim(
+                update(GameSave)
+                .where(GameSave.id == self.game_id, GameSave.head_seq == self.seq)
+                .values(head_seq=self.seq + 1)
+            )
+            self.seq += 1
+
+            result = SaveResult(seq=self.seq, ops=0, delta_bytes=0, compacted=False)
+            for section, ops in pending:
+                await self._write(section, ops, result)
+            await self.db.flush()
+        except IntegrityError as e:
+            raise SaveConflictError(f"Game save {self.game_id} was changed concurrently") from e
+
+        for section, _ in pending:
+            _remember_on_commit(self.db, self.game_id, section.name, section.head_seq, section.data)
+        return result
+
+    async def _claim(self, statement: Any) -> None:
+        """Run a conditional update, raising SaveConflictError if it matched nothing."""
+        if (await self.db.execute(statement)).rowcount != 1:
+            raise SaveConflictError(f"Game save {self.game_id} was changed concurrently")
+
+    async def _write(self, section: SaveSection, ops: list[dict], result: SaveResult) -> None:
+        """Append one section's delta, compacting when the interval is reached."""
+        seq = section.head_seq + 1
+        payload = encode_patch(ops)
+
+        values: dict[str, Any] = {"head_seq": seq}
+        compact = seq - section.snapshot_seq >= settings.save_compaction_interval
+        if compact:
+            values.update(data=section.data, snapshot_seq=seq)
+        await self._claim(
+            update(GameSaveSection)
+            .where(
+                GameSaveSection.game_save_id == self.game_id,
+                GameSaveSection.name == section.name,
+                GameSaveSection.head_seq == section.head_seq,
+            )
+            .values(**values)
+        )
+
+        if compact:
+            await self.db.execute(
+                delete(GameSaveDelta).where(
+                    GameSaveDelta.game_save_id == self.game_id,
+                    GameSaveDelta.section == section.name,
+                    GameSaveDelta.seq < seq,
+                )
+            )
+            section.snapshot_seq = seq
+            result.compacted = True
+        else:
+            self.db.add(
+                GameSaveDelta(game_save_id=self.game_id, section=section.name, seq=seq, payload=payload)
+            )
+
+        section.head_seq = seq
+        result.ops += len(ops)
+        result.delta_bytes += len(payload)
+        result.sections.append(section.name)
+
+    async def _load_persisted(self, section: SaveSection) -> Any:
+        """Get a section's persisted data from the cache or snapshot plus deltas."""
+        key = (self.game_id, section.name)
+        cached = _section_cache.get(key)
+        if cached and cached[0] == section.head_seq:
+            _section_cache.move_to_end(key)
+            return cached[1]
+
+        result = await self.db.execute(
+            select(GameSaveSection.data).where(
+                GameSaveSection.game_save_id == self.game_id,
+                GameSaveSection.name == section.name,
+            )
+        )
+        # Column selects bypass the identity map, so this is a fresh copy
+        data = result.scalar_one()
+
+        deltas = await self.db.execute(
+            select(GameSaveDelta.payload)
+            .where(
+                GameSaveDelta.game_save_id == self.game_id,
+                GameSaveDelta.section == section.name,
+                GameSaveDelta.seq > section.snapshot_seq,
+                GameSaveDelta.seq <= section.head_seq,
+            )
+            .order_by(GameSaveDelta.seq)
+        )
+        for payload in deltas.scalars():
+            data = apply_patch(data, decode_patch(payload))
+
+        if self.db.info.get(PENDING_KEY):
+            # May include this session's own uncommitted writes
+            _remember_on_commit(self.db, self.game_id, section.name, section.head_seq, data)
+        else:
+            _remember(self.game_id, section.name, section.head_seq, data)
+        return data
+
+
+class SaveService:
+    """
+    Handles game save persistence.
+
+    Each save is stored as one GameSaveSection row per section, and each
+    change to a section appends a delta. Rows are read and written
+    column by column, so section snapshots are only deserialized when
+    the in-memory section cache misses.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, state: dict | None = None) -> str:
+        """Create a new save and return its id."""
+        game_save = GameSave(head_seq=0)
+        self.db.add(game_save)
+        await self.db.flush()
+
+        sections = split_state(state or {})
+        for name in ALL_SECTIONS:
+            data = sections.get(name)
+            self.db.add(GameSaveSection(game_save_id=game_save.id, name=name, data=data))
+            _remember_on_commit(self.db, game_save.id, name, 0, data)
+        await self.db.flush()
+
+        return game_save.id
+
+    async def open(self, game_id: str) -> SaveSession:
+        """Open a session on a save without loading any section data."""
+        result = await self.db.execute(
+            select(
+                GameSave.head_seq,
+                GameSaveSection.name,
+                GameSaveSection.head_seq.label("section_head_seq"),
+                GameSaveSection.snapshot_seq,
+            )
+            .join(GameSaveSection, GameSaveSection.game_save_id == GameSave.id)
+            .where(GameSave.id == game_id)
+        )
+        rows = result.all()
+        if not rows:
+            raise GameSaveNotFoundError(f"Game save {game_id} not found")
+
+        sections = {
+            row.name: SaveSection(row.name, row.section_head_seq, row.snapshot_seq) for row in rows
+        }
+        return SaveSession(self.db, game_id, rows[0].head_seq, sections)
+
+    async def load(self, game_id: str, sections: Iterable[str] = ALL_SECTIONS) -> tuple[int, dict]:
+        """
+        Get the latest state of a save, limited to the given sections.
+
+        Returns (seq, state). The state may share data with the cache,
+        so callers must not mutate it.
+        """
+        names = list(sections)
+        for name in names:
+            check_section(name)
+        session = await self.open(game_id)
+        return session.seq, await session.state(names)
+
+    async def save(self, game_id: str, state: dict) -> SaveResult:
+        """
+        Save a full state as deltas against the previous one.
+
+        `state` replaces the saved state: sections and meta keys missing
+        from it are cleared. Use SaveSession.set() or update() to change
+        only some sections. Takes ownership of `state`; callers must not
+        mutate it afterwards.
+        """
+        session = await self.open(game_id)
+        session.replace(state)
+        return await session.flush()
+
+
+def _remember(game_id: str, name: str, seq: int, data: Any) -> None:
+    """Cache a reconstructed section, evicting the least recently used."""
+    key = (game_id, name)
+    _section_cache[key] = (seq, data)
+    _section_cache.move_to_end(key)
+    if len(_section_cache) > SECTION_CACHE_SIZE:
+        _section_cache.popitem(last=False)
+
+
+def _remember_on_commit(db: AsyncSession, game_id: str, name: str, seq: int, data: Any) -> None:
+    """
+    Cache a written section once the session commits. A rolled-back seq
+    may later be committed with other data, so it must never be cached.
+    """
+    info = db.info
+    if not info.get(LISTENING_KEY):
+        info[LISTENING_KEY] = True
+        event.listen(db.sync_session, "after_commit", _apply_pending)
+        event.listen(db.sync_session, "after_rollback", _discard_pending)
+    info.setdefault(PENDING_KEY, []).append((game_id, name, seq, data))
+
+
+def _apply_pending(session: Session) -> None:
+    """After a commit: cache the sections the session wrote."""
+    for game_id, name, seq, data in session.info.pop(PENDING_KEY, []):
+        _remember(game_id, name, seq, data)
+
+
+def _discard_pending(session: Session) -> None:
+    """After a rollback: the writes never happened, so nothing is cached."""
+    session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,62 @@
+"""
+Single Flight
+-------------
+Coalescing of identical concurrent async calls. Handles:
+- Running one call per key while others with the same key wait on it
+- Delivering the result, or the same exception, to every waiter
+- Cancelling the shared call only when its last waiter gives up
+"""
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass
+class _Flight(Generic[T]):
+    task: asyncio.Task[T]
+    waiters: int = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one call per key at a time.
+
+    The call runs in its own task, so one waiter being cancelled (e.g. a
+    player closing the dialog) doesn't cancel it for the others. If the
+    task itself fails or is cancelled, every waiter sees it.
+    """
+
+    def __init__(self) -> None:
+        self.calls = 0  # Calls actually started
+        self.coalesced = 0  # Calls that joined one already in flight
+        self._flights: dict[str, _Flight[Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn(), or the in-flight call for `key` if there is one."""
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(fn()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+            self.calls += 1
+        else:
+            self.coalesced += 1
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight[Any]) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
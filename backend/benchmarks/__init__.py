@@ -0,0 +1,6 @@
+"""
+Benchmarks
+----------
+Standalone performance scripts. Run from the backend directory, e.g.:
+    python -m benchmarks.bench_game_saves
+"""
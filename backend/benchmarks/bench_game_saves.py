@@ -0,0 +1,142 @@
+"""
+Game Save Benchmark
+-------------------
+Compares full-state rewrites against incremental delta saves, and
+measures load latency (whole save and a single section) as the state
+grows. Uses a temporary file-backed
+SQLite database so commit costs are realistic.
+
+Usage:
+    python -m benchmarks.bench_game_saves [--turns 50]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base
+from app.models.combat import GameSave
+from app.services import save_service
+from app.services.save_service import SaveService
+
+STATE_SIZES = [10, 100, 1000]
+
+
+def make_state(heroes: int, rng: random.Random) -> dict:
+    """Build a synthetic game state with `heroes` heroes and explored tiles."""
+    return {
+        "turn": 0,
+        "heroes": [
+            {
+                "id": f"hero-{i}",
+                "x": rng.randrange(512),
+                "y": rng.randrange(512),
+                "hp": 100,
+                "army": [{"type": "swordsman", "count": rng.randrange(1, 50)} for _ in range(5)],
+            }
+            for i in range(heroes)
+        ],
+        "overworld": {"explored": [rng.randrange(2**31) for _ in range(heroes * 200)]},
+        "quest_flags": {f"flag_{i}": False for i in range(heroes)},
+    }
+
+
+def advance(state: dict, rng: random.Random) -> None:
+    """Simulate one turn: a few heroes move and a counter ticks."""
+    state["turn"] += 1
+    for hero in rng.sample(state["heroes"], min(3, len(state["heroes"]))):
+        hero["x"] += 1
+        hero["hp"] -= 1
+
+
+def copy_state(state: dict) -> dict:
+    """Cheap structural copy of the parts advance() mutates."""
+    return {**state, "heroes": [dict(h) for h in state["heroes"]]}
+
+
+async def run(turns: int) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        session_maker = async_sessionmaker(engine, expire_on_commit=False)
+
+        print(f"{'heroes':>8} {'full save':>12} {'delta save':>12} {'delta bytes':>12} "
+              f"{'cold load':>12} {'warm load':>12} {'flags only':>12}")
+
+        for heroes in STATE_SIZES:
+            rng = random.Random(heroes)
+            state = make_state(heroes, rng)
+
+            async with session_maker() as db:
+                service = SaveService(db)
+                full_id = await service.create(copy_state(state))
+                delta_id = await service.create(copy_state(state))
+                await db.commit()
+
+            # Full rewrite of the JSON column every turn
+            full_state = copy_state(state)
+            start = time.perf_counter()
+            for _ in range(turns):
+                advance(full_state, rng)
+                async with session_maker() as db:
+                    await db.execute(
+                        update(GameSave).where(GameSave.id == full_id).values(game_state=full_state)
+                    )
+                    await db.commit()
+                full_state = copy_state(full_state)
+            full_ms = (time.perf_counter() - start) * 1000 / turns
+
+            # Delta save every turn
+            delta_state = copy_state(state)
+            delta_bytes = 0
+            start = time.perf_counter()
+            for _ in range(turns):
+                advance(delta_state, rng)
+                async with session_maker() as db:
+                    result = await SaveService(db).save(delta_id, delta_state)
+                    await db.commit()
+                delta_bytes += result.delta_bytes
+                delta_state = copy_state(delta_state)
+            delta_ms = (time.perf_counter() - start) * 1000 / turns
+
+            # Cold load reconstructs from snapshot plus deltas
+            save_service._section_cache.clear()
+            start = time.perf_counter()
+            async with session_maker() as db:
+                await SaveService(db).load(delta_id)
+            cold_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            async with session_maker() as db:
+                await SaveService(db).load(delta_id)
+            warm_ms = (time.perf_counter() - start) * 1000
+
+            # Cold load of one small section skips the large ones
+            save_service._section_cache.clear()
+            start = time.perf_counter()
+            async with session_maker() as db:
+                await SaveService(db).load(delta_id, ["quest_flags"])
+            section_ms = (time.perf_counter() - start) * 1000
+
+            print(f"{heroes:>8} {full_ms:>10.2f}ms {delta_ms:>10.2f}ms {delta_bytes // turns:>11}B "
+                  f"{cold_ms:>10.2f}ms {warm_ms:>10.2f}ms {section_ms:>10.2f}ms")
+
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=50, help="Saves per state size")
+    args = parser.parse_args()
+    asyncio.run(run(args.turns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+LLM Backend Latency Benchmark
+-----------------------------
+Runs the same NPC workload through the full streaming pipeline
+(dispatcher, response cache, prompt caching, sessions) once per backend
+and prints end-to-end latency side by side: time to first token, time
+to the whole line, and throughput.
+
+By default every backend is a local mock, so the run is offline and
+repeatable; each --profile gives a mock a time-to-first-token and a
+token-rate distribution (see llm_backends.Distribution). The default
+profiles are placeholders with plausible shapes; fit them to latencies
+measured from the real providers to compare them without spending
+tokens. --live anthropic,gemini runs the workload against the real
+APIs instead (needs their keys).
+
+Usage:
+    python -m benchmarks.bench_llm_backends [--players 20] [--turns 4]
+        [--profile NAME=LATENCY_MS,TOKENS_PER_SECOND ...] [--live anthropic,gemini]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from app.config import settings
+from app.services import gemini_service, llm_backends, npc_cache
+from app.services.gemini_service import (
+    TokenUsage,
+    close_http_client,
+    stream_npc_response,
+)
+from app.services.llm_backends import LlmBackend, MockBackend, create_llm_backend
+from app.services.npc_cache import NpcResponseCache
+from app.services.npc_conversations import ConversationStore
+
+DEFAULT_PROFILES = [
+    "steady=lognormal:650:0.25,normal:55:8",
+    "fast-start=lognormal:350:0.5,normal:90:25",
+]
+
+OPENERS = ["Hello!", "Any work for me?", "What news from the north?"]
+
+
+def percentile(values: list[float], share: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * share), len(ordered) - 1)]
+
+
+async def play(player: int, turns: int, store: ConversationStore) -> list[tuple[float, float]]:
+    """One player's conversation; returns (first token ms, whole line ms) per turn."""
+    conversation = store.open(f"player-{player}", "Bram")
+    timings = []
+    for turn in range(turns):
+        # Openers repeat across players (cacheable); later turns are unique
+        message = OPENERS[player % len(OPENERS)] if turn == 0 else f"Tell me more, part {turn}."
+        start = time.perf_counter()
+        first = None
+        parts = []
+        async for text in stream_npc_response(
+            "Bram", "A retired smith who knows the old mines. " * 20, "Gruff", "",
+            list(conversation.turns), message,
+            summary=conversation.summary,
+        ):
+            first = first or time.perf_counter()
+            parts.append(text)
+        end = time.perf_counter()
+        store.record(conversation, message, "".join(parts))
+        timings.append(((first - start) * 1000, (end - start) * 1000))
+    return timings
+
+
+async def run_backend(label: str, backend: LlmBackend, players: int, turns: int) -> None:
+    settings.llm_backend = backend.name
+    llm_backends._backend = backend
+    usage = gemini_service.token_usage = TokenUsage()
+    store = ConversationStore()
+    cache = npc_cache._npc_cache = NpcResponseCache()
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(play(player, turns, store) for player in range(players)))
+    wall = time.perf_counter() - start
+    await store.close()
+
+    ttft = [first for timings in results for first, _ in timings]
+    total = [whole for timings in results for _, whole in timings]
+    print(
+        f"{label:>12} {statistics.median(ttft):>8.0f} {percentile(ttft, 0.95):>8.0f} "
+        f"{statistics.median(total):>8.0f} {percentile(total, 0.95):>8.0f} "
+        f"{len(total) / wall:>8.1f} {usage.calls:>6} {cache.hits:>5} {usage.cached_token_ratio:>7.0%}"
+    )
+
+
+def mock_profile(spec: str) -> tuple[str, MockBackend]:
+    name, distributions = spec.split("=", 1)
+    latency, rate = distributions.split(",")
+    return name, MockBackend(latency_ms=latency, tokens_per_second=rate)
+
+
+async def run(players: int, turns: int, profiles: list[str], live: list[str]) -> None:
+    backends = [(name, create_llm_backend(name)) for name in live] or [
+        mock_profile(spec) for spec in profiles
+    ]
+    print(f"{players} players x {turns} turns, {settings.llm_max_concurrency} calls in flight")
+    print(
+        f"{'backend':>12} {'ttft p50':>8} {'ttft p95':>8} {'line p50':>8} {'line p95':>8} "
+        f"{'lines/s':>8} {'calls':>6} {'hits':>5} {'cached':>7}"
+    )
+    for label, backend in backends:
+        if not backend.configured():
+            print(f"{label:>12} skipped: API key not configured")
+            continue
+        await run_backend(label, backend, players, turns)
+    await close_http_client()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--players", type=int, default=20, help="Concurrent conversations")
+    parser.add_argument("--turns", type=int, default=4, help="Lines per conversation")
+    parser.add_argument(
+        "--profile", action="append", help="Mock backend NAME=LATENCY_MS,TOKENS_PER_SECOND (repeatable)"
+    )
+    parser.add_argument("--live", default="", help="Comma-separated real backends to run instead")
+    args = parser.parse_args()
+    live = [name for name in args.live.split(",") if name]
+    asyncio.run(run(args.players, args.turns, args.profile or DEFAULT_PROFILES, live))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+LLM HTTP Client Benchmark
+-------------------------
+Compares NPC chat latency when every call builds its own httpx client
+(the old behavior: new connection and SSL context per line) against the
+shared pooled client. Runs against a local stub server, so the numbers
+are pure client overhead; against the real API each avoided connection
+also saves a TLS handshake round trip.
+
+Usage:
+    python -m benchmarks.bench_llm_client [--calls 300] [--concurrency 20]
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.config import settings
+from app.services.gemini_service import (
+    close_http_client,
+    generate_npc_response,
+    get_http_client,
+)
+from benchmarks.stub_llm_server import StubLlmServer
+
+
+async def chat(client: httpx.AsyncClient | None) -> float:
+    """Send one NPC line; returns latency in ms."""
+    start = time.perf_counter()
+    if client is None:
+        async with httpx.AsyncClient() as per_call_client:
+            await generate_npc_response("Bram", "", "", "", [], "Hello", client=per_call_client)
+    else:
+        await generate_npc_response("Bram", "", "", "", [], "Hello", client=client)
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_mode(shared: bool, calls: int, concurrency: int) -> tuple[list[float], float, int]:
+    async with StubLlmServer() as server:
+        settings.anthropic_api_url = server.url
+        client = get_http_client() if shared else None
+
+        sequential = [await chat(client) for _ in range(calls)]
+
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def limited() -> None:
+            async with semaphore:
+                await chat(client)
+
+        await asyncio.gather(*(limited() for _ in range(calls)))
+        throughput = calls / (time.perf_counter() - start)
+
+        await close_http_client()
+        return sequential, throughput, server.connections
+
+
+async def run(calls: int, concurrency: int) -> None:
+    settings.anthropic_api_key = "bench"
+    settings.npc_cache_enabled = False  # Every call must reach the server
+    print(f"{'client':>10} {'p50 ms':>8} {'p95 ms':>8} {'mean ms':>8} {'calls/s':>9} {'connections':>12}")
+    for label, shared in (("per-call", False), ("shared", True)):
+        latencies, throughput, connections = await run_mode(shared, calls, concurrency)
+        latencies.sort()
+        print(
+            f"{label:>10} {statistics.median(latencies):>8.2f} "
+            f"{latencies[int(len(latencies) * 0.95)]:>8.2f} {statistics.mean(latencies):>8.2f} "
+            f"{throughput:>9.0f} {connections:>12}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=300, help="Calls per mode and phase")
+    parser.add_argument("--concurrency", type=int, default=20, help="Parallel calls in the throughput phase")
+    args = parser.parse_args()
+    asyncio.run(run(args.calls, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+NPC Conversation Session Benchmark
+----------------------------------
+Plays the same long chat through /api/npc/chat twice: once stateless
+(the client resends its whole transcript every turn, as the frontend
+used to) and once with a server-side session (player_id, no history).
+Reports the client request payload, the prompt size of the chat calls
+players wait on, and the background summary calls. Runs against the
+local stub LLM server; on the real API, input tokens and time to first
+token scale with the prompt size.
+
+Usage:
+    python -m benchmarks.bench_npc_sessions [--turns 40]
+"""
+
+import argparse
+import asyncio
+import json
+
+import httpx
+
+from app.config import settings
+from app.main import app
+from app.services.gemini_service import CHARS_PER_TOKEN, close_http_client, system_text
+from app.services.npc_conversations import (
+    close_conversation_store,
+    get_conversation_store,
+)
+from benchmarks.stub_llm_server import StubLlmServer
+
+NPC_REPLY = (
+    "Ah, that old tale. The mines beneath Greyhollow were sealed after the "
+    "collapse, and nobody who went looking for the lost seam came back with "
+    "more than a cough and a story. If you mean to try, bring rope and a friend."
+)
+
+
+def prompt_tokens(body: dict) -> int:
+    system = body["system"]
+    text = (system if isinstance(system, str) else system_text(system)) + "".join(
+        m["content"] for m in body["messages"]
+    )
+    return len(text) // CHARS_PER_TOKEN
+
+
+async def play(turns: int, session: bool) -> tuple[int, list[int], list[int]]:
+    """Returns (client request bytes, chat prompt tokens, summary prompt tokens)."""
+    async with StubLlmServer(reply_text=NPC_REPLY) as server:
+        settings.anthropic_api_url = server.url
+        transcript: list[dict[str, str]] = []
+        client_bytes = 0
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for turn in range(turns):
+                message = f"Tell me more about the mines, part {turn}."
+                body = {"npc": {"name": "Bram", "cache_responses": False}, "player_message": message}
+                if session:
+                    body["player_id"] = "bench-player"
+                else:
+                    body["conversation_history"] = transcript
+                payload = json.dumps(body).encode()
+                client_bytes += len(payload)
+
+                response = await client.post(
+                    "/api/npc/chat", content=payload, headers={"content-type": "application/json"}
+                )
+                transcript += [
+                    {"role": "player", "content": message},
+                    {"role": "npc", "content": response.json()["npc_response"]},
+                ]
+                await get_conversation_store().wait_idle()
+
+        await close_conversation_store()
+        await close_http_client()
+        chat = [prompt_tokens(b) for b in server.bodies if b["max_tokens"] != settings.npc_summary_max_tokens]
+        summaries = [prompt_tokens(b) for b in server.bodies if b["max_tokens"] == settings.npc_summary_max_tokens]
+        return client_bytes, chat, summaries
+
+
+async def run(turns: int) -> None:
+    settings.anthropic_api_key = "bench"
+    print(
+        f"{'mode':>10} {'client KB':>10} {'chat tokens/turn':>17} "
+        f"{'last turn':>10} {'summaries':>10} {'summary tokens':>15}"
+    )
+    for label, session in (("stateless", False), ("session", True)):
+        client_bytes, chat, summaries = await play(turns, session)
+        print(
+            f"{label:>10} {client_bytes / 1024:>10.1f} {sum(chat) / len(chat):>17.0f} "
+            f"{chat[-1]:>10} {len(summaries):>10} {sum(summaries):>15}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=40, help="Player messages per chat")
+    args = parser.parse_args()
+    asyncio.run(run(args.turns))
+
+
+if __name__ == "__main__":
+    main()
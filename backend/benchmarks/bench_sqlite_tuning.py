@@ -0,0 +1,109 @@
+"""
+SQLite Tuning Benchmark
+-----------------------
+Measures write and read throughput on combat_instances with the stock
+engine and no secondary indexes ("before") versus the tuned engine
+with PRAGMAs and indexes ("after"). Uses temporary database files.
+
+Usage:
+    python -m benchmarks.bench_sqlite_tuning [--writes 2000] [--reads 2000]
+"""
+
+import argparse
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker
+
+from app.database import Base, build_engine
+from app.models.combat import CombatInstance, GameSave
+
+SAVES = 50
+READERS = 4
+
+
+async def setup(engine: AsyncEngine, indexed: bool) -> list[str]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        if not indexed:
+            for index in CombatInstance.__table__.indexes:
+                await conn.execute(text(f"DROP INDEX {index.name}"))
+
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    async with session_maker() as db:
+        saves = [GameSave() for _ in range(SAVES)]
+        db.add_all(saves)
+        await db.commit()
+        return [save.id for save in saves]
+
+
+async def write(engine: AsyncEngine, save_ids: list[str], count: int, rng: random.Random) -> float:
+    """Insert combats one transaction each, like per-fight autosaves. Returns rows/s."""
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    start = time.perf_counter()
+    for i in range(count):
+        async with session_maker() as db:
+            db.add(CombatInstance(
+                game_save_id=rng.choice(save_ids),
+                initial_state={"units": [{"id": f"u{j}", "hp": 100} for j in range(10)]},
+                action_log=[],
+            ))
+            await db.commit()
+    return count / (time.perf_counter() - start)
+
+
+async def read(engine: AsyncEngine, save_ids: list[str], count: int, rng: random.Random) -> float:
+    """Fetch the latest combats of random saves. Returns queries/s."""
+    session_maker = async_sessionmaker(engine, expire_on_commit=False)
+    query = (
+        select(CombatInstance.id, CombatInstance.started_at)
+        .order_by(CombatInstance.started_at.desc())
+        .limit(20)
+    )
+    start = time.perf_counter()
+    for _ in range(count):
+        async with session_maker() as db:
+            await db.execute(query.where(CombatInstance.game_save_id == rng.choice(save_ids)))
+    return count / (time.perf_counter() - start)
+
+
+async def mixed(engine: AsyncEngine, save_ids: list[str], count: int) -> float:
+    """One writer and several readers at once. Returns total operations/s."""
+    start = time.perf_counter()
+    await asyncio.gather(
+        write(engine, save_ids, count, random.Random(1)),
+        *(read(engine, save_ids, count, random.Random(i)) for i in range(READERS)),
+    )
+    return count * (1 + READERS) / (time.perf_counter() - start)
+
+
+async def run(writes: int, reads: int) -> None:
+    print(f"{'profile':>8} {'writes/s':>10} {'reads/s':>10} {'mixed ops/s':>12}")
+    for label, tuned in (("before", False), ("after", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = build_engine(f"sqlite+aiosqlite:///{Path(tmp) / 'bench.db'}", tuned=tuned)
+            save_ids = await setup(engine, indexed=tuned)
+            rng = random.Random(0)
+
+            write_rate = await write(engine, save_ids, writes, rng)
+            read_rate = await read(engine, save_ids, reads, rng)
+            mixed_rate = await mixed(engine, save_ids, writes // 4)
+            await engine.dispose()
+
+        print(f"{label:>8} {write_rate:>10.0f} {read_rate:>10.0f} {mixed_rate:>12.0f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writes", type=int, default=2000, help="Rows to insert")
+    parser.add_argument("--reads", type=int, default=2000, help="Queries to run")
+    args = parser.parse_args()
+    asyncio.run(run(args.writes, args.reads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Startup Benchmark
+-----------------
+Measures worker cold start: each run is a fresh interpreter that imports
+app.main, runs the lifespan startup and answers GET /health, timed
+separately. The first run starts on an empty database file (create_all
+runs); later runs find the schema current and skip it.
+
+--importtime adds a `python -X importtime` report of the slowest
+imports, grouped by top-level package, plus the app's own modules.
+
+Usage:
+    python -m benchmarks.bench_startup [--runs 5] [--importtime] [--top 15]
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+# Run in each child interpreter; prints one JSON object of millisecond timings
+CHILD = """
+import time
+start = time.perf_counter()
+import asyncio, json, sys
+from app.main import app
+imported = time.perf_counter()
+
+async def health():
+    messages = []
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+    async def send(message):
+        messages.append(message)
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/health", "raw_path": b"/health", "root_path": "",
+        "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("test", 80),
+    }
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+async def main():
+    async with app.router.lifespan_context(app):
+        started = time.perf_counter()
+        status = await health()
+        answered = time.perf_counter()
+    return started, answered, status
+
+started, answered, status = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (started - imported) * 1000,
+    "first_request_ms": (answered - started) * 1000,
+    "total_ms": (answered - start) * 1000,
+    "status": status,
+    "httpx_imported": "httpx" in sys.modules,
+}))
+"""
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run_child(env: dict[str, str]) -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def cold_starts(runs: int, env: dict[str, str]) -> None:
+    timings = [run_child(env) for _ in range(runs)]
+    first, warm = timings[0], timings[1:] or timings
+
+    print(f"{'':22}{'import':>10}{'startup':>10}{'/health':>10}{'total':>10}")
+    print(
+        f"{'empty database':22}{first['import_ms']:>8.0f}ms{first['startup_ms']:>8.0f}ms"
+        f"{first['first_request_ms']:>8.1f}ms{first['total_ms']:>8.0f}ms"
+    )
+    medians = {
+        key: statistics.median(run[key] for run in warm)
+        for key in ("import_ms", "startup_ms", "first_request_ms", "total_ms")
+    }
+    print(
+        f"{f'current schema (x{len(warm)})':22}{medians['import_ms']:>8.0f}ms"
+        f"{medians['startup_ms']:>8.0f}ms{medians['first_request_ms']:>8.1f}ms"
+        f"{medians['total_ms']:>8.0f}ms  (median)"
+    )
+    print(f"httpx imported at startup: {any(run['httpx_imported'] for run in timings)}")
+
+
+def import_report(top: int, env: dict[str, str]) -> None:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    self_us: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us[match[4]] = int(match[1])
+
+    packages: dict[str, int] = defaultdict(int)
+    for module, microseconds in self_us.items():
+        packages[module.split(".")[0]] += microseconds
+    total = sum(self_us.values())
+
+    print(f"\nImports: {len(self_us)} modules, {total / 1000:.0f}ms (self time, -X importtime)")
+    print(f"{'package':32}{'self':>10}")
+    for package, microseconds in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        print(f"{package:32}{microseconds / 1000:>8.1f}ms")
+
+    print(f"\n{'app module':32}{'self':>10}")
+    own = sorted(
+        ((module, us) for module, us in self_us.items() if module.split(".")[0] == "app"),
+        key=lambda item: -item[1],
+    )
+    for module, microseconds in own[:top]:
+        print(f"{module:32}{microseconds / 1000:>8.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts, the first on an empty database")
+    parser.add_argument("--importtime", action="store_true", help="Also report the slowest imports")
+    parser.add_argument("--top", type=int, default=15, help="Rows per import table")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite+aiosqlite:///{Path(tmp) / 'startup.db'}",
+            "NPC_CACHE_PATH": "",
+        }
+        print(f"Cold starts ({sys.executable} {sys.version.split()[0]})")
+        cold_starts(args.runs, env)
+        if args.importtime:
+            import_report(args.top, env)
+
+
+if __name__ == "__main__":
+    main()
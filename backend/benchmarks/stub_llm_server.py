@@ -0,0 +1,158 @@
+"""
+Stub LLM Server
+---------------
+A minimal keep-alive HTTP/1.1 server that answers every POST like the
+Anthropic Messages API, for benchmarks and tests that must not hit the
+network. Requests with "stream": true get the reply as a chunked
+Server-Sent Events stream, one word per content_block_delta event.
+Usage is reported like the real API, including prompt caching: system
+blocks up to the last cache_control breakpoint count as a cache write
+the first time they are seen and as a cache read afterwards.
+
+Usage (from a benchmark):
+    async with StubLlmServer(latency_ms=0) as server:
+        settings.anthropic_api_url = server.url
+"""
+
+import asyncio
+import json
+import re
+
+REPLY_TEXT = "Well met, traveler."
+
+
+class StubLlmServer:
+    """Serves canned Messages API replies on 127.0.0.1 after an optional delay."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        reply_text: str = REPLY_TEXT,
+        token_interval_ms: float = 0.0,
+    ):
+        self.latency = latency_ms / 1000
+        self.reply_text = reply_text
+        self.token_interval = token_interval_ms / 1000
+        self.connections = 0
+        self.requests = 0
+        self.bytes_received = 0  # Request bodies, i.e. prompt payload size
+        self.bodies: list[dict] = []
+        self._prompt_cache: set[str] = set()
+        self.streams_completed = 0
+        self.streams_cancelled = 0  # Client went away mid-stream
+        self.deltas_sent = 0
+        self._server: asyncio.base_events.Server | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}/v1/messages"
+
+    async def __aenter__(self) -> "StubLlmServer":
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = 0
+                for line in head.split(b"\r\n"):
+                    if line.lower().startswith(b"content-length:"):
+                        length = int(line.split(b":", 1)[1])
+                body = json.loads(await reader.readexactly(length) or b"{}")
+                self.bytes_received += length
+                self.bodies.append(body)
+
+                self.requests += 1
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if body.get("stream"):
+                    if not await self._stream(reader, writer, body):
+                        return
+                    continue
+
+                reply = json.dumps({
+                    "content": [{"type": "text", "text": self.reply_text}],
+                    "usage": self._usage(body),
+                }).encode()
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\ncontent-type: application/json\r\n"
+                    b"content-length: %d\r\nconnection: keep-alive\r\n\r\n" % len(reply)
+                    + reply
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    def _usage(self, body: dict) -> dict[str, int]:
+        """Token counts (chars / 4) of a request, split by prompt cache status."""
+        system = body.get("system", "")
+        blocks = [{"text": system}] if isinstance(system, str) else system
+        cached_blocks = max(
+            (i + 1 for i, block in enumerate(blocks) if "cache_control" in block), default=0
+        )
+        prefix = "".join(block["text"] for block in blocks[:cached_blocks])
+        rest = "".join(block["text"] for block in blocks[cached_blocks:]) + "".join(
+            m["content"] for m in body.get("messages", [])
+        )
+
+        usage = {
+            "input_tokens": len(rest) // 4,
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+            "output_tokens": len(self.reply_text) // 4,
+        }
+        if prefix in self._prompt_cache:
+            usage["cache_read_input_tokens"] = len(prefix) // 4
+        elif prefix:
+            usage["cache_creation_input_tokens"] = len(prefix) // 4
+            self._prompt_cache.add(prefix)
+        return usage
+
+    async def _stream(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, body: dict
+    ) -> bool:
+        """Send the reply as SSE. Returns False if the client disconnected."""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\ncontent-type: text/event-stream\r\n"
+            b"transfer-encoding: chunked\r\nconnection: keep-alive\r\n\r\n"
+        )
+        usage = self._usage(body)
+        output_tokens = usage.pop("output_tokens")
+        events = [
+            {"type": "message_start", "message": {"usage": {**usage, "output_tokens": 1}}},
+            {"type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""}},
+            *(
+                {"type": "content_block_delta", "index": 0, "delta": {"type": "text_delta", "text": word}}
+                for word in re.findall(r"\s*\S+", self.reply_text)
+            ),
+            {"type": "content_block_stop", "index": 0},
+            {"type": "message_delta", "delta": {"stop_reason": "end_turn"}, "usage": {"output_tokens": output_tokens}},
+            {"type": "message_stop"},
+        ]
+        try:
+            for event in events:
+                if reader.at_eof():
+                    raise ConnectionResetError
+                chunk = f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode()
+                writer.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                await writer.drain()
+                if event["type"] == "content_block_delta":
+                    self.deltas_sent += 1
+                    if self.token_interval:
+                        await asyncio.sleep(self.token_interval)
+            writer.write(b"0\r\n\r\n")
+            await writer.drain()
+        except (ConnectionResetError, BrokenPipeError):
+            self.streams_cancelled += 1
+            return False
+        self.streams_completed += 1
+        return True
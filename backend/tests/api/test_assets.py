@@ -0,0 +1,101 @@
+"""
+Asset API Tests
+---------------
+Tests for the asset manifest and hashed file endpoints.
+"""
+
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+import pytest
+from httpx import AsyncClient
+
+from app.main import app
+from app.services.asset_service import AssetManifest, build_assets, get_asset_manifest
+
+
+@pytest.fixture
+async def asset_files(tmp_path: Path) -> AsyncGenerator[dict[str, str], None]:
+    """Build a small asset tree and serve it; yields logical name -> hashed path."""
+    assets = tmp_path / "assets"
+    assets.mkdir()
+    (assets / "sheet.png").write_bytes(bytes(range(256)) * 4)
+    (assets / "map.json").write_text('{"tiles": [' + ",".join(["0"] * 500) + "]}")
+    build_dir = tmp_path / "build"
+    files = build_assets({"assets": assets}, build_dir).manifest["files"]
+
+    manifest = AssetManifest(build_dir)
+    app.dependency_overrides[get_asset_manifest] = lambda: manifest
+    try:
+        yield {name: entry["path"] for name, entry in files.items()}
+    finally:
+        del app.dependency_overrides[get_asset_manifest]
+
+
+@pytest.mark.asyncio
+async def test_get_manifest(client: AsyncClient, asset_files: dict[str, str]) -> None:
+    """Test the manifest and its revalidation."""
+    response = await client.get("/api/assets/manifest")
+
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.json() == {"base_url": "/api/assets/files/", "files": asset_files}
+
+    second = await client.get(
+        "/api/assets/manifest", headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert second.status_code == 304
+
+    for accept, encoding in (("gzip", "gzip"), ("br, gzip;q=0", None), ("*", "gzip")):
+        response = await client.get("/api/assets/manifest", headers={"Accept-Encoding": accept})
+        assert response.headers.get("content-encoding") == encoding, accept
+        assert response.json()["files"] == asset_files
+
+
+@pytest.mark.asyncio
+async def test_get_asset_immutable(client: AsyncClient, asset_files: dict[str, str]) -> None:
+    """Test that hashed files are cached for good and revalidate to 304."""
+    url = f"/api/assets/files/{asset_files['assets/sheet.png']}"
+    response = await client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert "immutable" in response.headers["cache-control"]
+    assert response.content == bytes(range(256)) * 4
+
+    second = await client.get(url, headers={"If-None-Match": response.headers["etag"]})
+    assert second.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_get_asset_precompressed(client: AsyncClient, asset_files: dict[str, str]) -> None:
+    url = f"/api/assets/files/{asset_files['assets/map.json']}"
+
+    compressed = await client.get(url, headers={"Accept-Encoding": "gzip"})
+    plain = await client.get(url, headers={"Accept-Encoding": "identity"})
+
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert int(compressed.headers["content-length"]) < int(plain.headers["content-length"])
+    assert compressed.json() == plain.json()
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in compressed.headers["vary"]
+
+
+@pytest.mark.asyncio
+async def test_get_asset_range(client: AsyncClient, asset_files: dict[str, str]) -> None:
+    """Test byte ranges, which are always served from the identity file."""
+    url = f"/api/assets/files/{asset_files['assets/map.json']}"
+    response = await client.get(url, headers={"Range": "bytes=0-9", "Accept-Encoding": "gzip"})
+
+    assert response.status_code == 206
+    assert response.content == b'{"tiles": '
+    assert "content-encoding" not in response.headers
+    assert response.headers["content-range"].startswith("bytes 0-9/")
+
+
+@pytest.mark.asyncio
+async def test_get_asset_not_found(client: AsyncClient, asset_files: dict[str, str]) -> None:
+    """Test that only hashed paths from the manifest are served."""
+    for path in ("assets/sheet.png", "../manifest.json", "manifest.json"):
+        response = await client.get(f"/api/assets/files/{path}")
+        assert response.status_code == 404
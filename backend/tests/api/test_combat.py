@@ -4,6 +4,8 @@ Combat API Tests
 Tests for combat-related API endpoints.
 """
 
+import json
+
 import pytest
 from httpx import AsyncClient
 
@@ -315,3 +317,114 @@ async def test_end_combat(client: AsyncClient) -> None:
     # Verify it's gone
     get_response = await client.get(f"/api/combat/{combat_id}/state")
     assert get_response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_stream_actions(client: AsyncClient) -> None:
+    """Test replaying a finished combat's action log."""
+    units = {
+        "player_units": [{
+            "id": "p1", "type": "warrior", "name": "Warrior", "hp": 200, "max_hp": 200,
+            "attack": 50, "defense": 20, "speed": 2.0, "position": {"x": 3, "y": 1},
+            "is_player": True,
+        }],
+        "enemy_units": [{
+            "id": "e1", "type": "warrior", "name": "Enemy", "hp": 60, "max_hp": 60,
+            "attack": 5, "defense": 0, "speed": 0.5, "position": {"x": 3, "y": 5},
+            "is_player": False,
+        }],
+    }
+    combat_id = (await client.post("/api/combat/start", json=units)).json()["combat_id"]
+    for _ in range(10):
+        await client.post(f"/api/combat/{combat_id}/tick")
+
+    response = await client.get(f"/api/combat/{combat_id}/actions")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+
+    actions = [json.loads(line) for line in response.text.splitlines()]
+    assert [a["seq"] for a in actions] == list(range(1, len(actions) + 1))
+    assert actions[-1]["payload"] == {"type": "status", "status": "player_won"}
+
+    response = await client.get(f"/api/combat/{combat_id}/actions", params={"after_seq": 2})
+    assert response.text.splitlines()[0].startswith('{"seq":3,')
+
+    response = await client.get("/api/combat/missing/actions")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_combat_history(client: AsyncClient) -> None:
+    """Test listing a save's finished combats with their summaries."""
+    game_id = (await client.post("/api/game/new")).json()["game_id"]
+    units = {
+        "game_save_id": game_id,
+        "player_units": [{
+            "id": "p1", "type": "warrior", "name": "Warrior", "hp": 200, "max_hp": 200,
+            "attack": 50, "defense": 20, "speed": 2.0, "position": {"x": 3, "y": 4},
+            "is_player": True,
+        }],
+        "enemy_units": [{
+            "id": "e1", "type": "warrior", "name": "Enemy", "hp": 10, "max_hp": 10,
+            "attack": 5, "defense": 0, "speed": 0.5, "position": {"x": 3, "y": 5},
+            "is_player": False,
+        }],
+    }
+    won_id = (await client.post("/api/combat/start", json=units)).json()["combat_id"]
+    for _ in range(3):
+        await client.post(f"/api/combat/{won_id}/tick")
+    abandoned_id = (await client.post("/api/combat/start", json=units)).json()["combat_id"]
+    await client.delete(f"/api/combat/{abandoned_id}")
+
+    response = await client.get(
+        "/api/combat/history", params={"game_save_id": game_id, "limit": 1}
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert [c["combat_id"] for c in page["combats"]] == [abandoned_id]
+    assert page["combats"][0]["outcome"] == "abandoned"
+
+    response = await client.get(
+        "/api/combat/history",
+        params={"game_save_id": game_id, "cursor": page["next_cursor"]},
+    )
+    (won,) = response.json()["combats"]
+    assert won["combat_id"] == won_id
+    assert won["outcome"] == "player_won"
+    assert won["enemy_survivors"] == 0
+    assert response.json()["next_cursor"] is None
+
+    response = await client.get(
+        "/api/combat/history", params={"game_save_id": game_id, "cursor": "bogus"}
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_analytics_after_combat(client: AsyncClient) -> None:
+    """Test that a finished combat shows up in the analytics."""
+    units = {
+        "player_units": [{
+            "id": "p1", "type": "knight", "name": "Knight", "hp": 200, "max_hp": 200,
+            "attack": 50, "defense": 20, "speed": 2.0, "position": {"x": 3, "y": 4},
+            "is_player": True,
+        }],
+        "enemy_units": [{
+            "id": "e1", "type": "warrior", "name": "Enemy", "hp": 10, "max_hp": 10,
+            "attack": 5, "defense": 0, "speed": 0.5, "position": {"x": 3, "y": 5},
+            "is_player": False,
+        }],
+    }
+    combat_id = (await client.post("/api/combat/start", json=units)).json()["combat_id"]
+    for _ in range(3):
+        await client.post(f"/api/combat/{combat_id}/tick")
+
+    response = await client.get("/api/analytics")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["combats"] == 1
+    assert data["compositions"][0]["composition"] == "knight:1"
+    assert data["compositions"][0]["player_wins"] == 1
+    knight = next(u for u in data["unit_types"] if u["unit_type"] == "knight")
+    assert knight["damage_dealt"] == 50
@@ -0,0 +1,69 @@
+"""
+Game API Tests
+--------------
+Tests for game save/load endpoints.
+"""
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_new_save_load(client: AsyncClient) -> None:
+    """Test creating a game, saving twice and loading it back."""
+    create = await client.post("/api/game/new", json={"game_state": {"turn": 0}})
+    assert create.status_code == 201
+    game_id = create.json()["game_id"]
+
+    state = {"turn": 1, "hero": {"x": 2, "y": 4}}
+    save = await client.post(f"/api/game/{game_id}/save", json={"game_state": state})
+    assert save.status_code == 200
+    assert save.json()["seq"] == 1
+
+    state["hero"]["x"] = 3
+    save = await client.post(f"/api/game/{game_id}/save", json={"game_state": state})
+    assert save.json()["ops"] == 1
+
+    load = await client.post(f"/api/game/{game_id}/load")
+    assert load.status_code == 200
+    assert load.json()["game_state"] == state
+    assert load.json()["seq"] == 2
+
+
+@pytest.mark.asyncio
+async def test_sections(client: AsyncClient) -> None:
+    """Test reading and writing individual sections."""
+    create = await client.post(
+        "/api/game/new",
+        json={"game_state": {"turn": 7, "heroes": [{"id": "h1"}], "quest_flags": {"intro": True}}},
+    )
+    game_id = create.json()["game_id"]
+
+    response = await client.get(f"/api/game/{game_id}", params={"sections": ["quest_flags"]})
+    assert response.json()["game_state"] == {"quest_flags": {"intro": True}}
+
+    response = await client.put(
+        f"/api/game/{game_id}/sections/inventory", json={"data": {"gold": 5}}
+    )
+    assert response.status_code == 200
+    assert response.json()["sections"] == ["inventory"]
+
+    response = await client.get(f"/api/game/{game_id}/sections/inventory")
+    assert response.json()["data"] == {"gold": 5}
+    assert response.json()["seq"] == 1
+
+    response = await client.get(f"/api/game/{game_id}/sections/spells")
+    assert response.status_code == 404
+
+    response = await client.get(f"/api/game/{game_id}", params={"sections": ["spells"]})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_game_not_found(client: AsyncClient) -> None:
+    """Test loading a game that does not exist."""
+    response = await client.get("/api/game/missing")
+    assert response.status_code == 404
+
+    response = await client.post("/api/game/missing/save", json={"game_state": {}})
+    assert response.status_code == 404
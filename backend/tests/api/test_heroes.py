@@ -0,0 +1,85 @@
+"""
+Heroes API Tests
+----------------
+Tests for hero roster endpoints.
+"""
+
+import base64
+import json
+
+import pytest
+from httpx import AsyncClient
+
+
+@pytest.mark.asyncio
+async def test_hero_flow(client: AsyncClient) -> None:
+    """Test recruiting, equipping, leveling and listing a hero."""
+    game_id = (await client.post("/api/game/new")).json()["game_id"]
+
+    response = await client.post(
+        "/api/heroes/",
+        json={"game_save_id": game_id, "name": "Aria", "base_stats": {"attack": 2}},
+    )
+    assert response.status_code == 201
+    hero = response.json()
+    assert hero["stats"]["attack"] == 2
+
+    response = await client.patch(
+        f"/api/heroes/{hero['id']}",
+        json={"equipment": [{"id": "sword", "name": "Sword", "bonuses": {"attack": 3}}]},
+    )
+    assert response.json()["stats"]["attack"] == 5
+
+    response = await client.post(f"/api/heroes/{hero['id']}/level-up", json={"stat": "charisma"})
+    assert response.status_code == 200
+    assert response.json()["level"] == 2
+    assert response.json()["stats"]["attack"] == 6
+    assert response.json()["stats"]["charisma"] == 1
+
+    response = await client.get("/api/heroes/", params={"game_save_id": game_id})
+    assert response.status_code == 200
+    assert [h["name"] for h in response.json()["heroes"]] == ["Aria"]
+    assert response.json()["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_pagination(client: AsyncClient) -> None:
+    game_id = (await client.post("/api/game/new")).json()["game_id"]
+    for name in ("A", "B", "C"):
+        await client.post("/api/heroes/", json={"game_save_id": game_id, "name": name})
+
+    first = (await client.get("/api/heroes/", params={"game_save_id": game_id, "limit": 2})).json()
+    second = (
+        await client.get(
+            "/api/heroes/",
+            params={"game_save_id": game_id, "limit": 2, "cursor": first["next_cursor"]},
+        )
+    ).json()
+
+    assert [h["name"] for h in first["heroes"]] == ["A", "B"]
+    assert [h["name"] for h in second["heroes"]] == ["C"]
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_malformed_cursors_are_rejected(client: AsyncClient) -> None:
+    """Test that well-formed JSON cursors with the wrong value types get a 400."""
+    game_id = (await client.post("/api/game/new")).json()["game_id"]
+
+    for payload in ([[1], "x"], ["abc", None], [{"dt": "2024-01-01T00:00:00"}, ""], [1, 2]):
+        cursor = base64.urlsafe_b64encode(json.dumps(payload).encode()).decode()
+        for path in ("/api/heroes/", "/api/combat/history"):
+            response = await client.get(path, params={"game_save_id": game_id, "cursor": cursor})
+            assert response.status_code == 400, (path, payload)
+
+
+@pytest.mark.asyncio
+async def test_not_found(client: AsyncClient) -> None:
+    response = await client.get("/api/heroes/missing")
+    assert response.status_code == 404
+
+    response = await client.get("/api/heroes/", params={"game_save_id": "missing"})
+    assert response.status_code == 404
+
+    response = await client.post("/api/heroes/", json={"game_save_id": "missing", "name": "X"})
+    assert response.status_code == 404
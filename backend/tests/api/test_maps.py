@@ -0,0 +1,145 @@
+"""
+Map API Tests
+-------------
+Tests for overworld map endpoints.
+"""
+
+import threading
+
+import pytest
+from httpx import AsyncClient
+
+from app.services.pathfinding_service import get_pathfinding_service
+
+
+@pytest.mark.asyncio
+async def test_get_map_info(client: AsyncClient) -> None:
+    """Test map metadata for the tutorial map."""
+    response = await client.get("/api/maps/tutorial00")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["width"] == 30
+    assert data["height"] == 20
+    assert data["layers"] == ["terrain", "decoration"]
+    assert data["chunks_x"] == -(-30 // data["chunk_size"])
+
+
+@pytest.mark.asyncio
+async def test_get_map_not_found(client: AsyncClient) -> None:
+    """Test requesting a map that does not exist."""
+    response = await client.get("/api/maps/no_such_map")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_get_chunk(client: AsyncClient) -> None:
+    """Test fetching a chunk with a layer filter."""
+    response = await client.get(
+        "/api/maps/tutorial00/chunks/0/0",
+        params={"layers": "terrain"},
+        headers={"Accept-Encoding": "gzip"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert "etag" in response.headers
+
+    data = response.json()
+    assert list(data["layers"]) == ["terrain"]
+    assert len(data["layers"]["terrain"]) == data["width"] * data["height"]
+
+
+@pytest.mark.asyncio
+async def test_get_chunk_not_modified(client: AsyncClient) -> None:
+    """Test that a matching If-None-Match returns 304."""
+    first = await client.get("/api/maps/tutorial00/chunks/0/0")
+    etag = first.headers["etag"]
+
+    second = await client.get(
+        "/api/maps/tutorial00/chunks/0/0",
+        headers={"If-None-Match": etag},
+    )
+
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_get_chunk_out_of_bounds(client: AsyncClient) -> None:
+    """Test requesting a chunk outside the map."""
+    response = await client.get("/api/maps/tutorial00/chunks/99/0")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_find_paths_batch(client: AsyncClient) -> None:
+    """Test answering several path queries in one request."""
+    response = await client.post(
+        "/api/maps/tutorial00/paths",
+        json={
+            "queries": [
+                {"start": {"x": 2, "y": 4}, "goal": {"x": 2, "y": 4}},
+                {"start": {"x": 2, "y": 4}, "goal": {"x": 5, "y": 0}},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    paths = response.json()["paths"]
+    assert len(paths) == 2
+    assert paths[0] == {"found": True, "cost": 0.0, "path": []}
+    # (5, 0) is water
+    assert paths[1]["found"] is False
+
+
+@pytest.mark.asyncio
+async def test_find_paths_runs_off_the_event_loop(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that path searches run on a worker thread, not the event loop's."""
+    service = get_pathfinding_service()
+    find_paths = service.find_paths
+    threads = []
+
+    def record_thread(*args):
+        threads.append(threading.get_ident())
+        return find_paths(*args)
+
+    monkeypatch.setattr(service, "find_paths", record_thread)
+    response = await client.post(
+        "/api/maps/tutorial00/paths",
+        json={"queries": [{"start": {"x": 2, "y": 4}, "goal": {"x": 3, "y": 4}}]},
+    )
+
+    assert response.status_code == 200
+    assert threads and threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_find_paths_unknown_map(client: AsyncClient) -> None:
+    response = await client.post("/api/maps/nowhere/paths", json={"queries": []})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_fog_updates(client: AsyncClient) -> None:
+    """Test moving a hero's vision and reading the fog snapshot."""
+    url = "/api/maps/tutorial00/fog/test-player"
+
+    placed = await client.put(f"{url}/heroes/hero1", json={"x": 2, "y": 4, "radius": 3})
+    assert placed.status_code == 200
+    assert placed.json()["revealed"] == placed.json()["explored"]
+
+    moved = await client.put(f"{url}/heroes/hero1", json={"x": 3, "y": 4, "radius": 3})
+    assert moved.status_code == 200
+    data = moved.json()
+    assert data["revealed"] and data["hidden"]
+
+    snapshot = await client.get(url)
+    assert snapshot.status_code == 200
+    assert snapshot.json()["width"] == 30
+
+    removed = await client.delete(f"{url}/heroes/hero1")
+    assert removed.status_code == 200
+    assert removed.json()["revealed"] == []
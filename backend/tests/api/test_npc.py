@@ -0,0 +1,133 @@
+"""
+NPC API Tests
+-------------
+Tests for the NPC chat endpoints.
+"""
+
+import json
+
+import httpx
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.main import app
+from app.schemas.npc import NpcProfile
+from app.services import llm_dispatcher, npc_cache
+from app.services.gemini_service import get_http_client
+from app.services.npc_conversations import ConversationStore, get_conversation_store
+from app.services.npc_pregen_service import NpcPregenService, profile_prompt
+from benchmarks.stub_llm_server import StubLlmServer
+
+
+def parse_events(body: str) -> list[tuple[str, dict]]:
+    events = []
+    for block in body.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.asyncio
+async def test_stream_chat(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the reply arrives as delta events followed by a done event."""
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(npc_cache, "_npc_cache", npc_cache.NpcResponseCache())
+
+    async with StubLlmServer() as server, httpx.AsyncClient() as llm_client:
+        monkeypatch.setattr(settings, "anthropic_api_url", server.url)
+        app.dependency_overrides[get_http_client] = lambda: llm_client
+        try:
+            response = await client.post(
+                "/api/npc/chat/stream",
+                json={"npc": {"name": "Bram"}, "player_message": "Hello"},
+            )
+        finally:
+            del app.dependency_overrides[get_http_client]
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [name for name, _ in events] == ["delta", "delta", "delta", "done"]
+    assert "".join(data["text"] for _, data in events[:-1]) == "Well met, traveler."
+    assert events[-1][1] == {"npc_response": "Well met, traveler."}
+
+    stats = await client.get("/api/npc/cache/stats")
+    assert stats.json()["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_server_side_session(client: AsyncClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a player's session supplies the history the client no longer sends."""
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", llm_dispatcher.LlmDispatcher())
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"content": [{"type": "text", "text": f"Reply {len(bodies)}"}]})
+
+    store = ConversationStore()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as llm_client:
+        app.dependency_overrides[get_http_client] = lambda: llm_client
+        app.dependency_overrides[get_conversation_store] = lambda: store
+        try:
+            for message in ("I'm Aldric.", "Who am I?"):
+                response = await client.post(
+                    "/api/npc/chat",
+                    json={"npc": {"name": "Bram"}, "player_message": message, "player_id": "p1"},
+                )
+                assert response.status_code == 200
+        finally:
+            del app.dependency_overrides[get_http_client]
+            del app.dependency_overrides[get_conversation_store]
+
+    assert [m["content"] for m in bodies[1]["messages"]] == ["I'm Aldric.", "Reply 1", "Who am I?"]
+    assert len(store.open("p1", "Bram").turns) == 4
+
+
+@pytest.mark.asyncio
+async def test_canned_greeting(
+    client: AsyncClient, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that an opening greeting is served from pre-generated lines without a live call."""
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", llm_dispatcher.LlmDispatcher())
+    bodies: list[dict] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "Live reply."}]})
+
+    await NpcPregenService(db_session).replace_lines(
+        "Bram", profile_prompt(NpcProfile(name="Bram")), "greeting", ["Ho, traveler!"]
+    )
+    store = ConversationStore()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as llm_client:
+        app.dependency_overrides[get_http_client] = lambda: llm_client
+        app.dependency_overrides[get_conversation_store] = lambda: store
+        try:
+            replies = []
+            for message in ("Hello!", "Hello!"):
+                response = await client.post(
+                    "/api/npc/chat",
+                    json={"npc": {"name": "Bram"}, "player_message": message, "player_id": "p1"},
+                )
+                replies.append(response.json()["npc_response"])
+            stream = await client.post(
+                "/api/npc/chat/stream",
+                json={"npc": {"name": "Bram"}, "player_message": "...", "intent": "greeting"},
+            )
+        finally:
+            del app.dependency_overrides[get_http_client]
+            del app.dependency_overrides[get_conversation_store]
+
+    # Only the greeting opening the conversation is canned
+    assert replies == ["Ho, traveler!", "Live reply."]
+    assert len(bodies) == 1
+    assert [m["content"] for m in bodies[0]["messages"]] == ["Hello!", "Ho, traveler!", "Hello!"]
+    assert parse_events(stream.text) == [
+        ("delta", {"text": "Ho, traveler!"}),
+        ("done", {"npc_response": "Ho, traveler!"}),
+    ]
@@ -6,6 +6,7 @@ Uses SQLite for testing to avoid external dependencies.
 """
 
 import asyncio
+from contextlib import nullcontext
 from typing import AsyncGenerator, Generator
 
 import pytest
@@ -14,7 +15,8 @@ from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, SessionFactory, get_db, get_session_factory
+from app.services.combat_record_service import CombatActionWriter, get_combat_action_writer
 
 
 @pytest.fixture(scope="session")
@@ -51,15 +53,24 @@ async def client(db_session: AsyncSession) -> AsyncGenerator[AsyncClient, None]:
     """
     Provide an async HTTP client for testing API endpoints.
 
-    Overrides the database dependency to use the test session.
+    Overrides the database dependencies to use the test session. The
+    combat action writer only writes when flushed explicitly.
     """
     async def override_get_db() -> AsyncGenerator[AsyncSession, None]:
         yield db_session
 
+    def session_factory() -> SessionFactory:
+        return lambda: nullcontext(db_session)
+
+    writer = CombatActionWriter(session_factory(), flush_interval_ms=60_000, batch_size=10**9)
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = session_factory
+    app.dependency_overrides[get_combat_action_writer] = lambda: writer
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
 
+    await writer.close()
     app.dependency_overrides.clear()
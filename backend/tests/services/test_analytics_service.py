@@ -0,0 +1,113 @@
+"""
+Analytics Service Tests
+-----------------------
+Unit tests for incremental combat aggregates and their backfill.
+"""
+
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.schemas.combat import Position, UnitData, UnitType
+from app.services.analytics_service import AnalyticsService, composition_key
+from app.services.combat_engine import CombatEngine
+from app.services.combat_record_service import CombatActionWriter, CombatRecordService
+
+
+def unit(unit_id: str, unit_type: UnitType, is_player: bool, y: int, hp: int = 100) -> UnitData:
+    return UnitData(
+        id=unit_id,
+        type=unit_type,
+        name=unit_id,
+        hp=hp,
+        max_hp=hp,
+        attack=30 if is_player else 8,
+        defense=5,
+        speed=1.0,
+        position=Position(x=2 + len(unit_id), y=y),
+        is_player=is_player,
+    )
+
+
+async def play_combat(
+    db: AsyncSession, writer: CombatActionWriter, combat_id: str, units: list[UnitData]
+) -> CombatEngine:
+    """Run a combat to the end, recording it like the combat routes do."""
+    engine = CombatEngine(
+        combat_id,
+        [u for u in units if u.is_player],
+        [u for u in units if not u.is_player],
+        on_action=lambda seq, tick, payload: writer.submit(combat_id, seq, tick, payload),
+    )
+    records = CombatRecordService(db)
+    await records.create(combat_id, engine.get_state().model_dump(mode="json"))
+    for _ in range(50):
+        engine.tick()
+    final_state = engine.get_state().model_dump(mode="json")
+    await records.finish(combat_id, final_state)
+    await AnalyticsService(db).record_combat(final_state, engine.damage_dealt)
+    return engine
+
+
+def test_composition_key() -> None:
+    units = [
+        {"type": "warrior", "is_player": True},
+        {"type": "archer", "is_player": True},
+        {"type": "warrior", "is_player": True},
+        {"type": "mage", "is_player": False},
+    ]
+    assert composition_key(units) == "archer:1,warrior:2"
+
+
+class TestAnalyticsService:
+    """Tests for aggregate maintenance."""
+
+    @pytest.mark.asyncio
+    async def test_incremental_aggregates(self, db_session: AsyncSession) -> None:
+        """Test that each finished combat adds to the aggregates."""
+        writer = CombatActionWriter(lambda: nullcontext(db_session), batch_size=10**6)
+        engines = [
+            await play_combat(db_session, writer, f"c{i}", [
+                unit("p1", UnitType.WARRIOR, True, 3),
+                unit("e1", UnitType.ARCHER, False, 5, hp=40),
+            ])
+            for i in range(2)
+        ]
+        await writer.close()
+
+        dashboard = await AnalyticsService(db_session).get_dashboard()
+
+        assert dashboard.combats == 2
+        (composition,) = dashboard.compositions
+        assert composition.composition == "warrior:1"
+        assert composition.player_wins == 2
+        assert composition.win_rate == 1.0
+        assert dashboard.avg_fight_ticks == engines[0].current_tick
+
+        by_key = {(u.unit_type, u.side): u for u in dashboard.unit_types}
+        assert by_key[("warrior", "player")].damage_dealt == 2 * engines[0].damage_dealt["p1"]
+        assert by_key[("archer", "enemy")].units_lost == 2
+        assert by_key[("archer", "enemy")].damage_taken == 80
+
+    @pytest.mark.asyncio
+    async def test_backfill_matches_incremental(self, db_session: AsyncSession) -> None:
+        """Test that rebuilding from recorded combats gives the same aggregates."""
+        writer = CombatActionWriter(lambda: nullcontext(db_session), batch_size=10**6)
+        await play_combat(db_session, writer, "c1", [
+            unit("p1", UnitType.WARRIOR, True, 3),
+            unit("p2", UnitType.ARCHER, True, 2),
+            unit("e1", UnitType.KNIGHT, False, 6, hp=60),
+        ])
+        await play_combat(db_session, writer, "c2", [
+            unit("p1", UnitType.MAGE, True, 3, hp=10),
+            unit("e1", UnitType.WARRIOR, False, 4, hp=300),
+        ])
+        await writer.close()
+        service = AnalyticsService(db_session)
+        incremental = await service.get_dashboard()
+
+        counted = await service.backfill(batch_size=1)
+
+        assert counted == 2
+        assert await service.get_dashboard() == incremental
@@ -0,0 +1,94 @@
+"""
+Asset Service Tests
+-------------------
+Unit tests for content-hashed asset builds and the served manifest.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.asset_service import (
+    AssetManifest,
+    build_assets,
+    choose_encoding,
+    hashed_name,
+)
+from app.services.exceptions import AssetNotFoundError
+
+
+def make_roots(tmp_path: Path) -> dict[str, Path]:
+    assets = tmp_path / "public" / "assets"
+    (assets / "atlases").mkdir(parents=True)
+    (assets / "atlases" / "units-0.png").write_bytes(b"\x89PNG page")
+    atlas = {"textures": [{"image": "units-0.png", "frames": []}], "meta": {}}
+    (assets / "atlases" / "units.json").write_text(json.dumps(atlas))
+    (assets / "notes.txt").write_text("repeat " * 200)
+    return {"assets": assets}
+
+
+def test_hashed_name() -> None:
+    assert hashed_name("assets/units/knight_idle.png", "0123456789abcdef") == (
+        "assets/units/knight_idle.0123456789ab.png"
+    )
+
+
+def test_build_assets(tmp_path: Path) -> None:
+    """Test hashed copies, atlas page rewriting and precompressed variants."""
+    roots = make_roots(tmp_path)
+    build_dir = tmp_path / "build"
+
+    result = build_assets(roots, build_dir)
+
+    files = result.manifest["files"]
+    assert result.files == result.written == 3
+    page = files["assets/atlases/units-0.png"]["path"]
+    atlas = json.loads((build_dir / files["assets/atlases/units.json"]["path"]).read_text())
+    assert atlas["textures"][0]["image"] == Path(page).name
+    notes = files["assets/notes.txt"]
+    assert "gzip" in notes["encodings"]
+    assert (build_dir / (notes["path"] + ".gz")).is_file()
+    assert files["assets/atlases/units-0.png"]["encodings"] == []  # Not worth compressing
+    assert result.compressed_bytes < result.bytes
+
+
+def test_rebuild_only_changed_files(tmp_path: Path) -> None:
+    """Test that an unchanged build writes nothing and stale hashes are removed."""
+    roots = make_roots(tmp_path)
+    build_dir = tmp_path / "build"
+    first = build_assets(roots, build_dir).manifest["files"]
+
+    assert build_assets(roots, build_dir).written == 0
+
+    (roots["assets"] / "atlases" / "units-0.png").write_bytes(b"\x89PNG new page")
+    result = build_assets(roots, build_dir)
+    files = result.manifest["files"]
+
+    assert result.written == 2  # The page, and the atlas naming it
+    assert result.removed == 2
+    assert files["assets/notes.txt"] == first["assets/notes.txt"]
+    assert not (build_dir / first["assets/atlases/units-0.png"]["path"]).exists()
+
+
+def test_manifest_reloads(tmp_path: Path) -> None:
+    roots = make_roots(tmp_path)
+    build_dir = tmp_path / "build"
+    manifest = AssetManifest(build_dir)
+    assert json.loads(manifest.body)["files"] == {}
+
+    files = build_assets(roots, build_dir).manifest["files"]
+    manifest.refresh()
+
+    public = json.loads(manifest.body)
+    assert public["files"]["assets/notes.txt"] == files["assets/notes.txt"]["path"]
+    assert manifest.resolve(files["assets/notes.txt"]["path"]).encodings == ("gzip",)
+    with pytest.raises(AssetNotFoundError):
+        manifest.resolve("assets/notes.txt")  # Logical names are not served
+
+
+def test_choose_encoding() -> None:
+    assert choose_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+    assert choose_encoding("gzip, br;q=0", ("br", "gzip")) == "gzip"
+    assert choose_encoding("identity", ("gzip",)) is None
+    assert choose_encoding("*", ("gzip",)) == "gzip"
@@ -321,3 +321,22 @@ class TestCombatEngine:
                 break
 
         assert state.status.value == "enemy_won"
+
+    def test_actions_are_recorded_in_order(
+        self, player_units: list[UnitData], enemy_units: list[UnitData]
+    ) -> None:
+        """Test that moves and attacks are numbered and passed to on_action."""
+        recorded: list[tuple[int, int, dict]] = []
+        engine = CombatEngine(
+            "test-id",
+            player_units,
+            enemy_units,
+            on_action=lambda seq, tick, payload: recorded.append((seq, tick, payload)),
+        )
+
+        for _ in range(5):
+            engine.tick()
+
+        assert [seq for seq, _, _ in recorded] == list(range(1, len(recorded) + 1))
+        assert {payload["type"] for _, _, payload in recorded} >= {"move", "attack"}
+        assert all(1 <= tick <= 5 for _, tick, _ in recorded)
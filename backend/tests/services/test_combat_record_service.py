@@ -0,0 +1,192 @@
+"""
+Combat Record Service Tests
+---------------------------
+Unit tests for the batched combat action writer, replay streaming
+and combat history.
+"""
+
+import asyncio
+from contextlib import nullcontext
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.combat import CombatActionRecord
+from app.services.combat_record_service import (
+    CombatActionWriter,
+    CombatRecordService,
+    summarize_state,
+)
+from app.services.save_service import SaveService
+
+
+def final_state(won: bool) -> dict:
+    return {
+        "status": "player_won" if won else "enemy_won",
+        "tick": 12,
+        "units": [
+            {"id": "p1", "is_player": True, "hp": 10 if won else 0},
+            {"id": "p2", "is_player": True, "hp": 0},
+            {"id": "e1", "is_player": False, "hp": 0 if won else 5},
+        ],
+    }
+
+
+async def count_actions(db: AsyncSession) -> int:
+    result = await db.execute(select(func.count()).select_from(CombatActionRecord))
+    return result.scalar_one()
+
+
+class TestCombatActionWriter:
+    """Tests for batched action writes."""
+
+    @pytest.mark.asyncio
+    async def test_flushes_when_batch_is_full(self, db_session: AsyncSession) -> None:
+        writer = CombatActionWriter(lambda: nullcontext(db_session), flush_interval_ms=60_000, batch_size=3)
+
+        for seq in range(1, 4):
+            writer.submit("c1", seq, 1, {"type": "move"})
+        await asyncio.sleep(0.05)
+
+        assert writer.pending == 0
+        assert writer.flushes == 1
+        assert await count_actions(db_session) == 3
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_flushes_after_interval(self, db_session: AsyncSession) -> None:
+        writer = CombatActionWriter(lambda: nullcontext(db_session), flush_interval_ms=20, batch_size=1000)
+
+        writer.submit("c1", 1, 1, {"type": "move"})
+        assert writer.pending == 1
+        await asyncio.sleep(0.1)
+
+        assert writer.pending == 0
+        assert await count_actions(db_session) == 1
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_is_retried(self, db_session: AsyncSession) -> None:
+        """Test that rows from a failed write are kept for the next flush."""
+        calls = 0
+
+        def flaky_factory():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                raise ConnectionError("database unavailable")
+            return nullcontext(db_session)
+
+        writer = CombatActionWriter(flaky_factory, flush_interval_ms=60_000, batch_size=1000)
+        writer.submit("c1", 1, 1, {"type": "move"})
+        writer.submit("c1", 2, 1, {"type": "attack"})
+
+        with pytest.raises(ConnectionError):
+            await writer.flush()
+        assert writer.pending == 2
+
+        await writer.close()
+        assert writer.rows_written == 2
+        assert await count_actions(db_session) == 2
+
+    @pytest.mark.asyncio
+    async def test_bad_rows_are_dropped_after_attempts(self, db_session: AsyncSession) -> None:
+        """Test that a batch that keeps failing is split and only its bad row dropped."""
+        writer = CombatActionWriter(
+            lambda: nullcontext(db_session), flush_interval_ms=60_000, batch_size=1000, max_attempts=2
+        )
+        writer.submit("c1", 1, 1, {"type": "move"})
+        await writer.flush()
+
+        for seq in (2, 3, 1, 4, 5):  # seq 1 is already written
+            writer.submit("c1", seq, 1, {"type": "move"})
+        with pytest.raises(IntegrityError):
+            await writer.flush()
+        assert writer.pending == 5
+
+        assert await writer.flush() == 4
+        assert writer.pending == 0
+        assert writer.rows_dropped == 1
+        assert await count_actions(db_session) == 5
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_does_not_raise(self) -> None:
+        """Test that close gives up on rows it cannot write instead of raising."""
+        def broken_factory():
+            raise ConnectionError("database unavailable")
+
+        writer = CombatActionWriter(broken_factory, flush_interval_ms=60_000, batch_size=1000)
+        writer.submit("c1", 1, 1, {"type": "move"})
+        writer.submit("c1", 2, 1, {"type": "attack"})
+
+        await writer.close()
+        assert writer.pending == 0
+        assert writer.rows_dropped == 2
+
+
+class TestCombatRecordService:
+    """Tests for combat records and replay."""
+
+    @pytest.mark.asyncio
+    async def test_stream_actions_in_order(self, db_session: AsyncSession) -> None:
+        service = CombatRecordService(db_session)
+        await service.create("c1", {"units": []})
+        writer = CombatActionWriter(lambda: nullcontext(db_session), batch_size=1000)
+
+        # Submitted out of order across two batches
+        for seq in (4, 5, 6):
+            writer.submit("c1", seq, 2, {"type": "attack"})
+        await writer.flush()
+        for seq in (1, 2, 3):
+            writer.submit("c1", seq, 1, {"type": "move"})
+        writer.submit("c2", 1, 1, {"type": "move"})
+        await writer.close()
+
+        actions = [a async for a in service.stream_actions("c1")]
+        assert [a["seq"] for a in actions] == [1, 2, 3, 4, 5, 6]
+        assert actions[0] == {"seq": 1, "tick": 1, "payload": {"type": "move"}}
+
+        later = [a["seq"] async for a in service.stream_actions("c1", after_seq=4)]
+        assert later == [5, 6]
+
+    @pytest.mark.asyncio
+    async def test_finish_only_once(self, db_session: AsyncSession) -> None:
+        service = CombatRecordService(db_session)
+        await service.create("c1", {"units": []})
+
+        assert await service.finish("c1", {"status": "player_won"}) is True
+        assert await service.finish("c1", {"status": "enemy_won"}) is False
+
+    @pytest.mark.asyncio
+    async def test_history_pagination(self, db_session: AsyncSession) -> None:
+        """Test paging through finished combats newest first."""
+        game_id = await SaveService(db_session).create()
+        service = CombatRecordService(db_session)
+        for i in range(7):
+            await service.create(f"c{i}", {}, game_save_id=game_id)
+            await service.finish(f"c{i}", final_state(won=i % 2 == 0))
+        await service.create("active", {}, game_save_id=game_id)
+
+        ids = []
+        cursor = None
+        while True:
+            combats, cursor = await service.list_history(game_id, limit=3, cursor=cursor)
+            ids.extend(c.combat_id for c in combats)
+            if cursor is None:
+                break
+
+        assert ids == [f"c{i}" for i in reversed(range(7))]
+
+        (latest,), _ = await service.list_history(game_id, limit=1)
+        assert latest.outcome == "player_won"
+        assert latest.ticks == 12
+        assert (latest.player_units, latest.player_survivors) == (2, 1)
+        assert (latest.enemy_units, latest.enemy_survivors) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_abandoned_combat_summary(self, db_session: AsyncSession) -> None:
+        state = {**final_state(won=False), "status": "active"}
+        assert summarize_state(state)["outcome"] == "abandoned"
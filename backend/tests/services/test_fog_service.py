@@ -0,0 +1,168 @@
+"""
+Fog of War Service Tests
+------------------------
+Unit tests for incremental overworld visibility.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from app.services.fog_service import (
+    FogService,
+    PlayerFog,
+    circle_offsets,
+    move_offsets,
+    pack_bits,
+    to_runs,
+)
+from app.services.map_service import MapService
+
+
+def write_map(maps_dir: Path, name: str, width: int, height: int) -> None:
+    """Write an all-grass map and bump its mtime so it is reloaded."""
+    path = maps_dir / f"{name}.json"
+    stamp = path.stat().st_mtime_ns + 10**9 if path.exists() else None
+    path.write_text(json.dumps({
+        "name": name,
+        "width": width,
+        "height": height,
+        "tileSize": 16,
+        "tileset": "overworld_tileset_grass",
+        "layers": [{"name": "terrain", "data": [[0] * width for _ in range(height)]}],
+    }))
+    if stamp is not None:
+        os.utime(path, ns=(stamp, stamp))
+
+
+def visible_cells(fog: PlayerFog) -> set[int]:
+    return {i for i, count in enumerate(fog.visible) if count}
+
+
+def expected_circle(fog: PlayerFog, x: int, y: int, radius: int) -> set[int]:
+    """Cells a full recompute would mark visible."""
+    return {
+        (y + dy) * fog.width + (x + dx)
+        for dx, dy in circle_offsets(radius)
+        if 0 <= x + dx < fog.width and 0 <= y + dy < fog.height
+    }
+
+
+class TestOffsets:
+    """Tests for precomputed sight masks."""
+
+    def test_circle_radius(self) -> None:
+        """Test that the mask contains exactly the tiles within the radius."""
+        offsets = circle_offsets(2)
+
+        assert (0, 0) in offsets
+        assert (2, 0) in offsets
+        assert (2, 1) not in offsets
+        assert len(offsets) == 13
+
+    def test_single_step_touches_only_crescents(self) -> None:
+        """Test that a one-tile move updates far fewer cells than the circle."""
+        entering, leaving = move_offsets(5, 1, 0)
+
+        assert len(entering) == len(leaving) == 11
+        assert len(entering) < len(circle_offsets(5)) // 5
+
+
+class TestPlayerFog:
+    """Tests for per-player fog state."""
+
+    def test_place_hero_reveals_circle(self) -> None:
+        """Test that a new hero reveals and explores its circle."""
+        fog = PlayerFog(20, 20)
+
+        diff = fog.move_hero("h1", 10, 10, 3)
+
+        assert set(diff.revealed) == expected_circle(fog, 10, 10, 3)
+        assert set(diff.explored) == set(diff.revealed)
+        assert diff.hidden == []
+
+    def test_incremental_move_matches_full_recompute(self) -> None:
+        """Test that a walk leaves the same state as recomputing from scratch."""
+        fog = PlayerFog(30, 20)
+        fog.move_hero("h1", 2, 2, 4)
+        explored = expected_circle(fog, 2, 2, 4)
+
+        for x, y in [(3, 2), (4, 3), (5, 4), (5, 5), (8, 5), (8, 6)]:
+            before = visible_cells(fog)
+            diff = fog.move_hero("h1", x, y, 4)
+            after = expected_circle(fog, x, y, 4)
+
+            assert visible_cells(fog) == after
+            assert set(diff.revealed) == after - before
+            assert set(diff.hidden) == before - after
+            assert set(diff.explored) == after - explored
+            explored |= after
+
+        assert {i for i, e in enumerate(fog.explored) if e} == explored
+
+    def test_overlapping_heroes(self) -> None:
+        """Test that a cell stays visible while any hero still sees it."""
+        fog = PlayerFog(20, 20)
+        fog.move_hero("h1", 5, 5, 3)
+        fog.move_hero("h2", 7, 5, 3)
+
+        diff = fog.remove_hero("h1")
+
+        assert set(diff.hidden) == expected_circle(fog, 5, 5, 3) - expected_circle(fog, 7, 5, 3)
+        assert visible_cells(fog) == expected_circle(fog, 7, 5, 3)
+
+    def test_teleport_and_radius_change(self) -> None:
+        """Test moves that fall back to swapping the full circle."""
+        fog = PlayerFog(30, 30)
+        fog.move_hero("h1", 3, 3, 2)
+
+        diff = fog.move_hero("h1", 4, 3, 5)
+
+        assert visible_cells(fog) == expected_circle(fog, 4, 3, 5)
+        assert set(diff.revealed).isdisjoint(diff.hidden)
+
+        fog.move_hero("h1", 25, 25, 5)
+        assert visible_cells(fog) == expected_circle(fog, 25, 25, 5)
+
+
+class TestFogService:
+    """Tests for fog state bookkeeping across players and maps."""
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Test that the number of fog states is bounded."""
+        write_map(tmp_path, "field", 10, 10)
+        service = FogService(MapService(tmp_path, 4), max_states=2)
+        first = service.get_fog("p1", "field")
+        service.get_fog("p2", "field")
+
+        assert service.get_fog("p1", "field") is first  # Refreshes p1
+        service.get_fog("p3", "field")  # Evicts p2
+
+        assert service.get_fog("p1", "field") is first
+        assert len(service._fog) == 2
+        assert ("p2", "field") not in service._fog
+
+    def test_reset_when_map_changes(self, tmp_path: Path) -> None:
+        """Test that a reloaded map with new dimensions gets fresh fog."""
+        write_map(tmp_path, "field", 10, 10)
+        service = FogService(MapService(tmp_path, 4))
+        service.move_hero("p1", "field", "h1", 5, 5, 2)
+
+        write_map(tmp_path, "field", 20, 8)
+        fog = service.get_fog("p1", "field")
+
+        assert (fog.width, fog.height) == (20, 8)
+        assert len(fog.explored) == 160
+        assert fog.heroes == {}
+        assert not any(fog.explored)
+
+
+class TestEncoding:
+    """Tests for compact diff and snapshot encoding."""
+
+    def test_to_runs(self) -> None:
+        assert to_runs([5, 1, 2, 3, 9, 10]) == [[1, 3], [5, 1], [9, 2]]
+        assert to_runs([]) == []
+
+    def test_pack_bits(self) -> None:
+        assert pack_bits(bytearray([1, 0, 0, 0, 0, 0, 0, 0, 0, 1])) == bytes([1, 2])
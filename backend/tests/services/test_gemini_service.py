@@ -0,0 +1,310 @@
+"""
+Claude AI Service Tests
+-----------------------
+Unit tests for NPC response generation over the shared HTTP client.
+"""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import gemini_service, llm_dispatcher, npc_cache
+from app.services.gemini_service import (
+    TokenUsage,
+    build_messages,
+    build_system_prompt,
+    close_http_client,
+    create_http_client,
+    generate_npc_response,
+    get_http_client,
+    stream_npc_response,
+)
+from benchmarks.stub_llm_server import StubLlmServer
+
+
+def claude_reply(text: str) -> httpx.Response:
+    return httpx.Response(200, json={"content": [{"type": "text", "text": text}]})
+
+
+@pytest.fixture
+def api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(npc_cache, "_npc_cache", npc_cache.NpcResponseCache())
+
+
+@pytest.fixture(autouse=True)
+def fast_dispatcher(monkeypatch: pytest.MonkeyPatch) -> llm_dispatcher.LlmDispatcher:
+    dispatcher = llm_dispatcher.LlmDispatcher(
+        backoff_base_seconds=0.001, backoff_max_seconds=0.01
+    )
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", dispatcher)
+    return dispatcher
+
+
+@pytest.mark.asyncio
+async def test_request_shape(api_key: None) -> None:
+    """Test the Messages API request built from an NPC profile and history."""
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return claude_reply("  Well met, traveler.  ")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        reply = await generate_npc_response(
+            npc_name="Bram",
+            backstory="A retired smith.",
+            personality="Gruff",
+            guidelines="",
+            conversation_history=[{"role": "player", "content": "Hi"}, {"role": "npc", "content": "Hm."}],
+            player_message="Got any swords?",
+            client=client,
+        )
+
+    assert reply == "Well met, traveler."
+    (request,) = requests
+    assert str(request.url) == settings.anthropic_api_url
+    assert request.headers["x-api-key"] == "test-key"
+    body = json.loads(request.content)
+    (system,) = body["system"]
+    assert "Bram" in system["text"]
+    assert system["cache_control"] == {"type": "ephemeral"}
+    assert [m["role"] for m in body["messages"]] == ["user", "assistant", "user"]
+
+
+def test_history_is_trimmed_to_token_budget(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "npc_history_token_budget", 100)
+    history = [
+        {"role": "player", "content": "Tell me everything. " * 40},
+        {"role": "npc", "content": "Very well."},
+        {"role": "player", "content": "Go on."},
+    ]
+
+    messages = build_messages(history, "And then?")
+
+    assert [m["content"] for m in messages] == ["Very well.", "Go on.", "And then?"]
+
+
+@pytest.mark.asyncio
+async def test_summary_and_completion_hook(api_key: None) -> None:
+    """Test that a session summary reaches the system prompt and real replies are reported."""
+    bodies: list[dict] = []
+    completed: list[str] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        bodies.append(json.loads(request.content))
+        return claude_reply("Your debt stands.") if len(bodies) == 1 else httpx.Response(500)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        for _ in range(2):
+            await generate_npc_response(
+                "Bram", "", "", "", [], "What do I owe?", client=client, cache=False,
+                summary="Player owes Bram 5 gold.", on_complete=completed.append,
+            )
+
+    prompt, summary = bodies[0]["system"]
+    assert "cache_control" in prompt  # The summary varies, so it follows the cached prefix
+    assert summary == {"type": "text", "text": "EARLIER IN THIS CONVERSATION:\nPlayer owes Bram 5 gold."}
+    assert completed == ["Your debt stands."]  # The API error fallback is not reported
+
+
+@pytest.mark.asyncio
+async def test_prompt_prefix_caching(api_key: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test against a fake API with prompt caching that later turns read the cached prefix."""
+    usage = TokenUsage()
+    monkeypatch.setattr(gemini_service, "token_usage", usage)
+    profile = ("Bram", "A retired smith. " * 50, "Gruff", "Never mention the war.")
+
+    async with StubLlmServer() as server, httpx.AsyncClient() as client:
+        monkeypatch.setattr(settings, "anthropic_api_url", server.url)
+        history: list[dict] = []
+        for message in ("Hello", "Any work?", "Farewell"):
+            reply = await generate_npc_response(*profile, history, message, client=client)
+            history += [{"role": "player", "content": message}, {"role": "npc", "content": reply}]
+
+    first, *rest = server.bodies
+    assert all(body["system"] == first["system"] for body in rest)
+    assert usage.calls == 3
+    assert usage.cache_creation_input_tokens > 0
+    assert usage.cache_read_input_tokens == 2 * usage.cache_creation_input_tokens
+    assert 0.5 < usage.cached_token_ratio < 1
+    assert build_system_prompt(*profile) is build_system_prompt(*profile)
+
+
+@pytest.mark.asyncio
+async def test_errors_stay_in_character(api_key: None) -> None:
+    def failing(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(529, text="overloaded")
+
+    def unreachable(request: httpx.Request) -> httpx.Response:
+        raise httpx.ConnectError("refused")
+
+    for handler, expected in ((failing, "API error"), (unreachable, "Connection error")):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            reply = await generate_npc_response("Bram", "", "", "", [], "Hi", client=client)
+        assert reply.startswith("*Bram") and expected in reply
+
+
+@pytest.mark.asyncio
+async def test_responses_are_cached(api_key: None) -> None:
+    """Test that a repeated opener is served from the cache, unless opted out."""
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return claude_reply(f"Greetings #{calls}")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        first = await generate_npc_response("Bram", "", "", "", [], "Hello!", client=client)
+        second = await generate_npc_response("Bram", "", "", "", [], "  hello ", client=client)
+        other_npc = await generate_npc_response("Ilsa", "", "", "", [], "Hello", client=client)
+        varied = await generate_npc_response(
+            "Bram", "", "", "", [], "Hello", client=client, cache=False
+        )
+
+    assert first == second == "Greetings #1"
+    assert other_npc == "Greetings #2"
+    assert varied == "Greetings #3"
+    assert npc_cache.get_npc_cache().hits == 1
+
+
+@pytest.mark.asyncio
+async def test_errors_are_not_cached(api_key: None) -> None:
+    responses = iter([httpx.Response(500, text="internal error"), claude_reply("Ah, hello.")])
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: next(responses))
+    ) as client:
+        await generate_npc_response("Bram", "", "", "", [], "Hi", client=client)
+        reply = await generate_npc_response("Bram", "", "", "", [], "Hi", client=client)
+
+    assert reply == "Ah, hello."
+
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_are_coalesced(api_key: None) -> None:
+    """Test that identical requests in flight share one upstream call."""
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return claude_reply("Who's asking?")
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        replies = await asyncio.gather(*(
+            generate_npc_response("Bram", "", "", "", [], "Who are you?", client=client)
+            for _ in range(10)
+        ))
+
+    assert replies == ["Who's asking?"] * 10
+    assert calls == 1
+    assert gemini_service.npc_flights().coalesced >= 9
+
+
+@pytest.mark.asyncio
+async def test_rate_limits_are_retried(
+    api_key: None, fast_dispatcher: llm_dispatcher.LlmDispatcher
+) -> None:
+    responses = iter([
+        httpx.Response(429, headers={"retry-after": "0.001"}),
+        httpx.Response(529, text="overloaded"),
+        claude_reply("Patience, friend."),
+    ])
+
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: next(responses))
+    ) as client:
+        reply = await generate_npc_response("Bram", "", "", "", [], "Hi", client=client)
+
+    assert reply == "Patience, friend."
+    assert fast_dispatcher.retries == 2
+
+
+@pytest.mark.asyncio
+async def test_overload_sheds_in_character(
+    api_key: None, fast_dispatcher: llm_dispatcher.LlmDispatcher
+) -> None:
+    fast_dispatcher.max_concurrency = 1
+    fast_dispatcher.max_queue = 0
+    await fast_dispatcher.acquire()  # Every slot busy, no room to queue
+
+    async with httpx.AsyncClient() as client:
+        reply = await generate_npc_response("Bram", "", "", "", [], "Hi", client=client)
+
+    assert reply == "*Bram is too busy to talk right now*"
+    fast_dispatcher.release()
+
+
+@pytest.mark.asyncio
+async def test_streaming(api_key: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test streaming from a local fake server; the finished line is cached."""
+    async with StubLlmServer(reply_text="Well met, traveler.") as server:
+        monkeypatch.setattr(settings, "anthropic_api_url", server.url)
+        async with httpx.AsyncClient() as client:
+            deltas = [
+                text async for text in stream_npc_response("Bram", "", "", "", [], "Hi", client=client)
+            ]
+            cached = [
+                text async for text in stream_npc_response("Bram", "", "", "", [], "Hi", client=client)
+            ]
+
+    assert deltas == ["Well", " met,", " traveler."]
+    assert cached == ["Well met, traveler."]
+    assert server.requests == 1
+
+
+@pytest.mark.asyncio
+async def test_streaming_cancellation(api_key: None, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that closing the stream early closes the upstream request."""
+    async with StubLlmServer(reply_text="word " * 100, token_interval_ms=5) as server:
+        monkeypatch.setattr(settings, "anthropic_api_url", server.url)
+        async with httpx.AsyncClient() as client:
+            deltas = stream_npc_response("Bram", "", "", "", [], "Tell me a story", client=client)
+            assert await anext(deltas) == "word"
+            await deltas.aclose()
+
+            for _ in range(100):
+                if server.streams_cancelled:
+                    break
+                await asyncio.sleep(0.01)
+
+    assert server.streams_cancelled == 1
+    assert server.deltas_sent < 100
+    assert len(npc_cache.get_npc_cache()) == 0
+
+
+@pytest.mark.asyncio
+async def test_shared_client_lifecycle() -> None:
+    """Test that the shared client is reused until closed."""
+    client = get_http_client()
+    assert get_http_client() is client
+
+    await close_http_client()
+    assert client.is_closed
+    assert gemini_service._http_client is None
+
+    replacement = get_http_client()
+    assert replacement is not client
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_client_settings(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_timeout_seconds", 12.0)
+    monkeypatch.setattr(settings, "llm_connect_timeout_seconds", 2.0)
+
+    client = create_http_client()
+
+    assert client.timeout.read == 12.0
+    assert client.timeout.connect == 2.0
+    await client.aclose()
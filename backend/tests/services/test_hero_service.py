@@ -0,0 +1,190 @@
+"""
+Hero Service Tests
+------------------
+Unit tests for the hero roster, derived stats and keyset pagination.
+"""
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.combat import GameSave
+from app.models.heroes import Hero
+from app.schemas.heroes import HeroStat
+from app.services import hero_service
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    HeroNotFoundError,
+    InvalidCursorError,
+)
+from app.services.hero_service import HeroService, derive_stats
+from app.services.pagination import encode_cursor
+from app.services.save_service import SaveService
+
+PORTRAIT = "assets/units/hero/hero_south.png"
+
+
+async def make_roster(db: AsyncSession, size: int) -> tuple[HeroService, str]:
+    game_id = await SaveService(db).create()
+    service = HeroService(db)
+    for i in range(size):
+        await service.create(game_id, f"Hero {i}", PORTRAIT)
+    await db.commit()
+    return service, game_id
+
+
+class TestDeriveStats:
+    """Tests for derived stat computation."""
+
+    def test_level_equipment_and_buffs(self) -> None:
+        stats = derive_stats(
+            level=3,
+            base_stats={"attack": 2},
+            equipment=[{"name": "Sword", "bonuses": {"attack": 3}}],
+            buffs=[{"name": "Bless", "bonuses": {"attack": 1, "vampiric": 0.1}}],
+        )
+
+        assert stats["attack"] == 2 + 2 + 3 + 1
+        assert stats["defense"] == 2
+        assert stats["vampiric"] == 0.1
+        assert stats["tactics"] == 2  # Default base stat
+
+
+class TestHeroService:
+    """Tests for the hero roster."""
+
+    @pytest.mark.asyncio
+    async def test_stats_are_memoized(self, db_session: AsyncSession) -> None:
+        """Test that derived stats are only recomputed after a change."""
+        service, game_id = await make_roster(db_session, 1)
+        (hero,), _ = await service.list_roster(game_id)
+
+        first = hero.stats
+        assert hero.stats is first
+
+        await service.level_up(hero.id, HeroStat.MAGIC)
+        assert hero.stats is first  # The cache only changes on commit
+        await db_session.commit()
+
+        assert hero.stats is not first
+        assert hero.stats["magic"] == 1
+        assert hero.stats["attack"] == 1
+
+    @pytest.mark.asyncio
+    async def test_level_up_keeps_cached_pages(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 3)
+        heroes, _ = await service.list_roster(game_id, limit=2)
+        pages = dict(hero_service._rosters[game_id].pages)
+
+        await service.level_up(heroes[0].id, HeroStat.ATTACK)
+        await db_session.commit()
+
+        assert hero_service._rosters[game_id].pages == pages
+        again, _ = await service.list_roster(game_id, limit=2)
+        assert again[0].level == 2
+
+    @pytest.mark.asyncio
+    async def test_keyset_pagination(self, db_session: AsyncSession) -> None:
+        """Test paging through a roster visits every hero once, in order."""
+        service, game_id = await make_roster(db_session, 7)
+
+        names = []
+        cursor = None
+        while True:
+            heroes, cursor = await service.list_roster(game_id, limit=3, cursor=cursor)
+            names.extend(hero.name for hero in heroes)
+            if cursor is None:
+                break
+
+        assert names == [f"Hero {i}" for i in range(7)]
+
+    @pytest.mark.asyncio
+    async def test_recruit_refreshes_last_page(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 2)
+        heroes, cursor = await service.list_roster(game_id)
+        assert len(heroes) == 2 and cursor is None
+
+        await service.create(game_id, "Late Hero", PORTRAIT)
+
+        heroes, _ = await service.list_roster(game_id)
+        assert [h.name for h in heroes][-1] == "Late Hero"
+
+    @pytest.mark.asyncio
+    async def test_uncached_hero_is_loaded(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 1)
+        (hero,), _ = await service.list_roster(game_id)
+        hero_service._rosters.clear()
+        hero_service._hero_saves.clear()
+
+        loaded = await service.get(hero.id)
+
+        assert loaded is not hero
+        assert loaded.name == hero.name
+
+    @pytest.mark.asyncio
+    async def test_rolled_back_write_leaves_cache(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 1)
+        (hero,), _ = await service.list_roster(game_id)
+
+        leveled = await service.level_up(hero.id, HeroStat.ATTACK)
+        assert leveled.level == 2
+        await db_session.rollback()
+
+        assert hero.level == 1
+        assert (await service.get(hero.id)).level == 1
+
+    @pytest.mark.asyncio
+    async def test_external_write_reloads_roster(self, db_session: AsyncSession) -> None:
+        """Test that a write by another worker (seen via roster_seq) is not served stale."""
+        service, game_id = await make_roster(db_session, 1)
+        (hero,), _ = await service.list_roster(game_id)
+
+        await db_session.execute(update(Hero).where(Hero.id == hero.id).values(level=7))
+        await db_session.execute(
+            update(GameSave).where(GameSave.id == game_id).values(roster_seq=GameSave.roster_seq + 1)
+        )
+        await db_session.commit()
+
+        assert (await service.get(hero.id)).level == 7
+        (reloaded,), _ = await service.list_roster(game_id)
+        assert reloaded.level == 7
+
+    @pytest.mark.asyncio
+    async def test_level_up_increments_in_sql(self, db_session: AsyncSession) -> None:
+        """Test that a level-up builds on the stored level, not a cached copy."""
+        service, game_id = await make_roster(db_session, 1)
+        (hero,), _ = await service.list_roster(game_id)
+        await db_session.execute(
+            update(Hero).where(Hero.id == hero.id).values(level=4, version=Hero.version + 1)
+        )
+
+        leveled = await service.level_up(hero.id, HeroStat.ATTACK)
+
+        assert leveled.level == 5
+
+    @pytest.mark.asyncio
+    async def test_errors(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 0)
+
+        with pytest.raises(HeroNotFoundError):
+            await service.get("missing")
+        with pytest.raises(GameSaveNotFoundError):
+            await service.list_roster("missing")
+        assert "missing" not in hero_service._rosters
+        with pytest.raises(InvalidCursorError):
+            await service.list_roster(game_id, cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_only_issued_cursors_are_cached(self, db_session: AsyncSession) -> None:
+        service, game_id = await make_roster(db_session, 3)
+
+        _, next_cursor = await service.list_roster(game_id, limit=2)
+        await service.list_roster(game_id, limit=2, cursor=next_cursor)
+        made_up = encode_cursor(datetime(2000, 1, 1), "made-up")
+        heroes, _ = await service.list_roster(game_id, limit=2, cursor=made_up)
+        assert len(heroes) == 2
+
+        pages = hero_service._rosters[game_id].pages
+        assert set(pages) == {(None, 2), (next_cursor, 2)}
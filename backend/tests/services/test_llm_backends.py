@@ -0,0 +1,193 @@
+"""
+LLM Backend Tests
+-----------------
+Unit tests for the provider adapters and the local mock backend.
+"""
+
+import json
+import random
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import gemini_service, llm_backends, llm_dispatcher, npc_cache
+from app.services.gemini_service import (
+    TokenUsage,
+    generate_npc_response,
+    stream_npc_response,
+)
+from app.services.llm_backends import (
+    Distribution,
+    GeminiBackend,
+    MockBackend,
+    get_llm_backend,
+)
+
+
+class FakeClock:
+    """Records the sleeps of a mock backend instead of waiting."""
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+        self.sleeps: list[float] = []
+
+    async def __call__(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.elapsed += seconds
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(npc_cache, "_npc_cache", npc_cache.NpcResponseCache())
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", llm_dispatcher.LlmDispatcher(
+        backoff_base_seconds=0.001, backoff_max_seconds=0.01
+    ))
+    monkeypatch.setattr(llm_backends, "_backend", None)
+
+
+def use_mock(monkeypatch: pytest.MonkeyPatch, **options: object) -> MockBackend:
+    backend = MockBackend(**options)
+    monkeypatch.setattr(settings, "llm_backend", "mock")
+    monkeypatch.setattr(llm_backends, "_backend", backend)
+    return backend
+
+
+def test_distributions() -> None:
+    rng = random.Random(1)
+    assert Distribution.parse("fixed:250").sample(rng) == 250
+    assert 10 <= Distribution.parse("uniform:10:20").sample(rng) <= 20
+    assert Distribution.parse("normal:-50:1").sample(rng) == 0  # Clamped
+    samples = sorted(Distribution.parse("lognormal:100:0.5").sample(rng) for _ in range(1001))
+    assert 80 < samples[500] < 120  # The median
+    with pytest.raises(ValueError):
+        Distribution.parse("poisson:3")
+
+
+def test_backend_selection(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_backend", "gemini")
+    assert isinstance(get_llm_backend(), GeminiBackend)
+    monkeypatch.setattr(settings, "llm_backend", "mock")
+    assert get_llm_backend() is get_llm_backend()
+    monkeypatch.setattr(settings, "llm_backend", "openai")
+    with pytest.raises(ValueError):
+        get_llm_backend()
+
+
+@pytest.mark.asyncio
+async def test_mock_is_deterministic(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that a seeded mock replays the same lines and timings, without network."""
+    runs = []
+    for _ in range(2):
+        clock = FakeClock()
+        use_mock(monkeypatch, latency_ms="fixed:200", tokens_per_second="fixed:50",
+                 output_tokens="fixed:10", seed=7, sleep=clock)
+        replies = [
+            await generate_npc_response("Bram", "", "", "", [], "Hi", cache=False)
+            for _ in range(3)
+        ]
+        runs.append((replies, clock.elapsed))
+
+    assert runs[0] == runs[1]
+    replies, elapsed = runs[0]
+    assert len(set(replies)) > 1  # Repeats of a request are fresh samples
+    assert all(len(reply.split()) == 10 for reply in replies)
+    assert elapsed == pytest.approx(3 * (0.2 + 10 / 50))
+
+
+@pytest.mark.asyncio
+async def test_mock_streaming_and_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the mock streams at its token rate and reports prompt cache usage."""
+    usage = TokenUsage()
+    monkeypatch.setattr(gemini_service, "token_usage", usage)
+    clock = FakeClock()
+    use_mock(monkeypatch, latency_ms="fixed:300", tokens_per_second="fixed:20",
+             output_tokens="fixed:5", sleep=clock)
+
+    for message in ("Hi", "Any work?"):
+        deltas = [text async for text in stream_npc_response("Bram", "A smith. " * 40, "", "", [], message)]
+        assert len(deltas) == 5
+
+    assert clock.sleeps[:6] == [0.3] + [0.05] * 5
+    assert usage.calls == 2
+    assert usage.output_tokens == 10
+    assert usage.cache_creation_input_tokens == usage.cache_read_input_tokens > 0
+
+
+@pytest.mark.asyncio
+async def test_mock_memory_is_bounded(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the mock forgets the least recently used requests and prefixes."""
+    backend = use_mock(monkeypatch, latency_ms="fixed:0", output_tokens="fixed:3",
+                       sleep=FakeClock(), memory_size=2)
+
+    for name in ("Ann", "Bram", "Cid", "Bram"):
+        await generate_npc_response(name, "A smith. " * 40, "", "", [], "Hi", cache=False)
+
+    assert len(backend._seen) == 2
+    assert list(backend._seen.values()) == [1, 2]  # Cid, then Bram seen twice
+    assert len(backend._prompt_cache) == 2
+
+
+@pytest.mark.asyncio
+async def test_mock_errors_are_retried(monkeypatch: pytest.MonkeyPatch) -> None:
+    use_mock(monkeypatch, latency_ms="fixed:0", error_rate=1.0, sleep=FakeClock())
+
+    reply = await generate_npc_response("Bram", "", "", "", [], "Hi")
+
+    assert reply == "*Bram seems distracted* (API error)"
+    assert llm_dispatcher.get_llm_dispatcher().retries == settings.llm_max_retries
+
+
+@pytest.mark.asyncio
+async def test_gemini_request_and_usage(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test the generateContent request built from Messages-API-shaped input."""
+    monkeypatch.setattr(settings, "llm_backend", "gemini")
+    monkeypatch.setattr(settings, "gemini_api_key", "test-key")
+    usage = TokenUsage()
+    monkeypatch.setattr(gemini_service, "token_usage", usage)
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(200, json={
+            "candidates": [{"content": {"parts": [{"text": " Well met. "}]}}],
+            "usageMetadata": {"promptTokenCount": 120, "cachedContentTokenCount": 100, "candidatesTokenCount": 4},
+        })
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        reply = await generate_npc_response(
+            "Bram", "", "", "", [{"role": "npc", "content": "Hm."}], "Hi", client=client
+        )
+
+    assert reply == "Well met."
+    (request,) = requests
+    assert request.url.path.endswith(f"/models/{settings.gemini_model}:generateContent")
+    assert request.headers["x-goog-api-key"] == "test-key"
+    body = json.loads(request.content)
+    assert "Bram" in body["systemInstruction"]["parts"][0]["text"]
+    assert [c["role"] for c in body["contents"]] == ["model", "user"]
+    assert (usage.input_tokens, usage.cache_read_input_tokens, usage.output_tokens) == (20, 100, 4)
+
+
+@pytest.mark.asyncio
+async def test_gemini_streaming(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "llm_backend", "gemini")
+    monkeypatch.setattr(settings, "gemini_api_key", "test-key")
+    usage = TokenUsage()
+    monkeypatch.setattr(gemini_service, "token_usage", usage)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.params["alt"] == "sse"
+        events = [
+            {"candidates": [{"content": {"parts": [{"text": "Well"}]}}], "usageMetadata": {"promptTokenCount": 50}},
+            {"candidates": [{"content": {"parts": [{"text": " met."}]}}],
+             "usageMetadata": {"promptTokenCount": 50, "candidatesTokenCount": 2}},
+        ]
+        body = "".join(f"data: {json.dumps(event)}\r\n\r\n" for event in events)
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        deltas = [text async for text in stream_npc_response("Bram", "", "", "", [], "Hi", client=client)]
+
+    assert deltas == ["Well", " met."]
+    assert (usage.calls, usage.input_tokens, usage.output_tokens) == (1, 50, 2)
@@ -0,0 +1,157 @@
+"""
+LLM Dispatcher Tests
+--------------------
+Unit tests for bounded concurrency, priority, load shedding and retries.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.exceptions import LlmOverloadedError, NpcUpstreamError
+from app.services.llm_dispatcher import LlmDispatcher, Priority
+
+
+class SleepRecorder:
+    def __init__(self) -> None:
+        self.delays: list[float] = []
+
+    async def __call__(self, delay: float) -> None:
+        self.delays.append(delay)
+
+
+@pytest.mark.asyncio
+async def test_concurrency_is_bounded() -> None:
+    dispatcher = LlmDispatcher(max_concurrency=2, max_queue=10)
+    running = peak = 0
+
+    async def call() -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.001)
+        running -= 1
+
+    await asyncio.gather(*(dispatcher.submit(call) for _ in range(8)))
+
+    assert peak == 2
+    assert dispatcher.dispatched == 8
+    assert (dispatcher.active, dispatcher.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_interactive_calls_jump_the_queue() -> None:
+    dispatcher = LlmDispatcher(max_concurrency=1, max_queue=10)
+    order: list[str] = []
+
+    async def record(name: str) -> None:
+        order.append(name)
+
+    await dispatcher.acquire()
+    background = asyncio.create_task(dispatcher.submit(lambda: record("background"), Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    interactive = asyncio.create_task(dispatcher.submit(lambda: record("interactive")))
+    await asyncio.sleep(0)
+    dispatcher.release()
+    await asyncio.gather(background, interactive)
+
+    assert order == ["interactive", "background"]
+
+
+@pytest.mark.asyncio
+async def test_full_queue_sheds_immediately() -> None:
+    dispatcher = LlmDispatcher(max_concurrency=1, max_queue=1)
+    await dispatcher.acquire()
+    waiter = asyncio.create_task(dispatcher.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(LlmOverloadedError):
+        await dispatcher.acquire()
+
+    dispatcher.release()  # Handed to the waiter
+    await waiter
+    dispatcher.release()
+    assert dispatcher.shed == 1
+    assert dispatcher.active == 0
+
+
+@pytest.mark.asyncio
+async def test_full_queue_displaces_background_waiters() -> None:
+    dispatcher = LlmDispatcher(max_concurrency=1, max_queue=2)
+    await dispatcher.acquire()
+    first = asyncio.create_task(dispatcher.acquire(Priority.BACKGROUND))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(dispatcher.acquire(Priority.BACKGROUND))
+    await asyncio.sleep(0)
+
+    interactive = asyncio.create_task(dispatcher.acquire())
+    await asyncio.sleep(0)
+    with pytest.raises(LlmOverloadedError):
+        await second  # The newest background waiter makes room
+    with pytest.raises(LlmOverloadedError):
+        await dispatcher.acquire(Priority.BACKGROUND)  # Nothing lower to displace
+
+    dispatcher.release()  # Handed to the interactive call
+    await interactive
+    assert not first.done()
+    dispatcher.release()
+    await first
+    dispatcher.release()
+    assert dispatcher.shed == 2
+    assert (dispatcher.active, dispatcher.queued) == (0, 0)
+
+
+@pytest.mark.asyncio
+async def test_queue_timeout_sheds() -> None:
+    dispatcher = LlmDispatcher(max_concurrency=1, max_queue=10, queue_timeout_seconds=0.01)
+    await dispatcher.acquire()
+
+    with pytest.raises(LlmOverloadedError):
+        await dispatcher.acquire()
+
+    assert dispatcher.queued == 0
+    dispatcher.release()
+    assert dispatcher.active == 0
+
+
+@pytest.mark.asyncio
+async def test_retries_overloaded_responses() -> None:
+    sleep = SleepRecorder()
+    dispatcher = LlmDispatcher(max_retries=3, backoff_base_seconds=0.5, sleep=sleep)
+    errors = [
+        NpcUpstreamError("rate limited", status_code=429, retry_after=2.0),
+        NpcUpstreamError("overloaded", status_code=529),
+    ]
+
+    async def call() -> str:
+        if errors:
+            raise errors.pop(0)
+        return "Well met."
+
+    assert await dispatcher.submit(call) == "Well met."
+    assert dispatcher.retries == 2
+    assert 2.0 <= sleep.delays[0] <= 2.5  # retry-after plus jitter
+    assert 0 <= sleep.delays[1] <= 1.0  # Second attempt: up to base * 2
+
+
+@pytest.mark.asyncio
+async def test_gives_up_on_final_errors() -> None:
+    dispatcher = LlmDispatcher(max_retries=2, backoff_max_seconds=8.0, sleep=SleepRecorder())
+    cases = [
+        NpcUpstreamError("bad request", status_code=400),
+        NpcUpstreamError("come back later", status_code=429, retry_after=60.0),
+    ]
+    for error in cases:
+        async def call() -> str:
+            raise error
+
+        with pytest.raises(NpcUpstreamError):
+            await dispatcher.submit(call)
+
+    async def always_overloaded() -> str:
+        raise NpcUpstreamError("overloaded", status_code=529)
+
+    with pytest.raises(NpcUpstreamError):
+        await dispatcher.submit(always_overloaded)
+    assert dispatcher.retries == 2
+    assert dispatcher.active == 0
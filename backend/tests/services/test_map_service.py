@@ -0,0 +1,138 @@
+"""
+Map Service Tests
+-----------------
+Unit tests for map loading and chunk slicing.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from app.services.exceptions import (
+    ChunkOutOfBoundsError,
+    MapLayerNotFoundError,
+    MapNotFoundError,
+)
+from app.services.map_service import MapService, parse_map, slice_chunk
+
+
+def write_map(maps_dir: Path, name: str, width: int, height: int) -> None:
+    """Write a map whose terrain tile ids encode their position."""
+    terrain = [[y * width + x for x in range(width)] for y in range(height)]
+    decoration = [[0] * width for _ in range(height)]
+    data = {
+        "name": name,
+        "width": width,
+        "height": height,
+        "tileSize": 16,
+        "tileset": "overworld_tileset_grass",
+        "layers": [
+            {"name": "terrain", "data": terrain},
+            {"name": "decoration", "data": decoration},
+        ],
+    }
+    (maps_dir / f"{name}.json").write_text(json.dumps(data))
+
+
+class TestParseMap:
+    """Tests for map parsing."""
+
+    def test_layers_are_flat_row_major(self) -> None:
+        """Test that tile (x, y) is stored at y * width + x."""
+        raw = json.dumps({
+            "width": 3,
+            "height": 2,
+            "layers": [{"name": "terrain", "data": [[1, 2, 3], [4, 5, 6]]}],
+        }).encode()
+
+        tile_map = parse_map("test", raw)
+
+        assert list(tile_map.layers["terrain"]) == [1, 2, 3, 4, 5, 6]
+        assert tile_map.tile("terrain", 2, 1) == 6
+
+    def test_short_rows_are_padded(self) -> None:
+        """Test that missing tiles default to 0."""
+        raw = json.dumps({
+            "width": 3,
+            "height": 2,
+            "layers": [{"name": "terrain", "data": [[1, 2]]}],
+        }).encode()
+
+        tile_map = parse_map("test", raw)
+
+        assert list(tile_map.layers["terrain"]) == [1, 2, 0, 0, 0, 0]
+
+
+class TestSliceChunk:
+    """Tests for chunk slicing."""
+
+    def test_edge_chunk_is_clipped(self, tmp_path: Path) -> None:
+        """Test that chunks past the map edge only contain in-bounds tiles."""
+        write_map(tmp_path, "grid", 5, 3)
+        tile_map = MapService(tmp_path, 4).get_map("grid")
+
+        assert slice_chunk(tile_map, "terrain", 1, 0, 4) == [4, 9, 14]
+        assert slice_chunk(tile_map, "terrain", 0, 0, 4) == [
+            0, 1, 2, 3,
+            5, 6, 7, 8,
+            10, 11, 12, 13,
+        ]
+
+
+class TestMapService:
+    """Tests for the map service."""
+
+    def test_chunk_payload(self, tmp_path: Path) -> None:
+        """Test that chunk payloads contain the requested layers only."""
+        write_map(tmp_path, "grid", 10, 10)
+        service = MapService(tmp_path, 4)
+
+        chunk = service.get_chunk("grid", 2, 2, ["terrain"])
+        payload = json.loads(chunk.body)
+
+        assert list(payload["layers"]) == ["terrain"]
+        assert payload["width"] == 2
+        assert payload["height"] == 2
+        assert payload["layers"]["terrain"] == [88, 89, 98, 99]
+        assert gzip.decompress(chunk.gzip_body) == chunk.body
+
+    def test_chunks_are_cached(self, tmp_path: Path) -> None:
+        """Test that repeated requests reuse the encoded chunk."""
+        write_map(tmp_path, "grid", 10, 10)
+        service = MapService(tmp_path, 4)
+
+        first = service.get_chunk("grid", 0, 0)
+        second = service.get_chunk("grid", 0, 0)
+
+        assert first is second
+
+    def test_modified_map_is_reloaded(self, tmp_path: Path) -> None:
+        """Test that a changed map file invalidates its chunks."""
+        write_map(tmp_path, "grid", 10, 10)
+        service = MapService(tmp_path, 4)
+        before = service.get_chunk("grid", 0, 0)
+
+        write_map(tmp_path, "grid", 12, 10)
+        path = tmp_path / "grid.json"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        after = service.get_chunk("grid", 0, 0)
+        assert after.etag != before.etag
+
+    def test_errors(self, tmp_path: Path) -> None:
+        """Test missing maps, layers and out-of-bounds chunks."""
+        write_map(tmp_path, "grid", 10, 10)
+        service = MapService(tmp_path, 4)
+
+        with pytest.raises(MapNotFoundError):
+            service.get_map("missing")
+        with pytest.raises(MapNotFoundError):
+            service.get_map("../grid")
+        with pytest.raises(MapLayerNotFoundError):
+            service.get_chunk("grid", 0, 0, ["clouds"])
+        with pytest.raises(ChunkOutOfBoundsError):
+            service.get_chunk("grid", 3, 0)
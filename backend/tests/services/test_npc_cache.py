@@ -0,0 +1,108 @@
+"""
+NPC Response Cache Tests
+------------------------
+Unit tests for cache keys, TTL and LRU eviction, and persistence.
+"""
+
+import json
+from pathlib import Path
+
+from app.services.npc_cache import NpcResponseCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def user(content: str) -> dict[str, str]:
+    return {"role": "user", "content": content}
+
+
+class TestCacheKey:
+    """Tests for request normalization."""
+
+    def test_equivalent_requests_share_a_key(self) -> None:
+        key = make_cache_key("You are  Bram.\n", [user("Who are you?")])
+
+        assert make_cache_key("you are Bram.", [user("  who are   you")]) == key
+
+    def test_context_changes_the_key(self) -> None:
+        key = make_cache_key("You are Bram.", [user("Hello")])
+
+        assert make_cache_key("You are Ilsa.", [user("Hello")]) != key
+        assert make_cache_key("You are Bram.", [user("Hi"), user("Hello")]) != key
+        assert make_cache_key("You are Bram.", [user("Goodbye")]) != key
+
+
+class TestNpcResponseCache:
+    """Tests for expiry, eviction and persistence."""
+
+    def test_ttl(self) -> None:
+        clock = FakeClock()
+        cache = NpcResponseCache(max_entries=10, ttl_seconds=60, clock=clock)
+        cache.set("k", "Well met.")
+
+        assert cache.get("k") == "Well met."
+        clock.now += 61
+        assert cache.get("k") is None
+        assert (cache.hits, cache.misses, cache.expirations) == (1, 1, 1)
+        assert len(cache) == 0
+
+    def test_lru_eviction(self) -> None:
+        cache = NpcResponseCache(max_entries=2, ttl_seconds=60)
+        cache.set("a", "1")
+        cache.set("b", "2")
+        cache.get("a")  # "b" is now least recently used
+        cache.set("c", "3")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "1"
+        assert cache.get("c") == "3"
+        assert cache.evictions == 1
+
+    def test_persistence(self, tmp_path: Path) -> None:
+        clock = FakeClock()
+        path = tmp_path / "npc_cache.json"
+        cache = NpcResponseCache(max_entries=10, ttl_seconds=60, path=path, clock=clock)
+        cache.set("old", "stale")
+        clock.now += 30
+        cache.set("new", "fresh")
+        clock.now += 40  # "old" has expired
+
+        assert cache.save() == 1
+
+        restored = NpcResponseCache(max_entries=10, ttl_seconds=60, path=path, clock=clock)
+        assert restored.load() == 1
+        assert restored.get("new") == "fresh"
+
+    def test_unreadable_file_is_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "npc_cache.json"
+        path.write_text("not json")
+
+        assert NpcResponseCache(path=path).load() == 0
+
+    def test_corrupt_entries_are_skipped(self, tmp_path: Path) -> None:
+        path = tmp_path / "npc_cache.json"
+        path.write_text(json.dumps([
+            ["good", 2000.0, "hello"],
+            ["short", 2000.0],
+            "not an entry",
+            [1, 2000.0, "bad key"],
+            ["bad expiry", "soon", "x"],
+            ["also good", 2000, "there"],
+        ]))
+
+        cache = NpcResponseCache(path=path, clock=FakeClock())
+        assert cache.load() == 2
+        assert cache.get("good") == "hello"
+        assert cache.get("also good") == "there"
+
+    def test_non_list_file_is_ignored(self, tmp_path: Path) -> None:
+        path = tmp_path / "npc_cache.json"
+        path.write_text(json.dumps({"good": [100.0, "hello"]}))
+
+        assert NpcResponseCache(path=path).load() == 0
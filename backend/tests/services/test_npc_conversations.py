@@ -0,0 +1,97 @@
+"""
+NPC Conversations Tests
+-----------------------
+Unit tests for server-side sessions and background summaries.
+"""
+
+import json
+
+import httpx
+import pytest
+
+from app.config import settings
+from app.services import gemini_service, llm_dispatcher
+from app.services.npc_conversations import ConversationStore
+
+
+class FakeSummarizer:
+    """Fake Messages API for summary calls; fails the first `failures` calls."""
+
+    def __init__(self) -> None:
+        self.bodies: list[dict] = []
+        self.failures = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.bodies.append(json.loads(request.content))
+        if len(self.bodies) <= self.failures:
+            return httpx.Response(500)
+        return httpx.Response(200, json={"content": [{"type": "text", "text": "Player owes Bram 5 gold."}]})
+
+
+@pytest.fixture
+def summarizer(monkeypatch: pytest.MonkeyPatch) -> FakeSummarizer:
+    fake = FakeSummarizer()
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(settings, "npc_session_keep_turns", 2)
+    monkeypatch.setattr(
+        gemini_service, "_http_client", httpx.AsyncClient(transport=httpx.MockTransport(fake))
+    )
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", llm_dispatcher.LlmDispatcher())
+    return fake
+
+
+@pytest.mark.asyncio
+async def test_old_turns_are_summarized(summarizer: FakeSummarizer) -> None:
+    store = ConversationStore()
+    conversation = store.open("player-1", "Bram")
+
+    for i in range(5):
+        store.record(conversation, f"Question {i}", f"Answer {i}")
+    await store.wait_idle()
+
+    # One background summary folded in everything but the newest two messages
+    assert conversation.summary == "Player owes Bram 5 gold."
+    assert conversation.turns == [
+        {"role": "player", "content": "Question 4"},
+        {"role": "npc", "content": "Answer 4"},
+    ]
+    assert conversation.summarized_turns == 8
+    (body,) = summarizer.bodies
+    assert "Bram: Answer 0" in body["messages"][0]["content"]
+    assert body["max_tokens"] == settings.npc_summary_max_tokens
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_turns(summarizer: FakeSummarizer) -> None:
+    summarizer.failures = 1
+    store = ConversationStore()
+    conversation = store.open("player-1", "Bram")
+
+    for i in range(5):
+        store.record(conversation, f"Question {i}", f"Answer {i}")
+    await store.wait_idle()
+
+    assert conversation.summary == ""
+    assert len(conversation.turns) == 10
+    assert store.summary_failures == 1
+
+    store.record(conversation, "Question 5", "Answer 5")
+    await store.wait_idle()
+    assert conversation.summary == "Player owes Bram 5 gold."
+    assert len(conversation.turns) == 2
+
+
+def test_sessions_are_per_player_and_npc() -> None:
+    store = ConversationStore(max_sessions=2)
+    seeded = store.open("p1", "Bram", seed_history=[{"role": "player", "content": "Hi"}])
+
+    assert store.open("p1", "Bram") is seeded
+    assert store.open("p1", "Bram", seed_history=[{"role": "player", "content": "Other"}]).turns == [
+        {"role": "player", "content": "Hi"}
+    ]
+    assert store.open("p2", "Bram") is not seeded
+    store.open("p1", "Ilsa")
+
+    # Least recently used session was evicted
+    assert len(store) == 2
+    assert store.open("p1", "Bram") is not seeded
@@ -0,0 +1,108 @@
+"""
+NPC Pre-generation Service Tests
+--------------------------------
+Unit tests for canned intent detection and batch line generation.
+"""
+
+import asyncio
+import json
+from contextlib import nullcontext
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.schemas.npc import NpcProfile, PregenJob
+from app.services import llm_dispatcher
+from app.services.npc_pregen_service import (
+    INTENT_PROMPTS,
+    NpcPregenService,
+    detect_intent,
+    pregenerate,
+    profile_prompt,
+)
+
+
+@pytest.fixture(autouse=True)
+def api_key(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "anthropic_api_key", "test-key")
+    monkeypatch.setattr(llm_dispatcher, "_dispatcher", llm_dispatcher.LlmDispatcher())
+
+
+def test_detect_intent() -> None:
+    """Test that only plain greetings are detected."""
+    assert detect_intent("Hello!") == "greeting"
+    assert detect_intent("  good evening, stranger ") == "greeting"
+    assert detect_intent("Hello, where is the smithy?") is None
+    assert detect_intent("Who are you?") is None
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_bounded(db_session: AsyncSession) -> None:
+    """Test that variants are generated with bounded concurrency and stored deduplicated."""
+    in_flight = 0
+    peak = 0
+    calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak, calls
+        calls += 1
+        body = json.loads(request.content)
+        text = "Ho there." if calls % 2 else f"Hello {calls}."
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        assert body["messages"][-1]["content"] in INTENT_PROMPTS.values()
+        return httpx.Response(200, json={"content": [{"type": "text", "text": text}]})
+
+    jobs = [
+        PregenJob(npc=NpcProfile(name="Bram"), intents=["greeting", "bark"]),
+        PregenJob(npc=NpcProfile(name="Mira", personality="Shy")),
+    ]
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        result = await pregenerate(
+            jobs, lambda: nullcontext(db_session), variants=4, concurrency=2, client=client
+        )
+
+    assert calls == 12
+    assert peak == 2
+    assert result.failed == 0
+    # Each intent has one repeated "Ho there." among its four samples
+    assert result.lines == 9
+
+    service = NpcPregenService(db_session)
+    line = await service.get_line("Mira", profile_prompt(jobs[1].npc), "greeting")
+    assert line is not None
+    assert await service.get_line("Mira", profile_prompt(NpcProfile(name="Mira")), "greeting") is None
+    assert await service.get_line("Mira", profile_prompt(jobs[1].npc), "bark") is None
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_failures_keep_lines(db_session: AsyncSession) -> None:
+    """Test that an intent whose calls all fail keeps its previous lines."""
+    system_prompt = profile_prompt(NpcProfile(name="Bram"))
+    service = NpcPregenService(db_session)
+    await service.replace_lines("Bram", system_prompt, "greeting", ["Old greeting."])
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(lambda r: httpx.Response(500))) as client:
+        result = await pregenerate(
+            [PregenJob(npc=NpcProfile(name="Bram"))],
+            lambda: nullcontext(db_session),
+            variants=2,
+            client=client,
+        )
+
+    assert (result.lines, result.failed) == (0, 2)
+    assert await service.get_line("Bram", system_prompt, "greeting") == "Old greeting."
+
+
+@pytest.mark.asyncio
+async def test_pregenerate_unknown_intent(db_session: AsyncSession) -> None:
+    """Test that intents without a prompt are rejected before any call."""
+    with pytest.raises(ValueError):
+        await pregenerate(
+            [PregenJob(npc=NpcProfile(name="Bram"), intents=["haggle"])],
+            lambda: nullcontext(db_session),
+        )
@@ -0,0 +1,153 @@
+"""
+Pathfinding Service Tests
+-------------------------
+Unit tests for hierarchical pathfinding.
+"""
+
+import random
+
+from app.services.pathfinding_service import HpaGraph, search_grid
+
+
+def make_grid(width: int, height: int, blocked: float, seed: int) -> bytearray:
+    """Random walkability grid with the given fraction of blocked tiles."""
+    rng = random.Random(seed)
+    return bytearray(rng.random() >= blocked for _ in range(width * height))
+
+
+def assert_valid_path(
+    passable: bytearray,
+    width: int,
+    start: tuple[int, int],
+    goal: tuple[int, int],
+    path: list[tuple[int, int]],
+) -> None:
+    """Check that a path walks between walkable neighbors from start to goal."""
+    previous = start
+    for x, y in path:
+        assert passable[y * width + x]
+        assert max(abs(x - previous[0]), abs(y - previous[1])) == 1
+        previous = (x, y)
+    assert previous == goal
+
+
+class TestHpaGraph:
+    """Tests for the abstract graph and path queries."""
+
+    def test_open_map_straight_line(self) -> None:
+        """Test a cross-cluster path on an empty map."""
+        graph = HpaGraph(30, 20, bytearray([1] * 600), 10)
+
+        result = graph.find_path((0, 5), (29, 5))
+
+        assert result.found
+        # Smoothing removes most of the detour through border entrances
+        assert result.cost < 29 * 1.1
+        assert_valid_path(graph.passable, 30, (0, 5), (29, 5), result.path)
+
+    def test_wall_with_gap(self) -> None:
+        """Test routing through the only gap in a wall."""
+        width, height = 20, 20
+        passable = bytearray([1] * width * height)
+        for y in range(height):
+            if y != 17:
+                passable[y * width + 10] = 0
+        graph = HpaGraph(width, height, passable, 5)
+
+        result = graph.find_path((2, 2), (18, 2))
+
+        assert result.found
+        assert (10, 17) in result.path
+        assert_valid_path(passable, width, (2, 2), (18, 2), result.path)
+
+    def test_unreachable_and_blocked(self) -> None:
+        """Test goals that are walled off or not walkable."""
+        width, height = 20, 10
+        passable = bytearray([1] * width * height)
+        for y in range(height):
+            passable[y * width + 10] = 0
+        graph = HpaGraph(width, height, passable, 5)
+
+        assert not graph.find_path((0, 0), (19, 0)).found
+        assert not graph.find_path((0, 0), (10, 0)).found
+        assert not graph.find_path((0, 0), (25, 0)).found
+
+    def test_same_tile(self) -> None:
+        """Test a query whose start is the goal."""
+        graph = HpaGraph(10, 10, bytearray([1] * 100), 5)
+
+        result = graph.find_path((3, 3), (3, 3))
+
+        assert result.found
+        assert result.path == []
+
+    def test_diagonal_border_crossing(self) -> None:
+        """Test a goal reachable only by a diagonal step across a cluster border."""
+        rows = ["....#...", "...#....", "...##...", "...##..."]
+        passable = bytearray(tile == "." for row in rows for tile in row)
+        graph = HpaGraph(8, 4, passable, 4)
+
+        result = graph.find_path((0, 0), (7, 0))
+
+        assert result.found
+        assert_valid_path(passable, 8, (0, 0), (7, 0), result.path)
+
+    def test_diagonal_corner_crossing(self) -> None:
+        """Test clusters that only connect through their shared corner."""
+        width = height = 12
+        passable = bytearray([0] * width * height)
+        for i in range(width):
+            passable[i * width + i] = 1  # A single diagonal corridor
+        graph = HpaGraph(width, height, passable, 4)
+
+        result = graph.find_path((0, 0), (11, 11))
+
+        assert result.found
+        assert len(result.path) == 11
+        assert_valid_path(passable, width, (0, 0), (11, 11), result.path)
+
+    def test_random_maps_match_full_grid_search(self) -> None:
+        """Test HPA* reachability and cost against full-grid A* on many random maps."""
+        rng = random.Random(11)
+        for seed in range(60):
+            width, height = rng.randint(5, 40), rng.randint(5, 40)
+            passable = make_grid(width, height, rng.uniform(0.1, 0.5), seed)
+            graph = HpaGraph(width, height, passable, rng.randint(3, 10))
+            open_cells = [i for i, walkable in enumerate(passable) if walkable]
+            if len(open_cells) < 2:
+                continue
+
+            for _ in range(20):
+                s, g = rng.sample(open_cells, 2)
+                start = (s % width, s // width)
+                goal = (g % width, g // width)
+
+                dist, _ = search_grid(passable, width, s, (0, 0, width, height), g)
+                result = graph.find_path(start, goal)
+
+                assert result.found == (g in dist), (seed, start, goal)
+                if result.found:
+                    assert_valid_path(passable, width, start, goal, result.path)
+                    assert dist[g] - 1e-9 <= result.cost <= dist[g] * 1.5 + 1
+
+    def test_matches_full_grid_search(self) -> None:
+        """Test HPA* against full-grid A* on random maps."""
+        width, height = 60, 45
+        passable = make_grid(width, height, 0.25, seed=7)
+        graph = HpaGraph(width, height, passable, 10)
+        rng = random.Random(3)
+        open_cells = [i for i, walkable in enumerate(passable) if walkable]
+
+        for _ in range(100):
+            s, g = rng.sample(open_cells, 2)
+            start = (s % width, s // width)
+            goal = (g % width, g // width)
+
+            dist, _ = search_grid(passable, width, s, (0, 0, width, height), g)
+            result = graph.find_path(start, goal)
+
+            assert result.found == (g in dist)
+            if result.found:
+                assert_valid_path(passable, width, start, goal, result.path)
+                # HPA* is near-optimal, not exact
+                assert result.cost <= dist[g] * 1.3 + 2
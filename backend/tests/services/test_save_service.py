@@ -0,0 +1,238 @@
+"""
+Save Service Tests
+------------------
+Unit tests for sectioned, incremental delta saves.
+"""
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.models.saves import GameSaveDelta
+from app.services import save_service
+from app.services.exceptions import (
+    GameSaveNotFoundError,
+    SaveConflictError,
+    UnknownSaveSectionError,
+)
+from app.services.save_service import (
+    SaveService,
+    apply_patch,
+    diff_state,
+    merge_sections,
+    split_state,
+)
+
+
+def make_state(turn: int) -> dict:
+    return {
+        "turn": turn,
+        "heroes": [{"id": "h1", "x": turn, "y": 4, "hp": 100 - turn}],
+        "flags": {"tutorial_done": turn > 2},
+        "log": [f"turn {i}" for i in range(turn)],
+    }
+
+
+async def count_deltas(db: AsyncSession, game_id: str) -> int:
+    result = await db.execute(
+        select(func.count()).select_from(GameSaveDelta).where(GameSaveDelta.game_save_id == game_id)
+    )
+    return result.scalar_one()
+
+
+class TestPatches:
+    """Tests for diffing and patching."""
+
+    def test_round_trip(self) -> None:
+        """Test that applying a diff reproduces the new state."""
+        old = {"a": 1, "b": {"c": [1, 2, 3], "d": "x"}, "gone": True}
+        new = {"a": 2, "b": {"c": [1, 5, 3], "d": "x"}, "added": [1]}
+
+        ops = diff_state(old, new)
+
+        assert apply_patch(old, ops) == new
+
+    def test_diff_is_minimal(self) -> None:
+        """Test that unchanged branches produce no operations."""
+        old = {"big": list(range(1000)), "hero": {"x": 1}}
+        new = {"big": list(range(1000)), "hero": {"x": 2}}
+
+        assert diff_state(old, new) == [{"op": "replace", "path": ["hero", "x"], "value": 2}]
+
+    def test_resized_list_is_replaced(self) -> None:
+        ops = diff_state({"log": [1]}, {"log": [1, 2]})
+        assert ops == [{"op": "replace", "path": ["log"], "value": [1, 2]}]
+
+
+class TestSections:
+    """Tests for splitting states into sections."""
+
+    def test_split_and_merge(self) -> None:
+        state = make_state(3)
+        sections = split_state(state)
+
+        assert set(sections) == {"heroes", "meta"}
+        assert sections["meta"] == {"turn": 3, "flags": state["flags"], "log": state["log"]}
+        assert merge_sections(sections) == state
+
+
+class TestSaveService:
+    """Tests for saving and loading."""
+
+    @pytest.mark.asyncio
+    async def test_save_and_reconstruct(self, db_session: AsyncSession) -> None:
+        """Test that base plus deltas reconstructs the latest state."""
+        service = SaveService(db_session)
+        game_id = await service.create(make_state(0))
+
+        for turn in range(1, 6):
+            result = await service.save(game_id, make_state(turn))
+            assert result.seq == turn
+            assert result.ops > 0
+
+        # Force reconstruction from the database
+        save_service._section_cache.clear()
+        seq, state = await service.load(game_id)
+
+        assert seq == 5
+        assert state == make_state(5)
+        # One delta each for the heroes and meta sections per save
+        assert await count_deltas(db_session, game_id) == 10
+
+    @pytest.mark.asyncio
+    async def test_unchanged_state_writes_nothing(self, db_session: AsyncSession) -> None:
+        service = SaveService(db_session)
+        game_id = await service.create(make_state(1))
+
+        result = await service.save(game_id, make_state(1))
+
+        assert result.seq == 0
+        assert result.ops == 0
+        assert await count_deltas(db_session, game_id) == 0
+
+    @pytest.mark.asyncio
+    async def test_compaction(
+        self, db_session: AsyncSession, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Test that deltas are folded into the base snapshot periodically."""
+        monkeypatch.setattr(settings, "save_compaction_interval", 3)
+        service = SaveService(db_session)
+        game_id = await service.create(make_state(0))
+
+        results = [await service.save(game_id, make_state(turn)) for turn in range(1, 5)]
+
+        assert [r.compacted for r in results] == [False, False, True, False]
+        assert await count_deltas(db_session, game_id) == 2
+
+        save_service._section_cache.clear()
+        seq, state = await service.load(game_id)
+        assert seq == 4
+        assert state == make_state(4)
+
+    @pytest.mark.asyncio
+    async def test_missing_save(self, db_session: AsyncSession) -> None:
+        service = SaveService(db_session)
+
+        with pytest.raises(GameSaveNotFoundError):
+            await service.load("missing")
+
+    @pytest.mark.asyncio
+    async def test_sections_load_lazily(self, db_session: AsyncSession) -> None:
+        """Test that opening a save loads no data and get() loads one section."""
+        service = SaveService(db_session)
+        game_id = await service.create({**make_state(1), "quest_flags": {"intro": True}})
+        save_service._section_cache.clear()
+
+        session = await service.open(game_id)
+        assert session._sections["heroes"].loaded is False
+
+        assert await session.get("quest_flags") == {"intro": True}
+        assert session._sections["quest_flags"].loaded is True
+        assert session._sections["heroes"].loaded is False
+
+    @pytest.mark.asyncio
+    async def test_only_dirty_sections_are_written(self, db_session: AsyncSession) -> None:
+        service = SaveService(db_session)
+        game_id = await service.create({"heroes": [], "inventory": {"gold": 10}})
+
+        session = await service.open(game_id)
+        session.set("inventory", {"gold": 25})
+        session.set("heroes", [])  # Unchanged, diffed away on flush
+        assert session.dirty_sections == ["heroes", "inventory"]
+
+        result = await session.flush()
+
+        assert result.sections == ["inventory"]
+        assert result.seq == 1
+        assert session.dirty_sections == []
+
+        # A partial update leaves the other sections untouched
+        session = await service.open(game_id)
+        session.update({"heroes": [{"id": "h1"}]})
+        await session.flush()
+        save_service._section_cache.clear()
+        _, state = await service.load(game_id)
+        assert state == {"heroes": [{"id": "h1"}], "inventory": {"gold": 25}}
+
+    @pytest.mark.asyncio
+    async def test_full_save_clears_missing_keys(self, db_session: AsyncSession) -> None:
+        """Test that a full save replaces the state instead of merging into it."""
+        service = SaveService(db_session)
+        game_id = await service.create({"heroes": [], "inventory": {"gold": 10}, "turn": 1, "flags": {}})
+
+        await service.save(game_id, {"heroes": [{"id": "h1"}], "turn": 2})
+        save_service._section_cache.clear()
+        _, state = await service.load(game_id)
+        assert state == {"heroes": [{"id": "h1"}], "turn": 2}
+
+        # Clearing every meta key clears the meta section
+        await service.save(game_id, {"heroes": []})
+        save_service._section_cache.clear()
+        _, state = await service.load(game_id)
+        assert state == {"heroes": []}
+
+    @pytest.mark.asyncio
+    async def test_concurrent_saves_conflict(self, db_session: AsyncSession) -> None:
+        """Test that a save based on an outdated seq is rejected, not half-applied."""
+        service = SaveService(db_session)
+        game_id = await service.create({"heroes": [], "turn": 1})
+
+        first = await service.open(game_id)
+        second = await service.open(game_id)
+        first.update({"heroes": [{"id": "h1"}], "turn": 2})
+        second.update({"heroes": [{"id": "h2"}], "turn": 3})
+
+        assert (await first.flush()).seq == 1
+        with pytest.raises(SaveConflictError):
+            await second.flush()
+
+        save_service._section_cache.clear()
+        seq, state = await service.load(game_id)
+        assert seq == 1
+        assert state == {"heroes": [{"id": "h1"}], "turn": 2}
+        assert await count_deltas(db_session, game_id) == 2
+
+    @pytest.mark.asyncio
+    async def test_sections_are_cached_only_after_commit(self, db_session: AsyncSession) -> None:
+        """Test that a rolled-back save never leaves its section data in the cache."""
+        service = SaveService(db_session)
+        game_id = await service.create({"heroes": []})
+        await db_session.commit()
+
+        await service.save(game_id, {"heroes": [{"id": "rolled back"}]})
+        assert save_service._section_cache[(game_id, "heroes")][0] == 0
+        await db_session.rollback()
+        assert save_service._section_cache[(game_id, "heroes")] == (0, [])
+
+        await service.save(game_id, {"heroes": [{"id": "h1"}]})
+        await db_session.commit()
+        assert save_service._section_cache[(game_id, "heroes")] == (1, [{"id": "h1"}])
+
+    @pytest.mark.asyncio
+    async def test_unknown_section(self, db_session: AsyncSession) -> None:
+        service = SaveService(db_session)
+        game_id = await service.create()
+
+        with pytest.raises(UnknownSaveSectionError):
+            await service.load(game_id, ["spells"])
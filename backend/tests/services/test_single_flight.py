@@ -0,0 +1,96 @@
+"""
+Single Flight Tests
+-------------------
+Unit tests for coalescing identical concurrent calls.
+"""
+
+import asyncio
+
+import pytest
+
+from app.services.single_flight import SingleFlight
+
+
+class Upstream:
+    """A slow call that records how often it ran and can be released or failed."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    async def __call__(self) -> str:
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return "Well met."
+
+
+async def start(flight: SingleFlight, upstream: Upstream, waiters: int) -> list[asyncio.Task]:
+    tasks = [asyncio.create_task(flight.do("key", upstream)) for _ in range(waiters)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+@pytest.mark.asyncio
+async def test_waiters_share_one_call() -> None:
+    flight, upstream = SingleFlight(), Upstream()
+    tasks = await start(flight, upstream, 5)
+
+    upstream.release.set()
+    results = await asyncio.gather(*tasks)
+
+    assert results == ["Well met."] * 5
+    assert upstream.calls == 1
+    assert (flight.calls, flight.coalesced) == (1, 4)
+    assert len(flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_failure_reaches_every_waiter() -> None:
+    flight, upstream = SingleFlight(), Upstream()
+    upstream.error = RuntimeError("overloaded")
+    tasks = await start(flight, upstream, 3)
+
+    upstream.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+
+    assert all(isinstance(r, RuntimeError) for r in results)
+    # A later call starts a fresh flight
+    upstream.error = None
+    assert await flight.do("key", upstream) == "Well met."
+    assert upstream.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_call_running() -> None:
+    flight, upstream = SingleFlight(), Upstream()
+    leaving, staying = await start(flight, upstream, 2)
+
+    leaving.cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+
+    assert await staying == "Well met."
+    assert leaving.cancelled()
+    assert not upstream.cancelled
+
+
+@pytest.mark.asyncio
+async def test_last_waiter_leaving_cancels_call() -> None:
+    flight, upstream = SingleFlight(), Upstream()
+    tasks = await start(flight, upstream, 2)
+
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+
+    assert upstream.cancelled
+    assert len(flight) == 0
@@ -0,0 +1,79 @@
+"""
+Database Setup Tests
+--------------------
+Tests for engine construction, SQLite tuning and the schema version check.
+"""
+
+from pathlib import Path
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, inspect, text
+
+from app.config import settings
+from app.database import build_engine, ensure_schema, schema_fingerprint
+
+
+@pytest.mark.asyncio
+async def test_sqlite_pragmas_applied(tmp_path: Path) -> None:
+    """Test that the performance PRAGMAs are set on new connections."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'tuned.db'}", tuned=True)
+
+    async with engine.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+        busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+        cache_size = (await conn.execute(text("PRAGMA cache_size"))).scalar()
+
+    await engine.dispose()
+
+    assert journal_mode == "wal"
+    assert synchronous == 1  # NORMAL
+    assert busy_timeout == settings.sqlite_busy_timeout_ms
+    assert cache_size == -settings.sqlite_cache_size_kib
+    assert engine.pool.size() == settings.db_pool_size
+
+
+@pytest.mark.asyncio
+async def test_untuned_and_in_memory(tmp_path: Path) -> None:
+    untuned = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'plain.db'}", tuned=False)
+    async with untuned.connect() as conn:
+        assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "delete"
+    await untuned.dispose()
+
+    # In-memory databases skip pool sizing and WAL but still get tuned
+    memory = build_engine("sqlite+aiosqlite:///:memory:", tuned=True)
+    async with memory.connect() as conn:
+        assert (await conn.execute(text("PRAGMA busy_timeout"))).scalar() == settings.sqlite_busy_timeout_ms
+    await memory.dispose()
+
+
+def player_metadata(*extra: Column) -> MetaData:
+    metadata = MetaData()
+    Table("players", metadata, Column("id", Integer, primary_key=True), Column("name", String(50)), *extra)
+    return metadata
+
+
+@pytest.mark.asyncio
+async def test_ensure_schema_skips_current_schema(tmp_path: Path) -> None:
+    """Test that create_all only runs when the models changed."""
+    engine = build_engine(f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}")
+    metadata = player_metadata()
+
+    assert await ensure_schema(engine, metadata) is True
+    assert await ensure_schema(engine, metadata) is False
+
+    # A new table changes the fingerprint, so it gets created
+    Table("guilds", metadata, Column("id", Integer, primary_key=True))
+    assert await ensure_schema(engine, metadata) is True
+    async with engine.connect() as conn:
+        tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+    await engine.dispose()
+
+    assert {"players", "guilds", "schema_version"} <= set(tables)
+
+
+def test_schema_fingerprint_tracks_columns() -> None:
+    assert schema_fingerprint(player_metadata()) == schema_fingerprint(player_metadata())
+    assert schema_fingerprint(player_metadata()) != schema_fingerprint(
+        player_metadata(Column("level", Integer))
+    )
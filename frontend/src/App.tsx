@@ -11,17 +11,20 @@ import Phaser from 'phaser';
 import { CombatScene } from './game/scenes/CombatScene';
 import { SkirmishDeploymentUI } from './components/ui/SkirmishDeploymentUI';
 import { BattlefieldData } from './types/combatTerrain';
+import { loadAssetManifest } from './api/assets';
 
 const App: React.FC = () => {
   const gameRef = useRef<Phaser.Game | null>(null);
   const [game, setGame] = useState<Phaser.Game | null>(null);
   const [battlefield, setBattlefield] = useState<BattlefieldData | null>(null);
 
-  // Load battlefield data on mount
+  // Load battlefield data and the asset manifest (hashed asset URLs) on mount
   useEffect(() => {
-    fetch('/battlefields/battlefield1.json')
-      .then(res => res.json())
-      .then((data: BattlefieldData) => setBattlefield(data))
+    Promise.all([
+      fetch('/battlefields/battlefield1.json').then(res => res.json()),
+      loadAssetManifest(),
+    ])
+      .then(([data]: [BattlefieldData, unknown]) => setBattlefield(data))
       .catch(err => console.warn('Failed to load battlefield:', err));
   }, []);
 
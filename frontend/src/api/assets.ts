@@ -0,0 +1,44 @@
+/**
+ * Asset Manifest Client
+ * ---------------------
+ * Resolves logical asset paths (e.g. 'assets/units/knight_idle.png') to
+ * the content-hashed files the backend serves with immutable caching, so
+ * repeat visits load every unchanged asset from the browser cache.
+ * Falls back to the logical path when no manifest is available (e.g. the
+ * Vite dev server without an asset build).
+ */
+
+const API_BASE = '/api/assets';
+
+/** Hashed file locations, as returned by the backend */
+export interface AssetManifest {
+  base_url: string;
+  files: Record<string, string>;
+}
+
+let manifest: AssetManifest | null = null;
+
+/**
+ * Fetch the asset manifest once; later calls reuse it. Never rejects.
+ */
+export async function loadAssetManifest(): Promise<AssetManifest | null> {
+  if (manifest) return manifest;
+
+  try {
+    const response = await fetch(`${API_BASE}/manifest`);
+    if (response.ok) {
+      manifest = await response.json();
+    }
+  } catch (err) {
+    console.warn('Asset manifest unavailable, using unhashed assets:', err);
+  }
+  return manifest;
+}
+
+/**
+ * URL of an asset by logical path: its hashed file if built, else the path itself.
+ */
+export function assetUrl(path: string): string {
+  const hashed = manifest?.files[path];
+  return hashed ? `${manifest!.base_url}${hashed}` : path;
+}
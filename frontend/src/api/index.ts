@@ -4,4 +4,6 @@
  * Re-exports all API functions for easy importing.
  */
 
+export * from './assets';
 export * from './combat';
+export * from './maps';
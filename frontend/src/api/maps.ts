@@ -0,0 +1,188 @@
+/**
+ * Map API Client
+ * --------------
+ * Functions for streaming overworld map chunks from the backend.
+ * Fetch the map info once, then request only the chunks covering the viewport.
+ * Also syncs per-player fog of war, which the server updates incrementally.
+ */
+
+const API_BASE = '/api/maps';
+
+/** Map metadata used to plan chunk requests */
+export interface MapInfo {
+  name: string;
+  width: number;
+  height: number;
+  tile_size: number;
+  tileset: string;
+  layers: string[];
+  chunk_size: number;
+  chunks_x: number;
+  chunks_y: number;
+}
+
+/** One chunk of tiles; each layer is a flat row-major list of tile ids */
+export interface MapChunk {
+  map: string;
+  cx: number;
+  cy: number;
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+  layers: Record<string, number[]>;
+}
+
+/** Runs of flat tile indices (y * width + x) as [start, length] */
+export type CellRuns = Array<[number, number]>;
+
+/** Fog changes caused by one vision update */
+export interface FogDiff {
+  revealed: CellRuns;
+  hidden: CellRuns;
+  explored: CellRuns;
+}
+
+/** Full fog state as base64 bitmaps (bit i = cell i) */
+export interface FogSnapshot {
+  width: number;
+  height: number;
+  explored: string;
+  visible: string;
+}
+
+/** Viewport rectangle in tile coordinates */
+export interface TileViewport {
+  x: number;
+  y: number;
+  width: number;
+  height: number;
+}
+
+/**
+ * Get map dimensions, layers and chunk grid size.
+ */
+export async function getMapInfo(name: string): Promise<MapInfo> {
+  const response = await fetch(`${API_BASE}/${name}`);
+
+  if (!response.ok) {
+    throw new Error('Failed to get map info');
+  }
+
+  return response.json();
+}
+
+/**
+ * Get a single chunk. The browser revalidates with the chunk's ETag,
+ * so unchanged chunks come back as cheap 304s from the HTTP cache.
+ */
+export async function getMapChunk(
+  name: string,
+  cx: number,
+  cy: number,
+  layers?: string[]
+): Promise<MapChunk> {
+  const query = layers?.length ? `?layers=${layers.join(',')}` : '';
+  const response = await fetch(`${API_BASE}/${name}/chunks/${cx}/${cy}${query}`);
+
+  if (!response.ok) {
+    throw new Error('Failed to get map chunk');
+  }
+
+  return response.json();
+}
+
+/**
+ * Get the chunk coordinates overlapping a viewport.
+ */
+export function getChunksInViewport(info: MapInfo, viewport: TileViewport): Array<{ cx: number; cy: number }> {
+  const size = info.chunk_size;
+  const minCx = Math.max(0, Math.floor(viewport.x / size));
+  const minCy = Math.max(0, Math.floor(viewport.y / size));
+  const maxCx = Math.min(info.chunks_x - 1, Math.floor((viewport.x + viewport.width - 1) / size));
+  const maxCy = Math.min(info.chunks_y - 1, Math.floor((viewport.y + viewport.height - 1) / size));
+
+  const chunks: Array<{ cx: number; cy: number }> = [];
+  for (let cy = minCy; cy <= maxCy; cy++) {
+    for (let cx = minCx; cx <= maxCx; cx++) {
+      chunks.push({ cx, cy });
+    }
+  }
+  return chunks;
+}
+
+/**
+ * Fetch all chunks covering a viewport in parallel.
+ */
+export async function getViewportChunks(
+  info: MapInfo,
+  viewport: TileViewport,
+  layers?: string[]
+): Promise<MapChunk[]> {
+  return Promise.all(
+    getChunksInViewport(info, viewport).map(({ cx, cy }) => getMapChunk(info.name, cx, cy, layers))
+  );
+}
+
+/**
+ * Get a player's full fog state for a map.
+ */
+export async function getFogSnapshot(name: string, playerId: string): Promise<FogSnapshot> {
+  const response = await fetch(`${API_BASE}/${name}/fog/${playerId}`);
+
+  if (!response.ok) {
+    throw new Error('Failed to get fog state');
+  }
+
+  return response.json();
+}
+
+/**
+ * Place or move a hero's vision source and get the resulting fog diff.
+ */
+export async function updateHeroVision(
+  name: string,
+  playerId: string,
+  heroId: string,
+  x: number,
+  y: number,
+  radius: number
+): Promise<FogDiff> {
+  const response = await fetch(`${API_BASE}/${name}/fog/${playerId}/heroes/${heroId}`, {
+    method: 'PUT',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ x, y, radius }),
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to update hero vision');
+  }
+
+  return response.json();
+}
+
+/**
+ * Remove a hero's vision source and get the resulting fog diff.
+ */
+export async function removeHeroVision(name: string, playerId: string, heroId: string): Promise<FogDiff> {
+  const response = await fetch(`${API_BASE}/${name}/fog/${playerId}/heroes/${heroId}`, {
+    method: 'DELETE',
+  });
+
+  if (!response.ok) {
+    throw new Error('Failed to remove hero vision');
+  }
+
+  return response.json();
+}
+
+/**
+ * Call a function for every tile in a list of runs.
+ */
+export function forEachRunCell(runs: CellRuns, mapWidth: number, fn: (x: number, y: number) => void): void {
+  for (const [start, length] of runs) {
+    for (let cell = start; cell < start + length; cell++) {
+      fn(cell % mapWidth, Math.floor(cell / mapWidth));
+    }
+  }
+}
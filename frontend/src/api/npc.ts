@@ -9,11 +9,21 @@ import { NpcCharacter } from '../types/npcCharacter';
 import { buildNpcPrompt } from '../game/data/NpcPromptBuilder';
 
 const API_BASE = '/api/npc';
+const PLAYER_ID_KEY = 'rogueheroes.playerId';
+// Newest local messages sent with each streaming chat, to seed a session
+// the server no longer has (e.g. after a restart)
+const SEED_HISTORY_MESSAGES = 8;
 
 interface ChatResponse {
   npc_response: string;
 }
 
+/** An event from the streaming chat endpoint: `delta` ({text}) or `done` ({npc_response}). */
+interface ChatStreamEvent {
+  name: string;
+  data: { text?: string; npc_response?: string };
+}
+
 /**
  * Send a message to an AI NPC and get their response (simple version).
  */
@@ -93,3 +103,150 @@ export async function chatWithNpcCharacter(
     return `*${npc.background.name} seems lost in thought*`;
   }
 }
+
+/**
+ * Stable id for this browser. Streaming chats are keyed by it on the
+ * server, which keeps (and summarizes) each conversation, so the model
+ * never sees the client's history. The newest local messages still go
+ * along, and the server uses them only to seed a session it lost.
+ */
+export function getPlayerId(): string {
+  let playerId = localStorage.getItem(PLAYER_ID_KEY);
+  if (!playerId) {
+    playerId = crypto.randomUUID();
+    localStorage.setItem(PLAYER_ID_KEY, playerId);
+  }
+  return playerId;
+}
+
+/**
+ * Called with each chunk of an NPC's reply as it streams in.
+ */
+export type NpcDeltaHandler = (text: string) => void;
+
+/**
+ * Stream an AI NPC's response, calling onDelta as text arrives.
+ * The conversation so far is kept server-side; conversationHistory is
+ * the local transcript, used only to seed a new session (see getPlayerId).
+ * Resolves with the full response. Aborting the signal closes the
+ * stream, which also stops generation on the server.
+ */
+export async function streamChatWithNpc(
+  npc: AiNpcProfile,
+  conversationHistory: ChatMessage[],
+  playerMessage: string,
+  onDelta: NpcDeltaHandler,
+  signal?: AbortSignal
+): Promise<string> {
+  return streamChat(
+    {
+      npc: {
+        name: npc.name,
+        backstory: npc.backstory,
+        personality: npc.personality,
+        guidelines: npc.guidelines,
+      },
+      conversation_history: conversationHistory.slice(-SEED_HISTORY_MESSAGES),
+      player_message: playerMessage,
+      player_id: getPlayerId(),
+    },
+    npc.name,
+    onDelta,
+    signal
+  );
+}
+
+/**
+ * Stream a full NPC character's response, calling onDelta as text arrives.
+ * Sends history the same way as streamChatWithNpc.
+ */
+export async function streamChatWithNpcCharacter(
+  npc: NpcCharacter,
+  conversationHistory: ChatMessage[],
+  playerMessage: string,
+  onDelta: NpcDeltaHandler,
+  signal?: AbortSignal
+): Promise<string> {
+  return streamChat(
+    {
+      npc: {
+        name: npc.background.name,
+      },
+      conversation_history: conversationHistory.slice(-SEED_HISTORY_MESSAGES),
+      player_message: playerMessage,
+      player_id: getPlayerId(),
+      system_prompt: buildNpcPrompt(npc),
+    },
+    npc.background.name,
+    onDelta,
+    signal
+  );
+}
+
+/**
+ * POST to the SSE chat endpoint and read `delta` / `done` events.
+ * Falls back to an in-character line on errors; rethrows aborts.
+ */
+async function streamChat(
+  body: object,
+  npcName: string,
+  onDelta: NpcDeltaHandler,
+  signal?: AbortSignal
+): Promise<string> {
+  let reply = '';
+  try {
+    const response = await fetch(`${API_BASE}/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'text/event-stream',
+      },
+      body: JSON.stringify(body),
+      signal,
+    });
+
+    if (!response.ok || !response.body) {
+      console.error('NPC chat error:', response.status);
+      return `*${npcName} doesn't respond*`;
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line; keep any partial event
+      const events = buffer.split('\n\n');
+      buffer = events.pop() ?? '';
+      for (const raw of events) {
+        const event = parseSseEvent(raw);
+        if (event?.name === 'delta' && event.data.text) {
+          reply += event.data.text;
+          onDelta(event.data.text);
+        } else if (event?.name === 'done') {
+          return event.data.npc_response ?? reply.trim();
+        }
+      }
+    }
+
+    return reply.trim() || `*${npcName} seems lost in thought*`;
+  } catch (error) {
+    if (signal?.aborted) throw error;
+    console.error('NPC chat error:', error);
+    return reply.trim() || `*${npcName} seems lost in thought*`;
+  }
+}
+
+function parseSseEvent(raw: string): ChatStreamEvent | null {
+  let name = 'message';
+  const data: string[] = [];
+  for (const line of raw.split('\n')) {
+    if (line.startsWith('event:')) name = line.slice(6).trim();
+    else if (line.startsWith('data:')) data.push(line.slice(5).trimStart());
+  }
+  return data.length ? { name, data: JSON.parse(data.join('\n')) } : null;
+}
@@ -8,7 +8,7 @@
 
 import React, { useState, useRef, useEffect } from 'react';
 import { AiNpcProfile, ChatMessage } from '../../../types/aiNpc';
-import { chatWithNpc } from '../../../api/npc';
+import { streamChatWithNpc } from '../../../api/npc';
 
 interface AiNpcInteractionProps {
   npc: AiNpcProfile;
@@ -30,7 +30,12 @@ export const AiNpcInteraction: React.FC<AiNpcInteractionProps> = ({
   });
   const [inputValue, setInputValue] = useState('');
   const [isLoading, setIsLoading] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
+
+  // Stop any in-flight reply when the dialog closes
+  useEffect(() => () => abortRef.current?.abort(), []);
 
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
@@ -46,15 +51,31 @@ export const AiNpcInteraction: React.FC<AiNpcInteractionProps> = ({
     setMessages((prev) => [...prev, playerMessage]);
     setInputValue('');
     setIsLoading(true);
+    const controller = new AbortController();
+    abortRef.current = controller;
 
     try {
-      // Get NPC response
-      const response = await chatWithNpc(npc, messages, message);
+      // Stream the NPC response, showing it as it is written
+      let streamed = '';
+      const response = await streamChatWithNpc(
+        npc,
+        messages,
+        message,
+        (text) => {
+          const started = streamed !== '';
+          streamed += text;
+          const partial: ChatMessage = { role: 'npc', content: streamed };
+          setMessages((prev) => (started ? [...prev.slice(0, -1), partial] : [...prev, partial]));
+          setIsStreaming(true);
+        },
+        controller.signal
+      );
 
-      // Add NPC response
+      // Replace the streamed text with the final response
       const npcMessage: ChatMessage = { role: 'npc', content: response };
-      setMessages((prev) => [...prev, npcMessage]);
+      setMessages((prev) => (streamed ? [...prev.slice(0, -1), npcMessage] : [...prev, npcMessage]));
     } catch (error) {
+      if (controller.signal.aborted) return;
       console.error('Chat error:', error);
       setMessages((prev) => [
         ...prev,
@@ -62,6 +83,7 @@ export const AiNpcInteraction: React.FC<AiNpcInteractionProps> = ({
       ]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
     }
   };
 
@@ -175,7 +197,7 @@ export const AiNpcInteraction: React.FC<AiNpcInteractionProps> = ({
           </div>
         ))}
 
-        {isLoading && (
+        {isLoading && !isStreaming && (
           <div style={{ display: 'flex', justifyContent: 'flex-start' }}>
             <div
               style={{
@@ -9,7 +9,7 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { NpcCharacter } from '../../../types/npcCharacter';
 import { ChatMessage } from '../../../types/aiNpc';
-import { chatWithNpcCharacter } from '../../../api/npc';
+import { streamChatWithNpcCharacter } from '../../../api/npc';
 
 interface NpcCharacterInteractionProps {
   npc: NpcCharacter;
@@ -93,7 +93,9 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
   const [bjjUnlocked, setBjjUnlocked] = useState(false);
   const [showingReward, setShowingReward] = useState(false);
   const [rewardGiven, setRewardGiven] = useState(false);
+  const [isStreaming, setIsStreaming] = useState(false);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const abortRef = useRef<AbortController | null>(null);
   const inputRef = useRef<HTMLInputElement>(null);
 
   const npcName = npc.background.name;
@@ -137,6 +139,9 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
     setShowingReward(false);
   };
 
+  // Stop any in-flight reply when the dialog closes
+  useEffect(() => () => abortRef.current?.abort(), []);
+
   // Auto-scroll to bottom when new messages arrive
   useEffect(() => {
     messagesEndRef.current?.scrollIntoView({ behavior: 'smooth' });
@@ -161,14 +166,29 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
     setMessages((prev) => [...prev, playerMessage]);
     setInputValue('');
     setIsLoading(true);
+    const controller = new AbortController();
+    abortRef.current = controller;
 
     try {
-      // Get NPC response using full character sheet
-      const response = await chatWithNpcCharacter(npc, messages, message);
+      // Stream the NPC response, showing it as it is written
+      let streamed = '';
+      const response = await streamChatWithNpcCharacter(
+        npc,
+        messages,
+        message,
+        (text) => {
+          const started = streamed !== '';
+          streamed += text;
+          const partial: ChatMessage = { role: 'npc', content: streamed };
+          setMessages((prev) => (started ? [...prev.slice(0, -1), partial] : [...prev, partial]));
+          setIsStreaming(true);
+        },
+        controller.signal
+      );
 
-      // Add NPC response
+      // Replace the streamed text with the final response
       const npcMessage: ChatMessage = { role: 'npc', content: response };
-      setMessages((prev) => [...prev, npcMessage]);
+      setMessages((prev) => (streamed ? [...prev.slice(0, -1), npcMessage] : [...prev, npcMessage]));
 
       // Check if player is being kicked out (only Marta can kick out)
       if (npc.id === 'marta_tavern_keeper' && checkForKickOut(response)) {
@@ -180,6 +200,7 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
         }, 5000);
       }
     } catch (error) {
+      if (controller.signal.aborted) return;
       console.error('Chat error:', error);
       setMessages((prev) => [
         ...prev,
@@ -187,6 +208,7 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
       ]);
     } finally {
       setIsLoading(false);
+      setIsStreaming(false);
       // Re-focus input after response (small delay for DOM update)
       setTimeout(() => inputRef.current?.focus(), 50);
     }
@@ -305,7 +327,7 @@ export const NpcCharacterInteraction: React.FC<NpcCharacterInteractionProps> = (
           </div>
         ))}
 
-        {isLoading && (
+        {isLoading && !isStreaming && (
           <div style={{ display: 'flex', justifyContent: 'flex-start' }}>
             <div
               style={{
@@ -78,7 +78,10 @@ import {
   preloadUnitSprites,
   createUnitAnimations,
   getAnimPrefix,
+  getUnitFrame,
+  UNIT_ATLAS_KEY,
 } from '../systems/AnimationSystem';
+import { assetUrl } from '../../api/assets';
 
 /** Unit behavior state machine */
 type UnitState = 'moving' | 'setting' | 'attacking';
@@ -197,13 +200,13 @@ export class CombatScene extends Phaser.Scene {
 
   preload(): void {
     // Load tileset
-    this.load.image('tileset', 'assets/tiles/Dungeon_Tileset.png');
+    this.load.image('tileset', assetUrl('assets/tiles/Dungeon_Tileset.png'));
 
     // Load all unit sprite sheets via AnimationSystem
     preloadUnitSprites(this);
 
     // Load projectiles
-    this.load.image('arrow', 'assets/units/arrow.png');
+    this.load.image('arrow', assetUrl('assets/units/arrow.png'));
   }
 
   create(): void {
@@ -544,7 +547,7 @@ export class CombatScene extends Phaser.Scene {
     const spriteX = this.gridOffsetX + (gridX + unitSize / 2) * scaledTileSize;
     const spriteY = this.gridOffsetY + gridY * scaledTileSize + scaledTileSize / 2;
 
-    const sprite = this.add.sprite(spriteX, spriteY, `${animPrefix}_idle`);
+    const sprite = this.add.sprite(spriteX, spriteY, UNIT_ATLAS_KEY, getUnitFrame(animPrefix, 'idle'));
     sprite.setOrigin(0.5, originY);
     sprite.setScale(spriteScale);
     sprite.setDepth(10 + gridY);
@@ -789,7 +792,7 @@ export class CombatScene extends Phaser.Scene {
     const spriteX = this.gridOffsetX + (gridX + unitSize / 2) * scaledTileSize;
     const spriteY = this.gridOffsetY + gridY * scaledTileSize + scaledTileSize / 2;
 
-    const sprite = this.add.sprite(spriteX, spriteY, `${animPrefix}_idle`);
+    const sprite = this.add.sprite(spriteX, spriteY, UNIT_ATLAS_KEY, getUnitFrame(animPrefix, 'idle'));
     sprite.setOrigin(0.5, originY);
     sprite.setScale(spriteScale);
     sprite.setDepth(10 + gridY);
@@ -912,14 +915,14 @@ export class CombatScene extends Phaser.Scene {
     const spriteX = this.gridOffsetX + (tileX + unitSize / 2) * scaledTileSize;
     const spriteY = this.gridOffsetY + tileY * scaledTileSize + scaledTileSize / 2;
 
-    const textureKey = `${unitStats.type}_idle`;
+    const idleFrame = getUnitFrame(unitStats.type, 'idle');
 
     // Create or update the preview sprite
     if (!this.placementPreview) {
-      this.placementPreview = this.add.sprite(spriteX, spriteY, textureKey);
+      this.placementPreview = this.add.sprite(spriteX, spriteY, UNIT_ATLAS_KEY, idleFrame);
       this.placementPreview.setDepth(15);
     } else {
-      this.placementPreview.setTexture(textureKey);
+      this.placementPreview.setTexture(UNIT_ATLAS_KEY, idleFrame);
       this.placementPreview.setPosition(spriteX, spriteY);
     }
 
@@ -0,0 +1,90 @@
+/**
+ * NPC API Tests
+ * -------------
+ * Tests for the streaming NPC chat consumer.
+ */
+
+import { describe, it, expect, vi, beforeEach } from 'vitest';
+import { getPlayerId, streamChatWithNpc } from '../../src/api/npc';
+import { AiNpcProfile } from '../../src/types/aiNpc';
+
+const npc: AiNpcProfile = {
+  name: 'Bram',
+  backstory: 'A retired smith.',
+  personality: 'Gruff',
+  guidelines: '',
+};
+
+/** Fake streaming response that delivers the given chunks one read at a time. */
+function streamingResponse(chunks: string[]) {
+  const encoder = new TextEncoder();
+  let index = 0;
+  return {
+    ok: true,
+    status: 200,
+    body: {
+      getReader: () => ({
+        read: () =>
+          Promise.resolve(
+            index < chunks.length
+              ? { done: false, value: encoder.encode(chunks[index++]) }
+              : { done: true, value: undefined }
+          ),
+      }),
+    },
+  };
+}
+
+describe('NPC API', () => {
+  beforeEach(() => {
+    vi.resetAllMocks();
+  });
+
+  describe('streamChatWithNpc', () => {
+    it('calls onDelta per chunk and resolves with the full reply', async () => {
+      global.fetch = vi.fn().mockResolvedValue(
+        streamingResponse([
+          'event: delta\ndata: {"text": "Well"}\n\nevent: del',
+          'ta\ndata: {"text": " met."}\n\n',
+          'event: done\ndata: {"npc_response": "Well met."}\n\n',
+        ])
+      );
+      const deltas: string[] = [];
+
+      const history = [{ role: 'npc' as const, content: 'Welcome.' }];
+
+      const reply = await streamChatWithNpc(npc, history, 'Hello', (text) => deltas.push(text));
+
+      expect(deltas).toEqual(['Well', ' met.']);
+      expect(reply).toBe('Well met.');
+      expect(global.fetch).toHaveBeenCalledWith(
+        '/api/npc/chat/stream',
+        expect.objectContaining({ method: 'POST' })
+      );
+      const body = JSON.parse(vi.mocked(global.fetch).mock.calls[0][1]?.body as string);
+      expect(body.player_id).toBe(getPlayerId());
+      expect(body.conversation_history).toEqual(history);
+    });
+
+    it('sends only the newest messages to seed a lost session', async () => {
+      global.fetch = vi.fn().mockResolvedValue(streamingResponse([]));
+      const history = Array.from({ length: 12 }, (_, i) => ({
+        role: i % 2 ? ('npc' as const) : ('player' as const),
+        content: `message ${i}`,
+      }));
+
+      await streamChatWithNpc(npc, history, 'Hello', () => undefined);
+
+      const body = JSON.parse(vi.mocked(global.fetch).mock.calls[0][1]?.body as string);
+      expect(body.conversation_history).toEqual(history.slice(-8));
+    });
+
+    it('returns an in-character fallback on errors', async () => {
+      global.fetch = vi.fn().mockResolvedValue({ ok: false, status: 500 });
+
+      const reply = await streamChatWithNpc(npc, [], 'Hello', () => undefined);
+
+      expect(reply).toBe("*Bram doesn't respond*");
+    });
+  });
+});
@@ -3,10 +3,16 @@ Generate vertical attack sprite sheets for the archer unit.
 
 This script creates archer_attack_up.png and archer_attack_down.png by
 rotating the bow/arms assembly from the horizontal attack animation.
+
+Frames are NumPy arrays of shape (height, width, 4); pixels are
+classified with boolean masks over whole frames, and only bicubic
+rotation goes through Pillow.
 """
 
 from PIL import Image
+import math
 import os
+import numpy as np
 
 # Configuration
 FRAME_WIDTH = 100
@@ -15,41 +21,70 @@ NUM_FRAMES = 12
 # Only use frames 0-8, skip frames 9-11 where the arrow causes a jump
 OUTPUT_FRAMES = 9
 
-# Input/output paths
+# Input path and output prefix
 INPUT_PATH = 'frontend/public/assets/units/archer_attack.png'
-OUTPUT_UP_PATH = 'frontend/public/assets/units/archer_attack_up.png'
-OUTPUT_DOWN_PATH = 'frontend/public/assets/units/archer_attack_down.png'
+OUTPUT_PREFIX = 'frontend/public/assets/units/archer'
+
 
+def load_sprite_sheet(path, num_frames=NUM_FRAMES):
+    """Load sprite sheet into an array of frames, shape (num_frames, FRAME_HEIGHT, FRAME_WIDTH, 4)."""
+    sheet = np.asarray(Image.open(path).convert('RGBA'))
+    # Like Image.crop, anything past the edge of the sheet is transparent
+    padded = np.zeros((FRAME_HEIGHT, num_frames * FRAME_WIDTH, 4), np.uint8)
+    region = sheet[:FRAME_HEIGHT, :num_frames * FRAME_WIDTH]
+    padded[:region.shape[0], :region.shape[1]] = region
+    return padded.reshape(FRAME_HEIGHT, num_frames, FRAME_WIDTH, 4).swapaxes(0, 1)
 
-def load_sprite_sheet(path):
-    """Load sprite sheet and return list of frames."""
-    img = Image.open(path).convert('RGBA')
-    frames = []
-    for i in range(NUM_FRAMES):
-        x = i * FRAME_WIDTH
-        frame = img.crop((x, 0, x + FRAME_WIDTH, FRAME_HEIGHT))
-        frames.append(frame)
-    return frames
+
+def get_bbox(frame):
+    """Bounding box (left, top, right, bottom) of non-transparent pixels, like Image.getbbox()."""
+    rows = np.flatnonzero(frame[..., 3].any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(frame[..., 3].any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
 
 
 def get_frame_bounds(frame):
     """Get the bounding box of non-transparent pixels in a frame."""
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
         return (0, 0, FRAME_WIDTH, FRAME_HEIGHT)
     return bbox
 
 
+def paste_masked(canvas, layer, x=0, y=0):
+    """
+    Paste a layer onto the canvas at (x, y) using its alpha as the mask,
+    like Image.paste(layer, (x, y), layer); clipped to the canvas.
+    """
+    height, width = canvas.shape[:2]
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + layer.shape[1], width)
+    bottom = min(y + layer.shape[0], height)
+    if left >= right or top >= bottom:
+        return
+
+    target = canvas[top:bottom, left:right]
+    source = layer[top - y:bottom - y, left - x:right - x].astype(np.uint32)
+    mask = source[..., 3:4]
+    # Pillow's integer blend: (canvas * (255 - mask) + layer * mask) / 255, rounded
+    blend = target.astype(np.uint32) * (255 - mask) + source * mask + 128
+    target[...] = ((blend >> 8) + blend) >> 8
+
+
+def rotate_bicubic(region, angle):
+    """Rotate an RGBA array with Pillow's bicubic resampling, expanding to fit."""
+    image = Image.fromarray(np.ascontiguousarray(region), 'RGBA')
+    return np.asarray(image.rotate(angle, expand=True, resample=Image.BICUBIC))
+
+
 def analyze_frame_colors(frame):
     """Analyze pixel colors in a frame to understand the composition."""
-    pixels = list(frame.getdata())
-    color_counts = {}
-    for px in pixels:
-        if px[3] > 10:  # Non-transparent
-            # Quantize to reduce noise
-            key = (px[0] // 32, px[1] // 32, px[2] // 32)
-            color_counts[key] = color_counts.get(key, 0) + 1
-    return color_counts
+    visible = frame[frame[..., 3] > 10]  # Non-transparent
+    # Quantize to reduce noise
+    keys, counts = np.unique(visible[:, :3] // 32, axis=0, return_counts=True)
+    return {tuple(int(c) for c in key): int(count) for key, count in zip(keys, counts)}
 
 
 def extract_bow_arms_mask(frame, center_x, center_y):
@@ -59,57 +94,49 @@ def extract_bow_arms_mask(frame, center_x, center_y):
     The bow/arms are generally to the right of center (aiming right)
     and include the arm skin tones and bow wood colors.
     """
-    width, height = frame.size
-    mask = Image.new('L', (width, height), 0)
-    frame_data = frame.load()
-    mask_data = mask.load()
+    height, width = frame.shape[:2]
+    mask = np.zeros((height, width), np.uint8)
 
     # Find the bounds of the character
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
-        return mask
+        return Image.fromarray(mask, 'L')
 
     left, top, right, bottom = bbox
     char_center_x = (left + right) // 2
-    char_center_y = (top + bottom) // 2
 
     # For each non-transparent pixel, determine if it's likely bow/arms
     # Bow/arms are generally:
     # - To the right of character center (horizontal bow draw)
     # - Skin tones (arm) or brown tones (bow)
     # - The arrow and string
+    r, g, b, a = (frame[..., i].astype(np.int32) for i in range(4))
+    visible = a >= 10
 
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = frame_data[x, y]
-            if a < 10:  # Transparent
-                continue
+    # Calculate distance from character center
+    dx = np.arange(width) - char_center_x
 
-            # Calculate distance from character center
-            dx = x - char_center_x
-            dy = y - char_center_y
+    # Pixels to the right of center are more likely bow/arms
+    # Also include pixels above and below for the bow arc
+    is_bow_region = dx > -2  # Slightly to the right of center or beyond
 
-            # Pixels to the right of center are more likely bow/arms
-            # Also include pixels above and below for the bow arc
-            is_bow_region = dx > -2  # Slightly to the right of center or beyond
+    # Color analysis for bow/arm detection
+    # Skin tones: higher R, moderate G, lower B
+    is_skin_tone = (r > g) & (g > b) & (r > 100) & (r - b > 30)
 
-            # Color analysis for bow/arm detection
-            # Skin tones: higher R, moderate G, lower B
-            is_skin_tone = r > g > b and r > 100 and r - b > 30
+    # Bow wood: brown tones
+    is_wood_tone = (r > g) & (g > b) & (r > 60) & (g > 40) & (r < 180)
 
-            # Bow wood: brown tones
-            is_wood_tone = r > g > b and r > 60 and g > 40 and r < 180
+    # Arrow/string: light tan/white
+    is_string = (r > 180) & (g > 160) & (b > 100)
 
-            # Arrow/string: light tan/white
-            is_string = r > 180 and g > 160 and b > 100
+    # Combine criteria; far right pixels are definitely bow/arms
+    is_bow_or_arms = (is_bow_region & (is_skin_tone | is_wood_tone | is_string)) | (
+        dx > char_center_x * 0.3
+    )
+    mask[visible & is_bow_or_arms] = 255
 
-            # Combine criteria
-            if is_bow_region and (is_skin_tone or is_wood_tone or is_string):
-                mask_data[x, y] = 255
-            elif dx > char_center_x * 0.3:  # Far right pixels are definitely bow/arms
-                mask_data[x, y] = 255
-
-    return mask
+    return Image.fromarray(mask, 'L')
 
 
 def create_vertical_frame(frame, direction='down'):
@@ -118,25 +145,20 @@ def create_vertical_frame(frame, direction='down'):
 
     direction: 'up' or 'down'
     """
-    width, height = frame.size
+    height, width = frame.shape[:2]
 
     # Find character bounds
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
         return frame.copy()
 
     left, top, right, bottom = bbox
-    char_center_x = (left + right) // 2
-    char_center_y = (top + bottom) // 2
 
     # For archer, we'll rotate the entire character sprite for cleaner results
     # The archer is small enough that full rotation looks better than partial
 
     # Create output image
-    result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-
-    # Extract the character pixels
-    char_region = frame.crop(bbox)
+    result = np.zeros((height, width, 4), np.uint8)
 
     # Rotate the character region
     # For 'down': rotate 90 degrees clockwise (bow points down)
@@ -144,15 +166,15 @@ def create_vertical_frame(frame, direction='down'):
     angle = -90 if direction == 'down' else 90
 
     # Rotate around center with expansion to avoid clipping
-    rotated = char_region.rotate(angle, expand=True, resample=Image.BICUBIC)
+    rotated = rotate_bicubic(frame[top:bottom, left:right], angle)
 
     # Calculate paste position to center the rotated sprite
-    rot_width, rot_height = rotated.size
+    rot_height, rot_width = rotated.shape[:2]
     paste_x = (width - rot_width) // 2
     paste_y = (height - rot_height) // 2
 
     # Paste rotated character
-    result.paste(rotated, (paste_x, paste_y), rotated)
+    paste_masked(result, rotated, paste_x, paste_y)
 
     return result
 
@@ -163,9 +185,9 @@ def create_smart_vertical_frame(frame, direction='down'):
 
     This attempts to keep the body orientation while rotating the weapon.
     """
-    width, height = frame.size
+    height, width = frame.shape[:2]
 
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
         return frame.copy()
 
@@ -173,52 +195,38 @@ def create_smart_vertical_frame(frame, direction='down'):
     char_center_x = (left + right) // 2
     char_center_y = (top + bottom) // 2
 
-    # Create output starting from original frame
-    result = frame.copy()
-    result_data = result.load()
-    frame_data = frame.load()
-
     # For the archer, identify front-facing pixels (body) vs side pixels (bow/arms)
     # The body is generally centered, bow extends to the right
 
     # First pass: clear pixels that will be rotated
-    pixels_to_rotate = []
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = frame_data[x, y]
-            if a < 10:
-                continue
-
-            dx = x - char_center_x
-
-            # Pixels significantly to the right are bow/arms
-            if dx > 3:
-                pixels_to_rotate.append((x, y, r, g, b, a))
-                result_data[x, y] = (0, 0, 0, 0)
+    # Pixels significantly to the right are bow/arms
+    ys, xs = np.nonzero((frame[..., 3] >= 10) & (np.arange(width) - char_center_x > 3))
+    result = frame.copy()
+    result[ys, xs] = 0
 
     # Rotate these pixels around the character center
     angle_rad = 1.5708 if direction == 'down' else -1.5708  # 90 degrees in radians
-    import math
     cos_a = math.cos(angle_rad)
     sin_a = math.sin(angle_rad)
 
-    for ox, oy, r, g, b, a in pixels_to_rotate:
-        # Translate to origin (character center)
-        dx = ox - char_center_x
-        dy = oy - char_center_y
+    # Translate to origin (character center)
+    dx = xs - char_center_x
+    dy = ys - char_center_y
 
-        # Rotate
-        nx = dx * cos_a - dy * sin_a
-        ny = dx * sin_a + dy * cos_a
+    # Rotate
+    nx = dx * cos_a - dy * sin_a
+    ny = dx * sin_a + dy * cos_a
 
-        # Translate back
-        new_x = int(char_center_x + nx)
-        new_y = int(char_center_y + ny)
+    # Translate back
+    new_x = np.trunc(char_center_x + nx).astype(np.int64)
+    new_y = np.trunc(char_center_y + ny).astype(np.int64)
 
-        # Bounds check and place pixel
-        if 0 <= new_x < width and 0 <= new_y < height:
-            result_data[new_x, new_y] = (r, g, b, a)
+    # Bounds check and place pixels; the last one in row order wins a spot
+    inside = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < height)
+    ys, xs, new_x, new_y = ys[inside], xs[inside], new_x[inside], new_y[inside]
+    _, last = np.unique((new_y * width + new_x)[::-1], return_index=True)
+    last = ys.size - 1 - last
+    result[new_y[last], new_x[last]] = frame[ys[last], xs[last]]
 
     return result
 
@@ -228,11 +236,9 @@ def create_hybrid_vertical_frame(frame, direction='down', frame_index=0, anchor_
     Rotate sprite and compensate for any movement in the original animation
     to keep the character anchored in the same position.
     """
-    import math
+    height, width = frame.shape[:2]
 
-    width, height = frame.size
-
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
         return frame.copy()
 
@@ -242,9 +248,6 @@ def create_hybrid_vertical_frame(frame, direction='down', frame_index=0, anchor_
     this_center_x = (left + right) / 2
     this_center_y = (top + bottom) / 2
 
-    # Extract character
-    char_region = frame.crop(bbox)
-
     # Consistent rotation throughout
     base_angle = 70
 
@@ -254,13 +257,13 @@ def create_hybrid_vertical_frame(frame, direction='down', frame_index=0, anchor_
     else:
         angle = base_angle
 
-    # Rotate with bicubic resampling
-    rotated = char_region.rotate(angle, expand=True, resample=Image.BICUBIC)
+    # Extract character and rotate with bicubic resampling
+    rotated = rotate_bicubic(frame[top:bottom, left:right], angle)
 
     # Create result canvas
-    result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    result = np.zeros((height, width, 4), np.uint8)
 
-    rot_width, rot_height = rotated.size
+    rot_height, rot_width = rotated.shape[:2]
 
     # Calculate how much this frame's center differs from frame 0
     # This compensates for any movement in the original animation
@@ -288,7 +291,7 @@ def create_hybrid_vertical_frame(frame, direction='down', frame_index=0, anchor_
     paste_x = int(target_x - rot_width / 2 - rotated_offset_x)
     paste_y = int(target_y - rot_height / 2 - rotated_offset_y)
 
-    result.paste(rotated, (paste_x, paste_y), rotated)
+    paste_masked(result, rotated, paste_x, paste_y)
 
     return result
 
@@ -298,24 +301,23 @@ def save_sprite_sheet(frames, output_path, max_frames=None):
     if max_frames is not None:
         frames = frames[:max_frames]
 
-    total_width = FRAME_WIDTH * len(frames)
-    sheet = Image.new('RGBA', (total_width, FRAME_HEIGHT), (0, 0, 0, 0))
-
-    for i, frame in enumerate(frames):
-        sheet.paste(frame, (i * FRAME_WIDTH, 0))
-
-    sheet.save(output_path)
+    sheet = np.concatenate(frames, axis=1)
+    Image.fromarray(sheet, 'RGBA').save(output_path)
     print(f"Saved: {output_path} ({len(frames)} frames)")
 
 
-def main():
+def process_unit(input_path, output_prefix, num_frames=NUM_FRAMES):
+    """Create {output_prefix}_attack_up.png and _attack_down.png from an archer attack sheet."""
     # Check input file exists
-    if not os.path.exists(INPUT_PATH):
-        print(f"Error: Input file not found: {INPUT_PATH}")
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found: {input_path}")
         return
 
-    print(f"Loading sprite sheet: {INPUT_PATH}")
-    frames = load_sprite_sheet(INPUT_PATH)
+    output_up_path = f"{output_prefix}_attack_up.png"
+    output_down_path = f"{output_prefix}_attack_down.png"
+
+    print(f"Loading sprite sheet: {input_path}")
+    frames = load_sprite_sheet(input_path, num_frames)
     print(f"Loaded {len(frames)} frames")
 
     # Analyze first frame to understand composition
@@ -330,7 +332,7 @@ def main():
     up_frames = []
 
     # Calculate anchor point and frame 0 center for motion compensation
-    first_bbox = frames[0].getbbox()
+    first_bbox = get_bbox(frames[0])
     if first_bbox:
         frame0_center_x = (first_bbox[0] + first_bbox[2]) / 2
         frame0_center_y = (first_bbox[1] + first_bbox[3]) / 2
@@ -345,7 +347,7 @@ def main():
     # Analyze movement in original animation
     print("\n  Analyzing frame positions:")
     for i, frame in enumerate(frames):
-        bbox = frame.getbbox()
+        bbox = get_bbox(frame)
         if bbox:
             cx = (bbox[0] + bbox[2]) / 2
             cy = (bbox[1] + bbox[3]) / 2
@@ -363,15 +365,19 @@ def main():
 
     # Save output sprite sheets (only first OUTPUT_FRAMES to remove jump)
     print(f"\nSaving sprite sheets (first {OUTPUT_FRAMES} frames only)...")
-    save_sprite_sheet(down_frames, OUTPUT_DOWN_PATH, OUTPUT_FRAMES)
-    save_sprite_sheet(up_frames, OUTPUT_UP_PATH, OUTPUT_FRAMES)
+    save_sprite_sheet(down_frames, output_down_path, OUTPUT_FRAMES)
+    save_sprite_sheet(up_frames, output_up_path, OUTPUT_FRAMES)
 
     print("\nDone! Generated:")
-    print(f"  - {OUTPUT_DOWN_PATH}")
-    print(f"  - {OUTPUT_UP_PATH}")
+    print(f"  - {output_down_path}")
+    print(f"  - {output_up_path}")
     print("\nNote: You may need to adjust the rotation angle in create_hybrid_vertical_frame()")
     print("if the results don't look right. Try angles between 60-90 degrees.")
 
 
+def main():
+    process_unit(INPUT_PATH, OUTPUT_PREFIX)
+
+
 if __name__ == '__main__':
     main()
@@ -1,131 +1,126 @@
 """
 Generate vertical attack sprites for the lancer.
 The lance should point up or down while the rider/horse stay in place.
+
+Frames are NumPy arrays of shape (height, width, 4); pixels are
+classified with boolean masks over the whole sheet at once.
 """
 
 from PIL import Image
 import math
+import numpy as np
 
 FRAME_WIDTH = 100
 FRAME_HEIGHT = 100
 
 
 def load_frames(path, num_frames):
-    """Load sprite sheet into list of frames."""
-    img = Image.open(path).convert('RGBA')
-    frames = []
-    for i in range(num_frames):
-        x = i * FRAME_WIDTH
-        frame = img.crop((x, 0, x + FRAME_WIDTH, FRAME_HEIGHT))
-        frames.append(frame)
-    return frames
+    """Load sprite sheet into an array of frames, shape (num_frames, FRAME_HEIGHT, FRAME_WIDTH, 4)."""
+    sheet = np.asarray(Image.open(path).convert('RGBA'))
+    # Like Image.crop, anything past the edge of the sheet is transparent
+    padded = np.zeros((FRAME_HEIGHT, num_frames * FRAME_WIDTH, 4), np.uint8)
+    region = sheet[:FRAME_HEIGHT, :num_frames * FRAME_WIDTH]
+    padded[:region.shape[0], :region.shape[1]] = region
+    return padded.reshape(FRAME_HEIGHT, num_frames, FRAME_WIDTH, 4).swapaxes(0, 1)
 
 
-def is_lance_pixel(r, g, b, a):
-    """Detect if pixel is part of the lance (gray/silver metal)."""
-    if a < 10:
-        return False
+def lance_mask(pixels):
+    """Mask of pixels that are part of the lance (gray/silver metal)."""
+    rgb = pixels[..., :3].astype(np.int32)
+    alpha = pixels[..., 3]
 
     # Lance is gray/silver - low saturation, medium-high brightness
-    brightness = (r + g + b) / 3
-    max_c = max(r, g, b)
-    min_c = min(r, g, b)
-    saturation = (max_c - min_c) / max_c if max_c > 0 else 0
+    brightness = rgb.sum(axis=-1) / 3
+    max_c = rgb.max(axis=-1)
+    min_c = rgb.min(axis=-1)
+    saturation = np.divide(
+        max_c - min_c, max_c, out=np.zeros(max_c.shape), where=max_c > 0
+    )
 
     # Gray metal colors: brightness 100-220, low saturation
     # Also include the darker gray parts
-    is_gray_metal = brightness > 80 and brightness < 230 and saturation < 0.25
+    is_gray_metal = (brightness > 80) & (brightness < 230) & (saturation < 0.25)
 
     # Also catch the light blue/white tip shine
-    is_shine = brightness > 200 and saturation < 0.3
-
-    return is_gray_metal or is_shine
-
+    is_shine = (brightness > 200) & (saturation < 0.3)
 
-def separate_lance_and_body(frame):
-    """Separate lance pixels from body/horse pixels."""
-    width, height = frame.size
-    data = frame.load()
+    return (alpha >= 10) & (is_gray_metal | is_shine)
 
-    body = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    lance = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    body_data = body.load()
-    lance_data = lance.load()
 
-    # Find the rightmost extent of non-lance pixels to determine lance start
-    # The lance extends from the rider to the right
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = data[x, y]
-            if a < 10:
-                continue
-
-            # Lance pixels go to lance layer, others to body
-            if is_lance_pixel(r, g, b, a) and x > 40:  # Lance is on right side
-                lance_data[x, y] = (r, g, b, a)
-            else:
-                body_data[x, y] = (r, g, b, a)
+def separate_lance_and_body(frames, lance_pixels):
+    """Split frames into body/horse and lance layers."""
+    visible = frames[..., 3] >= 10
+    # Lance is on right side
+    lance_pixels = lance_pixels & (np.arange(FRAME_WIDTH) > 40)
 
+    body = np.where((visible & ~lance_pixels)[..., None], frames, 0).astype(np.uint8)
+    lance = np.where(lance_pixels[..., None], frames, 0).astype(np.uint8)
     return body, lance
 
 
-def get_lance_pivot(frame):
+def get_lance_pivot(frame, lance_pixels):
     """Find the pivot point where lance connects to rider (left edge of lance)."""
-    width, height = frame.size
-    data = frame.load()
-
-    # Find leftmost lance pixel
-    for x in range(width):
-        for y in range(height):
-            r, g, b, a = data[x, y]
-            if a > 10 and is_lance_pixel(r, g, b, a) and x > 40:
-                # Found leftmost lance pixel, pivot is slightly left of this
-                return (x - 2, y)
+    candidates = lance_pixels & (frame[..., 3] > 10)
+    candidates[:, :41] = False  # Lance is on right side
+    columns = np.flatnonzero(candidates.any(axis=0))
+    if columns.size == 0:
+        # Fallback to center
+        return (50, 50)
 
-    # Fallback to center
-    return (50, 50)
+    # Leftmost lance pixel (topmost in its column); pivot is slightly left of it
+    x = int(columns[0])
+    y = int(np.argmax(candidates[:, x]))
+    return (x - 2, y)
 
 
-def rotate_lance(lance, pivot, angle):
-    """Rotate the lance around the pivot point."""
-    width, height = lance.size
-    lance_data = lance.load()
+def rotate_layer(layer, pivot, angle):
+    """
+    Rotate a layer's visible pixels around the pivot point.
 
-    result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    result_data = result.load()
+    Each pixel is moved without resampling. When several land on the
+    same spot, the most opaque one wins (the first in row order on a tie).
+    """
+    height, width = layer.shape[:2]
+    result = np.zeros_like(layer)
 
     angle_rad = math.radians(angle)
     cos_a = math.cos(angle_rad)
     sin_a = math.sin(angle_rad)
 
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = lance_data[x, y]
-            if a < 10:
-                continue
+    ys, xs = np.nonzero(layer[..., 3] >= 10)
+    dx = xs - pivot[0]
+    dy = ys - pivot[1]
+    new_x = np.trunc(pivot[0] + dx * cos_a - dy * sin_a).astype(np.int64)
+    new_y = np.trunc(pivot[1] + dx * sin_a + dy * cos_a).astype(np.int64)
 
-            # Rotate around pivot
-            dx = x - pivot[0]
-            dy = y - pivot[1]
+    inside = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < height)
+    ys, xs, new_x, new_y = ys[inside], xs[inside], new_x[inside], new_y[inside]
 
-            new_x = int(pivot[0] + dx * cos_a - dy * sin_a)
-            new_y = int(pivot[1] + dx * sin_a + dy * cos_a)
-
-            if 0 <= new_x < width and 0 <= new_y < height:
-                existing = result_data[new_x, new_y]
-                if existing[3] < a:
-                    result_data[new_x, new_y] = (r, g, b, a)
+    target = new_y * width + new_x
+    alpha = layer[ys, xs, 3].astype(np.int64)
+    order = np.lexsort((np.arange(target.size), -alpha, target))
+    first = np.ones(order.size, bool)
+    first[1:] = target[order][1:] != target[order][:-1]
+    winners = order[first]
 
+    result[new_y[winners], new_x[winners]] = layer[ys[winners], xs[winners]]
     return result
 
 
-def create_vertical_frame(frame, direction):
+def paste_masked(canvas, layer):
+    """Paste a layer onto the canvas using its alpha as the mask (Image.paste(layer, (0, 0), layer))."""
+    mask = layer[..., 3:4].astype(np.uint32)
+    # Pillow's integer blend: (canvas * (255 - mask) + layer * mask) / 255, rounded
+    blend = canvas.astype(np.uint32) * (255 - mask) + layer.astype(np.uint32) * mask + 128
+    canvas[...] = ((blend >> 8) + blend) >> 8
+
+
+def create_vertical_frame(frame, lance_pixels, direction):
     """Create vertical attack frame with lance pointing up or down."""
-    body, lance = separate_lance_and_body(frame)
+    body, lance = separate_lance_and_body(frame, lance_pixels)
 
     # Find pivot point
-    pivot = get_lance_pivot(frame)
+    pivot = get_lance_pivot(frame, lance_pixels)
 
     # Rotate lance: -90 for up, +90 for down
     if direction == 'up':
@@ -133,47 +128,51 @@ def create_vertical_frame(frame, direction):
     else:  # down
         angle = 75
 
-    rotated_lance = rotate_lance(lance, pivot, angle)
+    rotated_lance = rotate_layer(lance, pivot, angle)
 
     # Composite: body + rotated lance
-    result = Image.new('RGBA', (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
-    result.paste(body, (0, 0), body)
-    result.paste(rotated_lance, (0, 0), rotated_lance)
+    result = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 4), np.uint8)
+    paste_masked(result, body)
+    paste_masked(result, rotated_lance)
 
     return result
 
 
 def save_sprite_sheet(frames, output_path):
     """Save frames as horizontal sprite sheet."""
-    total_width = FRAME_WIDTH * len(frames)
-    sheet = Image.new('RGBA', (total_width, FRAME_HEIGHT), (0, 0, 0, 0))
-
-    for i, frame in enumerate(frames):
-        sheet.paste(frame, (i * FRAME_WIDTH, 0))
-
-    sheet.save(output_path)
+    sheet = np.concatenate(frames, axis=1)
+    Image.fromarray(sheet, 'RGBA').save(output_path)
     print(f"Saved: {output_path}")
 
 
-def main():
-    print("Generating lancer vertical attack sprites...")
-
-    input_path = 'frontend/public/assets/units/lancer_attack.png'
-    num_frames = 6
-
+def process_unit(input_path, output_prefix, num_frames):
+    """Create {output_prefix}_attack_up.png and _attack_down.png from a lancer attack sheet."""
     frames = load_frames(input_path, num_frames)
     print(f"Loaded {num_frames} frames")
 
+    # Classify every pixel of the sheet at once
+    lance_pixels = lance_mask(frames)
+
     # Generate up and down versions
     up_frames = []
     down_frames = []
 
-    for frame in frames:
-        up_frames.append(create_vertical_frame(frame, 'up'))
-        down_frames.append(create_vertical_frame(frame, 'down'))
+    for frame, frame_lance in zip(frames, lance_pixels):
+        up_frames.append(create_vertical_frame(frame, frame_lance, 'up'))
+        down_frames.append(create_vertical_frame(frame, frame_lance, 'down'))
+
+    save_sprite_sheet(up_frames, f"{output_prefix}_attack_up.png")
+    save_sprite_sheet(down_frames, f"{output_prefix}_attack_down.png")
+
+
+def main():
+    print("Generating lancer vertical attack sprites...")
 
-    save_sprite_sheet(up_frames, 'frontend/public/assets/units/lancer_attack_up.png')
-    save_sprite_sheet(down_frames, 'frontend/public/assets/units/lancer_attack_down.png')
+    process_unit(
+        'frontend/public/assets/units/lancer_attack.png',
+        'frontend/public/assets/units/lancer',
+        6,
+    )
 
     print("Done!")
 
@@ -3,10 +3,15 @@ Generate vertical attack sprite sheets for melee units (knight, axeman).
 
 This script creates _attack_up.png and _attack_down.png variants by
 rotating the sprites to make weapons point vertically.
+
+Frames are NumPy arrays of shape (height, width, 4); only the bicubic
+rotation itself goes through Pillow.
 """
 
 from PIL import Image
+import math
 import os
+import numpy as np
 
 FRAME_WIDTH = 100
 FRAME_HEIGHT = 100
@@ -19,14 +24,42 @@ UNITS = [
 
 
 def load_sprite_sheet(path, num_frames):
-    """Load sprite sheet and return list of frames."""
-    img = Image.open(path).convert('RGBA')
-    frames = []
-    for i in range(num_frames):
-        x = i * FRAME_WIDTH
-        frame = img.crop((x, 0, x + FRAME_WIDTH, FRAME_HEIGHT))
-        frames.append(frame)
-    return frames
+    """Load sprite sheet into an array of frames, shape (num_frames, FRAME_HEIGHT, FRAME_WIDTH, 4)."""
+    sheet = np.asarray(Image.open(path).convert('RGBA'))
+    # Like Image.crop, anything past the edge of the sheet is transparent
+    padded = np.zeros((FRAME_HEIGHT, num_frames * FRAME_WIDTH, 4), np.uint8)
+    region = sheet[:FRAME_HEIGHT, :num_frames * FRAME_WIDTH]
+    padded[:region.shape[0], :region.shape[1]] = region
+    return padded.reshape(FRAME_HEIGHT, num_frames, FRAME_WIDTH, 4).swapaxes(0, 1)
+
+
+def get_bbox(frame):
+    """Bounding box (left, top, right, bottom) of non-transparent pixels, like Image.getbbox()."""
+    rows = np.flatnonzero(frame[..., 3].any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(frame[..., 3].any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+
+def paste_masked(canvas, layer, x=0, y=0):
+    """
+    Paste a layer onto the canvas at (x, y) using its alpha as the mask,
+    like Image.paste(layer, (x, y), layer); clipped to the canvas.
+    """
+    height, width = canvas.shape[:2]
+    left, top = max(x, 0), max(y, 0)
+    right = min(x + layer.shape[1], width)
+    bottom = min(y + layer.shape[0], height)
+    if left >= right or top >= bottom:
+        return
+
+    target = canvas[top:bottom, left:right]
+    source = layer[top - y:bottom - y, left - x:right - x].astype(np.uint32)
+    mask = source[..., 3:4]
+    # Pillow's integer blend: (canvas * (255 - mask) + layer * mask) / 255, rounded
+    blend = target.astype(np.uint32) * (255 - mask) + source * mask + 128
+    target[...] = ((blend >> 8) + blend) >> 8
 
 
 def create_vertical_frame(frame, direction='down', frame_index=0, anchor_pos=None, frame0_center=None):
@@ -34,11 +67,9 @@ def create_vertical_frame(frame, direction='down', frame_index=0, anchor_pos=Non
     Rotate sprite to create vertical attack variant.
     Uses consistent anchor point to prevent character jumping.
     """
-    import math
-
-    width, height = frame.size
+    height, width = frame.shape[:2]
 
-    bbox = frame.getbbox()
+    bbox = get_bbox(frame)
     if bbox is None:
         return frame.copy()
 
@@ -49,7 +80,7 @@ def create_vertical_frame(frame, direction='down', frame_index=0, anchor_pos=Non
     this_center_y = (top + bottom) / 2
 
     # Extract character
-    char_region = frame.crop(bbox)
+    char_region = Image.fromarray(np.ascontiguousarray(frame[top:bottom, left:right]), 'RGBA')
 
     # Consistent rotation - 70 degrees for melee swings
     base_angle = 70
@@ -61,12 +92,12 @@ def create_vertical_frame(frame, direction='down', frame_index=0, anchor_pos=Non
         angle = base_angle
 
     # Rotate with bicubic resampling
-    rotated = char_region.rotate(angle, expand=True, resample=Image.BICUBIC)
+    rotated = np.asarray(char_region.rotate(angle, expand=True, resample=Image.BICUBIC))
 
     # Create result canvas
-    result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    result = np.zeros((height, width, 4), np.uint8)
 
-    rot_width, rot_height = rotated.size
+    rot_height, rot_width = rotated.shape[:2]
 
     # Calculate offset from frame 0 to keep character stationary
     if frame0_center is not None:
@@ -92,20 +123,15 @@ def create_vertical_frame(frame, direction='down', frame_index=0, anchor_pos=Non
     paste_x = int(target_x - rot_width / 2 - rotated_offset_x)
     paste_y = int(target_y - rot_height / 2 - rotated_offset_y)
 
-    result.paste(rotated, (paste_x, paste_y), rotated)
+    paste_masked(result, rotated, paste_x, paste_y)
 
     return result
 
 
 def save_sprite_sheet(frames, output_path):
     """Save list of frames as a horizontal sprite sheet."""
-    total_width = FRAME_WIDTH * len(frames)
-    sheet = Image.new('RGBA', (total_width, FRAME_HEIGHT), (0, 0, 0, 0))
-
-    for i, frame in enumerate(frames):
-        sheet.paste(frame, (i * FRAME_WIDTH, 0))
-
-    sheet.save(output_path)
+    sheet = np.concatenate(frames, axis=1)
+    Image.fromarray(sheet, 'RGBA').save(output_path)
     print(f"Saved: {output_path} ({len(frames)} frames)")
 
 
@@ -121,7 +147,7 @@ def process_unit(input_path, output_prefix, num_frames):
     print(f"  Loaded {len(frames)} frames")
 
     # Calculate anchor from frame 0
-    first_bbox = frames[0].getbbox()
+    first_bbox = get_bbox(frames[0])
     if first_bbox:
         frame0_center_x = (first_bbox[0] + first_bbox[2]) / 2
         frame0_center_y = (first_bbox[1] + first_bbox[3]) / 2
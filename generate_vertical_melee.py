@@ -2,112 +2,112 @@
 Generate vertical attack sprites:
 - Body stays EXACTLY the same as original (no rotation)
 - Only the slash effect is rotated to point up or down
+
+Frames are NumPy arrays of shape (height, width, 4); pixels are
+classified with boolean masks over the whole sheet at once.
 """
 
 from PIL import Image
 import math
+import numpy as np
 
 FRAME_WIDTH = 100
 FRAME_HEIGHT = 100
 
 
 def load_frames(path, num_frames):
-    """Load sprite sheet into list of frames."""
-    img = Image.open(path).convert('RGBA')
-    frames = []
-    for i in range(num_frames):
-        x = i * FRAME_WIDTH
-        frame = img.crop((x, 0, x + FRAME_WIDTH, FRAME_HEIGHT))
-        frames.append(frame)
-    return frames
-
-
-def is_swing_effect(r, g, b, a):
-    """Detect if pixel is part of the sword swing effect (white/light arc)."""
-    if a < 10:
-        return False
+    """Load sprite sheet into an array of frames, shape (num_frames, FRAME_HEIGHT, FRAME_WIDTH, 4)."""
+    sheet = np.asarray(Image.open(path).convert('RGBA'))
+    # Like Image.crop, anything past the edge of the sheet is transparent
+    padded = np.zeros((FRAME_HEIGHT, num_frames * FRAME_WIDTH, 4), np.uint8)
+    region = sheet[:FRAME_HEIGHT, :num_frames * FRAME_WIDTH]
+    padded[:region.shape[0], :region.shape[1]] = region
+    return padded.reshape(FRAME_HEIGHT, num_frames, FRAME_WIDTH, 4).swapaxes(0, 1)
+
+
+def swing_effect_mask(pixels):
+    """Mask of pixels that are part of the sword swing effect (white/light arc)."""
+    rgb = pixels[..., :3].astype(np.int32)
+    alpha = pixels[..., 3]
+
     # Swing effect is typically white/light gray
-    brightness = (r + g + b) / 3
-    max_c = max(r, g, b)
-    min_c = min(r, g, b)
-    saturation = (max_c - min_c) / max_c if max_c > 0 else 0
-
-    return brightness > 180 and saturation < 0.3
-
-
-def separate_swing_and_body(frame):
-    """Separate swing effect pixels from body pixels."""
-    width, height = frame.size
-    data = frame.load()
-
-    body = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    swing = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    body_data = body.load()
-    swing_data = swing.load()
-
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = data[x, y]
-            if a < 10:
-                continue
-            if is_swing_effect(r, g, b, a):
-                swing_data[x, y] = (r, g, b, a)
-            else:
-                body_data[x, y] = (r, g, b, a)
+    brightness = rgb.sum(axis=-1) / 3
+    max_c = rgb.max(axis=-1)
+    min_c = rgb.min(axis=-1)
+    saturation = np.divide(
+        max_c - min_c, max_c, out=np.zeros(max_c.shape), where=max_c > 0
+    )
+
+    return (alpha >= 10) & (brightness > 180) & (saturation < 0.3)
 
+
+def separate_swing_and_body(frames, swing_pixels):
+    """Split frames into body and swing effect layers."""
+    visible = frames[..., 3] >= 10
+    body = np.where((visible & ~swing_pixels)[..., None], frames, 0).astype(np.uint8)
+    swing = np.where(swing_pixels[..., None], frames, 0).astype(np.uint8)
     return body, swing
 
 
 def get_body_center(body):
     """Get center of body for pivot point."""
-    bbox = body.getbbox()
-    if bbox is None:
+    rows = np.flatnonzero(body[..., 3].any(axis=1))
+    cols = np.flatnonzero(body[..., 3].any(axis=0))
+    if rows.size == 0:
         return (FRAME_WIDTH // 2, FRAME_HEIGHT // 2)
-    left, top, right, bottom = bbox
-    return ((left + right) // 2, (top + bottom) // 2)
+    left, top, right, bottom = cols[0], rows[0], cols[-1] + 1, rows[-1] + 1
+    return (int(left + right) // 2, int(top + bottom) // 2)
 
 
 def rotate_swing_only(swing, pivot, angle):
-    """Rotate just the swing effect around the body's center."""
-    width, height = swing.size
-    swing_data = swing.load()
+    """
+    Rotate just the swing effect around the body's center.
 
-    result = Image.new('RGBA', (width, height), (0, 0, 0, 0))
-    result_data = result.load()
+    Each pixel is moved without resampling. When several land on the
+    same spot, the most opaque one wins (the first in row order on a tie).
+    """
+    height, width = swing.shape[:2]
+    result = np.zeros_like(swing)
 
     angle_rad = math.radians(angle)
     cos_a = math.cos(angle_rad)
     sin_a = math.sin(angle_rad)
 
-    for y in range(height):
-        for x in range(width):
-            r, g, b, a = swing_data[x, y]
-            if a < 10:
-                continue
-
-            # Rotate around pivot
-            dx = x - pivot[0]
-            dy = y - pivot[1]
+    ys, xs = np.nonzero(swing[..., 3] >= 10)
+    dx = xs - pivot[0]
+    dy = ys - pivot[1]
+    new_x = np.trunc(pivot[0] + dx * cos_a - dy * sin_a).astype(np.int64)
+    new_y = np.trunc(pivot[1] + dx * sin_a + dy * cos_a).astype(np.int64)
 
-            new_x = int(pivot[0] + dx * cos_a - dy * sin_a)
-            new_y = int(pivot[1] + dx * sin_a + dy * cos_a)
+    inside = (new_x >= 0) & (new_x < width) & (new_y >= 0) & (new_y < height)
+    ys, xs, new_x, new_y = ys[inside], xs[inside], new_x[inside], new_y[inside]
 
-            if 0 <= new_x < width and 0 <= new_y < height:
-                # Blend with existing pixel if any
-                existing = result_data[new_x, new_y]
-                if existing[3] < a:
-                    result_data[new_x, new_y] = (r, g, b, a)
+    target = new_y * width + new_x
+    alpha = swing[ys, xs, 3].astype(np.int64)
+    order = np.lexsort((np.arange(target.size), -alpha, target))
+    first = np.ones(order.size, bool)
+    first[1:] = target[order][1:] != target[order][:-1]
+    winners = order[first]
 
+    result[new_y[winners], new_x[winners]] = swing[ys[winners], xs[winners]]
     return result
 
 
-def create_vertical_frame(frame, direction, swing_angle):
+def paste_masked(canvas, layer):
+    """Paste a layer onto the canvas using its alpha as the mask (Image.paste(layer, (0, 0), layer))."""
+    mask = layer[..., 3:4].astype(np.uint32)
+    # Pillow's integer blend: (canvas * (255 - mask) + layer * mask) / 255, rounded
+    blend = canvas.astype(np.uint32) * (255 - mask) + layer.astype(np.uint32) * mask + 128
+    canvas[...] = ((blend >> 8) + blend) >> 8
+
+
+def create_vertical_frame(frame, swing_pixels, direction, swing_angle):
     """
     Create vertical attack frame.
     - Body stays exactly the same
     - Only swing effect is rotated
     """
-    body, swing = separate_swing_and_body(frame)
+    body, swing = separate_swing_and_body(frame, swing_pixels)
 
     # Get pivot point (center of body)
     pivot = get_body_center(body)
@@ -122,22 +122,17 @@ def create_vertical_frame(frame, direction, swing_angle):
     rotated_swing = rotate_swing_only(swing, pivot, angle)
 
     # Composite: body (unchanged) + rotated swing
-    result = Image.new('RGBA', (FRAME_WIDTH, FRAME_HEIGHT), (0, 0, 0, 0))
-    result.paste(body, (0, 0), body)
-    result.paste(rotated_swing, (0, 0), rotated_swing)
+    result = np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 4), np.uint8)
+    paste_masked(result, body)
+    paste_masked(result, rotated_swing)
 
     return result
 
 
 def save_sprite_sheet(frames, output_path):
     """Save frames as horizontal sprite sheet."""
-    total_width = FRAME_WIDTH * len(frames)
-    sheet = Image.new('RGBA', (total_width, FRAME_HEIGHT), (0, 0, 0, 0))
-
-    for i, frame in enumerate(frames):
-        sheet.paste(frame, (i * FRAME_WIDTH, 0))
-
-    sheet.save(output_path)
+    sheet = np.concatenate(frames, axis=1)
+    Image.fromarray(sheet, 'RGBA').save(output_path)
     print(f"  Saved: {output_path}")
 
 
@@ -148,12 +143,15 @@ def process_unit(input_path, output_prefix, num_frames, swing_angle=70):
     frames = load_frames(input_path, num_frames)
     print(f"  Loaded {num_frames} frames")
 
+    # Classify every pixel of the sheet at once
+    swing_pixels = swing_effect_mask(frames)
+
     down_frames = []
     up_frames = []
 
-    for frame in frames:
-        down_frames.append(create_vertical_frame(frame, 'down', swing_angle))
-        up_frames.append(create_vertical_frame(frame, 'up', swing_angle))
+    for frame, frame_swing in zip(frames, swing_pixels):
+        down_frames.append(create_vertical_frame(frame, frame_swing, 'down', swing_angle))
+        up_frames.append(create_vertical_frame(frame, frame_swing, 'up', swing_angle))
 
     save_sprite_sheet(down_frames, f"{output_prefix}_attack_down.png")
     save_sprite_sheet(up_frames, f"{output_prefix}_attack_up.png")
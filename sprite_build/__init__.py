@@ -0,0 +1,30 @@
+"""
+Sprite Build
+------------
+Incremental build of the generated unit sprite sheets:
+- units: discovers unit attack sheets in the art pack and the frontend
+- transforms: maps each unit to the generate_* script that derives its
+  _attack_up/_attack_down sheets
+- manifest: content hashes of the last build, so unchanged work is skipped
+- atlas: packs every animation sheet into power-of-two texture atlases
+- build: runs the outstanding jobs on a process pool
+
+Run from the repository root with ``python -m sprite_build``.
+"""
+
+from sprite_build.build import BuildReport, plan_jobs, run_build
+from sprite_build.manifest import Manifest
+from sprite_build.transforms import TRANSFORMS, UNIT_TRANSFORMS, Transform
+from sprite_build.units import Unit, discover_units
+
+__all__ = [
+    "BuildReport",
+    "Manifest",
+    "TRANSFORMS",
+    "Transform",
+    "UNIT_TRANSFORMS",
+    "Unit",
+    "discover_units",
+    "plan_jobs",
+    "run_build",
+]
@@ -0,0 +1,108 @@
+"""
+Sprite Build CLI
+----------------
+Regenerates the vertical attack sheets of every unit whose source sheet
+or generate_* script changed since the last build, then the unit texture
+atlas (frontend/public/assets/atlases) if any animation sheet changed:
+
+    python -m sprite_build                     Build what is out of date
+    python -m sprite_build --units knight      Only these units
+    python -m sprite_build --units werebear=rotate
+                                               A unit without a configured transform
+    python -m sprite_build --force --jobs 8    Rebuild everything on 8 processes,
+                                               including the sheets a fresh clone keeps
+    python -m sprite_build --no-atlas          Skip repacking the unit atlas
+    python -m sprite_build --webp --palette --max-error 4
+                                               Smaller atlas pages, if within the error
+    python -m sprite_build --report            Bytes saved per unit by the atlas
+    python -m sprite_build --list              Show units and their transforms
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from sprite_build.build import ATLAS_KEY, run_build
+from sprite_build.transforms import TRANSFORMS, UNIT_TRANSFORMS
+from sprite_build.units import discover_units
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def parse_units(value: str) -> dict[str, str | None]:
+    overrides: dict[str, str | None] = {}
+    for item in value.split(","):
+        unit_id, _, transform = item.strip().partition("=")
+        if unit_id:
+            overrides[unit_id] = transform or None
+    return overrides
+
+
+def list_units(root: Path) -> None:
+    for unit_id, unit in sorted(discover_units(root).items()):
+        print(f"{unit_id:<20} {UNIT_TRANSFORMS.get(unit_id, '-'):<8} {unit.source}")
+
+
+def print_atlas_report(atlas: dict) -> None:
+    print(f"\n{'unit':<12} {'frames':>6} {'unique':>6} {'strips':>9} {'atlas':>9} {'saved':>9}")
+    before = after = 0
+    for unit_id, unit in atlas["units"].items():
+        before += unit["bytes_before"]
+        after += unit["bytes_after"]
+        print(
+            f"{unit_id:<12} {unit['frames']:>6} {unit['unique']:>6} {unit['bytes_before']:>9,} "
+            f"{unit['bytes_after']:>9,} {unit['bytes_before'] - unit['bytes_after']:>9,}"
+        )
+    print(f"{'total':<12} {'':>6} {'':>6} {before:>9,} {after:>9,} {before - after:>9,}")
+    for page in atlas["pages"]:
+        print(f"  {page['image']}: {page['format']}, {page['bytes']:,} bytes")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m sprite_build", description=__doc__.splitlines()[1])
+    parser.add_argument("--root", type=Path, default=ROOT, help="Repository root")
+    parser.add_argument(
+        "--units", type=parse_units, help="Comma-separated unit ids, optionally UNIT=TRANSFORM"
+    )
+    parser.add_argument("--jobs", "-j", type=int, help="Worker processes (default: CPU count)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if up to date")
+    parser.add_argument("--no-atlas", action="store_true", help="Do not repack the unit atlas")
+    parser.add_argument("--palette", action="store_true", help="Try palette PNG atlas pages")
+    parser.add_argument("--webp", action="store_true", help="Try lossless WebP atlas pages")
+    parser.add_argument(
+        "--max-error", type=int, default=0, help="Largest per-channel error a smaller page may have"
+    )
+    parser.add_argument("--report", action="store_true", help="Print bytes saved per unit by the atlas")
+    parser.add_argument("--dry-run", action="store_true", help="Show what would be built")
+    parser.add_argument("--list", action="store_true", help="List discovered units and exit")
+    args = parser.parse_args()
+
+    if args.list:
+        list_units(args.root)
+        print(f"\nTransforms: {', '.join(TRANSFORMS)}")
+        return 0
+
+    try:
+        report = run_build(
+            args.root, args.units, args.jobs, args.force, args.dry_run, atlas=not args.no_atlas,
+            atlas_options={"palette": args.palette, "webp": args.webp, "max_error": args.max_error},
+        )
+    except ValueError as e:
+        parser.error(str(e))
+
+    verb = "Would build" if args.dry_run else "Built"
+    print(f"{verb} {len(report.built)}, up to date {len(report.skipped)}, "
+          f"failed {len(report.failed)} in {report.seconds * 1000:.0f} ms")
+    if report.kept:
+        print(f"Kept the existing outputs of {len(report.kept)} unrecorded jobs (--force regenerates them)")
+    for unit_id in report.built:
+        print(f"  {unit_id}")
+    for unit_id, error in report.failed.items():
+        print(f"  {unit_id} FAILED: {error}", file=sys.stderr)
+    if report.atlas and (args.report or ATLAS_KEY in report.built):
+        print_atlas_report(report.atlas)
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
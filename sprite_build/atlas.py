@@ -0,0 +1,325 @@
+"""
+Texture Atlas Packer
+--------------------
+Packs every unit animation strip into a few power-of-two atlas pages:
+- frames are trimmed to their opaque area and hashed; identical frames
+  are packed once and share a rect in the metadata
+- pages are filled with a MaxRects packer (best short side fit), the
+  last page shrunk to the smallest power-of-two size that holds the rest
+- metadata is written as a multiatlas JSON (the TexturePacker "JSON
+  array" layout Phaser's load.multiatlas reads): per frame the atlas
+  rect, source size and trim offset; per animation its frame count,
+  frame size and pivot (the bottom centre of its opaque area)
+- pages are RGBA PNG, or optionally palette PNG / lossless WebP when
+  smaller and within a max per-pixel error
+
+Frames are named <unit type>_<animation>/<index>.
+"""
+
+import hashlib
+import io
+import json
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from sprite_build.units import ATLAS_DIR, sheet_unit
+
+MAX_PAGE_SIZE = 2048
+MIN_PAGE_SIZE = 64
+PADDING = 2  # Transparent pixels between frames, so filtering never bleeds
+
+
+class MaxRectsBin:
+    """A page being filled; free space is kept as maximal free rectangles."""
+
+    def __init__(self, width: int, height: int) -> None:
+        self.free = [(0, 0, width, height)]
+
+    def insert(self, width: int, height: int) -> tuple[int, int] | None:
+        best = None
+        for x, y, free_w, free_h in self.free:
+            if width <= free_w and height <= free_h:
+                fit = (min(free_w - width, free_h - height), max(free_w - width, free_h - height))
+                if best is None or fit < best[0]:
+                    best = (fit, x, y)
+        if best is None:
+            return None
+        _, x, y = best
+        self._place(x, y, width, height)
+        return x, y
+
+    def _place(self, x: int, y: int, width: int, height: int) -> None:
+        kept = []
+        split = []
+        for fx, fy, fw, fh in self.free:
+            if x >= fx + fw or x + width <= fx or y >= fy + fh or y + height <= fy:
+                kept.append((fx, fy, fw, fh))
+                continue
+            # Split the overlapped rectangle into up to four maximal ones
+            if x > fx:
+                split.append((fx, fy, x - fx, fh))
+            if x + width < fx + fw:
+                split.append((x + width, fy, fx + fw - x - width, fh))
+            if y > fy:
+                split.append((fx, fy, fw, y - fy))
+            if y + height < fy + fh:
+                split.append((fx, y + height, fw, fy + fh - y - height))
+
+        # Drop rectangles contained in another. The kept ones already were
+        # maximal among themselves, so only pairs with a new piece can nest.
+        split = [
+            rect for i, rect in enumerate(split)
+            if not any(_contains(other, rect) for other in kept)
+            and not any(_contains(other, rect) and (other != rect or j < i) for j, other in enumerate(split) if j != i)
+        ]
+        kept = [rect for rect in kept if not any(_contains(other, rect) for other in split)]
+        self.free = kept + split
+
+
+def _contains(outer: tuple, inner: tuple) -> bool:
+    return (
+        outer[0] <= inner[0] and outer[1] <= inner[1]
+        and inner[0] + inner[2] <= outer[0] + outer[2]
+        and inner[1] + inner[3] <= outer[1] + outer[3]
+    )
+
+
+def page_sizes(max_size: int) -> list[tuple[int, int]]:
+    """Power-of-two page sizes, square or twice as wide, smallest first."""
+    sides = []
+    side = MIN_PAGE_SIZE
+    while side <= max_size:
+        sides.append(side)
+        side *= 2
+    sizes = [(w, h) for w in sides for h in sides if h <= w <= 2 * h]
+    return sorted(sizes, key=lambda size: (size[0] * size[1], size[0]))
+
+
+def fill_page(width: int, height: int, order: list[int], sizes: list[tuple[int, int]]) -> dict[int, tuple[int, int]]:
+    """Place as many of the frames (in order) as fit; index -> (x, y)."""
+    page = MaxRectsBin(width + PADDING, height + PADDING)
+    placed = {}
+    for index in order:
+        w, h = sizes[index]
+        position = page.insert(w + PADDING, h + PADDING)
+        if position is not None:
+            placed[index] = position
+    return placed
+
+
+def pack(sizes: list[tuple[int, int]], max_size: int = MAX_PAGE_SIZE) -> list[tuple[int, int, dict[int, tuple[int, int]]]]:
+    """Pack rectangles onto pages; returns (width, height, index -> (x, y)) per page."""
+    too_big = [size for size in sizes if size[0] > max_size or size[1] > max_size]
+    if too_big:
+        raise ValueError(f"Frame {too_big[0]} does not fit a {max_size}px page")
+
+    # Largest first packs tightest
+    remaining = sorted(range(len(sizes)), key=lambda i: (-max(sizes[i]), -sizes[i][0] * sizes[i][1], i))
+    pages = []
+    while remaining:
+        area = sum((sizes[i][0] + PADDING) * (sizes[i][1] + PADDING) for i in remaining)
+        page = None
+        for width, height in page_sizes(max_size):
+            if width * height < area and (width, height) != (max_size, max_size):
+                continue
+            placed = fill_page(width, height, remaining, sizes)
+            page = (width, height, placed)
+            if len(placed) == len(remaining):
+                break
+        pages.append(page)
+        remaining = [i for i in remaining if i not in page[2]]
+    return pages
+
+
+def trim_box(frame: np.ndarray) -> tuple[int, int, int, int]:
+    """(x, y, width, height) of the opaque area; a 1x1 box for an empty frame."""
+    alpha = frame[..., 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if rows.size == 0:
+        return (0, 0, 1, 1)
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1] - cols[0]) + 1, int(rows[-1] - rows[0]) + 1)
+
+
+def load_strip(path: Path) -> np.ndarray:
+    """A horizontal strip of square frames as an array (frames, size, size, 4)."""
+    sheet = np.asarray(Image.open(path).convert("RGBA"))
+    size = sheet.shape[0]
+    count = max(sheet.shape[1] // size, 1)
+    sheet = sheet[:, :count * size]
+    return sheet.reshape(size, count, size, 4).swapaxes(0, 1)
+
+
+def encode_page(pixels: np.ndarray, palette: bool = False, webp: bool = False, max_error: int = 0) -> tuple[bytes, str, str]:
+    """
+    Encode a page as RGBA PNG, or as a smaller palette PNG / lossless WebP
+    when enabled and no channel of any pixel is off by more than max_error.
+    Returns (data, file extension, format name).
+    """
+    image = Image.fromarray(pixels, "RGBA")
+    candidates = [(_encode(image, "PNG"), "png", "RGBA8888")]
+    if palette:
+        quantized = image.quantize(256, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        candidates.append((_encode(quantized, "PNG", optimize=True), "png", "PALETTE8"))
+    if webp:
+        candidates.append((_encode(image, "WEBP", lossless=True, exact=True), "webp", "RGBA8888"))
+
+    best = candidates[0]
+    for candidate in candidates[1:]:
+        if len(candidate[0]) < len(best[0]) and pixel_error(pixels, candidate[0]) <= max_error:
+            best = candidate
+    return best
+
+
+def _encode(image: Image.Image, format: str, **options: object) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format, **options)
+    return buffer.getvalue()
+
+
+def pixel_error(pixels: np.ndarray, encoded: bytes) -> int:
+    """Largest per-channel difference after decoding; fully transparent pixels match any colour."""
+    decoded = np.asarray(Image.open(io.BytesIO(encoded)).convert("RGBA")).astype(np.int16)
+    difference = np.abs(decoded - pixels.astype(np.int16))
+    hidden = (pixels[..., 3] == 0) & (decoded[..., 3] == 0)
+    difference[hidden] = 0
+    return int(difference.max())
+
+
+def build_atlas(root: str, name: str, sheets: dict[str, str], options: dict | None = None) -> dict:
+    """
+    Pack the sheets (animation key -> path under root) into
+    ATLAS_DIR/<name>-<page>.<png|webp> and ATLAS_DIR/<name>.json.
+
+    Frames with identical pixels are packed once: every frame name keeps
+    its own entry and trim offset, but duplicates point at the rect of the
+    first one, and meta.duplicates maps each duplicate to it. options are
+    encode_page's palette, webp and max_error.
+
+    Returns {"outputs": written paths relative to root, "report": sizes}.
+    """
+    root_path = Path(root)
+    frames = []  # (animation key, frame index, frame size, trim box, unique index)
+    unique = []  # Trimmed pixels of each distinct frame
+    unique_names = []  # Frame name of the first frame with those pixels
+    seen: dict[tuple, int] = {}  # (width, height, pixel hash) -> unique index
+    animations = {}
+    duplicates = {}
+    for key, path in sorted(sheets.items()):
+        strip = load_strip(root_path / path)
+        size = strip.shape[1]
+        rows = np.flatnonzero(strip[..., 3].any(axis=(0, 2)))
+        animations[key] = {
+            "frames": len(strip),
+            "frameSize": {"w": size, "h": size},
+            "pivot": {"x": 0.5, "y": round(float(rows[-1] + 1) / size, 4) if rows.size else 1.0},
+        }
+        for index, frame in enumerate(strip):
+            left, top, w, h = box = trim_box(frame)
+            pixels = np.ascontiguousarray(frame[top:top + h, left:left + w])
+            digest = (w, h, hashlib.blake2b(pixels.tobytes(), digest_size=16).digest())
+            if digest in seen:
+                duplicates[f"{key}/{index}"] = unique_names[seen[digest]]
+            else:
+                seen[digest] = len(unique)
+                unique.append(pixels)
+                unique_names.append(f"{key}/{index}")
+            frames.append((key, index, size, box, seen[digest]))
+
+    pages = pack([pixels.shape[1::-1] for pixels in unique])
+    page_of = {}  # unique index -> (page, x, y)
+    for page_index, (_, _, placed) in enumerate(pages):
+        for unique_index, (x, y) in placed.items():
+            page_of[unique_index] = (page_index, x, y)
+
+    entries: list[list[dict]] = [[] for _ in pages]
+    for key, index, size, (left, top, w, h), unique_index in frames:
+        page_index, x, y = page_of[unique_index]
+        entries[page_index].append({
+            "filename": f"{key}/{index}",
+            "frame": {"x": x, "y": y, "w": w, "h": h},
+            "rotated": False,
+            "trimmed": (w, h) != (size, size),
+            "spriteSourceSize": {"x": left, "y": top, "w": w, "h": h},
+            "sourceSize": {"w": size, "h": size},
+        })
+
+    output_dir = root_path / ATLAS_DIR
+    output_dir.mkdir(parents=True, exist_ok=True)
+    textures = []
+    written = []
+    page_reports = []
+    for page_index, (width, height, placed) in enumerate(pages):
+        pixels = np.zeros((height, width, 4), np.uint8)
+        for unique_index, (x, y) in placed.items():
+            h, w = unique[unique_index].shape[:2]
+            pixels[y:y + h, x:x + w] = unique[unique_index]
+        data, extension, format = encode_page(pixels, **(options or {}))
+        image = f"{name}-{page_index}.{extension}"
+        (output_dir / image).write_bytes(data)
+        written.append((ATLAS_DIR / image).as_posix())
+        page_reports.append({"image": image, "format": format, "bytes": len(data)})
+        textures.append({
+            "image": image,
+            "format": format,
+            "size": {"w": width, "h": height},
+            "scale": 1,
+            "frames": sorted(entries[page_index], key=lambda entry: entry["filename"]),
+        })
+
+    # Pages left over from a bigger build or another format
+    for stale in [*output_dir.glob(f"{name}-*.png"), *output_dir.glob(f"{name}-*.webp")]:
+        if (ATLAS_DIR / stale.name).as_posix() not in written:
+            stale.unlink()
+
+    metadata = {
+        "textures": textures,
+        "meta": {"app": "sprite_build", "version": 1, "animations": animations, "duplicates": duplicates},
+    }
+    (output_dir / f"{name}.json").write_text(json.dumps(metadata, separators=(",", ":")))
+    written.append((ATLAS_DIR / f"{name}.json").as_posix())
+
+    report = {
+        "pages": page_reports,
+        "units": unit_report(root_path, sheets, frames, unique, pages, page_of, page_reports),
+    }
+    return {"outputs": written, "report": report}
+
+
+def unit_report(
+    root: Path,
+    sheets: dict[str, str],
+    frames: list[tuple],
+    unique: list[np.ndarray],
+    pages: list[tuple],
+    page_of: dict[int, tuple[int, int, int]],
+    page_reports: list[dict],
+) -> dict[str, dict]:
+    """
+    Per unit: its frames and distinct frames, the bytes of its strip PNGs
+    and its share of the atlas pages, split by packed area.
+    """
+    page_area = [0] * len(pages)
+    for unique_index, pixels in enumerate(unique):
+        page_area[page_of[unique_index][0]] += pixels.shape[0] * pixels.shape[1]
+
+    units: dict[str, dict] = {}
+    counted = set()
+    for key, _, _, _, unique_index in frames:
+        unit = units.setdefault(sheet_unit(key), {"frames": 0, "unique": 0, "bytes_before": 0, "bytes_after": 0.0})
+        unit["frames"] += 1
+        if unique_index in counted:
+            continue
+        counted.add(unique_index)
+        unit["unique"] += 1
+        page_index = page_of[unique_index][0]
+        area = unique[unique_index].shape[0] * unique[unique_index].shape[1]
+        unit["bytes_after"] += page_reports[page_index]["bytes"] * area / page_area[page_index]
+
+    for key, path in sheets.items():
+        units[sheet_unit(key)]["bytes_before"] += (root / path).stat().st_size
+    for unit in units.values():
+        unit["bytes_after"] = round(unit["bytes_after"])
+    return dict(sorted(units.items()))
@@ -0,0 +1,257 @@
+"""
+Sprite Build Runner
+-------------------
+Plans one job per unit with a transform, skips the jobs the manifest
+shows are up to date and runs the rest on a process pool, then repacks
+the unit atlas if any sheet changed. The main process only reads PNG
+headers and hashes; NumPy and Pillow are imported by the workers.
+
+A job the manifest has no record of (e.g. in a fresh clone) whose
+outputs all exist keeps them: they are the committed sheets, and are
+recorded as built from the current inputs. --force regenerates them.
+"""
+
+import contextlib
+import hashlib
+import importlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from sprite_build.manifest import Manifest
+from sprite_build.transforms import TRANSFORMS, UNIT_TRANSFORMS
+from sprite_build.units import (
+    ATLAS_DIR,
+    Unit,
+    discover_sheets,
+    discover_units,
+    frame_count,
+)
+
+ATLAS_NAME = "units"
+ATLAS_KEY = f"atlas:{ATLAS_NAME}"
+ATLAS_SCRIPT = Path(__file__).with_name("atlas.py")
+
+
+@dataclass
+class Job:
+    unit: Unit
+    transform: str
+    num_frames: int
+    record: dict
+
+    @property
+    def outputs(self) -> list[Path]:
+        return list(self.unit.outputs)
+
+
+@dataclass
+class BuildReport:
+    built: list[str] = field(default_factory=list)
+    skipped: list[str] = field(default_factory=list)
+    kept: list[str] = field(default_factory=list)  # Unrecorded jobs whose outputs existed
+    failed: dict[str, str] = field(default_factory=dict)
+    seconds: float = 0.0
+    atlas: dict | None = None  # Size report of the current atlas
+
+
+def plan_jobs(root: Path, manifest: Manifest, overrides: dict[str, str | None] | None = None) -> list[Job]:
+    """
+    One job per unit to build. overrides maps unit id -> transform name
+    (None for the configured one) and limits the build to those units.
+    """
+    units = discover_units(root)
+    if overrides:
+        unknown = sorted(set(overrides) - set(units))
+        if unknown:
+            raise ValueError(f"Unknown units: {', '.join(unknown)}")
+        selected = {
+            unit_id: transform or UNIT_TRANSFORMS.get(unit_id)
+            for unit_id, transform in overrides.items()
+        }
+        missing = sorted(unit_id for unit_id, transform in selected.items() if transform is None)
+        if missing:
+            raise ValueError(f"No transform configured for: {', '.join(missing)} (use UNIT=TRANSFORM)")
+    else:
+        selected = {unit_id: name for unit_id, name in UNIT_TRANSFORMS.items() if unit_id in units}
+
+    versions = {}
+    jobs = []
+    for unit_id, name in sorted(selected.items()):
+        if name not in TRANSFORMS:
+            raise ValueError(f"Unknown transform {name!r}; choose from {', '.join(TRANSFORMS)}")
+        if name not in versions:
+            versions[name] = TRANSFORMS[name].version(root)
+        unit = units[unit_id]
+        record = {
+            "transform": name,
+            "version": versions[name],
+            "source": unit.source.as_posix(),
+            "input": manifest.file_hash(unit.source),
+        }
+        jobs.append(Job(unit, name, frame_count(root / unit.source), record))
+    return jobs
+
+
+def run_in_worker(root: str, module: str, function: str, *args: object) -> object:
+    """Worker entry point: call module.function(*args) with its prints silenced."""
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    target = getattr(importlib.import_module(module), function)
+    with contextlib.redirect_stdout(io.StringIO()):
+        return target(*args)
+
+
+def atlas_record(root: Path, manifest: Manifest, options: dict) -> tuple[dict, dict[str, str]]:
+    """The atlas job's record and its sheets (animation key -> path)."""
+    sheets = {key: path.as_posix() for key, path in discover_sheets(root).items()}
+    inputs = {key: [path, manifest.file_hash(Path(path))] for key, path in sheets.items()}
+    record = {
+        "transform": "atlas",
+        "version": hashlib.sha256(ATLAS_SCRIPT.read_bytes()).hexdigest(),
+        "input": hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest(),
+        "options": options,
+    }
+    return record, sheets
+
+
+def atlas_outputs(root: Path) -> list[Path]:
+    """The atlas metadata and the pages it lists, or [] unless all exist."""
+    metadata = ATLAS_DIR / f"{ATLAS_NAME}.json"
+    try:
+        textures = json.loads((root / metadata).read_text())["textures"]
+        outputs = [ATLAS_DIR / texture["image"] for texture in textures] + [metadata]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+    return outputs if all((root / path).exists() for path in outputs) else []
+
+
+def keeps_outputs(manifest: Manifest, key: str, outputs: list[Path]) -> bool:
+    """Whether a job without a manifest record already has all its outputs."""
+    return key not in manifest.jobs and bool(outputs) and all(
+        (manifest.root / path).exists() for path in outputs
+    )
+
+
+def run_build(
+    root: Path,
+    overrides: dict[str, str | None] | None = None,
+    workers: int | None = None,
+    force: bool = False,
+    dry_run: bool = False,
+    atlas: bool = True,
+    atlas_options: dict | None = None,
+) -> BuildReport:
+    """
+    Build every out-of-date unit, then the atlas, and update the manifest.
+    atlas_options are atlas.encode_page's palette, webp and max_error.
+    """
+    start = time.perf_counter()
+    root = root.resolve()
+    manifest = Manifest.load(root)
+    report = BuildReport()
+    atlas_options = {"palette": False, "webp": False, "max_error": 0, **(atlas_options or {})}
+
+    pending = []
+    for job in plan_jobs(root, manifest, overrides):
+        if not force and manifest.is_current(job.unit.id, job.record):
+            report.skipped.append(job.unit.id)
+        elif not force and keeps_outputs(manifest, job.unit.id, job.outputs):
+            manifest.record(job.unit.id, job.record, job.outputs)
+            report.kept.append(job.unit.id)
+        else:
+            pending.append(job)
+
+    def atlas_state(record: dict) -> str:
+        """Whether to skip, keep or build the atlas, given its record now."""
+        if force:
+            return "build"
+        # Before a dry run's sheets are built, the record still shows the old ones
+        if not (dry_run and pending) and manifest.is_current(ATLAS_KEY, record):
+            return "skip"
+        if not pending and keeps_outputs(manifest, ATLAS_KEY, atlas_outputs(root)):
+            return "keep"
+        return "build"
+
+    if dry_run:
+        report.built = [job.unit.id for job in pending]
+        if atlas:
+            state = atlas_state(atlas_record(root, manifest, atlas_options)[0])
+            if state == "skip":
+                report.skipped.append(ATLAS_KEY)
+            elif state == "keep":
+                report.kept.append(ATLAS_KEY)
+            else:
+                report.built.append(ATLAS_KEY)
+        report.seconds = time.perf_counter() - start
+        return report
+
+    pool = None
+    try:
+        if pending:
+            pool = ProcessPoolExecutor(max_workers=min(workers or os.cpu_count() or 1, len(pending)))
+            futures = {}
+            for job in pending:
+                (root / job.unit.output_prefix).parent.mkdir(parents=True, exist_ok=True)
+                future = pool.submit(
+                    run_in_worker,
+                    str(root),
+                    TRANSFORMS[job.transform].module,
+                    "process_unit",
+                    str(root / job.unit.source),
+                    str(root / job.unit.output_prefix),
+                    job.num_frames,
+                )
+                futures[future] = job
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    report.failed[job.unit.id] = f"{type(e).__name__}: {e}"
+                    manifest.jobs.pop(job.unit.id, None)
+                else:
+                    manifest.record(job.unit.id, job.record, job.outputs)
+                    report.built.append(job.unit.id)
+            report.built.sort()
+
+        # The atlas packs the sheets written above, so it runs last
+        if atlas:
+            record, sheets = atlas_record(root, manifest, atlas_options)
+            state = atlas_state(record)
+            if state == "skip":
+                report.skipped.append(ATLAS_KEY)
+            elif state == "keep":
+                manifest.record(ATLAS_KEY, record, atlas_outputs(root))
+                report.kept.append(ATLAS_KEY)
+            else:
+                pool = pool or ProcessPoolExecutor(max_workers=1)
+                future = pool.submit(
+                    run_in_worker, str(root), "sprite_build.atlas", "build_atlas",
+                    str(root), ATLAS_NAME, sheets, atlas_options,
+                )
+                try:
+                    result = future.result()
+                except Exception as e:
+                    report.failed[ATLAS_KEY] = f"{type(e).__name__}: {e}"
+                    manifest.jobs.pop(ATLAS_KEY, None)
+                else:
+                    # The size report is kept for --report on later no-op builds
+                    manifest.record(
+                        ATLAS_KEY, {**record, "report": result["report"]},
+                        [Path(path) for path in result["outputs"]],
+                    )
+                    report.built.append(ATLAS_KEY)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        manifest.save()
+
+    report.atlas = manifest.jobs.get(ATLAS_KEY, {}).get("report")
+    report.seconds = time.perf_counter() - start
+    return report
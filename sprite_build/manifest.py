@@ -0,0 +1,83 @@
+"""
+Build Manifest
+--------------
+JSON record of the last build, kept at .sprite-build.json in the
+repository root (not committed):
+- files: path -> size, mtime and sha256, so unchanged files are not re-hashed
+- jobs: job key (unit id, or atlas:<name>) -> transform, script version,
+  input hash and the hash of every output it wrote
+
+A job is up to date when its transform, script version and input hash
+match and its outputs are still the files it wrote. Without a manifest
+(a fresh clone) the build records the committed outputs rather than
+regenerating them.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+MANIFEST_NAME = ".sprite-build.json"
+MANIFEST_FORMAT = 2
+
+
+class Manifest:
+    def __init__(self, root: Path, files: dict | None = None, jobs: dict | None = None) -> None:
+        self.root = root
+        self.files: dict[str, dict] = files or {}
+        self.jobs: dict[str, dict] = jobs or {}
+
+    @property
+    def path(self) -> Path:
+        return self.root / MANIFEST_NAME
+
+    @classmethod
+    def load(cls, root: Path) -> "Manifest":
+        try:
+            data = json.loads((root / MANIFEST_NAME).read_text())
+        except (OSError, ValueError):
+            return cls(root)
+        if data.get("format") != MANIFEST_FORMAT:
+            return cls(root)
+        return cls(root, data.get("files"), data.get("jobs"))
+
+    def save(self) -> None:
+        data = {"format": MANIFEST_FORMAT, "files": self.files, "jobs": self.jobs}
+        temp = self.path.with_suffix(".tmp")
+        temp.write_text(json.dumps(data, indent=1, sort_keys=True))
+        os.replace(temp, self.path)
+
+    def file_hash(self, path: Path) -> str | None:
+        """sha256 of a file under root; None if it does not exist."""
+        key = path.as_posix()
+        try:
+            stat = (self.root / path).stat()
+        except FileNotFoundError:
+            self.files.pop(key, None)
+            return None
+
+        cached = self.files.get(key)
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+
+        digest = hashlib.sha256((self.root / path).read_bytes()).hexdigest()
+        self.files[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest}
+        return digest
+
+    def is_current(self, key: str, record: dict) -> bool:
+        previous = self.jobs.get(key)
+        if previous is None:
+            return False
+        if any(previous.get(field) != value for field, value in record.items()):
+            return False
+        outputs = previous.get("outputs") or {}
+        return bool(outputs) and all(
+            self.file_hash(Path(path)) == digest for path, digest in outputs.items()
+        )
+
+    def record(self, key: str, record: dict, outputs: list[Path]) -> None:
+        self.jobs[key] = {
+            **record,
+            "outputs": {path.as_posix(): self.file_hash(path) for path in outputs},
+        }
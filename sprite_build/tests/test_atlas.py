@@ -0,0 +1,95 @@
+"""
+Texture Atlas Tests
+-------------------
+Tests that packed frames round-trip to the source strips and that
+identical frames are packed once.
+"""
+
+import json
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+Image = pytest.importorskip("PIL.Image")
+
+from sprite_build.atlas import build_atlas, encode_page, pixel_error
+from sprite_build.units import ATLAS_DIR
+
+SIZE = 32
+
+
+def frame(seed: int) -> "np.ndarray":
+    """A square frame with an opaque random block off-centre."""
+    pixels = np.zeros((SIZE, SIZE, 4), np.uint8)
+    block = np.random.default_rng(seed).integers(0, 256, (10, 12, 4), dtype=np.uint8)
+    block[..., 3] = 255
+    pixels[5 + seed % 7:15 + seed % 7, 3:15] = block
+    return pixels
+
+
+def write_strip(root: Path, name: str, frames: list) -> str:
+    path = Path("units") / name
+    (root / path).parent.mkdir(parents=True, exist_ok=True)
+    Image.fromarray(np.concatenate(frames, axis=1), "RGBA").save(root / path)
+    return path.as_posix()
+
+
+def unpack(root: Path, metadata: dict) -> dict[str, "np.ndarray"]:
+    """Every frame rebuilt at its source size from the atlas pages."""
+    frames = {}
+    for texture in metadata["textures"]:
+        page = np.asarray(Image.open(root / ATLAS_DIR / texture["image"]).convert("RGBA"))
+        for entry in texture["frames"]:
+            rect, offset, source = entry["frame"], entry["spriteSourceSize"], entry["sourceSize"]
+            pixels = np.zeros((source["h"], source["w"], 4), np.uint8)
+            pixels[offset["y"]:offset["y"] + rect["h"], offset["x"]:offset["x"] + rect["w"]] = (
+                page[rect["y"]:rect["y"] + rect["h"], rect["x"]:rect["x"] + rect["w"]]
+            )
+            frames[entry["filename"]] = pixels
+    return frames
+
+
+def test_frames_round_trip_and_duplicates_are_packed_once(tmp_path: Path) -> None:
+    idle = [frame(1), frame(2), frame(1)]
+    attack = [frame(1), frame(3)]
+    sheets = {
+        "knight_idle": write_strip(tmp_path, "knight_idle.png", idle),
+        "knight_attack": write_strip(tmp_path, "knight_attack.png", attack),
+    }
+
+    result = build_atlas(str(tmp_path), "units", sheets)
+    metadata = json.loads((tmp_path / ATLAS_DIR / "units.json").read_text())
+
+    frames = unpack(tmp_path, metadata)
+    expected = {f"knight_idle/{i}": pixels for i, pixels in enumerate(idle)}
+    expected.update({f"knight_attack/{i}": pixels for i, pixels in enumerate(attack)})
+    assert frames.keys() == expected.keys()
+    for name, pixels in expected.items():
+        assert np.array_equal(frames[name], pixels), name
+
+    # knight_attack/0 sorts first, so the other copies of frame(1) point at it
+    assert metadata["meta"]["duplicates"] == {
+        "knight_idle/0": "knight_attack/0",
+        "knight_idle/2": "knight_attack/0",
+    }
+    rects = {
+        entry["filename"]: entry["frame"] for texture in metadata["textures"] for entry in texture["frames"]
+    }
+    assert rects["knight_idle/0"] == rects["knight_idle/2"] == rects["knight_attack/0"]
+    assert len({json.dumps(rect, sort_keys=True) for rect in rects.values()}) == 3
+
+    assert metadata["meta"]["animations"]["knight_idle"]["frames"] == 3
+    unit = result["report"]["units"]["knight"]
+    assert (unit["frames"], unit["unique"]) == (5, 3)
+    for texture in metadata["textures"]:
+        for side in texture["size"].values():
+            assert side & (side - 1) == 0  # Power of two
+
+
+def test_smaller_pages_stay_within_max_error() -> None:
+    pixels = np.concatenate([frame(1), frame(2)], axis=1)
+
+    data, extension, _ = encode_page(pixels, palette=True, webp=True, max_error=0)
+    assert pixel_error(pixels, data) == 0
+    assert extension in ("png", "webp")
@@ -0,0 +1,130 @@
+"""
+Sprite Build Tests
+------------------
+Tests for incremental builds: manifest skips and invalidation, and
+keeping the committed outputs of a fresh clone.
+"""
+
+import json
+import struct
+from pathlib import Path
+
+from sprite_build import run_build
+from sprite_build.build import ATLAS_KEY
+from sprite_build.units import ATLAS_DIR, FRONTEND_UNITS_DIR
+
+# Stand-in for the "swing" transform script: writes both sheets from the input bytes
+SCRIPT = '''
+from pathlib import Path
+
+
+def process_unit(input_path, output_prefix, num_frames):
+    data = Path(input_path).read_bytes() + b"{marker}"
+    for direction in ("up", "down"):
+        Path(f"{{output_prefix}}_attack_{{direction}}.png").write_bytes(data)
+'''
+
+
+def write_sheet(root: Path, name: str, extra: bytes = b"") -> Path:
+    """A file with just enough of a PNG header for discovery (3 frames of 100px)."""
+    path = root / FRONTEND_UNITS_DIR / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", 300, 100) + extra)
+    return path
+
+
+def write_script(root: Path, marker: str = "v1") -> None:
+    (root / "generate_vertical_melee.py").write_text(SCRIPT.format(marker=marker))
+
+
+def make_repo(root: Path) -> Path:
+    write_sheet(root, "knight_attack.png")
+    write_script(root)
+    return root / FRONTEND_UNITS_DIR / "knight_attack_up.png"
+
+
+def build(root: Path, force: bool = False, atlas: bool = False):
+    return run_build(root, workers=1, force=force, atlas=atlas)
+
+
+def test_unchanged_build_is_skipped(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+
+    assert build(tmp_path).built == ["knight"]
+    assert output.read_bytes().endswith(b"v1")
+
+    report = build(tmp_path)
+    assert report.built == []
+    assert report.skipped == ["knight"]
+
+
+def test_changed_inputs_rebuild(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    build(tmp_path)
+
+    write_sheet(tmp_path, "knight_attack.png", extra=b"edited")
+    assert build(tmp_path).built == ["knight"]
+    assert b"edited" in output.read_bytes()
+
+    write_script(tmp_path, marker="v2")
+    assert build(tmp_path).built == ["knight"]
+    assert output.read_bytes().endswith(b"v2")
+
+
+def test_edited_output_rebuilds(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    build(tmp_path)
+
+    output.write_bytes(b"hand edited")
+    assert build(tmp_path).built == ["knight"]
+    assert output.read_bytes().endswith(b"v1")
+
+
+def test_fresh_clone_keeps_committed_outputs(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    output.write_bytes(b"committed up")
+    output.with_name("knight_attack_down.png").write_bytes(b"committed down")
+
+    report = build(tmp_path)
+    assert report.built == []
+    assert report.kept == ["knight"]
+    assert output.read_bytes() == b"committed up"
+
+    # Recorded as current, so later source edits still rebuild
+    assert build(tmp_path).skipped == ["knight"]
+    write_sheet(tmp_path, "knight_attack.png", extra=b"edited")
+    assert build(tmp_path).built == ["knight"]
+
+
+def test_force_regenerates_committed_outputs(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    output.write_bytes(b"committed up")
+    output.with_name("knight_attack_down.png").write_bytes(b"committed down")
+
+    assert build(tmp_path, force=True).built == ["knight"]
+    assert output.read_bytes().endswith(b"v1")
+
+
+def test_partial_outputs_are_built(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    output.write_bytes(b"committed up")  # attack_down is missing
+
+    assert build(tmp_path).built == ["knight"]
+    assert output.read_bytes().endswith(b"v1")
+
+
+def test_fresh_clone_keeps_committed_atlas(tmp_path: Path) -> None:
+    output = make_repo(tmp_path)
+    output.write_bytes(b"committed up")
+    output.with_name("knight_attack_down.png").write_bytes(b"committed down")
+    atlas_dir = tmp_path / ATLAS_DIR
+    atlas_dir.mkdir(parents=True)
+    (atlas_dir / "units-0.png").write_bytes(b"committed page")
+    (atlas_dir / "units.json").write_text(json.dumps({"textures": [{"image": "units-0.png"}]}))
+
+    assert run_build(tmp_path, dry_run=True).kept == ["knight", ATLAS_KEY]
+    report = build(tmp_path, atlas=True)
+    assert report.kept == ["knight", ATLAS_KEY]
+    assert (atlas_dir / "units-0.png").read_bytes() == b"committed page"
+    assert build(tmp_path, atlas=True).skipped == ["knight", ATLAS_KEY]
+
@@ -0,0 +1,50 @@
+"""
+Sprite Transforms
+-----------------
+The generate_* scripts at the repository root, each exposing
+process_unit(input_path, output_prefix, num_frames):
+- lance: rotate only the lance, rider and horse stay put
+- swing: rotate only the white swing effect around the body
+- rotate: rotate the whole sprite (bicubic), anchored on frame 0
+- archer: hybrid bow/body rotation, trimmed to the first 9 frames
+
+A transform's version is the hash of its script, so editing a script
+rebuilds exactly the units that use it.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+
+@dataclass(frozen=True)
+class Transform:
+    name: str
+    module: str
+
+    @property
+    def script(self) -> Path:
+        return Path(f"{self.module}.py")
+
+    def version(self, root: Path) -> str:
+        return hashlib.sha256((root / self.script).read_bytes()).hexdigest()
+
+
+TRANSFORMS = {
+    transform.name: transform
+    for transform in (
+        Transform("lance", "generate_lancer_vertical"),
+        Transform("swing", "generate_vertical_melee"),
+        Transform("rotate", "generate_melee_vertical_attacks"),
+        Transform("archer", "generate_archer_vertical_attacks"),
+    )
+}
+
+# Units whose vertical attack sheets are generated, and how. Others keep
+# their hand-made sheets unless a transform is given on the command line.
+UNIT_TRANSFORMS = {
+    "lancer": "lance",
+    "knight": "swing",
+    "axeman": "swing",
+    "archer": "archer",
+}
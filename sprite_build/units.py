@@ -0,0 +1,142 @@
+"""
+Unit Discovery
+--------------
+Finds the attack sheet of every unit:
+- frontend/public/assets/units/<id>_attack.png, the sheets the game loads
+- character_assets/Characters(100x100)/<Name>/<Name>/<Name>-Attack01.png,
+  the art pack, for units not yet imported into the frontend
+
+Frontend sheets win when a unit is in both. Only the PNG header is read,
+so discovery stays cheap on a no-op build.
+
+discover_sheets lists every animation strip the game loads, keyed by the
+name the frontend uses for it (<unit type>_<animation>).
+"""
+
+import re
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+
+FRONTEND_UNITS_DIR = Path("frontend/public/assets/units")
+ATLAS_DIR = Path("frontend/public/assets/atlases")
+PACK_DIR = Path("character_assets/Characters(100x100)")
+FRAME_WIDTH = 100
+
+# Pack folders whose unit id is not the lowercased folder name
+PACK_UNIT_IDS = {
+    "Armored Axeman": "axeman",
+}
+
+# Pack units whose frontend attack is not Attack01
+PACK_ATTACK_SHEETS = {
+    "Archer": "Attack02",
+    "Priest": "Attack",
+}
+
+# Frontend file prefixes whose unit type is different
+FRONTEND_UNIT_TYPES = {
+    "enemies-skeleton1": "skeleton1",
+    "enemies-skeleton2": "skeleton2",
+}
+
+# Animation file suffixes -> animation names, including the legacy spellings
+ANIMATION_SUFFIXES = {
+    "idle": "idle",
+    "attack": "attack",
+    "attack_up": "attack_up",
+    "attack_down": "attack_down",
+    "death": "death",
+    "move": "move",
+    "movement": "move",
+    "movemen": "move",
+    "hurt": "hurt",
+    "take_damage": "hurt",
+}
+
+_ANIMATION_SHEET = re.compile(
+    rf"(?P<unit>.+?)_(?P<animation>{'|'.join(sorted(ANIMATION_SUFFIXES, key=len, reverse=True))})\.png"
+)
+_ATTACK_SHEET = re.compile(r"(?P<unit>.+)_attack\.png")
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@dataclass(frozen=True)
+class Unit:
+    """A unit attack sheet and the prefix its vertical variants are written to."""
+
+    id: str
+    source: Path
+    output_prefix: Path
+
+    @property
+    def outputs(self) -> tuple[Path, Path]:
+        return (
+            self.output_prefix.with_name(f"{self.output_prefix.name}_attack_up.png"),
+            self.output_prefix.with_name(f"{self.output_prefix.name}_attack_down.png"),
+        )
+
+
+def pack_unit_id(folder: str) -> str:
+    return PACK_UNIT_IDS.get(folder, folder.lower().replace(" ", "_"))
+
+
+def png_size(path: Path) -> tuple[int, int]:
+    """(width, height) from the PNG header."""
+    with open(path, "rb") as f:
+        header = f.read(24)
+    if header[:8] != _PNG_SIGNATURE or header[12:16] != b"IHDR":
+        raise ValueError(f"Not a PNG file: {path}")
+    return struct.unpack(">II", header[16:24])
+
+
+def frame_count(path: Path) -> int:
+    """Number of FRAME_WIDTH frames in a horizontal sheet."""
+    width, _ = png_size(path)
+    return max(width // FRAME_WIDTH, 1)
+
+
+def discover_units(root: Path) -> dict[str, Unit]:
+    """Every unit with an attack sheet, keyed by unit id. Paths are relative to root."""
+    units: dict[str, Unit] = {}
+
+    pack = root / PACK_DIR
+    if pack.is_dir():
+        for folder in sorted(p for p in pack.iterdir() if p.is_dir()):
+            attack = PACK_ATTACK_SHEETS.get(folder.name, "Attack01")
+            sheet = folder / folder.name / f"{folder.name}-{attack}.png"
+            if sheet.is_file():
+                unit_id = pack_unit_id(folder.name)
+                units[unit_id] = Unit(
+                    unit_id, sheet.relative_to(root), FRONTEND_UNITS_DIR / unit_id
+                )
+
+    frontend = root / FRONTEND_UNITS_DIR
+    if frontend.is_dir():
+        for sheet in sorted(frontend.glob("*_attack.png")):
+            unit_id = _ATTACK_SHEET.fullmatch(sheet.name).group("unit")
+            units[unit_id] = Unit(
+                unit_id, sheet.relative_to(root), FRONTEND_UNITS_DIR / unit_id
+            )
+
+    return units
+
+
+def discover_sheets(root: Path) -> dict[str, Path]:
+    """Every unit animation strip in the frontend, keyed by <unit type>_<animation>."""
+    sheets: dict[str, Path] = {}
+    for sheet in sorted((root / FRONTEND_UNITS_DIR).glob("*.png")):
+        match = _ANIMATION_SHEET.fullmatch(sheet.name)
+        if match is None:
+            continue
+        unit_type = FRONTEND_UNIT_TYPES.get(match["unit"], match["unit"])
+        sheets[f"{unit_type}_{ANIMATION_SUFFIXES[match['animation']]}"] = sheet.relative_to(root)
+    return sheets
+
+
+def sheet_unit(key: str) -> str:
+    """The unit type of a discover_sheets key."""
+    for animation in sorted(set(ANIMATION_SUFFIXES.values()), key=len, reverse=True):
+        if key.endswith(f"_{animation}"):
+            return key[: -len(animation) - 1]
+    return key